@@ -3,6 +3,7 @@ import * as admin from 'firebase-admin';
 import nodemailer from 'nodemailer';
 import PDFDocument = require('pdfkit');
 import { randomUUID } from 'crypto';
+import * as https from 'https';
 
 // Initialisation sécurisée du SDK Admin
 // - En environnement Firebase Functions (GCP), l'initialisation par défaut fonctionne (ADC)
@@ -150,6 +151,134 @@ function setCors(res: any) {
 }
 
 // Upload proxy to bypass client-side CORS/preflight/network blocks
+//
+// Protocole par morceaux : un POST JSON {path, contentType, size, customMetadata}
+// ouvre une session d'upload résumable GCS, puis chaque morceau est envoyé en
+// binaire brut (POST application/octet-stream, ?session=<id>&offset=<n>) et
+// relayé tel quel vers la session. Le client n'envoie le morceau suivant
+// qu'après l'accusé de réception du précédent : la mémoire utilisée par requête
+// se limite à un morceau. L'ancien corps JSON {path, base64} reste accepté.
+const UPLOAD_SESSIONS_COLLECTION = 'uploadSessions';
+// Multiple de 256 Kio (exigé par GCS pour les morceaux intermédiaires), bien
+// en dessous de la limite de taille des requêtes HTTP des fonctions
+const UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024;
+// Une URI de session résumable GCS reste valide une semaine
+const UPLOAD_SESSION_TTL_MS = 7 * 24 * 60 * 60 * 1000;
+
+function storageDownloadUrl(bucketName: string, path: string, token: string): string {
+  return `https://firebasestorage.googleapis.com/v0/b/${bucketName}/o/${encodeURIComponent(path)}?alt=media&token=${token}`;
+}
+
+// Envoie un morceau à une session résumable GCS. 308 : morceau reçu, le
+// header Range indique les octets persistés ; 200/201 : objet finalisé.
+function putSessionChunk(sessionUri: string, chunk: Buffer, contentRange: string): Promise<{ status: number; range?: string; body: string }> {
+  return new Promise((resolve, reject) => {
+    const request = https.request(sessionUri, {
+      method: 'PUT',
+      headers: {
+        'Content-Length': chunk.length,
+        'Content-Range': contentRange,
+      },
+    }, (response) => {
+      let body = '';
+      response.setEncoding('utf8');
+      response.on('data', (data) => { body += data; });
+      response.on('end', () => resolve({
+        status: response.statusCode || 0,
+        range: response.headers.range,
+        body,
+      }));
+    });
+    request.on('error', reject);
+    request.end(chunk);
+  });
+}
+
+async function startUploadSession(uid: string, body: any, res: any) {
+  const { path, contentType, size, customMetadata } = body;
+  const total = Number(size);
+  if (!path || !Number.isInteger(total) || total < 0) {
+    res.status(400).json({ error: 'Missing required fields: path, size' });
+    return;
+  }
+  if (!String(path).startsWith(`users/${uid}/`)) {
+    res.status(403).json({ error: 'Forbidden: invalid storage path for user' });
+    return;
+  }
+
+  const token = randomUUID();
+  const resolvedContentType = contentType || 'application/octet-stream';
+  const [sessionUri] = await admin.storage().bucket().file(String(path)).createResumableUpload({
+    metadata: {
+      contentType: resolvedContentType,
+      metadata: {
+        firebaseStorageDownloadTokens: token,
+        ...(customMetadata && typeof customMetadata === 'object' ? customMetadata : {}),
+      },
+    },
+  });
+
+  const sessionRef = await admin.firestore().collection(UPLOAD_SESSIONS_COLLECTION).add({
+    uid,
+    path: String(path),
+    sessionUri,
+    contentType: resolvedContentType,
+    size: total,
+    token,
+    createdAt: admin.firestore.FieldValue.serverTimestamp(),
+    expireAt: admin.firestore.Timestamp.fromMillis(Date.now() + UPLOAD_SESSION_TTL_MS),
+  });
+
+  res.status(200).json({ sessionId: sessionRef.id, chunkSize: UPLOAD_CHUNK_SIZE });
+}
+
+async function uploadSessionChunk(uid: string, req: any, res: any) {
+  const sessionId = String(req.query?.session || '');
+  const offset = Number(req.query?.offset);
+  const chunk: Buffer = req.rawBody || Buffer.alloc(0);
+  if (!sessionId || !Number.isInteger(offset) || offset < 0) {
+    res.status(400).json({ error: 'Missing required query parameters: session, offset' });
+    return;
+  }
+
+  const sessionRef = admin.firestore().collection(UPLOAD_SESSIONS_COLLECTION).doc(sessionId);
+  const sessionSnap = await sessionRef.get();
+  const session = sessionSnap.data();
+  if (!session || session.uid !== uid) {
+    res.status(404).json({ error: 'Upload session not found' });
+    return;
+  }
+  if (offset + chunk.length > session.size) {
+    res.status(400).json({ error: 'Chunk exceeds declared upload size' });
+    return;
+  }
+
+  const contentRange = chunk.length > 0
+    ? `bytes ${offset}-${offset + chunk.length - 1}/${session.size}`
+    : `bytes */${session.size}`;
+  const result = await putSessionChunk(session.sessionUri, chunk, contentRange);
+
+  if (result.status === 308) {
+    // Range absent : aucun octet persisté, le client reprend depuis le début
+    const persisted = /bytes=0-(\d+)/.exec(result.range || '');
+    res.status(200).json({ complete: false, nextOffset: persisted ? Number(persisted[1]) + 1 : 0 });
+    return;
+  }
+  if (result.status !== 200 && result.status !== 201) {
+    res.status(502).json({ error: 'Storage rejected chunk', status: result.status, details: result.body });
+    return;
+  }
+
+  await sessionRef.delete();
+  res.status(200).json({
+    complete: true,
+    path: session.path,
+    downloadUrl: storageDownloadUrl(admin.storage().bucket().name, session.path, session.token),
+    size: session.size,
+    contentType: session.contentType,
+  });
+}
+
 export const uploadDocumentProxy = functions.https.onRequest(async (req: any, res: any) => {
   setCors(res);
   if (req.method === 'OPTIONS') {
@@ -163,8 +292,18 @@ export const uploadDocumentProxy = functions.https.onRequest(async (req: any, re
       return;
     }
 
+    if (req.is('application/octet-stream')) {
+      await uploadSessionChunk(uid, req, res);
+      return;
+    }
+    if (!req.body?.base64) {
+      await startUploadSession(uid, req.body || {}, res);
+      return;
+    }
+
+    // Ancien protocole : fichier entier en base64 dans le corps JSON
     const { path, base64, contentType, customMetadata } = req.body || {};
-    if (!path || !base64) {
+    if (!path) {
       res.status(400).json({ error: 'Missing required fields: path, base64' });
       return;
     }
@@ -190,7 +329,7 @@ export const uploadDocumentProxy = functions.https.onRequest(async (req: any, re
 
     await file.save(buffer, metadata);
 
-    const downloadUrl = `https://firebasestorage.googleapis.com/v0/b/${bucket.name}/o/${encodeURIComponent(String(path))}?alt=media&token=${token}`;
+    const downloadUrl = storageDownloadUrl(bucket.name, String(path), token);
     res.status(200).json({
       path,
       downloadUrl,
@@ -204,4 +343,228 @@ export const uploadDocumentProxy = functions.https.onRequest(async (req: any, re
     }
     res.status(500).json({ error: 'Internal Server Error', details: err?.message });
   }
-});
\ No newline at end of file
+});
+
+// Compteurs agrégés par ostéopathe (osteopathStats/{osteopathId}), tenus à
+// jour par les triggers ci-dessous : le tableau de bord et la page des
+// consultations lisent un seul document au lieu de parcourir les collections.
+const STATS_COLLECTION = 'osteopathStats';
+const STATS_EVENTS_COLLECTION = 'osteopathStatsEvents';
+// Les jours et mois sont ceux du cabinet, pas ceux du serveur (UTC)
+const STATS_TIME_ZONE = 'Europe/Paris';
+// Durée de conservation des marqueurs d'événements traités (politique TTL sur expireAt)
+const STATS_EVENT_TTL_MS = 7 * 24 * 60 * 60 * 1000;
+
+type StatsCollection = 'patients' | 'consultations' | 'appointments' | 'invoices';
+type StatsCounts = Record<string, number>;
+
+const statsDayFormatter = new Intl.DateTimeFormat('en-CA', {
+  timeZone: STATS_TIME_ZONE,
+  year: 'numeric',
+  month: '2-digit',
+  day: '2-digit',
+});
+
+function toStatsDate(value: any): Date | null {
+  if (!value) return null;
+  const date = typeof value.toDate === 'function' ? value.toDate() : new Date(value);
+  return isNaN(date.getTime()) ? null : date;
+}
+
+// Clé YYYY-MM-DD (ou YYYY-MM) utilisable comme segment de chemin de champ
+function statsDayKey(value: any): string | null {
+  const date = toStatsDate(value);
+  return date ? statsDayFormatter.format(date) : null;
+}
+
+function statsMonthKey(value: any): string | null {
+  const day = statsDayKey(value);
+  return day ? day.slice(0, 7) : null;
+}
+
+function statsStatus(value: any, fallback: string): string {
+  return typeof value === 'string' && /^[A-Za-z_]+$/.test(value) ? value : fallback;
+}
+
+/**
+ * Compteurs auxquels contribue un document, en chemins de champ du document
+ * de statistiques. Les mêmes règles servent aux triggers (différence avant /
+ * après) et à la reconstruction complète.
+ */
+function statsContribution(collectionName: StatsCollection, data: any): StatsCounts {
+  const counts: StatsCounts = {};
+  const add = (path: string | null) => {
+    if (path) counts[path] = (counts[path] || 0) + 1;
+  };
+  const isReal = data.isTestData !== true;
+
+  switch (collectionName) {
+    case 'patients': {
+      add('patients.total');
+      const month = statsMonthKey(data.createdAt);
+      add(month && `patients.byMonth.${month}`);
+      break;
+    }
+    case 'consultations': {
+      const status = statsStatus(data.status, 'draft');
+      add('consultations.total');
+      add(`consultations.byStatus.${status}`);
+      const day = statsDayKey(data.date);
+      if (isReal && day) {
+        add(`consultations.byDay.${day}.total`);
+        if (data.isInitialConsultation !== true && status === 'confirmed') {
+          add(`consultations.byDay.${day}.confirmed`);
+        }
+      }
+      break;
+    }
+    case 'appointments': {
+      add('appointments.total');
+      const day = statsDayKey(data.date);
+      // Les rendez-vous liés à une consultation sont déjà comptés avec elle
+      if (isReal && day && !data.consultationId && statsStatus(data.status, 'scheduled') === 'scheduled') {
+        add(`appointments.byDay.${day}.scheduled`);
+      }
+      break;
+    }
+    case 'invoices': {
+      add('invoices.total');
+      add(`invoices.byStatus.${statsStatus(data.status, 'draft')}`);
+      const month = statsMonthKey(data.issueDate);
+      add(month && `invoices.byMonth.${month}`);
+      break;
+    }
+  }
+  return counts;
+}
+
+/**
+ * Variations de compteurs d'une écriture, par ostéopathe (un document peut
+ * changer de propriétaire : l'ancien est décrémenté, le nouveau incrémenté)
+ */
+function statsDeltas(collectionName: StatsCollection, before: any, after: any): Map<string, StatsCounts> {
+  const deltas = new Map<string, StatsCounts>();
+  const apply = (data: any, sign: number) => {
+    if (!data || typeof data.osteopathId !== 'string' || !data.osteopathId) return;
+    const delta = deltas.get(data.osteopathId) || {};
+    Object.entries(statsContribution(collectionName, data)).forEach(([path, count]) => {
+      delta[path] = (delta[path] || 0) + sign * count;
+    });
+    deltas.set(data.osteopathId, delta);
+  };
+  apply(before, -1);
+  apply(after, 1);
+
+  deltas.forEach((delta, osteopathId) => {
+    Object.keys(delta).forEach(path => {
+      if (delta[path] === 0) delete delta[path];
+    });
+    if (Object.keys(delta).length === 0) deltas.delete(osteopathId);
+  });
+  return deltas;
+}
+
+// { 'a.b': 1 } -> { a: { b: 1 } } : set() ne comprend pas les chemins pointés
+function nestStatsCounts(counts: StatsCounts, toValue: (count: number) => any): Record<string, any> {
+  const nested: Record<string, any> = {};
+  Object.entries(counts).forEach(([path, count]) => {
+    const segments = path.split('.');
+    let node = nested;
+    segments.slice(0, -1).forEach(segment => {
+      node = node[segment] = node[segment] || {};
+    });
+    node[segments[segments.length - 1]] = toValue(count);
+  });
+  return nested;
+}
+
+function statsTrigger(collectionName: StatsCollection) {
+  return functions
+    .region('europe-west1')
+    .firestore.document(`${collectionName}/{docId}`)
+    .onWrite(async (change: any, context: any) => {
+      const before = change.before.exists ? change.before.data() : null;
+      const after = change.after.exists ? change.after.data() : null;
+      const deltas = statsDeltas(collectionName, before, after);
+      if (deltas.size === 0) return;
+
+      const firestore = admin.firestore();
+      const eventTime = Date.parse(context.timestamp);
+      const markerRef = firestore.collection(STATS_EVENTS_COLLECTION).doc(context.eventId);
+      const statsRefs = Array.from(deltas.keys()).map(osteopathId => firestore.collection(STATS_COLLECTION).doc(osteopathId));
+
+      await firestore.runTransaction(async (transaction: any) => {
+        const [marker, ...statsSnaps] = await transaction.getAll(markerRef, ...statsRefs);
+        // Les triggers peuvent être rejoués : un événement déjà compté est ignoré
+        if (marker.exists) {
+          functions.logger.info('Stats event already applied', { eventId: context.eventId });
+          return;
+        }
+        transaction.create(markerRef, {
+          expireAt: admin.firestore.Timestamp.fromMillis(Date.now() + STATS_EVENT_TTL_MS),
+        });
+        statsSnaps.forEach((statsSnap: any) => {
+          // Jamais reconstruit : la reconstruction complète comptera ce document.
+          // Écriture antérieure à la reconstruction : déjà comptée par elle.
+          const rebuiltAt = statsSnap.get('rebuiltAt');
+          if (!rebuiltAt || rebuiltAt.toMillis() >= eventTime) return;
+          const increments: Record<string, any> = {};
+          Object.entries(deltas.get(statsSnap.id) || {}).forEach(([path, count]) => {
+            increments[path] = admin.firestore.FieldValue.increment(count);
+          });
+          transaction.update(statsSnap.ref, {
+            ...increments,
+            updatedAt: admin.firestore.FieldValue.serverTimestamp(),
+          });
+        });
+      });
+    });
+}
+
+export const patientStats = statsTrigger('patients');
+export const consultationStats = statsTrigger('consultations');
+export const appointmentStats = statsTrigger('appointments');
+export const invoiceStats = statsTrigger('invoices');
+
+// Reconstruction complète des compteurs de l'utilisateur (première utilisation,
+// données antérieures aux triggers)
+export const rebuildOsteopathStats = functions
+  .region('europe-west1')
+  .https.onCall(async (_data: any, context: any) => {
+    const uid = context.auth?.uid;
+    if (!uid) {
+      throw new functions.https.HttpsError('unauthenticated', 'Authentification requise');
+    }
+
+    const firestore = admin.firestore();
+    const collections: StatsCollection[] = ['patients', 'consultations', 'appointments', 'invoices'];
+
+    // Lectures et écriture dans la même transaction : aucune écriture sur les
+    // documents comptés ne peut s'intercaler. rebuiltAt (heure du commit)
+    // indique aux triggers quels événements sont déjà inclus.
+    await firestore.runTransaction(async (transaction: any) => {
+      const totals: StatsCounts = {
+        'patients.total': 0,
+        'consultations.total': 0,
+        'appointments.total': 0,
+        'invoices.total': 0,
+      };
+
+      for (const collectionName of collections) {
+        const snapshot = await transaction.get(firestore.collection(collectionName).where('osteopathId', '==', uid));
+        snapshot.docs.forEach((docSnap: any) => {
+          Object.entries(statsContribution(collectionName, docSnap.data())).forEach(([path, count]) => {
+            totals[path] = (totals[path] || 0) + count;
+          });
+        });
+      }
+
+      transaction.set(firestore.collection(STATS_COLLECTION).doc(uid), {
+        ...nestStatsCounts(totals, count => count),
+        updatedAt: admin.firestore.FieldValue.serverTimestamp(),
+        rebuiltAt: admin.firestore.FieldValue.serverTimestamp(),
+      });
+    });
+
+    return { ok: true };
+  });
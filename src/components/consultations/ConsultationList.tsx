@@ -0,0 +1,184 @@
+import React, { useState, useEffect, useCallback, useRef } from 'react';
+import { format } from 'date-fns';
+import { fr } from 'date-fns/locale';
+import { Edit, Trash2, Loader2 } from 'lucide-react';
+import { Button } from '../ui/Button';
+import { VirtualList } from '../ui/VirtualList';
+import {
+  ConsultationService,
+  ConsultationPageCursor,
+  ConsultationRow
+} from '../../services/consultationService';
+import { Consultation } from '../../types';
+import { toDateSafe } from '../../utils/dataCleaning';
+
+const ROW_HEIGHT = 64;
+const LIST_HEIGHT = 448;
+// Page suivante demandée quand il reste moins de lignes chargées que ce seuil sous l'écran
+const PREFETCH_ROWS = 10;
+
+export interface ConsultationListItem {
+  id: string;
+  patientId: string;
+  patientName: string;
+  date: Date;
+}
+
+interface ConsultationListProps {
+  // Toute nouvelle valeur recharge la liste depuis la première page
+  refreshKey?: number;
+  onEdit: (consultationId: string) => void;
+  onDelete: (consultation: ConsultationListItem) => void;
+}
+
+/**
+ * Historique des consultations, paginé par curseur et fenêtré : seules les
+ * lignes visibles sont montées et déchiffrées, la page suivante est chargée
+ * avant d'atteindre le bas de la liste.
+ */
+const ConsultationList: React.FC<ConsultationListProps> = ({ refreshKey = 0, onEdit, onDelete }) => {
+  const [rows, setRows] = useState<ConsultationRow[]>([]);
+  const [decrypted, setDecrypted] = useState<Record<string, Consultation>>({});
+  const [hasMore, setHasMore] = useState(true);
+  const [loadingPage, setLoadingPage] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+
+  const cursorRef = useRef<ConsultationPageCursor | null>(null);
+  const loadingRef = useRef(false);
+  const pendingDecryption = useRef<Set<string>>(new Set());
+  // Les réponses d'un chargement antérieur au dernier rafraîchissement sont ignorées
+  const generation = useRef(0);
+
+  const loadNextPage = useCallback(async () => {
+    if (loadingRef.current) return;
+    loadingRef.current = true;
+    setLoadingPage(true);
+    const current = generation.current;
+    try {
+      const page = await ConsultationService.getConsultationsPage({ cursor: cursorRef.current });
+      if (current !== generation.current) return;
+      cursorRef.current = page.cursor;
+      setRows(prev => [...prev, ...page.rows]);
+      setHasMore(page.hasMore);
+    } catch (err) {
+      console.error('❌ Error loading consultations page:', err);
+      if (current === generation.current) {
+        setError('Erreur lors du chargement des consultations');
+      }
+    } finally {
+      if (current === generation.current) {
+        loadingRef.current = false;
+        setLoadingPage(false);
+      }
+    }
+  }, []);
+
+  useEffect(() => {
+    generation.current++;
+    cursorRef.current = null;
+    loadingRef.current = false;
+    pendingDecryption.current.clear();
+    setRows([]);
+    setDecrypted({});
+    setHasMore(true);
+    setError(null);
+    loadNextPage();
+  }, [refreshKey, loadNextPage]);
+
+  const handleRangeChange = useCallback((start: number, end: number) => {
+    const toDecrypt = rows
+      .slice(start, end)
+      .filter(row => !decrypted[row.id] && !pendingDecryption.current.has(row.id));
+
+    if (toDecrypt.length > 0) {
+      toDecrypt.forEach(row => pendingDecryption.current.add(row.id));
+      const current = generation.current;
+      ConsultationService.decryptConsultationRows(toDecrypt)
+        .then(consultations => {
+          if (current !== generation.current) return;
+          setDecrypted(prev => {
+            const next = { ...prev };
+            consultations.forEach(consultation => {
+              next[consultation.id] = consultation;
+            });
+            return next;
+          });
+        })
+        .catch(err => console.error('❌ Error decrypting consultations:', err))
+        .finally(() => toDecrypt.forEach(row => pendingDecryption.current.delete(row.id)));
+    }
+
+    if (hasMore && end + PREFETCH_ROWS >= rows.length) {
+      loadNextPage();
+    }
+  }, [rows, decrypted, hasMore, loadNextPage]);
+
+  const renderRow = (row: ConsultationRow) => {
+    const consultation = decrypted[row.id];
+    const date = toDateSafe(row.data.date);
+    const item: ConsultationListItem = {
+      id: row.id,
+      patientId: row.data.patientId || '',
+      patientName: row.data.patientName || 'Patient inconnu',
+      date
+    };
+
+    return (
+      <div className="flex items-center h-full px-4 border-b border-gray-100" data-testid="consultation-list-row">
+        <time className="w-32 shrink-0 text-sm text-gray-900" dateTime={date.toISOString()}>
+          <span className="block">{format(date, 'dd/MM/yyyy', { locale: fr })}</span>
+          <span className="block text-xs text-gray-500">{format(date, 'HH:mm')}</span>
+        </time>
+        <div className="flex-1 min-w-0">
+          <div className="text-sm font-medium text-gray-900 truncate">{item.patientName}</div>
+          <div className="text-xs text-gray-500 truncate">
+            {consultation
+              ? consultation.consultationReason || consultation.reason || 'Consultation standard'
+              : <span className="inline-block h-3 w-40 bg-gray-100 rounded animate-pulse align-middle" />}
+          </div>
+        </div>
+        <span className={`mx-3 px-2 py-0.5 rounded-full text-xs ${
+          row.data.status === 'completed' ? 'bg-green-100 text-green-800' : 'bg-yellow-100 text-yellow-800'
+        }`}>
+          {row.data.status === 'completed' ? 'Terminée' : 'En cours'}
+        </span>
+        <Button variant="ghost" size="sm" onClick={() => onEdit(row.id)} aria-label="Modifier">
+          <Edit size={14} />
+        </Button>
+        <Button variant="ghost" size="sm" onClick={() => onDelete(item)} aria-label="Supprimer">
+          <Trash2 size={14} />
+        </Button>
+      </div>
+    );
+  };
+
+  if (error) {
+    return <div className="p-4 text-sm text-error">{error}</div>;
+  }
+
+  if (rows.length === 0) {
+    return (
+      <div className="p-4 text-sm text-gray-500">
+        {loadingPage || hasMore ? 'Chargement des consultations...' : 'Aucune consultation'}
+      </div>
+    );
+  }
+
+  return (
+    <VirtualList
+      items={rows}
+      rowHeight={ROW_HEIGHT}
+      height={Math.min(LIST_HEIGHT, rows.length * ROW_HEIGHT + (loadingPage ? 40 : 0))}
+      getKey={row => row.id}
+      renderRow={renderRow}
+      onRangeChange={handleRangeChange}
+      footer={loadingPage && (
+        <div className="flex items-center justify-center h-10 text-gray-500">
+          <Loader2 className="animate-spin" size={16} />
+        </div>
+      )}
+    />
+  );
+};
+
+export default ConsultationList;
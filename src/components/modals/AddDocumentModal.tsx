@@ -3,6 +3,7 @@ import { motion, AnimatePresence } from 'framer-motion';
 import { X, Upload, FileText, Image as ImageIcon } from 'lucide-react';
 import { Button } from '../ui/Button';
 import { uploadPatientFile, UploadProgress } from '../../utils/fileUpload';
+import { patientCache } from '../../utils/patientCache';
 import { doc, updateDoc, arrayUnion } from 'firebase/firestore';
 import { db, auth } from '../../firebase/config';
 import { PatientDocument } from '../../types';
@@ -91,6 +92,7 @@ const AddDocumentModal: React.FC<AddDocumentModalProps> = ({
         documents: arrayUnion(documentMetadata),
         updatedAt: new Date().toISOString()
       });
+      patientCache.invalidate(patientId);
 
       console.log('✅ Document successfully saved to Firestore');
 
@@ -1,6 +1,6 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useMemo } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
-import { X, User, Plus, Trash2 } from 'lucide-react';
+import { X, User, Plus, Trash2, Search } from 'lucide-react';
 import { useForm, useFieldArray } from 'react-hook-form';
 import { collection, query, where, getDocs, doc, getDoc } from 'firebase/firestore';
 import { db, auth } from '../../firebase/config';
@@ -13,6 +13,8 @@ import { AppointmentService } from '../../services/appointmentService';
 import DocumentUploadManager from '../ui/DocumentUploadManager';
 import { DocumentMetadata } from '../../utils/documentStorage';
 import { buildConsultationCreatePayload } from '../../utils/consultationMappers';
+import { HDSCompliance } from '../../utils/hdsCompliance';
+import { usePatientSearch } from '../../hooks/usePatientSearch';
 
 interface NewConsultationModalProps {
   isOpen: boolean;
@@ -88,6 +90,7 @@ const NewConsultationModal: React.FC<NewConsultationModalProps> = ({
   const [isSubmitting, setIsSubmitting] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [patients, setPatients] = useState<Patient[]>([]);
+  const [patientSearch, setPatientSearch] = useState('');
   const [selectedPatient, setSelectedPatient] = useState<Patient | null>(null);
   const [isPatientPreselected, setIsPatientPreselected] = useState(false);
   const [consultationDocuments, setConsultationDocuments] = useState<DocumentMetadata[]>([]);
@@ -245,10 +248,20 @@ const NewConsultationModal: React.FC<NewConsultationModalProps> = ({
         const q = query(patientsRef, where('osteopathId', '==', auth.currentUser.uid));
         const snapshot = await getDocs(q);
         
-        const patientsList = snapshot.docs.map(doc => ({
-          ...doc.data(),
+        // Noms déchiffrés pour la liste et l'index de recherche
+        const decrypted = await HDSCompliance.decryptDocumentsForDisplay(
+          snapshot.docs.map(doc => doc.data()),
+          'patients',
+          auth.currentUser.uid
+        );
+        const patientsList = snapshot.docs.map((doc, index) => ({
+          ...decrypted[index],
           id: doc.id,
         })) as Patient[];
+        const collator = new Intl.Collator('fr', { sensitivity: 'base' });
+        patientsList.sort((a, b) =>
+          collator.compare(a.lastName || '', b.lastName || '') || collator.compare(a.firstName || '', b.firstName || '')
+        );
         
         setPatients(patientsList);
 
@@ -263,6 +276,15 @@ const NewConsultationModal: React.FC<NewConsultationModalProps> = ({
     }
   }, [isOpen, preselectedPatientId, setValue, preselectedPatientName, fillPatientFields]);
 
+  const matchingPatientIds = usePatientSearch(patients, patientSearch);
+  // Le patient sélectionné reste dans la liste pour que le choix soit conservé
+  const visiblePatients = useMemo(
+    () => matchingPatientIds
+      ? patients.filter(patient => matchingPatientIds.has(patient.id) || patient.id === watchedPatientId)
+      : patients,
+    [patients, matchingPatientIds, watchedPatientId]
+  );
+
   // Update selected patient when patientId changes
   useEffect(() => {
     if (watchedPatientId && !isPatientPreselected) {
@@ -462,9 +484,13 @@ const NewConsultationModal: React.FC<NewConsultationModalProps> = ({
             exit={{ opacity: 0, scale: 0.95, y: 20 }}
             transition={{ type: 'spring', duration: 0.5 }}
             className="relative w-[calc(100%-2rem)] md:w-[800px] max-h-[90vh] bg-white rounded-xl shadow-2xl flex flex-col"
+            role="dialog"
+            aria-modal="true"
+            aria-labelledby="new-consultation-title"
+            data-testid="new-consultation-modal"
           >
             <div className="flex items-center justify-between px-6 py-4 border-b border-gray-200">
-              <h2 className="text-xl font-semibold text-gray-900">Nouvelle consultation</h2>
+              <h2 id="new-consultation-title" className="text-xl font-semibold text-gray-900">Nouvelle consultation</h2>
               <button
                 onClick={onClose}
                 className="text-gray-400 transition-colors hover:text-gray-500"
@@ -493,13 +519,23 @@ const NewConsultationModal: React.FC<NewConsultationModalProps> = ({
                     <label htmlFor="patientId" className="block mb-1 text-sm font-medium text-gray-700">
                       Patient *
                     </label>
+                    <div className="relative mb-2">
+                      <Search size={16} className="absolute left-3 top-1/2 -translate-y-1/2 text-gray-400" />
+                      <input
+                        type="text"
+                        className="input w-full pl-9"
+                        placeholder="Rechercher un patient..."
+                        value={patientSearch}
+                        onChange={(e) => setPatientSearch(e.target.value)}
+                      />
+                    </div>
                     <select
                       id="patientId"
                       className={`input w-full ${errors.patientId ? 'border-error focus:border-error focus:ring-error' : ''}`}
                       {...register('patientId', { required: 'Veuillez sélectionner un patient' })}
                     >
                       <option value="">Sélectionner un patient</option>
-                      {patients.map((patient) => (
+                      {visiblePatients.map((patient) => (
                         <option key={patient.id} value={patient.id}>
                           {patient.firstName} {patient.lastName}
                         </option>
@@ -511,7 +547,7 @@ const NewConsultationModal: React.FC<NewConsultationModalProps> = ({
                     
                     {/* Selected Patient Info */}
                     {selectedPatient && (
-                      <div className="p-4 mt-4 rounded-lg bg-primary-50">
+                      <div className="p-4 mt-4 rounded-lg bg-primary-50" data-testid="selected-patient">
                         <div className="flex items-center">
                           <User size={20} className="mr-2 text-primary-600" />
                           <div>
@@ -7,7 +7,7 @@ import { PatientService } from '../../services/patientService';
 import { cleanDecryptedField } from '../../utils/dataCleaning';
 import { format } from 'date-fns';
 import { fr } from 'date-fns/locale';
-import { DocumentMetadata, formatFileSize, isImageFile, deleteDocument } from '../../utils/documentStorage';
+import { DocumentMetadata, formatFileSize, isImageFile, deleteDocument, resolveDocumentURL } from '../../utils/documentStorage';
 import { HDSCompliance } from '../../utils/hdsCompliance';
 import { auth } from '../../firebase/config';
 
@@ -254,11 +254,15 @@ const ViewConsultationModal: React.FC<ViewConsultationModalProps> = ({
             exit={{ opacity: 0, scale: 0.95, y: 20 }}
             transition={{ type: 'spring', duration: 0.5 }}
             className="relative w-[calc(100%-2rem)] md:w-[700px] max-h-[90vh] bg-white rounded-xl shadow-2xl flex flex-col"
+            role="dialog"
+            aria-modal="true"
+            aria-labelledby="view-consultation-title"
+            data-testid="view-consultation-modal"
           >
             <div className="flex items-center justify-between px-6 py-4 border-b border-gray-200">
               <div className="flex items-center">
                 <Eye size={20} className="text-primary-600 mr-2" />
-                <h2 className="text-xl font-semibold text-gray-900">
+                <h2 id="view-consultation-title" className="text-xl font-semibold text-gray-900">
                   {consultation ? `Consultation du ${format(consultation.date, 'dd/MM/yyyy', { locale: fr })}` : 'Détails de la consultation'}
                 </h2>
               </div>
@@ -272,14 +276,14 @@ const ViewConsultationModal: React.FC<ViewConsultationModalProps> = ({
 
             <div className="flex-1 overflow-y-auto px-6 py-4">
               {error && (
-                <div className="mb-4 p-3 bg-error/5 border border-error/20 rounded-lg flex items-center">
+                <div role="alert" className="mb-4 p-3 bg-error/5 border border-error/20 rounded-lg flex items-center">
                   <AlertCircle size={16} className="text-error mr-2" />
                   <span className="text-error text-sm">{error}</span>
                 </div>
               )}
 
               {loading ? (
-                <div className="flex items-center justify-center py-12">
+                <div className="flex items-center justify-center py-12" data-testid="consultation-loading">
                   <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-primary-600"></div>
                 </div>
               ) : consultation ? (
@@ -504,10 +508,17 @@ const ViewConsultationModal: React.FC<ViewConsultationModalProps> = ({
                                   size="sm"
                                   leftIcon={<Eye size={14} />}
                                   className="text-primary-600 hover:text-primary-700"
-                                  onClick={() => {
+                                  onClick={async () => {
                                     setZoom(1);
                                     setViewerLoading(true);
-                                    setViewingDocument(document);
+                                    try {
+                                      // URL résolue à l'ouverture (les listes n'en contiennent pas)
+                                      setViewingDocument({ ...document, url: await resolveDocumentURL(document) });
+                                    } catch (err) {
+                                      console.error('Erreur lors de l\'ouverture du document:', err);
+                                      setViewerLoading(false);
+                                      alert('Impossible d\'ouvrir le document.');
+                                    }
                                   }}
                                 >
                                   Voir
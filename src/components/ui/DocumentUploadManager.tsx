@@ -3,17 +3,25 @@ import { Upload, FileText, Image as ImageIcon, AlertCircle, CheckCircle, Loader2
 import { Button } from './Button';
 import {
   uploadDocument,
+  compressImageIfNeeded,
   deleteDocument,
   formatFileSize,
   isImageFile,
   DocumentMetadata,
   validateFile,
   checkStorageConfiguration,
-  printUploadDiagnostic
+  printUploadDiagnostic,
+  resolveDocumentURL
 } from '../../utils/documentStorage';
 import { mapStorageErrorToMessage } from '../../utils/documentStorage';
 import { auth } from '../../firebase/config';
-import { uploadPatientFile } from '../../utils/fileUpload';
+import { uploadPatientFile, compressImageIfNeeded as compressPatientImageIfNeeded } from '../../utils/fileUpload';
+import { readFolderIndex } from '../../utils/documentIndex';
+import { createUploadPipeline } from '../../utils/uploadPipeline';
+
+// Partagé par toutes les instances : un seul budget d'octets et de
+// téléversements simultanés pour l'application
+const uploadPipeline = createUploadPipeline();
 
 interface DocumentUploadManagerProps {
   onUploadSuccess: (documents: DocumentMetadata[]) => void;
@@ -69,6 +77,17 @@ const DocumentUploadManager: React.FC<DocumentUploadManagerProps> = ({
   const [showDeleteConfirm, setShowDeleteConfirm] = useState<string | null>(null);
   const [isDeleting, setIsDeleting] = useState<string | null>(null);
   const [storageError, setStorageError] = useState<string | null>(null);
+  // Index des dossiers lu une fois par lot de fichiers (détection des doublons)
+  const folderIndexRef = useRef(new Map<string, Promise<DocumentMetadata[] | null>>());
+
+  const readFolderIndexOnce = (folderPath: string) => {
+    let pending = folderIndexRef.current.get(folderPath);
+    if (!pending) {
+      pending = readFolderIndex(folderPath);
+      folderIndexRef.current.set(folderPath, pending);
+    }
+    return pending;
+  };
 
   // Helper: extrait le nom du fichier depuis une URL signée Firebase Storage
   const extractStorageFileNameFromURL = (url: string): string | null => {
@@ -165,6 +184,7 @@ const DocumentUploadManager: React.FC<DocumentUploadManagerProps> = ({
       displayName: finalDisplayName || file.name.replace(/\.[^/.]+$/, '') // Par défaut : nom sans extension
     }));
 
+    folderIndexRef.current.clear();
     setUploadingFiles(prev => {
       const updatedFiles = [...prev, ...newUploadingFiles];
       
@@ -229,63 +249,68 @@ const DocumentUploadManager: React.FC<DocumentUploadManagerProps> = ({
 
       console.log('🚀 Démarrage de l\'upload vers:', folderPath);
 
-      // Mettre à jour le statut
-      updateFileStatus(index, 'uploading', 10);
-
-      // Upload: utiliser la voie stable pour patient, conserver uploadDocument pour consultation
-      let result;
-      if (!customFolderPath && entityType === 'patient') {
-        result = await uploadPatientFile(
-          file,
-          patientId,
-          (progress) => {
-            console.log(`📊 Progression upload (${index}):`, progress.progress, '%', progress.status);
-            updateFileStatus(index, (progress.status as UploadingFile['status']) || 'uploading', progress.progress);
-            if (progress.status === 'error') {
-              console.error('❌ Erreur callback upload:', progress.error);
-              updateFileError(index, progress.error || 'Erreur lors du téléversement');
-            }
-          }
-        );
-      } else {
-        result = await uploadDocument(
-          file,
-          folderPath,
-          undefined,
-          (progress) => {
-            console.log(`📊 Progression upload (${index}):`, progress.progress, '%', progress.status);
-            updateFileStatus(index, progress.status, progress.progress);
-            if (progress.status === 'error') {
-              console.error('❌ Erreur callback upload:', progress.error);
-              updateFileError(index, progress.error || 'Erreur lors du téléversement');
-            }
-          }
-        );
+      const isPatientUpload = !customFolderPath && entityType === 'patient';
+      const onUploadProgress = (progress: { progress: number; status: string; error?: string }) => {
+        console.log(`📊 Progression upload (${index}):`, progress.progress, '%', progress.status);
+        updateFileStatus(index, (progress.status as UploadingFile['status']) || 'uploading', progress.progress);
+        if (progress.status === 'error') {
+          console.error('❌ Erreur callback upload:', progress.error);
+          updateFileError(index, progress.error || 'Erreur lors du téléversement');
+        }
+      };
+
+      // Compression dans le pool de workers pendant l'envoi des fichiers
+      // précédents ; un contenu déjà présent dans le dossier n'est ni
+      // recompressé ni renvoyé
+      const { result: uploadedDocument, skipped } = await uploadPipeline<DocumentMetadata>({
+        file,
+        prepare: (original) => {
+          updateFileStatus(index, 'compressing', 10);
+          return isPatientUpload ? compressPatientImageIfNeeded(original) : compressImageIfNeeded(original);
+        },
+        findUploaded: async (contentHash) => {
+          const indexed = await readFolderIndexOnce(folderPath);
+          return indexed?.find(document => document.contentHash === contentHash) || null;
+        },
+        upload: async (preparedFile, contentHash) => {
+          // Upload: utiliser la voie stable pour patient, conserver uploadDocument pour consultation
+          const result = isPatientUpload
+            ? await uploadPatientFile(file, patientId, onUploadProgress, { preparedFile, contentHash })
+            : await uploadDocument(file, folderPath, undefined, onUploadProgress, { preparedFile, contentHash });
+
+          console.log('✅ Upload réussi, résultat:', result);
+
+          // Harmoniser le nom de fichier: utiliser le nom réel stocké si possible
+          const storedFileName = extractStorageFileNameFromURL(result.url) || result.fileName;
+
+          return {
+            ...result,
+            id: storedFileName,
+            name: storedFileName,
+            originalName: file.name,
+            displayName: displayName,
+            url: result.url,
+            type: file.type,
+            size: result.fileSize,
+            uploadedAt: new Date().toISOString(),
+            uploadedBy: auth.currentUser!.uid,
+            folder: folderPath,
+            category,
+            contentHash: contentHash || undefined
+          };
+        }
+      });
+
+      if (skipped) {
+        console.log('♻️ Contenu déjà présent dans le dossier, envoi ignoré:', uploadedDocument.name);
       }
 
-      console.log('✅ Upload réussi, résultat:', result);
-
-      // Harmoniser le nom de fichier: utiliser le nom réel stocké si possible
-      const storedFileName = extractStorageFileNameFromURL(result.url) || result.fileName;
-
-      const documentWithCategory: DocumentMetadata = {
-        ...result,
-        id: storedFileName,
-        name: storedFileName,
-        originalName: file.name,
-        displayName: displayName,
-        url: result.url,
-        type: file.type,
-        size: result.fileSize,
-        uploadedAt: new Date().toISOString(),
-        uploadedBy: auth.currentUser.uid,
-        folder: folderPath,
-        category
-      };
-      
       // Mettre à jour la liste des documents
       setDocuments(prev => {
-        const updatedDocuments = [...prev, documentWithCategory];
+        if (skipped && prev.some(document => document.name === uploadedDocument.name)) {
+          return prev;
+        }
+        const updatedDocuments = [...prev, uploadedDocument];
         // Notifier le parent avec la liste mise à jour
         onUploadSuccess(updatedDocuments);
         return updatedDocuments;
@@ -389,6 +414,7 @@ const DocumentUploadManager: React.FC<DocumentUploadManagerProps> = ({
       displayName: finalDisplayName || file.name.replace(/\.[^/.]+$/, '') // Par défaut : nom sans extension
     }));
 
+    folderIndexRef.current.clear();
     setUploadingFiles(prev => {
       const updatedFiles = [...prev, ...newUploadingFiles];
       
@@ -675,11 +701,26 @@ const DocumentUploadManager: React.FC<DocumentUploadManagerProps> = ({
                 
                 <div className="flex space-x-2">
                   <a
-                    href={document.url}
+                    href={document.url || undefined}
                     target="_blank"
                     rel="noopener noreferrer"
                     className="text-primary-600 hover:text-primary-700"
                     title="Voir le document"
+                    onClick={(e) => {
+                      if (document.url) return;
+                      // Onglet ouvert pendant le clic (sinon bloqué), URL résolue ensuite
+                      e.preventDefault();
+                      const tab = window.open('', '_blank');
+                      if (tab) tab.opener = null;
+                      resolveDocumentURL(document)
+                        .then(url => {
+                          if (tab) tab.location.href = url;
+                        })
+                        .catch(error => {
+                          tab?.close();
+                          onUploadError(mapStorageErrorToMessage(error));
+                        });
+                    }}
                   >
                     <Button variant="ghost" size="sm">
                       Voir
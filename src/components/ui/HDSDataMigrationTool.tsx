@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { Shield, RefreshCw, CheckCircle, AlertTriangle, Database, ArrowRight } from 'lucide-react';
 import { Button } from './Button';
 import { HDSCompliance } from '../../utils/hdsCompliance';
+import { CIPHERTEXT_PREFIX_PATTERN } from '../../utils/encryption';
 import { collection, query, where, getDocs, doc, getDoc } from 'firebase/firestore';
 import { db, auth } from '../../firebase/config';
 
@@ -60,7 +61,7 @@ const HDSDataMigrationTool: React.FC<HDSDataMigrationToolProps> = ({ onClose, on
           if (data[field] && typeof data[field] === 'string' && 
               (data[field].includes('[DECRYPTION_ERROR:') || 
                data[field].includes('[ENCRYPTION_ERROR:') ||
-               (data[field].includes(':') && !data[field].match(/^[0-9a-fA-F]{32}:/)))) {
+               (data[field].includes(':') && !CIPHERTEXT_PREFIX_PATTERN.test(data[field])))) {
             corruptedFields.push(field);
           }
         }
@@ -84,7 +85,7 @@ const HDSDataMigrationTool: React.FC<HDSDataMigrationToolProps> = ({ onClose, on
           if (data[field] && typeof data[field] === 'string' && 
               (data[field].includes('[DECRYPTION_ERROR:') || 
                data[field].includes('[ENCRYPTION_ERROR:') ||
-               (data[field].includes(':') && !data[field].match(/^[0-9a-fA-F]{32}:/)))) {
+               (data[field].includes(':') && !CIPHERTEXT_PREFIX_PATTERN.test(data[field])))) {
             corruptedFields.push(field);
           }
         }
@@ -108,7 +109,7 @@ const HDSDataMigrationTool: React.FC<HDSDataMigrationToolProps> = ({ onClose, on
           if (data[field] && typeof data[field] === 'string' && 
               (data[field].includes('[DECRYPTION_ERROR:') || 
                data[field].includes('[ENCRYPTION_ERROR:') ||
-               (data[field].includes(':') && !data[field].match(/^[0-9a-fA-F]{32}:/)))) {
+               (data[field].includes(':') && !CIPHERTEXT_PREFIX_PATTERN.test(data[field])))) {
             corruptedFields.push(field);
           }
         }
@@ -0,0 +1,74 @@
+import React, { useState, useEffect } from 'react';
+
+interface VirtualListProps<T> {
+  items: T[];
+  rowHeight: number;
+  height: number;
+  overscan?: number;
+  getKey: (item: T, index: number) => string;
+  renderRow: (item: T, index: number) => React.ReactNode;
+  // Plage [start, end) des lignes montées, appelée à chaque changement
+  onRangeChange?: (start: number, end: number) => void;
+  footer?: React.ReactNode;
+  className?: string;
+}
+
+/**
+ * Plage des lignes à monter pour une position de défilement donnée
+ */
+export function getVisibleRange(
+  scrollTop: number,
+  height: number,
+  rowHeight: number,
+  count: number,
+  overscan: number
+): { start: number; end: number } {
+  const start = Math.max(0, Math.floor(scrollTop / rowHeight) - overscan);
+  const end = Math.min(count, Math.ceil((scrollTop + height) / rowHeight) + overscan);
+  return { start, end: Math.max(start, end) };
+}
+
+/**
+ * Liste à hauteur de ligne fixe qui ne monte que les lignes visibles
+ * (plus une marge), quelle que soit la longueur de la liste
+ */
+export function VirtualList<T>({
+  items,
+  rowHeight,
+  height,
+  overscan = 5,
+  getKey,
+  renderRow,
+  onRangeChange,
+  footer,
+  className
+}: VirtualListProps<T>) {
+  const [scrollTop, setScrollTop] = useState(0);
+  const { start, end } = getVisibleRange(scrollTop, height, rowHeight, items.length, overscan);
+
+  useEffect(() => {
+    onRangeChange?.(start, end);
+  }, [start, end, onRangeChange]);
+
+  return (
+    <div
+      className={className}
+      style={{ height, overflowY: 'auto' }}
+      onScroll={(e) => setScrollTop(e.currentTarget.scrollTop)}
+    >
+      <div style={{ height: items.length * rowHeight, position: 'relative' }}>
+        {items.slice(start, end).map((item, i) => (
+          <div
+            key={getKey(item, start + i)}
+            style={{ position: 'absolute', top: (start + i) * rowHeight, left: 0, right: 0, height: rowHeight }}
+          >
+            {renderRow(item, start + i)}
+          </div>
+        ))}
+      </div>
+      {footer}
+    </div>
+  );
+}
+
+export default VirtualList;
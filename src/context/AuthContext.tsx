@@ -4,6 +4,13 @@ import { auth } from '../firebase/config';
 import { User, AuthState, LoginCredentials, ApiResponse } from '../types/auth';
 import { authService } from '../services/authService';
 import { tokenStorage } from '../utils/jwt';
+import { decryptionCache } from '../utils/decryptionCache';
+import { clearKeyHandles } from '../utils/encryption';
+import { terminateCryptoWorkers } from '../utils/cryptoWorkerPool';
+import { clearLiveQueries } from '../utils/firestoreListener';
+import { clearOfflineStore } from '../utils/offlineStore';
+import { patientCache } from '../utils/patientCache';
+import { AuditLogger } from '../utils/auditLogger';
 // Analytics supprimés: retirer les imports et utiliser des stubs locaux
 const trackEvent = (..._args: any[]) => {};
 const setUserTag = (..._args: any[]) => {};
@@ -12,6 +19,9 @@ const setGAUserId = (..._args: any[]) => {};
 const setUserProperties = (..._args: any[]) => {};
 import { saveSessionState, hasValidSession } from '../utils/sessionPersistence';
 
+// Attente maximale de l'écriture des événements d'audit à la déconnexion
+const LOGOUT_FLUSH_TIMEOUT_MS = 3000;
+
 interface AuthContextType extends AuthState {
   login: (credentials: LoginCredentials) => Promise<ApiResponse<{ user: User; token: string }>>;
   logout: () => Promise<ApiResponse>;
@@ -149,8 +159,20 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
       role: authState.user?.role || 'unknown'
     });
     
+    // Les événements d'audit en file sont écrits tant que la session est
+    // ouverte ; hors ligne, ils restent dans IndexedDB pour ce compte
+    await AuditLogger.flush(LOGOUT_FLUSH_TIMEOUT_MS);
+    
     const result = await authService.logout();
     
+    // Ni les données déchiffrées ni les clés ne doivent survivre à la session
+    decryptionCache.clear();
+    patientCache.clear();
+    clearKeyHandles();
+    terminateCryptoWorkers();
+    clearLiveQueries();
+    clearOfflineStore().catch(error => console.warn('⚠️ Could not clear offline store:', error));
+    
     setAuthState({
       user: null,
       token: null,
@@ -241,6 +263,9 @@ export function AuthProvider({ children }: { children: React.ReactNode }) {
           
           // Save session state
           saveSessionState();
+
+          // Événements d'audit de ce compte restés en attente à la session précédente
+          void AuditLogger.syncLocalLogs();
         }
       } else {
         // Check if we have a valid session in localStorage
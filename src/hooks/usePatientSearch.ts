@@ -0,0 +1,35 @@
+import { useState, useEffect, useMemo } from 'react';
+import { PatientSearchIndex, SearchablePatient } from '../utils/patientSearchIndex';
+
+const SEARCH_DEBOUNCE_MS = 150;
+
+/**
+ * Recherche de patients par index : la liste est indexée à chaque changement
+ * (seuls les patients modifiés sont réindexés) et la recherche n'est relancée
+ * qu'une fois la saisie stabilisée.
+ *
+ * @param patients Liste complète des patients déchiffrés
+ * @param searchTerm Texte saisi
+ * @returns IDs des patients correspondants, ou null si la recherche est vide
+ */
+export function usePatientSearch(patients: SearchablePatient[], searchTerm: string) {
+  const index = useMemo(() => new PatientSearchIndex(), []);
+  const [debouncedTerm, setDebouncedTerm] = useState(searchTerm);
+
+  useEffect(() => {
+    // Effacer la recherche est appliqué sans attendre
+    if (!searchTerm.trim()) {
+      setDebouncedTerm(searchTerm);
+      return;
+    }
+    const timer = setTimeout(() => setDebouncedTerm(searchTerm), SEARCH_DEBOUNCE_MS);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
+  const indexed = useMemo(() => {
+    index.sync(patients);
+    return patients;
+  }, [index, patients]);
+
+  return useMemo(() => index.search(debouncedTerm), [index, indexed, debouncedTerm]);
+}
@@ -17,9 +17,9 @@ import {
   ChevronLeft,
   ChevronRight
 } from 'lucide-react';
-import { collection, query, where, getDocs } from 'firebase/firestore';
-import { db, auth } from '../firebase/config';
-import { setupSafeSnapshot } from '../utils/firestoreListener';
+import { auth } from '../firebase/config';
+import { subscribeLiveQuery } from '../utils/firestoreListener';
+import { osteopathCollection, LiveRecord } from '../utils/liveCollections';
 import { toDateSafe } from '../utils/dataCleaning';
 import { Button } from '../components/ui/Button';
 import { format, startOfMonth, endOfMonth, startOfWeek, endOfWeek,
@@ -123,109 +123,51 @@ const Statistics: React.FC = () => {
     return () => clearInterval(clockInterval);
   }, []);
 
-  // Rafraîchissement automatique toutes les 3 secondes
-  useEffect(() => {
-    const refreshInterval = setInterval(() => {
-      loadAllStats();
-    }, 3000);
-    
-    return () => clearInterval(refreshInterval);
-  }, [selectedPeriod]);
-
-  // Initial load
-  useEffect(() => {
-    loadAllStats();
-  }, [selectedPeriod]);
-
-  useEffect(() => {
-    if (!auth.currentUser) return;
-    let unsubscribe: () => void = () => {};
-    (async () => {
-      const invoicesRef = collection(db, 'invoices');
-      const q = query(invoicesRef, where('osteopathId', '==', auth.currentUser!.uid));
-      unsubscribe = await setupSafeSnapshot(q, () => {
-        setIsCalculating(true);
-        loadInvoiceStats().finally(() => setIsCalculating(false));
-      }, (err) => {
-        console.error('Invoice listener error:', err);
-      });
-    })();
-    return () => unsubscribe();
-  }, [selectedMonth, selectedPeriod]);
-
-  useEffect(() => {
-    if (!auth.currentUser) return;
-    let unsubscribe: () => void = () => {};
-    (async () => {
-      const patientsRef = collection(db, 'patients');
-      const q = query(patientsRef, where('osteopathId', '==', auth.currentUser!.uid));
-      unsubscribe = await setupSafeSnapshot(q, () => {
-        setIsCalculating(true);
-        loadPatientStats().finally(() => setIsCalculating(false));
-      }, (err) => {
-        console.error('Patient listener error:', err);
-      });
-    })();
-    return () => unsubscribe();
-  }, [selectedMonth, selectedPeriod]);
-
-  useEffect(() => {
-    if (!auth.currentUser) return;
-    let unsubscribe: () => void = () => {};
-    (async () => {
-      const appointmentsRef = collection(db, 'appointments');
-      const q = query(appointmentsRef, where('osteopathId', '==', auth.currentUser!.uid));
-      unsubscribe = await setupSafeSnapshot(q, () => {
-        setIsCalculating(true);
-        loadAppointmentStats().finally(() => setIsCalculating(false));
-      }, (err) => {
-        console.error('Appointment listener error:', err);
-      });
-    })();
-    return () => unsubscribe();
-  }, [selectedPeriod]);
+  // Collections partagées et tenues à jour en temps réel (aucune relecture
+  // complète en changeant d'onglet ou de période)
+  const [patientRecords, setPatientRecords] = useState<LiveRecord[] | null>(null);
+  const [consultationRecords, setConsultationRecords] = useState<LiveRecord[] | null>(null);
+  const [invoiceRecords, setInvoiceRecords] = useState<LiveRecord[] | null>(null);
 
   useEffect(() => {
     if (!auth.currentUser) return;
-    let unsubscribe: () => void = () => {};
-    (async () => {
-      const consultationsRef = collection(db, 'consultations');
-      const q = query(consultationsRef, where('osteopathId', '==', auth.currentUser!.uid));
-      unsubscribe = await setupSafeSnapshot(q, () => {
-        setIsCalculating(true);
-        Promise.all([loadPatientStats(), loadAppointmentStats()]).finally(() => setIsCalculating(false));
-      }, (err) => {
-        console.error('Consultation listener error:', err);
-      });
-    })();
-    return () => unsubscribe();
-  }, [selectedPeriod]);
-
-  const loadAllStats = async () => {
-    if (!auth.currentUser) return;
-
-    try {
-      setError(null);
-      await Promise.all([
-        loadPatientStats(),
-        loadAppointmentStats(),
-        loadInvoiceStats()
-      ]);
-      setLastUpdate(new Date());
-    } catch (error) {
-      console.error('Error loading statistics:', error);
+    const uid = auth.currentUser.uid;
+    const onError = (err: Error) => {
+      console.error('Statistics listener error:', err);
       setError('Erreur lors du chargement des statistiques');
-    } finally {
       setLoading(false);
-    }
-  };
+    };
+    const unsubscribers = [
+      subscribeLiveQuery(osteopathCollection('patients', uid), setPatientRecords, onError),
+      subscribeLiveQuery(osteopathCollection('consultations', uid), setConsultationRecords, onError),
+      subscribeLiveQuery(osteopathCollection('invoices', uid), setInvoiceRecords, onError)
+    ];
+    return () => unsubscribers.forEach(unsubscribe => unsubscribe());
+  }, []);
 
-  const loadPatientStats = async () => {
-    const patientsRef = collection(db, 'patients');
-    const q = query(patientsRef, where('osteopathId', '==', auth.currentUser!.uid));
-    const snapshot = await getDocs(q);
+  useEffect(() => {
+    if (!patientRecords || !consultationRecords || !invoiceRecords) return;
+    setIsCalculating(true);
+    Promise.all([
+      loadPatientStats(patientRecords, consultationRecords),
+      loadAppointmentStats(consultationRecords),
+      loadInvoiceStats(invoiceRecords)
+    ])
+      .then(() => {
+        setError(null);
+        setLastUpdate(new Date());
+      })
+      .catch(error => {
+        console.error('Error loading statistics:', error);
+        setError('Erreur lors du chargement des statistiques');
+      })
+      .finally(() => {
+        setLoading(false);
+        setIsCalculating(false);
+      });
+  }, [patientRecords, consultationRecords, invoiceRecords, selectedPeriod, selectedMonth]);
 
-    const patients = snapshot.docs.map(doc => doc.data());
+  const loadPatientStats = async (patients: LiveRecord[], consultations: LiveRecord[]) => {
     const now = new Date();
     const baseDate = selectedPeriod === 'month' ? selectedMonth : now;
     const monthStart = startOfMonth(baseDate);
@@ -266,18 +208,10 @@ const Statistics: React.FC = () => {
       }
     });
 
-    // Get consultations for "seen last 30 days"
-    const consultationsRef = collection(db, 'consultations');
-    const consultationsQuery = query(
-      consultationsRef,
-      where('osteopathId', '==', auth.currentUser!.uid)
-    );
-    const consultationsSnapshot = await getDocs(consultationsQuery);
-
+    // Consultations for "seen last 30 days"
     const uniquePatientsLast30Days = new Set<string>();
     const uniquePatientsInPeriod = new Set<string>();
-    consultationsSnapshot.docs.forEach(doc => {
-      const consultation = doc.data();
+    consultations.forEach(consultation => {
       const consultationDate = toDateSafe(consultation.date);
       if (consultationDate >= thirtyDaysAgo) {
         uniquePatientsLast30Days.add(consultation.patientId);
@@ -302,11 +236,7 @@ const Statistics: React.FC = () => {
     setPatientStats(nextStats);
   };
 
-  const loadAppointmentStats = async () => {
-    const consultationsRef = collection(db, 'consultations');
-    const q = query(consultationsRef, where('osteopathId', '==', auth.currentUser!.uid));
-    const snapshot = await getDocs(q);
-
+  const loadAppointmentStats = async (consultations: LiveRecord[]) => {
     const now = new Date();
     const today = new Date(now.getFullYear(), now.getMonth(), now.getDate());
     const baseDate = selectedPeriod === 'month' ? selectedMonth : now;
@@ -317,8 +247,7 @@ const Statistics: React.FC = () => {
     let cancelledCountInPeriod = 0;
     let totalInPeriod = 0;
 
-    snapshot.docs.forEach(doc => {
-      const consultation = doc.data();
+    consultations.forEach(consultation => {
       const consultationDate = toDateSafe(consultation.date);
 
       if (consultationDate.toDateString() === today.toDateString()) {
@@ -370,12 +299,7 @@ const Statistics: React.FC = () => {
     }).length;
   };
 
-  const loadInvoiceStats = async () => {
-    const invoicesRef = collection(db, 'invoices');
-    const q = query(invoicesRef, where('osteopathId', '==', auth.currentUser!.uid));
-    const snapshot = await getDocs(q);
-
-    const invoices = snapshot.docs.map(doc => doc.data());
+  const loadInvoiceStats = async (invoices: LiveRecord[]) => {
     const now = new Date();
     const baseDate = selectedPeriod === 'month' ? selectedMonth : now;
     const { currentStart, currentEnd, previousStart, previousEnd } = getPeriodRange(selectedPeriod, baseDate);
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback } from 'react';
+import React, { useState, useEffect, useCallback, useRef } from 'react';
 import { useNavigate, useLocation } from 'react-router-dom';
 import { 
   X,
@@ -16,14 +16,28 @@ import NewConsultationModal from '../../components/modals/NewConsultationModal';
 import EditConsultationModal from '../../components/modals/EditConsultationModal';
 import DeleteConsultationModal from '../../components/modals/DeleteConsultationModal';
 import DeleteAppointmentModal from '../../components/modals/DeleteAppointmentModal';
-import { format, startOfWeek, endOfWeek, startOfDay, endOfDay, startOfMonth, endOfMonth } from 'date-fns';
+import ConsultationList, { ConsultationListItem } from '../../components/consultations/ConsultationList';
+import { format, startOfWeek, endOfWeek, startOfDay, endOfDay, startOfMonth, endOfMonth, addDays, subDays } from 'date-fns';
 import { fr } from 'date-fns/locale';
-import { collection, doc, getDoc, getDocs, query, where, Timestamp } from 'firebase/firestore';
+import {
+  collection,
+  getCountFromServer,
+  query,
+  where,
+  orderBy,
+  limit,
+  Timestamp,
+  Query,
+  QueryDocumentSnapshot,
+  QuerySnapshot
+} from 'firebase/firestore';
 import { setupSafeSnapshot } from '../../utils/firestoreListener';
 import { db, auth } from '../../firebase/config';
-import { ConsultationService } from '../../services/consultationService';
+import { ConsultationService, ConsultationCounts } from '../../services/consultationService';
 import { AppointmentService } from '../../services/appointmentService';
 import { AuditLogger, AuditEventType, SensitivityLevel } from '../../utils/auditLogger';
+import { patientCache } from '../../utils/patientCache';
+import { Patient } from '../../types';
 
 interface Appointment {
   id: string;
@@ -45,17 +59,197 @@ interface Appointment {
   consultationId?: string;
 }
 
-interface Consultation {
-  id: string;
-  patientId: string;
-  patientName: string;
-  date: Date;
-  reason: string;
-  treatment: string;
-  notes: string;
-  status: 'draft' | 'completed';
-  appointmentId?: string;
-  osteopathId: string;
+// Plafond par requête de l'agenda : une période affichée n'en approche pas
+const CALENDAR_QUERY_LIMIT = 500;
+
+/**
+ * Période couverte par l'agenda (la vue mois affiche des semaines complètes)
+ */
+function getCalendarRange(currentDate: Date, view: 'day' | 'week' | 'month'): { start: Date; end: Date } {
+  if (view === 'day') {
+    return { start: startOfDay(currentDate), end: endOfDay(currentDate) };
+  }
+  if (view === 'week') {
+    return {
+      start: startOfWeek(currentDate, { weekStartsOn: 1 }),
+      end: endOfWeek(currentDate, { weekStartsOn: 1 })
+    };
+  }
+  return {
+    start: startOfWeek(startOfMonth(currentDate), { weekStartsOn: 1 }),
+    end: endOfWeek(endOfMonth(currentDate), { weekStartsOn: 1 })
+  };
+}
+
+/**
+ * Requêtes d'une collection (consultations, rendez-vous) sur la période : les
+ * dates sont des Timestamp, ou des chaînes ISO pour les plus anciennes
+ * (Firestore ne compare pas les deux types dans un même filtre)
+ */
+function calendarQueries(collectionName: string, osteopathId: string, range: { start: Date; end: Date }): Query[] {
+  const collectionRef = collection(db, collectionName);
+  return [
+    query(
+      collectionRef,
+      where('osteopathId', '==', osteopathId),
+      where('date', '>=', Timestamp.fromDate(range.start)),
+      where('date', '<=', Timestamp.fromDate(range.end)),
+      orderBy('date'),
+      limit(CALENDAR_QUERY_LIMIT)
+    ),
+    query(
+      collectionRef,
+      where('osteopathId', '==', osteopathId),
+      where('date', '>=', format(subDays(range.start, 1), 'yyyy-MM-dd')),
+      where('date', '<=', format(addDays(range.end, 1), 'yyyy-MM-dd') + '\uf8ff'),
+      orderBy('date'),
+      limit(CALENDAR_QUERY_LIMIT)
+    )
+  ];
+}
+
+/**
+ * Documents modifiés après `since` : signal de changement borné, qui ne relit
+ * pas la collection (updatedAt est un Timestamp ou une chaîne ISO selon
+ * l'auteur de l'écriture)
+ */
+function changedSinceQueries(collectionName: string, osteopathId: string, since: Date): Query[] {
+  const collectionRef = collection(db, collectionName);
+  return [
+    query(collectionRef, where('osteopathId', '==', osteopathId), where('updatedAt', '>', Timestamp.fromDate(since))),
+    query(collectionRef, where('osteopathId', '==', osteopathId), where('updatedAt', '>', since.toISOString()))
+  ];
+}
+
+/**
+ * Consultations de la période mises au format des rendez-vous de l'agenda
+ */
+function mapCalendarConsultations(docs: QueryDocumentSnapshot[], range: { start: Date; end: Date }): Appointment[] {
+  const mappedConsultationsData: Appointment[] = [];
+  const invalidConsultations: { id: string; reason: string; error?: unknown }[] = [];
+  for (const docSnapshot of docs) {
+    try {
+      const consultationData = docSnapshot.data();
+      
+      console.log('📋 Processing consultation:', docSnapshot.id, {
+        patientId: consultationData.patientId,
+        date: consultationData.date,
+        status: consultationData.status,
+        osteopathId: consultationData.osteopathId
+      });
+      
+      if (!consultationData.patientId) {
+        console.warn('❌ Missing patientId for consultation:', docSnapshot.id);
+        invalidConsultations.push({ id: docSnapshot.id, reason: 'Missing patientId' });
+        continue;
+      }
+
+      if (!consultationData.date) {
+        console.warn('❌ Missing date for consultation:', docSnapshot.id);
+        invalidConsultations.push({ id: docSnapshot.id, reason: 'Missing date' });
+        continue;
+      }
+
+      if (!consultationData.osteopathId) {
+        console.warn('❌ Missing osteopathId for consultation:', docSnapshot.id);
+        invalidConsultations.push({ id: docSnapshot.id, reason: 'Missing osteopathId' });
+        continue;
+      }
+
+      if (consultationData.osteopathId !== auth.currentUser!.uid) {
+        console.warn('❌ Consultation does not belong to current user:', docSnapshot.id);
+        continue;
+      }
+
+      let consultationDate: Date;
+      let endTime: Date;
+
+      try {
+        // Gestion robuste des formats de date
+        if (consultationData.date?.toDate) {
+          consultationDate = consultationData.date.toDate();
+        } else if (consultationData.date?.seconds) {
+          consultationDate = new Date(consultationData.date.seconds * 1000);
+        } else if (typeof consultationData.date === 'string') {
+          consultationDate = new Date(consultationData.date);
+        } else if (consultationData.date instanceof Date) {
+          consultationDate = consultationData.date;
+        } else {
+          console.warn('Invalid date format for consultation:', docSnapshot.id, consultationData.date);
+          throw new Error('Invalid date format');
+        }
+
+        if (isNaN(consultationDate.getTime())) {
+          console.warn('Invalid date value for consultation:', docSnapshot.id, consultationData.date);
+          throw new Error('Invalid date value');
+        }
+
+        // Calculer endTime à partir de la durée de la consultation
+        const duration = consultationData.duration || 60;
+        endTime = new Date(consultationDate.getTime() + duration * 60000);
+
+        // Validation de endTime
+        if (isNaN(endTime.getTime())) {
+          const duration = consultationData.duration || 60;
+          endTime = new Date(consultationDate.getTime() + duration * 60000);
+        }
+
+      } catch (dateError) {
+        console.error('❌ Error parsing dates for consultation:', docSnapshot.id, dateError);
+        invalidConsultations.push({ id: docSnapshot.id, reason: 'Invalid date format', error: dateError });
+        continue;
+      }
+
+      
+      const patientName = consultationData.patientName || 'Patient inconnu';
+
+      // Création de l'objet rendez-vous mappé depuis la consultation
+      const mappedAppointment: Appointment = {
+        id: docSnapshot.id,
+        patientId: consultationData.patientId || '',
+        patientName: patientName,
+        practitionerId: consultationData.osteopathId || auth.currentUser!.uid,
+        practitionerName: auth.currentUser!.displayName || 'Ostéopathe',
+        date: consultationDate,
+        endTime: endTime,
+        duration: consultationData.duration || 60,
+        status: consultationData.status === 'completed' ? 'completed' : 'confirmed',
+        type: consultationData.reason || 'Consultation standard',
+        location: {
+          type: 'office',
+          name: 'Cabinet principal'
+        },
+        notes: consultationData.notes || '',
+        osteopathId: consultationData.osteopathId,
+        consultationId: docSnapshot.id // Référence vers la consultation
+      };
+
+      // Dates textuelles anciennes : la requête est élargie d'un jour
+      if (mappedAppointment.date < range.start || mappedAppointment.date > range.end) {
+        continue;
+      }
+      mappedConsultationsData.push(mappedAppointment);
+      console.log('✅ Successfully processed consultation:', mappedAppointment.id, {
+        patient: mappedAppointment.patientName,
+        date: mappedAppointment.date.toISOString(),
+        status: mappedAppointment.status,
+        patientExists: true
+      });
+
+    } catch (error) {
+      console.error('❌ Error processing consultation:', docSnapshot.id, error);
+      invalidConsultations.push({ id: docSnapshot.id, reason: 'Processing error', error });
+    }
+  }
+
+  // Tri par date (ascendant pour un meilleur affichage dans le calendrier)
+  mappedConsultationsData.sort((a, b) => a.date.getTime() - b.date.getTime());
+
+  if (invalidConsultations.length > 0) {
+    console.warn('⚠️ Invalid consultations found:', invalidConsultations);
+  }
+
+  return mappedConsultationsData;
 }
 
 const Consultations: React.FC = () => {
@@ -66,10 +260,16 @@ const Consultations: React.FC = () => {
   
   const [patientNotFound, setPatientNotFound] = useState<string | null>(null);
   const [appointments, setAppointments] = useState<Appointment[]>([]);
+  const [appointmentCount, setAppointmentCount] = useState(0);
   const [mappedConsultationsForCalendar, setMappedConsultationsForCalendar] = useState<Appointment[]>([]);
-  const [consultations, setConsultations] = useState<Consultation[]>([]);
+  const [consultationCounts, setConsultationCounts] = useState<ConsultationCounts>({ total: 0, completed: 0, draft: 0 });
+  const [listVersion, setListVersion] = useState(0);
+  const [calendarVersion, setCalendarVersion] = useState(0);
   
   const [loading, setLoading] = useState(true);
+  // Lu par les écoutes installées au montage
+  const loadingRef = useRef(loading);
+  loadingRef.current = loading;
   const [error, setError] = useState<string | null>(null);
   
   const [refreshing, setRefreshing] = useState(false);
@@ -130,29 +330,28 @@ const Consultations: React.FC = () => {
     }
   }, [location]);
 
-  // Chargement des rendez-vous (pour l'agenda)
-  const loadAppointments = useCallback(async () => {
+  // Rendez-vous de la période affichée (documents lus par l'écoute de l'agenda)
+  const mapAppointments = useCallback(async (docs: QueryDocumentSnapshot[]): Promise<Appointment[]> => {
     if (!auth.currentUser) {
-      console.log('No authenticated user, skipping appointments load');
       return [];
     }
 
-    console.log('🔄 Loading appointments for user:', auth.currentUser.uid);
-    setError(null);
-
     try {
-      const appointmentsRef = collection(db, 'appointments');
-      const appointmentsQuery = query(
-        appointmentsRef,
-        where('osteopathId', '==', auth.currentUser.uid)
-      );
-
-      console.log('📡 Executing appointments query...');
-      const snapshot = await getDocs(appointmentsQuery);
-      console.log('📊 Query returned', snapshot.docs.length, 'documents');
+      // Patients des rendez-vous lus en une fois (requêtes groupées + cache)
+      // plutôt qu'un getDoc par rendez-vous
+      let patientsById = new Map<string, Patient>();
+      let patientsAvailable = true;
+      try {
+        patientsById = await patientCache.getMany(
+          docs.map(docSnapshot => docSnapshot.data().patientId).filter(Boolean)
+        );
+      } catch (patientsError) {
+        patientsAvailable = false;
+        console.warn('⚠️ Could not load appointment patients:', patientsError);
+      }
 
       const appointmentsData: Appointment[] = [];
-      for (const docSnapshot of snapshot.docs) {
+      for (const docSnapshot of docs) {
         try {
           const appointmentData = docSnapshot.data();
           
@@ -202,15 +401,12 @@ const Consultations: React.FC = () => {
           let patientName = appointmentData.patientName || 'Patient inconnu';
 
           if (appointmentData.patientId) {
-            try {
-              const patientDoc = await getDoc(doc(db, 'patients', appointmentData.patientId));
-              if (patientDoc.exists()) {
-                const patientData = patientDoc.data();
-                patientName = `${patientData.firstName} ${patientData.lastName}`;
-              } else {
-                patientName = appointmentData.patientName || 'Patient supprimé';
-              }
-            } catch {
+            const patient = patientsById.get(appointmentData.patientId);
+            if (patient) {
+              patientName = `${patient.firstName} ${patient.lastName}`;
+            } else if (patientsAvailable) {
+              patientName = appointmentData.patientName || 'Patient supprimé';
+            } else {
               patientName = appointmentData.patientName || 'Patient inaccessible';
             }
           }
@@ -243,292 +439,120 @@ const Consultations: React.FC = () => {
       }
 
       appointmentsData.sort((a, b) => a.date.getTime() - b.date.getTime());
-      setAppointments(appointmentsData);
       return appointmentsData;
 
     } catch (error) {
       console.error('❌ Error loading appointments:', error);
       setError('Erreur lors du chargement des rendez-vous: ' + (error as Error).message);
-      throw error;
+      return [];
     }
   }, []);
 
-  // Chargement des consultations (pour l'agenda)
-  const loadConsultationsForCalendar = useCallback(async (): Promise<Appointment[]> => {
+
+  // Compteurs (la liste elle-même est paginée par ConsultationList)
+  const loadCounts = useCallback(async () => {
     if (!auth.currentUser) {
       console.log('No authenticated user, skipping consultations load');
-      return [];
+      return;
     }
 
-    console.log('🔄 Loading consultations for calendar for user:', auth.currentUser.uid);
-    setError(null);
-
     try {
-      const consultationsRef = collection(db, 'consultations');
-      // Limiter la fenêtre aux dates visibles pour accélérer
-      let rangeStart: Date;
-      let rangeEnd: Date;
-      if (view === 'day') {
-        rangeStart = startOfDay(currentDate);
-        rangeEnd = endOfDay(currentDate);
-      } else if (view === 'week') {
-        rangeStart = startOfWeek(currentDate, { weekStartsOn: 1 });
-        rangeEnd = endOfWeek(currentDate, { weekStartsOn: 1 });
-      } else {
-        rangeStart = startOfMonth(currentDate);
-        rangeEnd = endOfMonth(currentDate);
-      }
-      const consultationsQuery = query(
-        consultationsRef,
-        where('osteopathId', '==', auth.currentUser.uid)
-      );
-
-      console.log('📡 Executing consultations query...');
-      const snapshot = await getDocs(consultationsQuery);
-      console.log('📊 Query returned', snapshot.docs.length, 'documents');
-
-      const mappedConsultationsData: Appointment[] = [];
-      const invalidConsultations: { id: string; reason: string; error?: unknown }[] = [];
-      for (const docSnapshot of snapshot.docs) {
-        try {
-          const consultationData = docSnapshot.data();
-          
-          console.log('📋 Processing consultation:', docSnapshot.id, {
-            patientId: consultationData.patientId,
-            date: consultationData.date,
-            status: consultationData.status,
-            osteopathId: consultationData.osteopathId
-          });
-          
-          if (!consultationData.patientId) {
-            console.warn('❌ Missing patientId for consultation:', docSnapshot.id);
-            invalidConsultations.push({ id: docSnapshot.id, reason: 'Missing patientId' });
-            continue;
-          }
-
-          if (!consultationData.date) {
-            console.warn('❌ Missing date for consultation:', docSnapshot.id);
-            invalidConsultations.push({ id: docSnapshot.id, reason: 'Missing date' });
-            continue;
-          }
-
-          if (!consultationData.osteopathId) {
-            console.warn('❌ Missing osteopathId for consultation:', docSnapshot.id);
-            invalidConsultations.push({ id: docSnapshot.id, reason: 'Missing osteopathId' });
-            continue;
-          }
-
-          if (consultationData.osteopathId !== auth.currentUser!.uid) {
-            console.warn('❌ Consultation does not belong to current user:', docSnapshot.id);
-            continue;
-          }
-
-          let consultationDate: Date;
-          let endTime: Date;
-
-          try {
-            // Gestion robuste des formats de date
-            if (consultationData.date?.toDate) {
-              consultationDate = consultationData.date.toDate();
-            } else if (consultationData.date?.seconds) {
-              consultationDate = new Date(consultationData.date.seconds * 1000);
-            } else if (typeof consultationData.date === 'string') {
-              consultationDate = new Date(consultationData.date);
-            } else if (consultationData.date instanceof Date) {
-              consultationDate = consultationData.date;
-            } else {
-              console.warn('Invalid date format for consultation:', docSnapshot.id, consultationData.date);
-              throw new Error('Invalid date format');
-            }
-
-            if (isNaN(consultationDate.getTime())) {
-              console.warn('Invalid date value for consultation:', docSnapshot.id, consultationData.date);
-              throw new Error('Invalid date value');
-            }
-
-            // Calculer endTime à partir de la durée de la consultation
-            const duration = consultationData.duration || 60;
-            endTime = new Date(consultationDate.getTime() + duration * 60000);
-
-            // Validation de endTime
-            if (isNaN(endTime.getTime())) {
-              const duration = consultationData.duration || 60;
-              endTime = new Date(consultationDate.getTime() + duration * 60000);
-            }
-
-          } catch (dateError) {
-            console.error('❌ Error parsing dates for consultation:', docSnapshot.id, dateError);
-            invalidConsultations.push({ id: docSnapshot.id, reason: 'Invalid date format', error: dateError });
-            continue;
-          }
-
-          
-          const patientName = consultationData.patientName || 'Patient inconnu';
-
-          // Création de l'objet rendez-vous mappé depuis la consultation
-          const mappedAppointment: Appointment = {
-            id: docSnapshot.id,
-            patientId: consultationData.patientId || '',
-            patientName: patientName,
-            practitionerId: consultationData.osteopathId || auth.currentUser!.uid,
-            practitionerName: auth.currentUser!.displayName || 'Ostéopathe',
-            date: consultationDate,
-            endTime: endTime,
-            duration: consultationData.duration || 60,
-            status: consultationData.status === 'completed' ? 'completed' : 'confirmed',
-            type: consultationData.reason || 'Consultation standard',
-            location: {
-              type: 'office',
-              name: 'Cabinet principal'
-            },
-            notes: consultationData.notes || '',
-            osteopathId: consultationData.osteopathId,
-            consultationId: docSnapshot.id // Référence vers la consultation
-          };
-
-          mappedConsultationsData.push(mappedAppointment);
-          if (mappedAppointment.date < rangeStart || mappedAppointment.date > rangeEnd) {
-            mappedConsultationsData.pop();
-            continue;
-          }
-          console.log('✅ Successfully processed consultation:', mappedAppointment.id, {
-            patient: mappedAppointment.patientName,
-            date: mappedAppointment.date.toISOString(),
-            status: mappedAppointment.status,
-            patientExists: true
-          });
-
-        } catch (error) {
-          console.error('❌ Error processing consultation:', docSnapshot.id, error);
-          invalidConsultations.push({ id: docSnapshot.id, reason: 'Processing error', error });
-        }
-      }
-
-      // Tri par date (ascendant pour un meilleur affichage dans le calendrier)
-      mappedConsultationsData.sort((a, b) => a.date.getTime() - b.date.getTime());
-
-      console.log('📈 Final consultations summary:', {
-        total: mappedConsultationsData.length,
-        valid: mappedConsultationsData.length,
-        invalid: invalidConsultations.length,
-        byStatus: {
-          confirmed: mappedConsultationsData.filter(a => a.status === 'confirmed').length,
-          pending: mappedConsultationsData.filter(a => a.status === 'pending').length,
-          cancelled: mappedConsultationsData.filter(a => a.status === 'cancelled').length,
-          completed: mappedConsultationsData.filter(a => a.status === 'completed').length
-        }
-      });
-
-      if (invalidConsultations.length > 0) {
-        console.warn('⚠️ Invalid consultations found:', invalidConsultations);
-      }
+      const [counts, appointmentsCount] = await Promise.all([
+        ConsultationService.getConsultationCounts(),
+        getCountFromServer(query(
+          collection(db, 'appointments'),
+          where('osteopathId', '==', auth.currentUser.uid)
+        ))
+      ]);
+      setConsultationCounts(counts);
+      setAppointmentCount(appointmentsCount.data().count);
+      return counts;
+    } catch (error) {
+      console.error('❌ Error loading consultations:', error);
+      setError('Erreur lors du chargement des consultations: ' + (error as Error).message);
+      throw error;
+    }
+  }, []);
 
+  // Agenda : seuls les consultations et rendez-vous de la période affichée
+  // sont lus et écoutés
+  useEffect(() => {
+    if (!auth.currentUser) return;
+
+    const range = getCalendarRange(currentDate, view);
+    const docsByQuery: QueryDocumentSnapshot[][] = [];
+    const appointmentDocsByQuery: QueryDocumentSnapshot[][] = [];
+    const unsubscribers: (() => void)[] = [];
+    let cancelled = false;
+    // Seul le dernier décodage des rendez-vous est publié
+    let appointmentsVersion = 0;
+
+    const publish = () => {
+      const mappedConsultationsData = mapCalendarConsultations(docsByQuery.flat(), range);
       setMappedConsultationsForCalendar(mappedConsultationsData);
       try {
         const start = new Date(); start.setHours(0,0,0,0);
         const end = new Date(start); end.setDate(end.getDate()+1);
         const todayCount = mappedConsultationsData.filter(a => a.date >= start && a.date < end).length;
-        await AuditLogger.log(
+        AuditLogger.log(
           AuditEventType.DATA_ACCESS,
           'consultations/page',
           'sync_check_today',
           SensitivityLevel.INTERNAL,
           'success',
           { agendaTodayCount: todayCount }
-        );
+        ).catch(() => {});
       } catch (e) { void e; }
-      return mappedConsultationsData;
-
-    } catch (error) {
-      console.error('❌ Error loading consultations for calendar:', error);
-      setError('Erreur lors du chargement des consultations: ' + (error as Error).message);
-      throw error;
-    }
-  }, [loadAppointments, loading]);
-
-  // Chargement des consultations
-  const loadConsultations = useCallback(async () => {
-    if (!auth.currentUser) {
-      console.log('No authenticated user, skipping consultations load');
-      return;
-    }
-
-    try {
-      const consultationsRef = collection(db, 'consultations');
-      const consultationsQuery = query(
-        consultationsRef,
-        where('osteopathId', '==', auth.currentUser.uid)
-      );
-
-      const snapshot = await getDocs(consultationsQuery);
-      const consultationsData: Consultation[] = [];
-
-      for (const docSnapshot of snapshot.docs) {
-        try {
-          const consultationData = docSnapshot.data();
-          console.log('📋 Processing consultation:', docSnapshot.id, {
-            patientId: consultationData.patientId,
-            date: consultationData.date,
-            status: consultationData.status,
-            osteopathId: consultationData.osteopathId
-          });
-
-          let consultationDate: Date;
-
-          try {
-            if (consultationData.date?.toDate) {
-              consultationDate = consultationData.date.toDate();
-            } else if (consultationData.date?.seconds) {
-              consultationDate = new Date(consultationData.date.seconds * 1000);
-            } else if (typeof consultationData.date === 'string') {
-              consultationDate = new Date(consultationData.date);
-            } else if (consultationData.date instanceof Date) {
-              consultationDate = consultationData.date;
-            } else {
-              throw new Error('Invalid date format');
-            }
-
-            if (isNaN(consultationDate.getTime())) {
-              throw new Error('Invalid date value');
-            }
-
-          } catch (dateError) {
-            console.error('❌ Error parsing dates for consultation:', docSnapshot.id, dateError);
-            continue;
-          }
-
-          const patientName = consultationData.patientName || 'Patient inconnu';
-
-          const consultation: Consultation = {
-            id: docSnapshot.id,
-            patientId: consultationData.patientId || '',
-            patientName: patientName,
-            date: consultationDate,
-            reason: consultationData.reason || '',
-            treatment: consultationData.treatment || '',
-            notes: consultationData.notes || '',
-            status: consultationData.status || 'draft',
-            appointmentId: consultationData.appointmentId || undefined,
-            osteopathId: consultationData.osteopathId
-          };
+    };
 
-          consultationsData.push(consultation);
+    const publishAppointments = () => {
+      const version = ++appointmentsVersion;
+      mapAppointments(appointmentDocsByQuery.flat()).then(appointmentsData => {
+        if (!cancelled && version === appointmentsVersion) setAppointments(appointmentsData);
+      });
+    };
 
-        } catch (error) {
-          console.error('❌ Error processing consultation:', docSnapshot.id, error);
+    const listen = (calendarQuery: Query, onDocs: (docs: QueryDocumentSnapshot[]) => void, label: string) => {
+      setupSafeSnapshot(
+        calendarQuery,
+        (snapshot: QuerySnapshot) => {
+          if (!cancelled) onDocs(snapshot.docs);
+        },
+        (error) => {
+          console.error(`❌ Error loading ${label} for calendar:`, error);
+          setError(`Erreur lors du chargement des ${label}: ` + error.message);
+        },
+        { validate: false }
+      ).then(unsubscribe => {
+        if (cancelled) {
+          unsubscribe();
+        } else {
+          unsubscribers.push(unsubscribe);
         }
-      }
+      });
+    };
 
-      consultationsData.sort((a, b) => b.date.getTime() - a.date.getTime());
-      setConsultations(consultationsData);
-      return consultationsData;
+    const osteopathId = auth.currentUser.uid;
+    calendarQueries('consultations', osteopathId, range).forEach((calendarQuery, index) => {
+      docsByQuery[index] = [];
+      listen(calendarQuery, docs => {
+        docsByQuery[index] = docs;
+        publish();
+      }, 'consultations');
+    });
+    calendarQueries('appointments', osteopathId, range).forEach((calendarQuery, index) => {
+      appointmentDocsByQuery[index] = [];
+      listen(calendarQuery, docs => {
+        appointmentDocsByQuery[index] = docs;
+        publishAppointments();
+      }, 'rendez-vous');
+    });
 
-    } catch (error) {
-      console.error('❌ Error loading consultations:', error);
-      setError('Erreur lors du chargement des consultations: ' + (error as Error).message);
-      throw error;
-    }
-  }, []);
+    return () => {
+      cancelled = true;
+      unsubscribers.splice(0).forEach(unsubscribe => unsubscribe());
+    };
+  }, [currentDate, view, calendarVersion, mapAppointments]);
 
   // Chargement initial et configuration du listener en temps réel
   useEffect(() => {
@@ -543,7 +567,7 @@ const Consultations: React.FC = () => {
     setError(null);
 
     // Chargement initial
-    Promise.all([loadAppointments(), loadConsultations(), loadConsultationsForCalendar()])
+    loadCounts()
       .then(() => {
         console.log('✅ Initial data load completed');
         setLoading(false);
@@ -554,77 +578,50 @@ const Consultations: React.FC = () => {
       });
 
     const watchdog = setTimeout(() => {
-      if (loading) {
+      if (loadingRef.current) {
         setError("Le chargement de l'agenda prend trop de temps. Veuillez actualiser.");
         setLoading(false);
       }
     }, 10000);
 
-    // Configuration du listener en temps réel pour les rendez-vous
-    try {
-      const appointmentsRef = collection(db, 'appointments');
-      const appointmentsQuery = query(
-        appointmentsRef,
-        where('osteopathId', '==', auth.currentUser.uid)
-      );
-
-      let appointmentsUnsubscribe: () => void = () => {};
-      (async () => {
-        appointmentsUnsubscribe = await setupSafeSnapshot(
-          appointmentsQuery,
-          (snapshot) => {
-            console.log('🔄 Appointments real-time update received, docs count:', snapshot.docs.length);
-            if (!loading) {
-              loadAppointments().catch(console.error);
-            }
-          },
-          (error) => {
-            console.error('❌ Appointments real-time listener error:', error);
-            setError('Erreur de synchronisation en temps réel: ' + error.message);
-          }
-        );
-      })();
-
-      // Configuration du listener en temps réel pour les consultations
-      const consultationsRef = collection(db, 'consultations');
-      const consultationsQuery = query(
-        consultationsRef,
-        where('osteopathId', '==', auth.currentUser.uid)
-      );
-
-      let consultationsUnsubscribe: () => void = () => {};
-      (async () => {
-        consultationsUnsubscribe = await setupSafeSnapshot(
-          consultationsQuery,
-          (snapshot) => {
-            console.log('🔄 Consultations real-time update received, docs count:', snapshot.docs.length);
-            if (!loading) {
-              Promise.all([
-                loadConsultations(),
-                loadConsultationsForCalendar()
-              ]).catch(console.error);
-            }
-          },
-          (error) => {
-            console.error('❌ Consultations real-time listener error:', error);
-            setError('Erreur de synchronisation en temps réel: ' + error.message);
-          }
-        );
-      })();
-
-      // Recherche patients (désactivée — états et chargement supprimés car non utilisés)
+    // Signal de changement : seules les écritures postérieures à l'ouverture
+    // sont lues, la liste et les compteurs sont alors rechargés. L'agenda a
+    // ses propres écoutes sur la période affichée.
+    const mountedAt = new Date();
+    const unsubscribers: (() => void)[] = [];
+    let cancelled = false;
+    [
+      ...changedSinceQueries('consultations', auth.currentUser.uid, mountedAt),
+      ...changedSinceQueries('appointments', auth.currentUser.uid, mountedAt)
+    ].forEach(changesQuery => {
+      setupSafeSnapshot(
+        changesQuery,
+        (snapshot: QuerySnapshot) => {
+          if (cancelled || loadingRef.current || snapshot.docChanges().length === 0) return;
+          console.log('🔄 Consultations real-time update received');
+          setListVersion(version => version + 1);
+          loadCounts().catch(console.error);
+        },
+        (error) => {
+          console.error('❌ Consultations real-time listener error:', error);
+          setError('Erreur de synchronisation en temps réel: ' + error.message);
+        },
+        { validate: false }
+      ).then(unsubscribe => {
+        if (cancelled) {
+          unsubscribe();
+        } else {
+          unsubscribers.push(unsubscribe);
+        }
+      });
+    });
 
-      return () => {
-        console.log('🔌 Cleaning up listeners');
-        appointmentsUnsubscribe();
-        consultationsUnsubscribe();
-        clearTimeout(watchdog);
-      };
-    } catch (err) {
-      console.error('❌ Error setting up sync:', err);
-      setError('Erreur lors de la configuration de la synchronisation');
-      setLoading(false);
-    }
+    return () => {
+      console.log('🔌 Cleaning up listeners');
+      cancelled = true;
+      unsubscribers.splice(0).forEach(unsubscribe => unsubscribe());
+      clearTimeout(watchdog);
+    };
   }, []);
 
   // Fonction de rafraîchissement manuel
@@ -633,11 +630,9 @@ const Consultations: React.FC = () => {
       setRefreshing(true);
     }
     try {
-      await Promise.all([
-        loadAppointments(),
-        loadConsultations(),
-        loadConsultationsForCalendar()
-      ]);
+      setListVersion(version => version + 1);
+      setCalendarVersion(version => version + 1);
+      await loadCounts();
       console.log('✅ Manual refresh completed');
       setLastRefreshTime(new Date());
     } catch (error) {
@@ -647,7 +642,7 @@ const Consultations: React.FC = () => {
         setRefreshing(false);
       }
     }
-  }, [loadAppointments, loadConsultations, loadConsultationsForCalendar]);
+  }, [loadCounts]);
 
   // Supprimé: rafraîchissement périodique redondant (onSnapshot suffit pour la synchro)
 
@@ -665,7 +660,7 @@ const Consultations: React.FC = () => {
   // Handle appointment edit (now consultation edit)
   const handleAppointmentEdit = (appointmentId: string) => {
     // Dans le contexte des consultations, appointmentId est en fait consultationId
-    const consultation = consultations.find(c => c.id === appointmentId);
+    const consultation = mappedConsultationsForCalendar.find(c => c.id === appointmentId);
     if (consultation) {
       // Éditer directement la consultation
       setSelectedConsultationId(appointmentId);
@@ -676,19 +671,24 @@ const Consultations: React.FC = () => {
     }
   };
 
+  // Handle consultation delete (agenda ou liste)
+  const handleConsultationDelete = (consultation: ConsultationListItem) => {
+    setConsultationToDelete({
+      id: consultation.id,
+      patientId: consultation.patientId,
+      patientName: consultation.patientName,
+      date: format(consultation.date, 'dd/MM/yyyy', { locale: fr }),
+      time: format(consultation.date, 'HH:mm')
+    });
+    setIsDeleteConsultationModalOpen(true);
+  };
+
   // Handle appointment delete
   const handleAppointmentDelete = (appointmentId: string) => {
     // Si l'élément est une consultation mappée, supprimer la consultation
-    const consultation = consultations.find(c => c.id === appointmentId);
+    const consultation = mappedConsultationsForCalendar.find(c => c.id === appointmentId);
     if (consultation) {
-      setConsultationToDelete({
-        id: consultation.id,
-        patientId: consultation.patientId,
-        patientName: consultation.patientName,
-        date: format(consultation.date, 'dd/MM/yyyy', { locale: fr }),
-        time: format(consultation.date, 'HH:mm')
-      });
-      setIsDeleteConsultationModalOpen(true);
+      handleConsultationDelete(consultation);
       return;
     }
 
@@ -807,7 +807,7 @@ const Consultations: React.FC = () => {
 
   if (loading) {
     return (
-      <div className="flex items-center justify-center h-full py-12">
+      <div className="flex items-center justify-center h-full py-12" data-testid="consultations-loading">
         <div className="flex items-center space-x-2 text-gray-500">
           <Loader2 className="animate-spin" size={20} />
           <span>Chargement des consultations...</span>
@@ -929,7 +929,7 @@ const Consultations: React.FC = () => {
           <div className="flex items-center">
             <CalendarIcon size={20} className="text-primary-500 mr-2" />
             <div>
-              <div className="text-2xl font-bold text-gray-900">{appointments.length}</div>
+              <div className="text-2xl font-bold text-gray-900">{appointmentCount}</div>
               <div className="text-sm text-gray-500">Rendez-vous</div>
             </div>
           </div>
@@ -939,7 +939,7 @@ const Consultations: React.FC = () => {
           <div className="flex items-center">
             <FileText size={20} className="text-secondary-500 mr-2" />
             <div>
-              <div className="text-2xl font-bold text-gray-900">{consultations.length}</div>
+              <div className="text-2xl font-bold text-gray-900">{consultationCounts.total}</div>
               <div className="text-sm text-gray-500">Consultations</div>
             </div>
           </div>
@@ -950,7 +950,7 @@ const Consultations: React.FC = () => {
             <Clock size={20} className="text-green-500 mr-2" />
             <div>
               <div className="text-2xl font-bold text-gray-900">
-                {consultations.filter(c => c.status === 'completed').length}
+                {consultationCounts.completed}
               </div>
               <div className="text-sm text-gray-500">Terminées</div>
             </div>
@@ -962,7 +962,7 @@ const Consultations: React.FC = () => {
             <AlertCircle size={20} className="text-yellow-500 mr-2" />
             <div>
               <div className="text-2xl font-bold text-gray-900">
-                {consultations.filter(c => c.status === 'draft').length}
+                {consultationCounts.draft}
               </div>
               <div className="text-sm text-gray-500">En cours</div>
             </div>
@@ -970,6 +970,21 @@ const Consultations: React.FC = () => {
         </div>
       </div>
 
+      {/* Historique */}
+      <div className="bg-white rounded-xl shadow">
+        <div className="px-4 py-3 border-b border-gray-200">
+          <h2 className="text-lg font-medium text-gray-900">Historique des consultations</h2>
+        </div>
+        <ConsultationList
+          refreshKey={listVersion}
+          onEdit={(consultationId) => {
+            setSelectedConsultationId(consultationId);
+            setIsEditConsultationModalOpen(true);
+          }}
+          onDelete={handleConsultationDelete}
+        />
+      </div>
+
       {/* Modals */}
       <NewConsultationModal
         isOpen={isNewConsultationModalOpen}
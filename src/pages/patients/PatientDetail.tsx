@@ -41,7 +41,7 @@ import EditConsultationModal from '../../components/modals/EditConsultationModal
 import ViewConsultationModal from '../../components/modals/ViewConsultationModal';
 import DeleteConsultationModal from '../../components/modals/DeleteConsultationModal';
 import { Patient, Consultation, Invoice } from '../../types';
-import { isImageFile } from '../../utils/documentStorage';
+import { isImageFile, resolveDocumentURL } from '../../utils/documentStorage';
 import { format } from 'date-fns';
 import { fr } from 'date-fns/locale';
 import { HDSCompliance } from '../../utils/hdsCompliance';
@@ -1537,7 +1537,7 @@ const PatientDetail: React.FC = () => {
             ) : (
               <div className="space-y-4">
                 {consultations.map((consultation, index) => (
-                  <div key={consultation.id} className="p-6 bg-white border-l-4 shadow rounded-xl border-primary-500">
+                  <div key={consultation.id} data-testid="consultation-row" className="p-6 bg-white border-l-4 shadow rounded-xl border-primary-500">
                     <div className="flex items-start justify-between mb-4">
                       <div className="flex-1">
                         <div className="flex items-center mb-2 space-x-3">
@@ -1670,10 +1670,17 @@ const PatientDetail: React.FC = () => {
                                     <Button
                                       variant="outline"
                                       size="sm"
-                                      onClick={() => {
+                                      onClick={async () => {
                                         setZoom(1);
                                         setViewerLoading(true);
-                                        setViewingDocument(docMeta);
+                                        try {
+                                          // URL résolue à l'ouverture (les listes n'en contiennent pas)
+                                          setViewingDocument({ ...docMeta, url: await resolveDocumentURL(docMeta) });
+                                        } catch (err) {
+                                          console.error('Erreur lors de l\'ouverture du document:', err);
+                                          setViewerLoading(false);
+                                          alert('Impossible d\'ouvrir le document.');
+                                        }
                                       }}
                                       leftIcon={<Eye size={12} />}
                                       className="text-xs"
@@ -1683,11 +1690,16 @@ const PatientDetail: React.FC = () => {
                                     <Button
                                       variant="outline"
                                       size="sm"
-                                      onClick={() => {
-                                        const link = document.createElement('a');
-                                        link.href = docMeta.url;
-                                        link.download = docMeta.originalName || docMeta.name;
-                                        link.click();
+                                      onClick={async () => {
+                                        try {
+                                          const link = document.createElement('a');
+                                          link.href = await resolveDocumentURL(docMeta);
+                                          link.download = docMeta.originalName || docMeta.name;
+                                          link.click();
+                                        } catch (err) {
+                                          console.error('Erreur lors du téléchargement du document:', err);
+                                          alert('Impossible de télécharger le document.');
+                                        }
                                       }}
                                       leftIcon={<Download size={12} />}
                                       className="text-xs"
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useMemo } from 'react';
 import { Link, useLocation } from 'react-router-dom';
 import { Search, Plus, Calendar, Users, ArrowDown, ArrowUp, Clock } from 'lucide-react';
 import { collection, query, where, onSnapshot } from 'firebase/firestore';
@@ -8,6 +8,10 @@ import NewPatientModal from '../../components/modals/NewPatientModal';
 import { Patient } from '../../types';
 import { HDSCompliance } from '../../utils/hdsCompliance';
 import { clearFormData } from '../../utils/sessionPersistence';
+import { usePatientSearch } from '../../hooks/usePatientSearch';
+
+// Réutilisé par chaque tri : localeCompare recrée ses règles à chaque appel
+const nameCollator = new Intl.Collator('fr', { sensitivity: 'base' });
 
 const Patients: React.FC = () => {
   const [searchTerm, setSearchTerm] = useState('');
@@ -77,7 +81,7 @@ const Patients: React.FC = () => {
             patientsList.push(patient);
           }
 
-          patientsList.sort((a, b) => a.lastName.localeCompare(b.lastName));
+          patientsList.sort((a, b) => nameCollator.compare(a.lastName || '', b.lastName || ''));
           setPatients(patientsList);
           setLoading(false);
         } catch (e) {
@@ -132,18 +136,20 @@ const Patients: React.FC = () => {
     }
   };
 
+  // Recherche par index (nom, prénom, email, téléphone, sans accents)
+  const matchingIds = usePatientSearch(patients, searchTerm);
+
   // ✅ Client-side filtering and sorting
-  const filteredPatients = patients.filter(patient => {
-    const fullName = `${patient.firstName} ${patient.lastName}`.toLowerCase();
-    const searchMatch = fullName.includes(searchTerm.toLowerCase()) || 
-                       patient.phone?.includes(searchTerm) ||
-                       patient.email?.toLowerCase().includes(searchTerm.toLowerCase());
+  const filteredPatients = useMemo(() => patients.filter(patient => {
+    if (matchingIds && !matchingIds.has(patient.id)) {
+      return false;
+    }
 
     if (selectedFilter === 'upcoming' && (!patient.nextAppointment || !isUpcomingAppointment(patient.nextAppointment))) {
       return false;
     }
 
-    return searchMatch;
+    return true;
   }).sort((a, b) => {
     if (selectedFilter === 'upcoming') {
       // Conserver le tri par prochain rendez-vous pour ce filtre
@@ -166,7 +172,7 @@ const Patients: React.FC = () => {
         ? bDate.getTime() - aDate.getTime() 
         : aDate.getTime() - bDate.getTime();
     }
-  });
+  }), [patients, matchingIds, selectedFilter, sortBy, sortDirection]);
 
   const getInitials = (firstName: string, lastName: string) => {
     return `${firstName[0]}${lastName[0]}`.toUpperCase();
@@ -14,6 +14,8 @@ import { db, auth } from '../firebase/config';
 import { AuditLogger, AuditEventType, SensitivityLevel } from '../utils/auditLogger';
 import HDSCompliance from '../utils/hdsCompliance';
 import { toDateSafe } from '../utils/dataCleaning';
+import { forgetDocument } from '../utils/liveCollections';
+import { patientCache } from '../utils/patientCache';
 
 /**
  * Service pour la gestion des rendez-vous avec synchronisation bidirectionnelle
@@ -73,6 +75,7 @@ export class AppointmentService {
             nextAppointment: formattedDate,
             updatedAt: new Date().toISOString()
           });
+          patientCache.invalidate(appointmentData.patientId);
           
           console.log(`✅ Patient ${appointmentData.patientId} updated with next appointment: ${formattedDate}`);
         }
@@ -225,6 +228,7 @@ export class AppointmentService {
       
       // 5. Supprimer le rendez-vous
       await deleteDoc(appointmentRef);
+      forgetDocument('appointments', auth.currentUser.uid, appointmentId);
       
       // 6. Mettre à jour le dossier patient s'il existe encore
       if (patientDoc.exists()) {
@@ -306,6 +310,7 @@ export class AppointmentService {
           
           // Supprimer le rendez-vous
           await deleteDoc(docSnap.ref);
+          forgetDocument('appointments', auth.currentUser.uid, docSnap.id);
           count++;
           
           // Journaliser chaque suppression
@@ -424,6 +429,7 @@ export class AppointmentService {
           nextAppointment: formattedDate,
           updatedAt: new Date().toISOString()
         });
+        patientCache.invalidate(patientId);
         
         console.log(`✅ Patient ${patientId} updated with next appointment: ${formattedDate}`);
       } else {
@@ -432,6 +438,7 @@ export class AppointmentService {
           nextAppointment: deleteField(),
           updatedAt: new Date().toISOString()
         });
+        patientCache.invalidate(patientId);
         
         console.log(`✅ Patient ${patientId} updated with no next appointment`);
       }
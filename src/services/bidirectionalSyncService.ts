@@ -10,6 +10,7 @@ import { doc, getDoc, updateDoc } from 'firebase/firestore';
 import { db } from '../firebase/config';
 import { HDSCompliance, cleanFirestoreData } from '../utils/hdsCompliance';
 import { AuditLogger, AuditEventType, SensitivityLevel } from '../utils/auditLogger';
+import { patientCache } from '../utils/patientCache';
 
 interface SyncResult {
   success: boolean;
@@ -110,6 +111,7 @@ export class BidirectionalSyncService {
 
       // 7–8. Nettoyer les données (retire undefined, conserve null) et mettre à jour
       await updateDoc(patientRef, cleanFirestoreData(encryptedUpdates));
+      patientCache.invalidate(patientId);
 
       console.log('  ✅ Dossier patient synchronisé avec succès');
       result.success = true;
@@ -10,6 +10,7 @@ import {
 import { db, auth } from '../firebase/config';
 import { Patient } from '../types';
 import { DecryptionDiagnostic } from '../utils/decryptionDiagnostic';
+import { CIPHERTEXT_PREFIX_PATTERN } from '../utils/encryption';
 
 /**
  * Service de migration des consultations existantes
@@ -69,9 +70,8 @@ export class ConsultationMigrationService {
             if (typeof field === 'string') {
               // Détecter les UUIDs simples
               if (isUUID(field)) return true;
-              // Détecter les UUIDs chiffrés (format: 32 caractères hexadécimaux:encryptedData)
-              const uuidChiffrePattern = /^[0-9a-f]{32}:/i;
-              if (uuidChiffrePattern.test(field)) return true;
+              // Détecter les UUIDs chiffrés (format: [version]IV hexadécimal:encryptedData)
+              if (CIPHERTEXT_PREFIX_PATTERN.test(field)) return true;
             }
             return false;
           };
@@ -3,13 +3,19 @@ import {
   query, 
   where, 
   orderBy, 
+  limit,
+  startAfter,
   getDocs, 
+  getCountFromServer,
   doc, 
   getDoc, 
   addDoc, 
   updateDoc, 
   deleteDoc,
-  Timestamp 
+  Timestamp,
+  DocumentData,
+  QueryConstraint,
+  QueryDocumentSnapshot
 } from 'firebase/firestore';
 import { db, auth } from '../firebase/config';
 import { Consultation, ConsultationFormData } from '../types';
@@ -19,8 +25,55 @@ import { toDateSafe } from '../utils/dataCleaning';
 import { listDocuments } from '../utils/documentStorage';
 import { validateConsultationData, validateConsultationUpdate, formatValidationErrors } from '../utils/validation';
 import BidirectionalSyncService from './bidirectionalSyncService';
+import { OsteopathStatsService } from './osteopathStatsService';
+import { readLiveQuery } from '../utils/firestoreListener';
+import { osteopathCollection, forgetDocument } from '../utils/liveCollections';
+
+/**
+ * Position dans l'un des deux ordres de dates stockées : dernier document
+ * lu, et fin atteinte
+ */
+interface DateStreamCursor {
+  last: QueryDocumentSnapshot<DocumentData> | null;
+  done: boolean;
+}
+
+/**
+ * Curseur de pagination. Les dates sont des Timestamp ou, pour les plus
+ * anciennes consultations, des chaînes ISO : Firestore trie les deux types
+ * séparément, chacun est donc paginé à part puis fusionné par date.
+ */
+export interface ConsultationPageCursor {
+  timestamp: DateStreamCursor;
+  string: DateStreamCursor;
+}
+
+// Plus petite date d'un Timestamp Firestore (0001-01-01)
+const FIRST_TIMESTAMP_MS = -62135596800000;
+
+/**
+ * Consultation telle que stockée (champs sensibles encore chiffrés)
+ */
+export interface ConsultationRow {
+  id: string;
+  data: DocumentData;
+}
+
+export interface ConsultationPage {
+  rows: ConsultationRow[];
+  cursor: ConsultationPageCursor | null;
+  hasMore: boolean;
+}
+
+export interface ConsultationCounts {
+  total: number;
+  completed: number;
+  draft: number;
+}
 
 export class ConsultationService {
+  static readonly PAGE_SIZE = 25;
+
   /**
    * Récupère toutes les consultations
    */
@@ -30,30 +83,17 @@ export class ConsultationService {
     }
 
     try {
-      const consultationsRef = collection(db, 'consultations');
-      const q = query(
-        consultationsRef,
-        where('osteopathId', '==', auth.currentUser.uid),
-        orderBy('date', 'desc')
-      );
-      
-      const querySnapshot = await getDocs(q);
-      const consultations: Consultation[] = [];
-      
-      for (const docSnapshot of querySnapshot.docs) {
-        const data = docSnapshot.data();
-        
-        // Déchiffrement des données sensibles pour l'affichage
-        const decryptedData = HDSCompliance.decryptDataForDisplay(data, 'consultations', auth.currentUser.uid);
-        
-        consultations.push({
-          id: docSnapshot.id,
-          ...decryptedData,
-          date: toDateSafe(data.date),
-          createdAt: toDateSafe(data.createdAt),
-          updatedAt: toDateSafe(data.updatedAt)
-        } as Consultation);
-      }
+      // Requête partagée et tenue à jour en temps réel : seules les
+      // consultations modifiées depuis la dernière lecture sont déchiffrées
+      const records = await readLiveQuery(osteopathCollection('consultations', auth.currentUser.uid));
+      const consultations = records
+        .map(record => ({
+          ...record,
+          date: toDateSafe(record.date),
+          createdAt: toDateSafe(record.createdAt),
+          updatedAt: toDateSafe(record.updatedAt)
+        } as Consultation))
+        .sort((a, b) => b.date.getTime() - a.date.getTime());
       
       // Journalisation de l'accès aux données
       await AuditLogger.log(
@@ -84,6 +124,137 @@ export class ConsultationService {
     }
   }
 
+  /**
+   * Récupère une page de consultations, des plus récentes aux plus anciennes,
+   * à partir du curseur de la page précédente. Les documents ne sont pas
+   * déchiffrés : l'appelant ne déchiffre (decryptConsultationRows) que les
+   * lignes qu'il affiche. Le coût ne dépend que de la taille de page, pas de
+   * l'ancienneté du cabinet.
+   */
+  static async getConsultationsPage(options: {
+    cursor?: ConsultationPageCursor | null;
+    pageSize?: number;
+    patientId?: string;
+  } = {}): Promise<ConsultationPage> {
+    if (!auth.currentUser) {
+      throw new Error('Utilisateur non authentifié');
+    }
+
+    const { cursor = null, pageSize = this.PAGE_SIZE, patientId } = options;
+    const scope: QueryConstraint[] = [where('osteopathId', '==', auth.currentUser.uid)];
+    if (patientId) {
+      scope.push(where('patientId', '==', patientId));
+    }
+    const streams = [
+      { key: 'timestamp' as const, bound: where('date', '>=', Timestamp.fromMillis(FIRST_TIMESTAMP_MS)) },
+      { key: 'string' as const, bound: where('date', '>=', '') }
+    ];
+
+    const fetched = await Promise.all(streams.map(async ({ key, bound }) => {
+      const position = cursor?.[key];
+      if (position?.done) return [];
+      const constraints = [...scope, bound, orderBy('date', 'desc')];
+      if (position?.last) {
+        constraints.push(startAfter(position.last));
+      }
+      // Un document de plus que la page pour savoir s'il en reste
+      constraints.push(limit(pageSize + 1));
+      const querySnapshot = await getDocs(query(collection(db, 'consultations'), ...constraints));
+      return querySnapshot.docs.map(docSnapshot => ({
+        key,
+        docSnapshot,
+        time: toDateSafe(docSnapshot.data().date).getTime()
+      }));
+    }));
+
+    const merged = fetched.flat().sort((a, b) => b.time - a.time);
+    const page = merged.slice(0, pageSize);
+    const nextPosition = (key: 'timestamp' | 'string', index: number): DateStreamCursor => {
+      const consumed = page.filter(entry => entry.key === key);
+      return {
+        last: consumed.length > 0 ? consumed[consumed.length - 1].docSnapshot : cursor?.[key].last ?? null,
+        done: consumed.length === fetched[index].length
+      };
+    };
+
+    return {
+      rows: page.map(({ docSnapshot }) => ({ id: docSnapshot.id, data: docSnapshot.data() })),
+      cursor: { timestamp: nextPosition('timestamp', 0), string: nextPosition('string', 1) },
+      hasMore: merged.length > pageSize
+    };
+  }
+
+  /**
+   * Déchiffre des lignes obtenues par getConsultationsPage (typiquement les
+   * lignes visibles d'une liste), en un seul lot
+   */
+  static async decryptConsultationRows(rows: ConsultationRow[]): Promise<Consultation[]> {
+    if (!auth.currentUser) {
+      throw new Error('Utilisateur non authentifié');
+    }
+    if (rows.length === 0) {
+      return [];
+    }
+
+    const decryptedDocuments = await HDSCompliance.decryptDocumentsForDisplay(
+      rows.map(row => row.data),
+      'consultations',
+      auth.currentUser.uid
+    );
+
+    const consultations = rows.map((row, index) => ({
+      id: row.id,
+      ...decryptedDocuments[index],
+      date: toDateSafe(row.data.date),
+      createdAt: toDateSafe(row.data.createdAt),
+      updatedAt: toDateSafe(row.data.updatedAt)
+    } as Consultation));
+
+    await AuditLogger.log(
+      AuditEventType.DATA_ACCESS,
+      'consultations',
+      'read_page',
+      SensitivityLevel.SENSITIVE,
+      'success',
+      { count: consultations.length }
+    );
+
+    return consultations;
+  }
+
+  /**
+   * Compteurs de consultations par statut, lus dans le document agrégé
+   * osteopathStats ou, à défaut, calculés par des requêtes d'agrégation
+   */
+  static async getConsultationCounts(): Promise<ConsultationCounts> {
+    if (!auth.currentUser) {
+      throw new Error('Utilisateur non authentifié');
+    }
+
+    const stats = await OsteopathStatsService.getStats(auth.currentUser.uid);
+    if (stats?.consultations) {
+      return {
+        total: stats.consultations.total || 0,
+        completed: stats.consultations.byStatus?.completed || 0,
+        draft: stats.consultations.byStatus?.draft || 0
+      };
+    }
+
+    const consultationsRef = collection(db, 'consultations');
+    const byOsteopath = where('osteopathId', '==', auth.currentUser.uid);
+    const [total, completed, draft] = await Promise.all([
+      getCountFromServer(query(consultationsRef, byOsteopath)),
+      getCountFromServer(query(consultationsRef, byOsteopath, where('status', '==', 'completed'))),
+      getCountFromServer(query(consultationsRef, byOsteopath, where('status', '==', 'draft')))
+    ]);
+
+    return {
+      total: total.data().count,
+      completed: completed.data().count,
+      draft: draft.data().count
+    };
+  }
+
   /**
    * Récupère les consultations d'un patient spécifique
    */
@@ -103,12 +274,17 @@ export class ConsultationService {
       
       const querySnapshot = await getDocs(q);
       const consultations: Consultation[] = [];
+
+      // Déchiffrement des données sensibles pour l'affichage, en un seul lot pour tout le snapshot
+      const decryptedDocuments = await HDSCompliance.decryptDocumentsForDisplay(
+        querySnapshot.docs.map(docSnapshot => docSnapshot.data()),
+        'consultations',
+        auth.currentUser.uid
+      );
       
-      for (const docSnapshot of querySnapshot.docs) {
+      for (const [index, docSnapshot] of querySnapshot.docs.entries()) {
         const data = docSnapshot.data();
-        
-        // Déchiffrement des données sensibles pour l'affichage
-        const decryptedData = HDSCompliance.decryptDataForDisplay(data, 'consultations', auth.currentUser.uid);
+        const decryptedData = decryptedDocuments[index];
         
         const consultation: Consultation = {
           id: docSnapshot.id,
@@ -931,6 +1107,7 @@ export class ConsultationService {
 
       // Supprimer la consultation
       await deleteDoc(docRef);
+      forgetDocument('consultations', auth.currentUser.uid, id);
 
       // ✅ SYNCHRONISATION : Mettre à jour le champ nextAppointment du patient
       // Après suppression d'une consultation, recalculer le prochain rendez-vous
@@ -1,9 +1,13 @@
-import { collection, query, where, getDocs, getCountFromServer } from 'firebase/firestore';
+import { collection, query, where, orderBy, limit, getDocs, getCountFromServer, Timestamp } from 'firebase/firestore';
 import { db, auth } from '../firebase/config';
 import { AuditLogger, AuditEventType, SensitivityLevel } from '../utils/auditLogger';
 import { HDSCompliance } from '../utils/hdsCompliance';
 import { getEffectiveOsteopathId } from '../utils/substituteAuth';
 import { toDateSafe } from '../utils/dataCleaning';
+import { OsteopathStatsService, OsteopathStats } from './osteopathStatsService';
+
+// Prochaines consultations du jour affichées dans les notifications
+const UPCOMING_NOTIFICATIONS = 3;
 
 /**
  * Service pour la gestion du tableau de bord
@@ -25,7 +29,9 @@ export class DashboardService {
         throw new Error('Utilisateur non autorisé à accéder aux données');
       }
       
-      // Récupération des compteurs
+      // Récupération des compteurs : document agrégé si disponible, sinon
+      // requêtes sur les collections
+      const aggregateStats = await OsteopathStatsService.getStats(effectiveOsteopathId);
       const [
         patientCount,
         todayBreakdown,
@@ -33,14 +39,16 @@ export class DashboardService {
         newPatientsThisMonth,
         occupancyRate,
         invoicesThisMonth
-      ] = await Promise.all([
-        this.getPatientCount(effectiveOsteopathId),
-        this.getTodayAppointmentsBreakdown(effectiveOsteopathId),
-        this.getPendingInvoices(effectiveOsteopathId),
-        this.getNewPatientsThisMonth(effectiveOsteopathId),
-        this.getOccupancyRate(effectiveOsteopathId),
-        this.getInvoicesThisMonth(effectiveOsteopathId)
-      ]);
+      ] = aggregateStats
+        ? this.countersFromStats(aggregateStats)
+        : await Promise.all([
+          this.getPatientCount(effectiveOsteopathId),
+          this.getTodayAppointmentsBreakdown(effectiveOsteopathId),
+          this.getPendingInvoices(effectiveOsteopathId),
+          this.getNewPatientsThisMonth(effectiveOsteopathId),
+          this.getOccupancyRate(effectiveOsteopathId),
+          this.getInvoicesThisMonth(effectiveOsteopathId)
+        ]);
       
       // Récupération des notifications récentes
       const recentNotifications = await this.getRecentNotifications(effectiveOsteopathId);
@@ -86,6 +94,35 @@ export class DashboardService {
     }
   }
   
+  /**
+   * Compteurs du tableau de bord lus dans le document agrégé, dans l'ordre
+   * des requêtes qu'ils remplacent
+   */
+  private static countersFromStats(stats: OsteopathStats): [
+    number,
+    { total: number; confirmed: number; completed: number; draft: number; cancelled: number; pending: number; },
+    number,
+    number,
+    number,
+    number
+  ] {
+    const today = OsteopathStatsService.dayKey();
+    const month = OsteopathStatsService.monthKey();
+    const confirmed = stats.consultations?.byDay?.[today]?.confirmed || 0;
+    const pending = stats.appointments?.byDay?.[today]?.scheduled || 0;
+    // Hypothèse: 40 créneaux disponibles par semaine, comme getOccupancyRate
+    const weekConsultations = OsteopathStatsService.sumWeek(stats.consultations?.byDay, 'total');
+
+    return [
+      stats.patients?.total || 0,
+      { total: confirmed + pending, confirmed, completed: 0, draft: 0, cancelled: 0, pending },
+      stats.invoices?.byStatus?.unpaid || 0,
+      stats.patients?.byMonth?.[month] || 0,
+      Math.min(Math.round((weekConsultations / 40) * 100), 100),
+      stats.invoices?.byMonth?.[month] || 0
+    ];
+  }
+
   /**
    * Récupère le nombre de patients
    */
@@ -370,15 +407,34 @@ export class DashboardService {
       const consultationsRef = collection(db, 'consultations');
       
       try {
-        const consultationsQuery = query(
-          consultationsRef,
-          where('osteopathId', '==', userId)
-        );
-        
-        const consultationsSnapshot = await getDocs(consultationsQuery);
-        
-        // Filtrer manuellement pour les consultations d'aujourd'hui
-        const todayConsultations = consultationsSnapshot.docs
+        // Une requête par type de date stockée (Timestamp, ou chaîne ISO pour
+        // les plus anciennes) : Firestore ne compare pas les deux types
+        const localNow = new Date(now.getTime() - now.getTimezoneOffset() * 60000).toISOString().slice(0, 16);
+        const consultationsQueries = [
+          query(
+            consultationsRef,
+            where('osteopathId', '==', userId),
+            where('date', '>=', Timestamp.fromDate(now)),
+            where('date', '<=', Timestamp.fromDate(endOfDay)),
+            orderBy('date'),
+            limit(UPCOMING_NOTIFICATIONS)
+          ),
+          query(
+            consultationsRef,
+            where('osteopathId', '==', userId),
+            // Chaînes avec ou sans fuseau : la borne la plus basse des deux
+            where('date', '>=', [localNow, now.toISOString().slice(0, 16)].sort()[0]),
+            where('date', '<=', localNow.slice(0, 10) + '\uf8ff'),
+            orderBy('date'),
+            limit(UPCOMING_NOTIFICATIONS)
+          )
+        ];
+
+        const consultationsSnapshots = await Promise.all(consultationsQueries.map(q => getDocs(q)));
+
+        // Les chaînes sont rebornées une fois converties en dates
+        const todayConsultations = consultationsSnapshots
+          .flatMap(snapshot => snapshot.docs)
           .filter(doc => {
             const consultationDate = toDateSafe(doc.data().date);
             return consultationDate >= now && consultationDate <= endOfDay;
@@ -388,7 +444,7 @@ export class DashboardService {
             const dateB = toDateSafe(b.data().date);
             return dateA.getTime() - dateB.getTime();
           })
-          .slice(0, 3);
+          .slice(0, UPCOMING_NOTIFICATIONS);
         
         for (const doc of todayConsultations) {
           const consultation = doc.data();
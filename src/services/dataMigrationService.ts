@@ -13,6 +13,8 @@ import {
 } from 'firebase/firestore';
 import { db, auth } from '../firebase/config';
 import { AuditLogger, AuditEventType, SensitivityLevel } from '../utils/auditLogger';
+import { forgetDocument } from '../utils/liveCollections';
+import { patientCache } from '../utils/patientCache';
 import { AppointmentService } from './appointmentService';
 // Analytics supprimés: retirer les imports et utiliser des stubs locaux
 const trackEvent = (..._args: unknown[]) => {};
@@ -233,6 +235,7 @@ export class DataMigrationService {
               ...patientUpdates,
               updatedAt: new Date().toISOString()
             });
+            patientCache.invalidate(patientId);
             results.updatedPatients++;
           }
 
@@ -405,6 +408,7 @@ export class DataMigrationService {
 
             if (Object.keys(patientUpdates).length > 0) {
               await updateDoc(doc(db, 'patients', patientId), { ...patientUpdates, updatedAt: new Date().toISOString() });
+              patientCache.invalidate(patientId);
               agg.updatedPatients++;
             }
 
@@ -476,6 +480,7 @@ export class DataMigrationService {
     } else {
       await updateDoc(patientRef, { nextAppointment: deleteField(), updatedAt: new Date().toISOString() });
     }
+    patientCache.invalidate(patientId);
   }
 
   /**
@@ -514,6 +519,7 @@ export class DataMigrationService {
             migratedAt: new Date().toISOString(),
             migratedBy: auth.currentUser.uid
           });
+          patientCache.invalidate(docSnap.id);
           
           updated++;
           
@@ -779,6 +785,7 @@ export class DataMigrationService {
             // Supprimer les consultations en double
             for (const consultation of consultationsToDelete) {
               await deleteDoc(doc(db, 'consultations', consultation.id));
+              forgetDocument('consultations', auth.currentUser.uid, consultation.id);
               results.consultationsCleaned++;
             }
             
@@ -842,6 +849,7 @@ export class DataMigrationService {
             // Supprimer les factures en double
             for (const invoice of invoicesToDelete) {
               await deleteDoc(doc(db, 'invoices', invoice.id));
+              forgetDocument('invoices', auth.currentUser.uid, invoice.id);
               results.invoicesCleaned++;
             }
             
@@ -1144,6 +1152,7 @@ export class DataMigrationService {
         try {
           // Supprimer le rendez-vous orphelin
           await deleteDoc(docSnap.ref);
+          forgetDocument('appointments', auth.currentUser.uid, docSnap.id);
           results.fixedAppointments++;
         } catch (error) {
           console.error(`❌ Failed to fix appointment ${docSnap.id}:`, error);
@@ -1165,6 +1174,7 @@ export class DataMigrationService {
         try {
           // Supprimer la consultation orpheline
           await deleteDoc(docSnap.ref);
+          forgetDocument('consultations', auth.currentUser.uid, docSnap.id);
           results.fixedConsultations++;
         } catch (error) {
           console.error(`❌ Failed to fix consultation ${docSnap.id}:`, error);
@@ -1186,6 +1196,7 @@ export class DataMigrationService {
         try {
           // Supprimer la facture orpheline
           await deleteDoc(docSnap.ref);
+          forgetDocument('invoices', auth.currentUser.uid, docSnap.id);
           results.fixedInvoices++;
         } catch (error) {
           console.error(`❌ Failed to fix invoice ${docSnap.id}:`, error);
@@ -11,6 +11,8 @@ import {
 } from 'firebase/firestore';
 import { db, auth } from '../firebase/config';
 import { AuditLogger, AuditEventType, SensitivityLevel } from '../utils/auditLogger';
+import { forgetDocument } from '../utils/liveCollections';
+import { patientCache } from '../utils/patientCache';
 import { ConsultationService } from './consultationService';
 import { InvoiceService } from './invoiceService';
 import { AppointmentService } from './appointmentService';
@@ -96,6 +98,8 @@ export class DuplicateCleanupService {
 
                 // Supprimer le patient doublon
                 await deleteDoc(doc(db, 'patients', duplicatePatient.id));
+                forgetDocument('patients', auth.currentUser.uid, duplicatePatient.id);
+                patientCache.invalidate(duplicatePatient.id);
                 results.duplicatesRemoved++;
 
                 console.log(`✅ Patient doublon supprimé: ${duplicatePatient.firstName} ${duplicatePatient.lastName} (${duplicatePatient.id})`);
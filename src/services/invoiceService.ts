@@ -12,6 +12,7 @@ import { db, auth } from '../firebase/config';
 import { AuditLogger, AuditEventType, SensitivityLevel } from '../utils/auditLogger';
 import { HDSCompliance } from '../utils/hdsCompliance';
 import { getEffectiveOsteopathId } from '../utils/substituteAuth';
+import { forgetDocument } from '../utils/liveCollections';
 
 /**
  * Service pour la gestion des factures avec intégrité référentielle
@@ -207,6 +208,7 @@ export class InvoiceService {
       
       // 4. Supprimer la facture
       await deleteDoc(invoiceRef);
+      forgetDocument('invoices', auth.currentUser.uid, invoiceId);
       
       // 5. Journaliser l'action
       await AuditLogger.log(
@@ -258,6 +260,7 @@ export class InvoiceService {
       // Suppression de chaque facture
       for (const docSnap of snapshot.docs) {
         await deleteDoc(docSnap.ref);
+        forgetDocument('invoices', auth.currentUser.uid, docSnap.id);
         count++;
         
         // Journalisation de chaque suppression
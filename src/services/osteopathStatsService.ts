@@ -0,0 +1,109 @@
+import { doc, getDoc } from 'firebase/firestore';
+import { httpsCallable } from 'firebase/functions';
+import { db, functions } from '../firebase/config';
+
+// Les triggers regroupent jours et mois à l'heure du cabinet : les clés
+// calculées ici doivent l'être aussi, quel que soit le fuseau du navigateur
+const STATS_TIME_ZONE = 'Europe/Paris';
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+const statsDayFormatter = new Intl.DateTimeFormat('en-CA', {
+  timeZone: STATS_TIME_ZONE,
+  year: 'numeric',
+  month: '2-digit',
+  day: '2-digit'
+});
+
+interface DayCounts {
+  [field: string]: number;
+}
+
+/**
+ * Document osteopathStats/{osteopathId}, tenu à jour par les triggers des
+ * Cloud Functions (functions/src/index.ts). Jours et mois au format
+ * YYYY-MM-DD / YYYY-MM, heure de Paris.
+ */
+export interface OsteopathStats {
+  patients?: { total?: number; byMonth?: Record<string, number> };
+  consultations?: {
+    total?: number;
+    byStatus?: Record<string, number>;
+    byDay?: Record<string, DayCounts>;
+  };
+  appointments?: { total?: number; byDay?: Record<string, DayCounts> };
+  invoices?: {
+    total?: number;
+    byStatus?: Record<string, number>;
+    byMonth?: Record<string, number>;
+  };
+  // Posé par la reconstruction complète ; absent, les compteurs ne sont pas fiables
+  rebuiltAt?: unknown;
+}
+
+// Une seule demande de reconstruction par session
+let rebuildRequested = false;
+
+/**
+ * Service de lecture des compteurs agrégés
+ */
+export class OsteopathStatsService {
+  /**
+   * Lit les compteurs de l'ostéopathe en une lecture. Retourne null si le
+   * document n'a pas encore été reconstruit (reconstruction demandée en
+   * arrière-plan) ou s'il est illisible : l'appelant revient alors aux
+   * requêtes de comptage.
+   */
+  static async getStats(osteopathId: string): Promise<OsteopathStats | null> {
+    try {
+      const snapshot = await getDoc(doc(db, 'osteopathStats', osteopathId));
+      const stats = snapshot.exists() ? snapshot.data() as OsteopathStats : null;
+      if (stats?.rebuiltAt) {
+        return stats;
+      }
+      this.requestRebuild();
+      return null;
+    } catch (error) {
+      console.warn('Could not read aggregate stats, using count queries:', (error as Error)?.message || String(error));
+      return null;
+    }
+  }
+
+  /**
+   * Clé de jour utilisée par les compteurs (heure de Paris)
+   */
+  static dayKey(date: Date = new Date()): string {
+    return statsDayFormatter.format(date);
+  }
+
+  /**
+   * Clé de mois utilisée par les compteurs (heure de Paris)
+   */
+  static monthKey(date: Date = new Date()): string {
+    return this.dayKey(date).slice(0, 7);
+  }
+
+  /**
+   * Somme d'un compteur journalier sur la semaine (lundi-dimanche) de la date,
+   * jours de Paris
+   */
+  static sumWeek(byDay: Record<string, DayCounts> | undefined, field: string, date: Date = new Date()): number {
+    const [year, month, day] = this.dayKey(date).split('-').map(Number);
+    const current = Date.UTC(year, month - 1, day);
+    const monday = current - ((new Date(current).getUTCDay() + 6) % 7) * DAY_MS;
+    let sum = 0;
+    for (let i = 0; i < 7; i++) {
+      const key = new Date(monday + i * DAY_MS).toISOString().slice(0, 10);
+      sum += byDay?.[key]?.[field] || 0;
+    }
+    return sum;
+  }
+
+  private static requestRebuild(): void {
+    if (rebuildRequested) return;
+    rebuildRequested = true;
+    httpsCallable(functions, 'rebuildOsteopathStats')()
+      .catch(error => console.warn('Aggregate stats rebuild failed:', (error as Error)?.message || String(error)));
+  }
+}
+
+export default OsteopathStatsService;
@@ -12,6 +12,7 @@ import {
 import { db } from '../firebase/config';
 import { HDSCompliance, cleanFirestoreData } from '../utils/hdsCompliance';
 import { AuditLogger, AuditEventType, SensitivityLevel } from '../utils/auditLogger';
+import { patientCache } from '../utils/patientCache';
 
 interface MigrationResult {
   success: boolean;
@@ -155,6 +156,7 @@ export class PatientDataMigrationService {
           // Mettre à jour le patient
           const patientRef = doc(db, 'patients', patientId);
           await updateDoc(patientRef, cleanFirestoreData(encryptedData));
+          patientCache.invalidate(patientId);
 
           result.patientsUpdated++;
           result.details.push({
@@ -6,6 +6,9 @@ import { validatePatientUpdate } from '../utils/validation';
 import { AuditLogger, AuditEventType, SensitivityLevel } from '../utils/auditLogger';
 import { getEffectiveOsteopathId } from '../utils/substituteAuth';
 import { InitialConsultationSyncService } from './initialConsultationSyncService';
+import { readLiveQuery } from '../utils/firestoreListener';
+import { osteopathCollection, forgetDocument } from '../utils/liveCollections';
+import { patientCache } from '../utils/patientCache';
 
 /**
  * Service pour la gestion des patients conforme HDS
@@ -29,6 +32,14 @@ export class PatientService {
         'success'
       );
       
+      // Cache partagé : les lectures concurrentes d'un même patient sont
+      // regroupées. Un patient hors du périmètre de l'utilisateur (accès
+      // administrateur) est lu directement.
+      const cached = await patientCache.load(patientId);
+      if (cached) {
+        return cached;
+      }
+
       // Récupération avec déchiffrement HDS
       const patientData = await HDSCompliance.getCompliantData(
         this.COLLECTION_NAME,
@@ -68,9 +79,9 @@ export class PatientService {
         throw new Error('Utilisateur non autorisé à accéder aux données patients');
       }
       
-      const patientsRef = collection(db, this.COLLECTION_NAME);
-      const q = query(patientsRef, where('osteopathId', '==', effectiveOsteopathId));
-      const snapshot = await getDocs(q);
+      // Requête partagée et tenue à jour en temps réel : seuls les patients
+      // modifiés depuis la dernière lecture sont relus et déchiffrés
+      const patients = await readLiveQuery(osteopathCollection(this.COLLECTION_NAME, effectiveOsteopathId));
       
       // Journalisation de l'accès
       await AuditLogger.log(
@@ -79,27 +90,10 @@ export class PatientService {
         'list',
         SensitivityLevel.SENSITIVE,
         'success',
-        { count: snapshot.size, effectiveOsteopathId }
+        { count: patients.length, effectiveOsteopathId }
       );
       
-      // Traitement des données avec déchiffrement
-      const patients: Patient[] = [];
-      
-      for (const docSnap of snapshot.docs) {
-        const data = docSnap.data();
-        const decryptedData = HDSCompliance.decryptDataForDisplay(
-          data,
-          this.COLLECTION_NAME,
-          effectiveOsteopathId
-        );
-        
-        patients.push({
-          ...decryptedData,
-          id: docSnap.id
-        } as Patient);
-      }
-      
-      return patients;
+      return patients.map(patient => ({ ...patient } as Patient));
       
     } catch (error) {
       console.error('❌ Failed to get patients:', error);
@@ -368,6 +362,7 @@ export class PatientService {
         patientId,
         updatesWithMetadata
       );
+      patientCache.invalidate(patientId);
 
       // Journalisation de la modification
       await AuditLogger.logPatientModification(
@@ -510,6 +505,8 @@ export class PatientService {
       
       // 5. Suppression du patient
       await deleteDoc(patientRef);
+      forgetDocument('patients', auth.currentUser.uid, patientId);
+      patientCache.invalidate(patientId);
       
       // Journalisation de la suppression complète
       await AuditLogger.logPatientModification(
@@ -571,6 +568,7 @@ export class PatientService {
       // Suppression de chaque rendez-vous
       for (const docSnap of snapshot.docs) {
         await deleteDoc(docSnap.ref);
+        forgetDocument('appointments', auth.currentUser.uid, docSnap.id);
         count++;
         
         // Journalisation de chaque suppression
@@ -614,6 +612,7 @@ export class PatientService {
       // Suppression de chaque consultation
       for (const docSnap of snapshot.docs) {
         await deleteDoc(docSnap.ref);
+        forgetDocument('consultations', auth.currentUser.uid, docSnap.id);
         count++;
         
         // Journalisation de chaque suppression
@@ -657,6 +656,7 @@ export class PatientService {
       // Suppression de chaque facture
       for (const docSnap of snapshot.docs) {
         await deleteDoc(docSnap.ref);
+        forgetDocument('invoices', auth.currentUser.uid, docSnap.id);
         count++;
         
         // Journalisation de chaque suppression
@@ -1,5 +1,11 @@
-import { describe, it, expect, vi, beforeEach } from 'vitest';
-import { setupSafeSnapshot } from '../utils/firestoreListener';
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest';
+import {
+  setupSafeSnapshot,
+  readLiveQuery,
+  subscribeLiveQuery,
+  clearLiveQueries,
+  LiveQuerySource
+} from '../utils/firestoreListener';
 
 // Mocks
 const mockGetDocs = vi.fn();
@@ -60,4 +66,157 @@ describe('setupSafeSnapshot', () => {
     // cleanup should be a no-op
     expect(() => cleanup()).not.toThrow();
   });
-});
\ No newline at end of file
+});
+
+// Snapshot minimal : documents présents et changements depuis le précédent
+function fakeSnapshot(
+  docs: Record<string, any>,
+  changes: Array<{ type: 'added' | 'modified' | 'removed'; id: string }>
+) {
+  return {
+    docs: Object.keys(docs).map(id => ({ id })),
+    docChanges: () => changes.map(({ type, id }) => ({
+      type,
+      doc: { id, data: () => docs[id] }
+    }))
+  };
+}
+
+describe('live queries', () => {
+  let emit: (snapshot: any) => void;
+  const unsubscribe = vi.fn();
+  const decode = vi.fn(async (docs: Array<{ id: string; data: any }>) =>
+    docs.map(({ id, data }) => ({ id, name: data.name.toUpperCase() }))
+  );
+  const source: LiveQuerySource<{ id: string; name: string }> = {
+    key: 'patients:u1',
+    query: () => ({} as any),
+    decode
+  };
+
+  beforeEach(() => {
+    mockGetDocs.mockReset();
+    mockOnSnapshot.mockReset();
+    unsubscribe.mockReset();
+    decode.mockClear();
+    mockOnSnapshot.mockImplementation((_q, next) => {
+      emit = next;
+      return unsubscribe;
+    });
+  });
+
+  afterEach(() => {
+    clearLiveQueries();
+    vi.useRealTimers();
+  });
+
+  it('shares one listener and decodes each document once', async () => {
+    const first = readLiveQuery(source);
+    emit(fakeSnapshot({ a: { name: 'alice' }, b: { name: 'bob' } }, [
+      { type: 'added', id: 'a' },
+      { type: 'added', id: 'b' }
+    ]));
+
+    expect(await first).toEqual([{ id: 'a', name: 'ALICE' }, { id: 'b', name: 'BOB' }]);
+    expect(await readLiveQuery(source)).toHaveLength(2);
+    expect(mockOnSnapshot).toHaveBeenCalledTimes(1);
+    expect(mockGetDocs).not.toHaveBeenCalled();
+    expect(decode).toHaveBeenCalledTimes(1);
+  });
+
+  it('applies incremental changes and notifies subscribers', async () => {
+    const listener = vi.fn();
+    const stop = subscribeLiveQuery(source, listener);
+    emit(fakeSnapshot({ a: { name: 'alice' }, b: { name: 'bob' } }, [
+      { type: 'added', id: 'a' },
+      { type: 'added', id: 'b' }
+    ]));
+    emit(fakeSnapshot({ a: { name: 'alicia' } }, [
+      { type: 'modified', id: 'a' },
+      { type: 'removed', id: 'b' }
+    ]));
+
+    expect(await readLiveQuery(source)).toEqual([{ id: 'a', name: 'ALICIA' }]);
+    expect(decode).toHaveBeenLastCalledWith([{ id: 'a', data: { name: 'alicia' } }]);
+    expect(listener).toHaveBeenLastCalledWith([{ id: 'a', name: 'ALICIA' }]);
+    stop();
+  });
+
+  it('stops listening when idle and serves the stale value while revalidating', async () => {
+    vi.useFakeTimers();
+    const first = readLiveQuery(source);
+    emit(fakeSnapshot({ a: { name: 'alice' } }, [{ type: 'added', id: 'a' }]));
+    await first;
+
+    vi.advanceTimersByTime(5 * 60 * 1000);
+    expect(unsubscribe).toHaveBeenCalled();
+
+    expect(await readLiveQuery(source, { allowStale: true })).toEqual([{ id: 'a', name: 'ALICE' }]);
+    expect(mockOnSnapshot).toHaveBeenCalledTimes(2);
+  });
+
+  it('starts from bootstrapped documents and listens to changes only', async () => {
+    const onChanges = vi.fn();
+    const changesQuery: any = { changesOnly: true };
+    const bootstrapped: LiveQuerySource<{ id: string; name: string }> = {
+      ...source,
+      key: 'patients:u2',
+      bootstrap: async () => ({
+        docs: [{ id: 'a', data: { name: 'alice' } }, { id: 'b', data: { name: 'bob' } }],
+        queries: [changesQuery]
+      }),
+      onChanges
+    };
+
+    expect(await readLiveQuery(bootstrapped)).toHaveLength(2);
+    expect(mockOnSnapshot).toHaveBeenCalledWith(changesQuery, expect.any(Function), expect.any(Function));
+
+    emit(fakeSnapshot({ c: { name: 'chloé' } }, [{ type: 'added', id: 'c' }]));
+
+    expect(await readLiveQuery(bootstrapped)).toEqual([
+      { id: 'a', name: 'ALICE' },
+      { id: 'b', name: 'BOB' },
+      { id: 'c', name: 'CHLOÉ' }
+    ]);
+    expect(onChanges).toHaveBeenCalledWith([{ id: 'c', data: { name: 'chloé' } }], []);
+  });
+
+  it('drops documents deleted elsewhere when the listener reconnects', async () => {
+    const reconcile = vi.fn(async (knownCount: number) => (knownCount === 2 ? new Set(['a']) : null));
+    const changesQuery: any = { changesOnly: true };
+    mockOnSnapshot.mockImplementation((_q, _options, next) => {
+      emit = next;
+      return unsubscribe;
+    });
+    const reconciled: LiveQuerySource<{ id: string; name: string }> = {
+      ...source,
+      key: 'patients:u3',
+      bootstrap: async () => ({
+        docs: [{ id: 'a', data: { name: 'alice' } }, { id: 'b', data: { name: 'bob' } }],
+        queries: [changesQuery]
+      }),
+      reconcile
+    };
+
+    expect(await readLiveQuery(reconciled)).toHaveLength(2);
+    expect(mockOnSnapshot).toHaveBeenCalledWith(
+      changesQuery, { includeMetadataChanges: true }, expect.any(Function), expect.any(Function)
+    );
+
+    emit({ ...fakeSnapshot({}, []), metadata: { fromCache: true } });
+    emit({ ...fakeSnapshot({}, []), metadata: { fromCache: false } });
+
+    await vi.waitFor(() => expect(reconcile).toHaveBeenCalledWith(2));
+    expect(reconcile).toHaveBeenCalledTimes(1);
+    await vi.waitFor(async () => expect(await readLiveQuery(reconciled)).toEqual([{ id: 'a', name: 'ALICE' }]));
+  });
+
+  it('rejects pending reads when the listener fails', async () => {
+    mockOnSnapshot.mockImplementation((_q, _next, onError) => {
+      onError(new Error('permission-denied'));
+      return unsubscribe;
+    });
+
+    await expect(readLiveQuery(source)).rejects.toThrow('permission-denied');
+  });
+});
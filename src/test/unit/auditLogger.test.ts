@@ -0,0 +1,129 @@
+import { describe, it, expect, vi, beforeEach } from 'vitest'
+import { writeBatch } from 'firebase/firestore'
+import { AuditLogger, AuditEventType, SensitivityLevel } from '../../utils/auditLogger'
+import { auth } from '../../firebase/config'
+
+const batches = vi.hoisted(() => [] as { sets: any[] }[])
+
+vi.mock('firebase/firestore', () => ({
+  doc: vi.fn((_db, collectionName, id) => ({ path: `${collectionName}/${id}` })),
+  writeBatch: vi.fn(() => {
+    const batch = { sets: [] as any[], commit: vi.fn(async () => {}), set: vi.fn() }
+    batch.set.mockImplementation((ref: any, data: any) => batch.sets.push({ ref, data }))
+    batches.push(batch)
+    return batch
+  }),
+  Timestamp: { fromMillis: (ms: number) => ({ ms }) }
+}))
+
+const fetchMock = vi.fn(async () => ({ json: async () => ({ ip: '203.0.113.7' }) }))
+vi.stubGlobal('fetch', fetchMock)
+
+let counter = 0
+vi.mocked(crypto.randomUUID).mockImplementation(() => `uuid-${++counter}` as any)
+
+const logRead = (resource: string) =>
+  AuditLogger.log(AuditEventType.DATA_ACCESS, resource, 'read', SensitivityLevel.SENSITIVE, 'success')
+
+describe('AuditLogger pipeline', () => {
+  beforeEach(async () => {
+    await AuditLogger.flush()
+    batches.length = 0
+    vi.mocked(writeBatch).mockClear()
+  })
+
+  it('should queue events without any network access', async () => {
+    const id = await logRead('consultations/c1')
+
+    expect(id).toMatch(/^uuid-/)
+    expect(writeBatch).not.toHaveBeenCalled()
+    expect(AuditLogger.getQueueSize()).toBe(1)
+  })
+
+  it('should write queued events in one batch with the session IP', async () => {
+    await logRead('consultations/c1')
+    await logRead('consultations/c2')
+
+    expect(await AuditLogger.flush()).toBe(2)
+    expect(batches).toHaveLength(1)
+    const [first, second] = batches[0].sets
+    expect(first.ref.path).toMatch(/^activity_logs\/uuid-/)
+    expect(first.data).toMatchObject({ resource: 'consultations/c1', ipAddress: '203.0.113.7', userId: 'test-user-id' })
+    expect(first.data.timestamp.ms).toBeTypeOf('number')
+    expect(second.data.resource).toBe('consultations/c2')
+
+    await logRead('consultations/c3')
+    await AuditLogger.flush()
+    expect(fetchMock).toHaveBeenCalledTimes(1)
+    expect(AuditLogger.getQueueSize()).toBe(0)
+  })
+
+  it('should flush as soon as the batch size is reached', async () => {
+    for (let i = 0; i < 100; i++) {
+      await logRead(`patients/p${i}`)
+    }
+
+    await AuditLogger.flush()
+    expect(batches[0].sets).toHaveLength(100)
+  })
+
+  it('should keep events queued when a batch fails', async () => {
+    vi.mocked(writeBatch).mockImplementationOnce(() => ({
+      set: vi.fn(),
+      commit: vi.fn(async () => { throw new Error('unavailable') })
+    }) as any)
+    await logRead('invoices/i1')
+
+    expect(await AuditLogger.flush()).toBe(0)
+    expect(AuditLogger.getQueueSize()).toBe(1)
+
+    expect(await AuditLogger.flush()).toBe(1)
+    expect(batches[batches.length - 1].sets[0].data.resource).toBe('invoices/i1')
+  })
+
+  it('should isolate refused events by writing them one by one', async () => {
+    const refused = { code: 'permission-denied', message: 'Missing or insufficient permissions.' }
+    vi.mocked(writeBatch)
+      .mockImplementationOnce(() => ({ set: vi.fn(), commit: vi.fn(async () => { throw refused }) }) as any)
+      .mockImplementationOnce(() => ({ set: vi.fn(), commit: vi.fn(async () => { throw refused }) }) as any)
+    await logRead('patients/p1')
+    await logRead('patients/p2')
+
+    expect(await AuditLogger.flush()).toBe(1)
+    expect(AuditLogger.getQueueSize()).toBe(0)
+  })
+
+  it('should not hold the flush on a stalled IP lookup', async () => {
+    vi.useFakeTimers()
+    try {
+      ;(AuditLogger as any).clientIP = null
+      fetchMock.mockImplementationOnce(((_url: string, init: RequestInit) => new Promise((_resolve, reject) => {
+        init.signal?.addEventListener('abort', () => reject(new Error('aborted')))
+      })) as any)
+      await logRead('patients/p1')
+
+      const flushed = AuditLogger.flush()
+      await vi.advanceTimersByTimeAsync(2000)
+      expect(await flushed).toBe(1)
+      expect(batches[0].sets[0].data.ipAddress).toBe('unknown')
+    } finally {
+      vi.useRealTimers()
+    }
+  })
+
+  it('should leave events of a previous user out of the next user batches', async () => {
+    const previousUser = auth.currentUser
+    await logRead('patients/p1')
+    try {
+      ;(auth as any).currentUser = { uid: 'other-user-id' }
+      await logRead('patients/p2')
+
+      expect(await AuditLogger.flush()).toBe(1)
+      expect(batches[0].sets).toHaveLength(1)
+      expect(batches[0].sets[0].data).toMatchObject({ resource: 'patients/p2', userId: 'other-user-id' })
+      expect(AuditLogger.getQueueSize()).toBe(0)
+    } finally {
+      ;(auth as any).currentUser = previousUser
+    }
+  })
+})
@@ -0,0 +1,72 @@
+import { describe, it, expect, vi, beforeEach } from 'vitest'
+import { getDocs } from 'firebase/firestore'
+import { ConsultationService } from '../../services/consultationService'
+
+vi.mock('firebase/firestore', () => ({
+  collection: vi.fn(() => ({})),
+  query: vi.fn((_ref, ...constraints: any[]) => constraints),
+  where: vi.fn((field, op, value) => ({ field, op, value })),
+  orderBy: vi.fn(() => ({ orderBy: true })),
+  startAfter: vi.fn(after => ({ after })),
+  limit: vi.fn(count => ({ limit: count })),
+  getDocs: vi.fn(),
+  Timestamp: { fromMillis: (ms: number) => ({ ms }) }
+}))
+
+vi.mock('../../firebase/config', () => ({
+  auth: { currentUser: { uid: 'u1' } },
+  db: {},
+  functions: {}
+}))
+
+// Consultations datées par Timestamp (récentes) et par chaîne ISO (anciennes)
+const stamp = (iso: string) => ({ toDate: () => new Date(iso) })
+const timestamped = ['2025-03-10', '2025-01-05', '2024-06-01'].map(day => ({ id: `t-${day}`, date: stamp(day) }))
+const legacy = ['2024-09-15', '2023-02-01'].map(day => ({ id: `s-${day}`, date: `${day}T09:00:00.000Z` }))
+
+const serveStreams = () => {
+  vi.mocked(getDocs).mockImplementation(async (constraints: any) => {
+    const bound = constraints.find((part: any) => part?.field === 'date')
+    const after = constraints.find((part: any) => part?.after)?.after
+    const count = constraints.find((part: any) => part?.limit)?.limit
+    const stream = typeof bound.value === 'string' ? legacy : timestamped
+    const start = after ? stream.findIndex(entry => entry.id === after.id) + 1 : 0
+    return {
+      docs: stream.slice(start, start + count).map(entry => ({ id: entry.id, data: () => entry }))
+    } as any
+  })
+}
+
+describe('ConsultationService.getConsultationsPage', () => {
+  beforeEach(() => {
+    vi.mocked(getDocs).mockReset()
+    serveStreams()
+  })
+
+  it('should merge Timestamp and string dates in descending order across pages', async () => {
+    const first = await ConsultationService.getConsultationsPage({ pageSize: 2 })
+    const second = await ConsultationService.getConsultationsPage({ pageSize: 2, cursor: first.cursor })
+    const third = await ConsultationService.getConsultationsPage({ pageSize: 2, cursor: second.cursor })
+
+    expect([...first.rows, ...second.rows, ...third.rows].map(row => row.id)).toEqual([
+      't-2025-03-10',
+      't-2025-01-05',
+      's-2024-09-15',
+      't-2024-06-01',
+      's-2023-02-01'
+    ])
+    expect(first.hasMore).toBe(true)
+    expect(second.hasMore).toBe(true)
+    expect(third.hasMore).toBe(false)
+  })
+
+  it('should not query an exhausted date type again', async () => {
+    const first = await ConsultationService.getConsultationsPage({ pageSize: 4 })
+    vi.mocked(getDocs).mockClear()
+
+    await ConsultationService.getConsultationsPage({ pageSize: 4, cursor: first.cursor })
+
+    expect(first.cursor?.timestamp.done).toBe(true)
+    expect(getDocs).toHaveBeenCalledTimes(1)
+  })
+})
@@ -0,0 +1,99 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest'
+import { webcrypto } from 'node:crypto'
+import { encryptMany, decryptMany, terminateCryptoWorkers } from '../../utils/cryptoWorkerPool'
+import { handleCryptoRequest, CryptoWorkerRequest } from '../../workers/cryptoMessages'
+import { HDSCompliance } from '../../utils/hdsCompliance'
+
+// Worker factice : traite les requêtes comme crypto.worker.ts, dans le même thread
+class FakeWorker {
+  static instances: FakeWorker[] = []
+  onmessage: ((event: { data: unknown }) => void) | null = null
+  onerror: ((event: unknown) => void) | null = null
+  transfers: ArrayBuffer[][] = []
+
+  constructor() {
+    FakeWorker.instances.push(this)
+  }
+
+  postMessage(request: CryptoWorkerRequest, transfer: ArrayBuffer[]) {
+    this.transfers.push(transfer)
+    handleCryptoRequest(request).then(response => this.onmessage?.({ data: response }))
+  }
+
+  terminate() {}
+}
+
+describe('cryptoWorkerPool', () => {
+  const values = Array.from({ length: 20 }, (_, i) => `Note clinique ${i}`)
+
+  beforeEach(() => {
+    // Le setup remplace crypto par un mock sans Web Crypto ni générateur aléatoire
+    Object.assign(globalThis.crypto, {
+      subtle: webcrypto.subtle,
+      getRandomValues: webcrypto.getRandomValues.bind(webcrypto)
+    })
+    FakeWorker.instances = []
+  })
+
+  afterEach(() => {
+    terminateCryptoWorkers()
+    vi.unstubAllGlobals()
+    delete (globalThis.crypto as any).subtle
+  })
+
+  it('should run synchronously on the main thread without Worker', async () => {
+    const encrypted = await encryptMany(values, 'test-user-id')
+
+    expect(encrypted).toHaveLength(values.length)
+    expect(await decryptMany(encrypted, 'test-user-id')).toEqual(values)
+  })
+
+  it('should split a batch across the pool and keep results in input order', async () => {
+    vi.stubGlobal('Worker', FakeWorker)
+    vi.stubGlobal('navigator', { hardwareConcurrency: 4 })
+
+    const encrypted = await encryptMany(values, 'test-user-id')
+    const decrypted = await decryptMany(encrypted, 'test-user-id')
+
+    expect(decrypted).toEqual(values)
+    expect(FakeWorker.instances).toHaveLength(4)
+    // 20 valeurs, 8 minimum par worker : 3 tranches par lot, payload transféré
+    const transfers = FakeWorker.instances.flatMap(worker => worker.transfers)
+    expect(transfers).toHaveLength(6)
+    transfers.forEach(transfer => expect(transfer[0]).toBeInstanceOf(ArrayBuffer))
+  })
+
+  it('should keep small batches on the main thread', async () => {
+    vi.stubGlobal('Worker', FakeWorker)
+
+    await encryptMany(['Lombalgie'], 'test-user-id')
+
+    expect(FakeWorker.instances).toHaveLength(0)
+  })
+
+  it('should process a chunk on the main thread when its worker fails', async () => {
+    class FailingWorker extends FakeWorker {
+      postMessage(request: CryptoWorkerRequest) {
+        Promise.resolve().then(() => this.onmessage?.({ data: { id: request.id, error: 'boom' } }))
+      }
+    }
+    vi.stubGlobal('Worker', FailingWorker)
+
+    const encrypted = await encryptMany(values, 'test-user-id')
+
+    expect(await decryptMany(encrypted, 'test-user-id')).toEqual(values)
+  })
+
+  it('should prepare documents like prepareDataForStorage', async () => {
+    const patient = { firstName: 'Jean', lastName: 'Dupont', phone: '0601020304', osteopathId: 'test-user-id' }
+
+    const [prepared] = await HDSCompliance.prepareDocumentsForStorage([patient], 'patients', 'test-user-id')
+    const expected = HDSCompliance.prepareDataForStorage(patient, 'patients', 'test-user-id')
+
+    expect(prepared._hds.encryptedFields).toEqual(expected._hds.encryptedFields)
+    expect(prepared.osteopathId).toBe('test-user-id')
+    expect(prepared.firstName).not.toBe('Jean')
+    expect(await HDSCompliance.decryptDocumentsForDisplay([prepared], 'patients', 'test-user-id'))
+      .toEqual([expect.objectContaining({ firstName: 'Jean', lastName: 'Dupont' })])
+  })
+})
@@ -1,10 +1,14 @@
 import { describe, it, expect, vi, beforeEach } from 'vitest'
+import { limit, where } from 'firebase/firestore'
 import { DashboardService } from '../../services/dashboardService'
 
 vi.mock('firebase/firestore', () => ({
   collection: vi.fn(() => ({})),
   query: vi.fn(() => ({})),
   where: vi.fn(() => ({})),
+  orderBy: vi.fn(() => ({})),
+  limit: vi.fn(() => ({})),
+  Timestamp: { fromDate: (date: Date) => date },
   getDocs: vi.fn(async () => ({
     docs: [
       { data: () => ({ date: new Date(), createdAt: new Date(), updatedAt: new Date(), isInitialConsultation: false, isTestData: false }) },
@@ -36,4 +40,11 @@ describe('DashboardService.getDashboardStats', () => {
     const stats = await DashboardService.getDashboardStats()
     expect(stats.todayAppointments).toBe(2)
   })
+
+  it('lit les prochaines consultations du jour par plage de dates bornée', async () => {
+    await DashboardService.getDashboardStats()
+    expect(where).toHaveBeenCalledWith('date', '>=', expect.any(Date))
+    expect(where).toHaveBeenCalledWith('date', '>=', expect.any(String))
+    expect(limit).toHaveBeenCalledWith(3)
+  })
 })
\ No newline at end of file
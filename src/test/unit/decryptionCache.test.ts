@@ -0,0 +1,106 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest'
+import { webcrypto } from 'node:crypto'
+import { DecryptionCache, decryptionCache } from '../../utils/decryptionCache'
+import { AES } from 'crypto-js'
+import { decryptData, decryptDataBatch, encryptData, getUserKey } from '../../utils/encryption'
+
+describe('DecryptionCache', () => {
+  it('should count hits and misses', () => {
+    const cache = new DecryptionCache()
+    cache.set('user-a', 'cipher-1', 'Lombalgie')
+
+    expect(cache.get('user-a', 'cipher-1')).toBe('Lombalgie')
+    expect(cache.get('user-a', 'cipher-2')).toBeUndefined()
+    expect(cache.get('user-b', 'cipher-1')).toBeUndefined()
+    expect(cache.getStats()).toMatchObject({ hits: 1, misses: 2, entries: 1 })
+  })
+
+  it('should return a copy of cached objects', () => {
+    const cache = new DecryptionCache()
+    cache.set('user-a', 'cipher-1', { street: '123 Rue de la Paix' })
+
+    cache.get('user-a', 'cipher-1').street = 'modifié'
+
+    expect(cache.get('user-a', 'cipher-1')).toEqual({ street: '123 Rue de la Paix' })
+  })
+
+  it('should evict least recently used entries beyond its byte budget', () => {
+    // Chaque entrée pèse (6 + 8 + 6) * 2 = 40 octets
+    const cache = new DecryptionCache(100)
+    cache.set('user-a', 'cipher-1', 'value1')
+    cache.set('user-a', 'cipher-2', 'value2')
+    cache.get('user-a', 'cipher-1')
+    cache.set('user-a', 'cipher-3', 'value3')
+
+    expect(cache.get('user-a', 'cipher-2')).toBeUndefined()
+    expect(cache.get('user-a', 'cipher-1')).toBe('value1')
+    expect(cache.get('user-a', 'cipher-3')).toBe('value3')
+    expect(cache.getStats().bytes).toBe(80)
+  })
+
+  it('should reset entries and counters on clear', () => {
+    const cache = new DecryptionCache()
+    cache.set('user-a', 'cipher-1', 'value1')
+    cache.get('user-a', 'cipher-1')
+    cache.clear()
+
+    expect(cache.getStats()).toMatchObject({ hits: 0, misses: 0, entries: 0, bytes: 0 })
+  })
+
+  describe('in front of decryptDataBatch', () => {
+    beforeEach(() => {
+      Object.assign(globalThis.crypto, {
+        subtle: webcrypto.subtle,
+        getRandomValues: webcrypto.getRandomValues.bind(webcrypto)
+      })
+      decryptionCache.clear()
+    })
+
+    afterEach(() => {
+      vi.restoreAllMocks()
+      delete (globalThis.crypto as any).subtle
+    })
+
+    it('should not decrypt the same ciphertexts twice', async () => {
+      const values = ['Douleurs lombaires chroniques', 'Séance à 45 €']
+      const encrypted = values.map(value => encryptData(value, 'test-user-id'))
+      const decrypt = vi.spyOn(webcrypto.subtle, 'decrypt')
+
+      expect(await decryptDataBatch(encrypted, 'test-user-id')).toEqual(values)
+      expect(await decryptDataBatch(encrypted, 'test-user-id')).toEqual(values)
+
+      expect(decrypt).toHaveBeenCalledTimes(2)
+      expect(decryptionCache.getStats()).toMatchObject({ hits: 2, misses: 2 })
+    })
+
+    it('should decrypt a single value only once through decryptData', () => {
+      const encrypted = encryptData('Cervicalgie', 'test-user-id')
+      const decrypt = vi.spyOn(AES, 'decrypt')
+
+      expect(decryptData(encrypted, 'test-user-id')).toBe('Cervicalgie')
+      expect(decryptData(encrypted, 'test-user-id')).toBe('Cervicalgie')
+
+      expect(decrypt).toHaveBeenCalledTimes(1)
+      expect(decryptionCache.getStats()).toMatchObject({ hits: 1, misses: 1, entries: 1 })
+    })
+
+    it('should decrypt a legacy value before caching it', async () => {
+      // Ancien format : IV de 32 caractères hexadécimaux, passphrase "Salted__"
+      const legacy = 'a1b2c3d4e5f60718293a4b5c6d7e8f90:' + AES.encrypt('Entorse cheville', getUserKey('test-user-id')).toString()
+
+      expect(decryptData(legacy, 'test-user-id')).toBe('Entorse cheville')
+      expect(await decryptDataBatch([legacy], 'test-user-id')).toEqual(['Entorse cheville'])
+      decryptionCache.clear()
+      expect(await decryptDataBatch([legacy], 'test-user-id')).toEqual(['Entorse cheville'])
+      expect(decryptData(legacy, 'test-user-id')).toBe('Entorse cheville')
+    })
+
+    it('should not cache failures', async () => {
+      const encrypted = encryptData('Notes du praticien', 'other-user-id')
+
+      await decryptDataBatch([encrypted], 'test-user-id')
+
+      expect(decryptionCache.getStats().entries).toBe(0)
+    })
+  })
+})
@@ -0,0 +1,98 @@
+import { describe, it, expect, vi, beforeEach } from 'vitest'
+import { getDocs, setDoc, writeBatch } from 'firebase/firestore'
+import { listAll, getMetadata, getDownloadURL } from 'firebase/storage'
+import { listDocuments, resolveDocumentURL } from '../../utils/documentStorage'
+
+vi.mock('firebase/firestore', () => ({
+  collection: vi.fn(() => ({})),
+  doc: vi.fn((_db, collectionName, id) => ({ path: `${collectionName}/${id}` })),
+  query: vi.fn((...args: any[]) => args),
+  where: vi.fn(),
+  getDocs: vi.fn(),
+  setDoc: vi.fn(async () => {}),
+  deleteDoc: vi.fn(async () => {}),
+  writeBatch: vi.fn(() => ({ set: vi.fn(), commit: vi.fn(async () => {}) }))
+}))
+
+vi.mock('firebase/storage', () => ({
+  ref: vi.fn((_storage, path) => ({ fullPath: path })),
+  listAll: vi.fn(),
+  getMetadata: vi.fn(),
+  getDownloadURL: vi.fn(async (ref: any) => `https://files.example/${ref.fullPath}`),
+  uploadBytes: vi.fn(),
+  uploadBytesResumable: vi.fn(),
+  deleteObject: vi.fn()
+}))
+
+vi.mock('../../firebase/config', () => ({
+  db: {},
+  storage: {},
+  app: { options: {} },
+  auth: { currentUser: { uid: 'test-user-id' } }
+}))
+
+vi.mock('browser-image-compression', () => ({ default: vi.fn() }))
+
+const folder = 'users/test-user-id/patients/p1/documents'
+const snapshotOf = (docs: { id: string; data: any }[]) => ({
+  docs: docs.map(({ id, data }) => ({ id, data: () => data }))
+})
+
+describe('listDocuments', () => {
+  beforeEach(() => {
+    vi.clearAllMocks()
+  })
+
+  it('should answer from the Firestore index without any Storage call', async () => {
+    vi.mocked(getDocs).mockResolvedValueOnce(snapshotOf([
+      { id: `folder:${encodeURIComponent(folder)}`, data: { isFolderMarker: true, folder } },
+      { id: 'a', data: { name: 'a.pdf', path: `${folder}/a.pdf`, size: 10, type: 'application/pdf', uploadedAt: '2026-01-01T00:00:00Z', folder } },
+      { id: 'b', data: { name: 'b.png', path: `${folder}/b.png`, size: 20, type: 'image/png', uploadedAt: '2026-02-01T00:00:00Z', folder } }
+    ]) as any)
+
+    const documents = await listDocuments(folder)
+
+    expect(documents.map(d => d.name)).toEqual(['b.png', 'a.pdf'])
+    expect(documents[0]).toMatchObject({ url: '', path: `${folder}/b.png`, size: 20 })
+    expect(listAll).not.toHaveBeenCalled()
+    expect(getMetadata).not.toHaveBeenCalled()
+    expect(getDownloadURL).not.toHaveBeenCalled()
+  })
+
+  it('should list an unindexed folder in Storage once and index it', async () => {
+    vi.mocked(getDocs).mockResolvedValueOnce(snapshotOf([]) as any)
+    vi.mocked(listAll).mockResolvedValueOnce({
+      items: [{ name: 'a.pdf', fullPath: `${folder}/a.pdf` }],
+      prefixes: []
+    } as any)
+    vi.mocked(getMetadata).mockResolvedValueOnce({
+      size: 10,
+      contentType: 'application/pdf',
+      timeCreated: '2026-01-01T00:00:00Z',
+      customMetadata: { originalName: 'Ordonnance.pdf', uploadedBy: 'test-user-id' }
+    } as any)
+
+    const documents = await listDocuments(folder)
+
+    expect(documents).toHaveLength(1)
+    expect(documents[0]).toMatchObject({ originalName: 'Ordonnance.pdf', url: '', category: 'documents' })
+    expect(getDownloadURL).not.toHaveBeenCalled()
+    expect(writeBatch).toHaveBeenCalledTimes(1)
+    expect(setDoc).toHaveBeenCalledWith(
+      { path: `storageDocuments/folder:${encodeURIComponent(folder)}` },
+      expect.objectContaining({ isFolderMarker: true, osteopathId: 'test-user-id' })
+    )
+  })
+
+  it('should resolve download URLs on demand and cache them', async () => {
+    const descriptor = { url: '', path: `${folder}/c.pdf`, folder, name: 'c.pdf' }
+
+    const first = await resolveDocumentURL(descriptor)
+    const second = await resolveDocumentURL(descriptor)
+
+    expect(first).toBe(`https://files.example/${folder}/c.pdf`)
+    expect(second).toBe(first)
+    expect(getDownloadURL).toHaveBeenCalledTimes(1)
+    expect(await resolveDocumentURL({ ...descriptor, url: 'https://known' })).toBe('https://known')
+  })
+})
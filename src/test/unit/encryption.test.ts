@@ -1,5 +1,20 @@
-import { describe, it, expect, vi, beforeEach } from 'vitest'
-import { isEncrypted, decryptData, encryptData } from '../../utils/encryption'
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest'
+import { webcrypto } from 'node:crypto'
+import { AES } from 'crypto-js'
+import {
+  isEncrypted,
+  isValidEncryptedFormat,
+  decryptData,
+  decryptDataBatch,
+  encryptData,
+  encryptDataBatch,
+  getKeyHandle,
+  getUserKey,
+  isCurrentKeyVersion,
+  migrateEncryptedDataStream,
+  CURRENT_KEY_VERSION,
+  CIPHERTEXT_PREFIX_PATTERN
+} from '../../utils/encryption'
 
 describe('Encryption Utils', () => {
   beforeEach(() => {
@@ -77,4 +92,137 @@ describe('Encryption Utils', () => {
       expect(encrypted).not.toBe(objectData)
     })
   })
+
+  describe('decryptDataBatch', () => {
+    // Le setup remplace crypto par un mock sans Web Crypto ni générateur aléatoire
+    beforeEach(() => {
+      Object.assign(globalThis.crypto, {
+        subtle: webcrypto.subtle,
+        getRandomValues: webcrypto.getRandomValues.bind(webcrypto)
+      })
+    })
+
+    afterEach(() => {
+      delete (globalThis.crypto as any).subtle
+    })
+
+    it('should decrypt values produced by encryptData through Web Crypto', async () => {
+      const values = ['Douleurs lombaires chroniques', 'Hernie discale L4-L5 en 2018', 'Séance à 45 €']
+      const encrypted = values.map(value => encryptData(value, 'test-user-id'))
+
+      expect(await decryptDataBatch(encrypted, 'test-user-id')).toEqual(values)
+    })
+
+    it('should restore objects and empty values', async () => {
+      const address = { street: '123 Rue de la Paix', city: 'Paris' }
+      const encrypted = [encryptData(address, 'test-user-id'), encryptData('', 'test-user-id')]
+
+      expect(await decryptDataBatch(encrypted, 'test-user-id')).toEqual([address, ''])
+    })
+
+    it('should keep results aligned with decryptData for values it cannot parse', async () => {
+      const values = ['not-encrypted-data', '', '[ENCRYPTION_ERROR]:secret']
+      const results = await decryptDataBatch(values, 'test-user-id')
+
+      expect(results).toEqual(values.map(value => decryptData(value, 'test-user-id')))
+    })
+
+    it('should fall back to decryptData without Web Crypto', async () => {
+      delete (globalThis.crypto as any).subtle
+      const values = ['not-encrypted-data', '']
+
+      expect(await decryptDataBatch(values, 'test-user-id')).toEqual(['not-encrypted-data', '[NOT_ENCRYPTED_OR_INVALID]'])
+    })
+
+    it('should report a ciphertext encrypted for another user as a failure', async () => {
+      const encrypted = encryptData('Notes du praticien', 'other-user-id')
+      const [result] = await decryptDataBatch([encrypted], 'test-user-id')
+
+      expect(result).not.toBe('Notes du praticien')
+    })
+  })
+
+  describe('key handles', () => {
+    beforeEach(() => {
+      Object.assign(globalThis.crypto, {
+        subtle: webcrypto.subtle,
+        getRandomValues: webcrypto.getRandomValues.bind(webcrypto)
+      })
+    })
+
+    afterEach(() => {
+      delete (globalThis.crypto as any).subtle
+    })
+
+    // Ancien format : passphrase de session, en-tête "Salted__"
+    const legacyEncrypt = (value: string, userId: string) =>
+      'a1b2c3d4e5f60718293a4b5c6d7e8f90:' + AES.encrypt(value, getUserKey(userId)).toString()
+
+    it('should tag ciphertexts with the current key version', () => {
+      const encrypted = encryptData('Lombalgie', 'test-user-id')
+
+      expect(encrypted).toMatch(/^02[0-9a-f]{32}:[A-Za-z0-9+/=]+$/)
+      expect(isEncrypted(encrypted)).toBe(true)
+      expect(isValidEncryptedFormat(encrypted)).toBe(true)
+      expect(isCurrentKeyVersion(encrypted)).toBe(true)
+    })
+
+    it('should recognise legacy and versioned ciphertext headers', () => {
+      expect(CIPHERTEXT_PREFIX_PATTERN.test(encryptData('Lombalgie', 'test-user-id'))).toBe(true)
+      expect(CIPHERTEXT_PREFIX_PATTERN.test(legacyEncrypt('Lombalgie', 'test-user-id'))).toBe(true)
+      expect(CIPHERTEXT_PREFIX_PATTERN.test('Rendez-vous: 10:30')).toBe(false)
+    })
+
+    it('should derive a key handle once per user and version', () => {
+      const handle = getKeyHandle('test-user-id')
+
+      expect(handle?.version).toBe(CURRENT_KEY_VERSION)
+      expect(getKeyHandle('test-user-id')).toBe(handle)
+      expect(getKeyHandle('other-user-id')).not.toBe(handle)
+      expect(getKeyHandle('test-user-id', 99)).toBeNull()
+    })
+
+    it('should decrypt versioned values synchronously', () => {
+      const address = { street: '123 Rue de la Paix', city: 'Paris' }
+
+      expect(decryptData(encryptData('Sciatique droite', 'test-user-id'), 'test-user-id')).toBe('Sciatique droite')
+      expect(decryptData(encryptData(address, 'test-user-id'), 'test-user-id')).toEqual(address)
+      expect(decryptData(encryptData('', 'test-user-id'), 'test-user-id')).toBe('')
+    })
+
+    it('should produce the same format through Web Crypto', async () => {
+      const encrypted = await encryptDataBatch(['Cervicalgie', { city: 'Lyon' }], 'test-user-id')
+
+      encrypted.forEach(value => expect(isCurrentKeyVersion(value)).toBe(true))
+      expect(decryptData(encrypted[0], 'test-user-id')).toBe('Cervicalgie')
+      expect(await decryptDataBatch(encrypted, 'test-user-id')).toEqual(['Cervicalgie', { city: 'Lyon' }])
+    })
+
+    it('should decrypt legacy and versioned values in the same batch', async () => {
+      const values = [legacyEncrypt('Ancienne note', 'test-user-id'), encryptData('Nouvelle note', 'test-user-id')]
+
+      expect(await decryptDataBatch(values, 'test-user-id')).toEqual(['Ancienne note', 'Nouvelle note'])
+    })
+
+    it('should stream legacy values to the current key version', async () => {
+      const values = [
+        legacyEncrypt('Note 1', 'test-user-id'),
+        'texte en clair',
+        encryptData('Note 2', 'test-user-id'),
+        legacyEncrypt('Note 3', 'test-user-id')
+      ]
+
+      const migrated: string[] = []
+      for await (const value of migrateEncryptedDataStream(values, 'test-user-id', 2)) {
+        migrated.push(value)
+      }
+
+      expect(migrated).toHaveLength(4)
+      expect(migrated[1]).toBe('texte en clair')
+      expect(migrated[2]).toBe(values[2])
+      expect(isCurrentKeyVersion(migrated[0])).toBe(true)
+      expect(isCurrentKeyVersion(migrated[3])).toBe(true)
+      expect(await decryptDataBatch([migrated[0], migrated[3]], 'test-user-id')).toEqual(['Note 1', 'Note 3'])
+    })
+  })
 })
@@ -0,0 +1,68 @@
+import { describe, it, expect, vi } from 'vitest'
+import { where } from 'firebase/firestore'
+import {
+  updatedAtMillis,
+  serializeData,
+  deserializeData,
+  changedSinceQueries,
+  syncCollection
+} from '../../utils/offlineStore'
+
+class FakeTimestamp {
+  constructor(public seconds: number, public nanoseconds = 0) {}
+  toMillis() { return this.seconds * 1000 + this.nanoseconds / 1e6 }
+  static fromMillis(ms: number) { return new FakeTimestamp(Math.floor(ms / 1000), (ms % 1000) * 1e6) }
+}
+
+vi.mock('firebase/firestore', () => ({
+  collection: vi.fn(() => ({})),
+  query: vi.fn((...args: any[]) => args),
+  where: vi.fn((field, op, value) => ({ field, op, value })),
+  getDocs: vi.fn(),
+  getCountFromServer: vi.fn(),
+  Timestamp: { fromMillis: (ms: number) => FakeTimestamp.fromMillis(ms) }
+}))
+
+describe('offlineStore', () => {
+  it('should read updatedAt whatever its stored type', () => {
+    const ms = Date.UTC(2026, 9, 17, 8, 30)
+    expect(updatedAtMillis(new FakeTimestamp(ms / 1000))).toBe(ms)
+    expect(updatedAtMillis(new Date(ms).toISOString())).toBe(ms)
+    expect(updatedAtMillis({ seconds: ms / 1000 })).toBe(ms)
+    expect(updatedAtMillis(undefined)).toBe(0)
+    expect(updatedAtMillis('pas une date')).toBe(0)
+  })
+
+  it('should round-trip timestamps through the stored form', () => {
+    const data = {
+      firstName: 'a1b2c3:U2FsdGVkX1',
+      createdAt: new FakeTimestamp(1_700_000_000),
+      history: [{ at: new FakeTimestamp(1_700_000_100), note: 'x' }],
+      birth: new Date('1980-05-01')
+    }
+
+    const stored = serializeData(data)
+    expect(stored.createdAt).toEqual({ __timestamp: 1_700_000_000_000 })
+    expect(stored.birth).toBeInstanceOf(Date)
+
+    const restored = deserializeData(stored)
+    expect(restored.createdAt.toMillis()).toBe(1_700_000_000_000)
+    expect(restored.history[0].at.toMillis()).toBe(1_700_000_100_000)
+    expect(restored.firstName).toBe(data.firstName)
+  })
+
+  it('should query changes for both updatedAt types with a safety margin', () => {
+    const since = Date.UTC(2026, 9, 17, 8, 30)
+    const queries = changedSinceQueries('patients', 'u1', since)
+
+    expect(queries).toHaveLength(2)
+    const from = since - 10 * 60 * 1000
+    expect(where).toHaveBeenCalledWith('updatedAt', '>', new Date(from).toISOString())
+    expect(where).toHaveBeenCalledWith('updatedAt', '>', expect.objectContaining({ seconds: from / 1000 }))
+  })
+
+  it('should let the caller read the collection when IndexedDB is unavailable', async () => {
+    expect(typeof indexedDB).toBe('undefined')
+    expect(await syncCollection('patients', 'u1')).toBeNull()
+  })
+})
@@ -0,0 +1,120 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest'
+import { getDoc, getDocs, getCountFromServer } from 'firebase/firestore'
+import { DashboardService } from '../../services/dashboardService'
+import { OsteopathStatsService } from '../../services/osteopathStatsService'
+
+vi.mock('firebase/firestore', () => ({
+  collection: vi.fn(() => ({})),
+  doc: vi.fn(() => ({})),
+  query: vi.fn(() => ({})),
+  where: vi.fn(() => ({})),
+  orderBy: vi.fn(() => ({})),
+  limit: vi.fn(() => ({})),
+  Timestamp: { fromDate: (date: Date) => date },
+  getDoc: vi.fn(),
+  getDocs: vi.fn(async () => ({ docs: [], size: 0 })),
+  getCountFromServer: vi.fn(async () => ({ data: () => ({ count: 0 }) }))
+}))
+
+vi.mock('firebase/functions', () => ({
+  httpsCallable: vi.fn(() => vi.fn(async () => ({ data: { ok: true } })))
+}))
+
+vi.mock('../../firebase/config', () => ({
+  auth: { currentUser: { uid: 'u1' } },
+  db: {},
+  functions: {}
+}))
+
+vi.mock('../../utils/substituteAuth', () => ({
+  getEffectiveOsteopathId: vi.fn(async () => 'u1')
+}))
+
+vi.mock('../../utils/auditLogger', () => ({
+  AuditLogger: { log: vi.fn() },
+  AuditEventType: { DATA_ACCESS: 'DATA_ACCESS' },
+  SensitivityLevel: { INTERNAL: 'INTERNAL' }
+}))
+
+describe('aggregate dashboard counters', () => {
+  beforeEach(() => {
+    vi.clearAllMocks()
+    vi.useFakeTimers({ toFake: ['Date'] })
+    // Mercredi
+    vi.setSystemTime(new Date(2026, 9, 14, 10, 0))
+  })
+
+  afterEach(() => {
+    vi.useRealTimers()
+  })
+
+  it('should read every counter from the stats document', async () => {
+    vi.mocked(getDoc).mockResolvedValue({
+      exists: () => true,
+      data: () => ({
+        rebuiltAt: { seconds: 1 },
+        patients: { total: 120, byMonth: { '2026-10': 4, '2026-09': 9 } },
+        consultations: {
+          total: 300,
+          byStatus: { completed: 280, draft: 20 },
+          byDay: {
+            '2026-10-12': { total: 6 },
+            '2026-10-14': { total: 8, confirmed: 3 },
+            '2026-10-19': { total: 5 }
+          }
+        },
+        appointments: { byDay: { '2026-10-14': { scheduled: 2 } } },
+        invoices: { byStatus: { unpaid: 7 }, byMonth: { '2026-10': 11 } }
+      })
+    } as any)
+
+    const stats = await DashboardService.getDashboardStats()
+
+    expect(stats.patientCount).toBe(120)
+    expect(stats.todayAppointmentsBreakdown).toMatchObject({ total: 5, confirmed: 3, pending: 2 })
+    expect(stats.pendingInvoices).toBe(7)
+    expect(stats.newPatientsThisMonth).toBe(4)
+    // 14 consultations sur 40 créneaux, le lundi suivant n'est pas compté
+    expect(stats.occupancyRate).toBe(35)
+    expect(stats.invoicesThisMonth).toBe(11)
+    expect(getCountFromServer).not.toHaveBeenCalled()
+  })
+
+  it('should fall back to count queries when the stats document is missing', async () => {
+    vi.mocked(getDoc).mockResolvedValue({ exists: () => false } as any)
+
+    const stats = await DashboardService.getDashboardStats()
+
+    expect(stats.patientCount).toBe(0)
+    expect(getCountFromServer).toHaveBeenCalled()
+    expect(getDocs).toHaveBeenCalled()
+  })
+
+  it('should not trust a stats document that was never rebuilt', async () => {
+    vi.mocked(getDoc).mockResolvedValue({
+      exists: () => true,
+      data: () => ({ consultations: { total: 1 } })
+    } as any)
+
+    expect(await OsteopathStatsService.getStats('u1')).toBeNull()
+    const stats = await DashboardService.getDashboardStats()
+    expect(getCountFromServer).toHaveBeenCalled()
+    expect(stats.patientCount).toBe(0)
+  })
+
+  it('should use Paris days whatever the browser time zone', () => {
+    // 23h30 UTC le 14 : déjà le 15 à Paris
+    expect(OsteopathStatsService.dayKey(new Date(Date.UTC(2026, 9, 14, 23, 30)))).toBe('2026-10-15')
+    expect(OsteopathStatsService.monthKey(new Date(Date.UTC(2026, 9, 31, 23, 30)))).toBe('2026-11')
+  })
+
+  it('should sum a daily counter over the monday-sunday week', () => {
+    const byDay = {
+      '2026-10-11': { total: 1 },
+      '2026-10-12': { total: 2 },
+      '2026-10-18': { total: 3 }
+    }
+
+    expect(OsteopathStatsService.sumWeek(byDay, 'total')).toBe(5)
+  })
+})
@@ -0,0 +1,128 @@
+import { describe, it, expect, vi, beforeEach } from 'vitest'
+import { getDocs, where } from 'firebase/firestore'
+import { PatientCache } from '../../utils/patientCache'
+import { getEffectiveOsteopathId } from '../../utils/substituteAuth'
+
+vi.mock('firebase/firestore', () => ({
+  collection: vi.fn(() => ({})),
+  query: vi.fn((...args: any[]) => args),
+  where: vi.fn((field, op, value) => ({ field, op, value })),
+  documentId: vi.fn(() => '__name__'),
+  getDocs: vi.fn()
+}))
+
+vi.mock('../../utils/hdsCompliance', () => ({
+  default: {
+    decryptDocumentsForDisplay: vi.fn(async (docs: any[]) => docs.map(data => ({ ...data, decrypted: true })))
+  }
+}))
+
+// Remplaçant : les patients appartiennent au titulaire lié
+vi.mock('../../utils/substituteAuth', () => ({
+  getEffectiveOsteopathId: vi.fn(async () => 'titular-id')
+}))
+
+const snapshotOf = (ids: string[]) => ({
+  size: ids.length,
+  docs: ids.map(id => ({ id, data: () => ({ firstName: `P-${id}`, osteopathId: 'titular-id' }) }))
+})
+
+// Rend les patients demandés par le filtre "in", sauf ceux de `unknown`
+const serveRequested = (unknown: string[] = []) => {
+  vi.mocked(getDocs).mockImplementation(async (q: any) => {
+    const ids: string[] = q.find((part: any) => part?.op === 'in').value
+    return snapshotOf(ids.filter(id => !unknown.includes(id))) as any
+  })
+}
+
+describe('PatientCache', () => {
+  beforeEach(() => {
+    vi.mocked(getDocs).mockReset()
+    vi.mocked(getEffectiveOsteopathId).mockClear()
+  })
+
+  it('should evict the least recently used entry', () => {
+    const cache = new PatientCache(2)
+    cache.set('a', { id: 'a' } as any)
+    cache.set('b', { id: 'b' } as any)
+    cache.get('a')
+    cache.set('c', { id: 'c' } as any)
+
+    expect(cache.get('b')).toBeNull()
+    expect(cache.get('a')).not.toBeNull()
+    expect(cache.get('c')).not.toBeNull()
+    expect(cache.getStats()).toMatchObject({ entries: 2, evictions: 1 })
+  })
+
+  it('should expire entries after the TTL', () => {
+    vi.useFakeTimers()
+    try {
+      const cache = new PatientCache(10, 1000)
+      cache.set('a', { id: 'a' } as any)
+      vi.advanceTimersByTime(1001)
+      expect(cache.get('a')).toBeNull()
+      expect(cache.getStats().entries).toBe(0)
+    } finally {
+      vi.useRealTimers()
+    }
+  })
+
+  it('should coalesce concurrent loads of the same patient', async () => {
+    serveRequested()
+    const cache = new PatientCache()
+
+    const [first, second] = await Promise.all([cache.load('p1'), cache.load('p1')])
+
+    expect(getDocs).toHaveBeenCalledTimes(1)
+    expect(first).toEqual(second)
+    expect(first).toMatchObject({ id: 'p1', firstName: 'P-p1', decrypted: true })
+    expect(cache.getStats()).toMatchObject({ coalesced: 1, inFlight: 0 })
+
+    await cache.load('p1')
+    expect(getDocs).toHaveBeenCalledTimes(1)
+  })
+
+  it('should fetch missing patients in chunks of 30 scoped to the effective osteopath', async () => {
+    serveRequested(['gone'])
+    const cache = new PatientCache()
+    cache.set('p0', { id: 'p0' } as any)
+    const ids = ['p0', ...Array.from({ length: 45 }, (_, i) => `p${i + 1}`), 'gone', 'p1']
+
+    const patients = await cache.getMany(ids)
+
+    expect(getDocs).toHaveBeenCalledTimes(2)
+    expect(where).toHaveBeenCalledWith('osteopathId', '==', 'titular-id')
+    expect(where).not.toHaveBeenCalledWith('osteopathId', '==', 'test-user-id')
+    expect(getEffectiveOsteopathId).toHaveBeenCalledTimes(1)
+    expect(patients.size).toBe(46)
+    expect(patients.has('gone')).toBe(false)
+    expect(cache.getStats()).toMatchObject({ queries: 2, fetched: 45, entries: 46 })
+  })
+
+  it('should not cache a load that raced with an invalidation', async () => {
+    let resolve: (value: any) => void = () => {}
+    vi.mocked(getDocs).mockImplementationOnce(() => new Promise(r => { resolve = r }))
+    const cache = new PatientCache()
+
+    const pending = cache.load('p1')
+    cache.invalidate('p1')
+    resolve(snapshotOf(['p1']))
+
+    expect(await pending).toMatchObject({ id: 'p1' })
+    expect(cache.getStats().entries).toBe(0)
+  })
+
+  it('should hand out copies that callers can modify', async () => {
+    serveRequested()
+    const cache = new PatientCache()
+
+    const [first, second] = await Promise.all([cache.load('p1'), cache.load('p1')])
+    first!.firstName = 'Modifié'
+    const cached = cache.get('p1')!
+    cached.firstName = 'Modifié aussi'
+
+    expect(second).not.toBe(first)
+    expect(second!.firstName).toBe('P-p1')
+    expect(cache.get('p1')!.firstName).toBe('P-p1')
+  })
+})
@@ -0,0 +1,73 @@
+import { describe, it, expect } from 'vitest'
+import { PatientSearchIndex, normalizeSearchText, searchTerms } from '../../utils/patientSearchIndex'
+
+const patients = [
+  { id: '1', firstName: 'Hélène', lastName: 'Lefèvre', email: 'helene.lefevre@example.fr', phone: '06 12 34 56 78' },
+  { id: '2', firstName: 'Jean-Luc', lastName: 'Dupont', email: 'jl.dupont@example.fr', phone: '+33 7 98 76 54 32' },
+  { id: '3', firstName: 'Chloé', lastName: 'Dupuis', email: '', phone: '' }
+]
+
+const ids = (result: Set<string> | null) => (result ? Array.from(result).sort() : null)
+
+describe('PatientSearchIndex', () => {
+  it('should fold accents, case and punctuation', () => {
+    expect(normalizeSearchText('  Hélène LEFÈVRE-Cœur ')).toBe('helene lefevre coeur')
+    expect(searchTerms('06 12.34')).toEqual(['061234'])
+    expect(searchTerms('dup dup')).toEqual(['dup'])
+  })
+
+  it('should match every term as a word prefix', () => {
+    const index = new PatientSearchIndex()
+    index.sync(patients)
+
+    expect(ids(index.search('dup'))).toEqual(['2', '3'])
+    expect(ids(index.search('dupon'))).toEqual(['2'])
+    expect(ids(index.search('HELENE lef'))).toEqual(['1'])
+    expect(ids(index.search('luc dupont'))).toEqual(['2'])
+    expect(ids(index.search('chloe dupont'))).toEqual([])
+    expect(ids(index.search('upont'))).toEqual([])
+    expect(index.search('  ')).toBeNull()
+  })
+
+  it('should find phone numbers in national and international form', () => {
+    const index = new PatientSearchIndex()
+    index.sync(patients)
+
+    expect(ids(index.search('06 12 34'))).toEqual(['1'])
+    expect(ids(index.search('0798'))).toEqual(['2'])
+    expect(ids(index.search('+33 7 98'))).toEqual(['2'])
+  })
+
+  it('should reindex only changed patients and drop removed ones', () => {
+    const index = new PatientSearchIndex()
+    index.sync(patients)
+
+    expect(index.upsert({ ...patients[0] })).toBe(false)
+    expect(index.upsert({ ...patients[0], lastName: 'Martin' })).toBe(true)
+    expect(ids(index.search('lefevre'))).toEqual(['1'])
+    expect(ids(index.search('lefe'))).toEqual(['1'])
+    expect(ids(index.search('martin'))).toEqual(['1'])
+
+    index.sync(patients.slice(1))
+    expect(index.size).toBe(2)
+    expect(ids(index.search('martin'))).toEqual([])
+  })
+
+  it('should answer quickly over a large patient list', () => {
+    const index = new PatientSearchIndex()
+    index.sync(Array.from({ length: 10000 }, (_, i) => ({
+      id: String(i),
+      firstName: `Prenom${i % 97}`,
+      lastName: `Nom${i}`,
+      email: `patient${i}@example.fr`,
+      phone: `06${String(i).padStart(8, '0')}`
+    })))
+
+    const start = performance.now()
+    const result = index.search('nom42 prenom')
+    const elapsed = performance.now() - start
+
+    expect(result!.has('42')).toBe(true)
+    expect(elapsed).toBeLessThan(16)
+  })
+})
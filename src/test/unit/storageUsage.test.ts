@@ -0,0 +1,105 @@
+import { describe, it, expect, vi, beforeEach } from 'vitest'
+import { list, getMetadata } from 'firebase/storage'
+import {
+  createLimiter,
+  scanStorageUsage,
+  getIndexedStorageUsage,
+  recordStorageChange,
+  invalidateStorageUsageForPath,
+  locateStoragePath
+} from '../../utils/storageUsage'
+
+vi.mock('firebase/storage', () => ({
+  list: vi.fn(),
+  getMetadata: vi.fn()
+}))
+
+// Arborescence : users/u1 (2 pages de fichiers) et users/u1/patients/p1
+const folder = (fullPath: string, name = fullPath.split('/').pop()!) => ({ fullPath, name })
+const file = (path: string) => ({ fullPath: path, name: path.split('/').pop() })
+const sizes: Record<string, number> = {
+  'users/u1/a.pdf': 100,
+  'users/u1/b.pdf': 200,
+  'users/u1/patients/p1/c.png': 50
+}
+
+const mockTree = () => {
+  vi.mocked(list).mockImplementation(async (ref: any, options: any) => {
+    if (ref.fullPath === 'users/u1' && !options.pageToken) {
+      return { items: [file('users/u1/a.pdf')], prefixes: [folder('users/u1/patients')], nextPageToken: 'page2' } as any
+    }
+    if (ref.fullPath === 'users/u1') {
+      return { items: [file('users/u1/b.pdf')], prefixes: [] } as any
+    }
+    if (ref.fullPath === 'users/u1/patients') {
+      return { items: [], prefixes: [folder('users/u1/patients/p1')] } as any
+    }
+    return { items: [file('users/u1/patients/p1/c.png')], prefixes: [] } as any
+  })
+  vi.mocked(getMetadata).mockImplementation(async (ref: any) => ({ size: sizes[ref.fullPath] }) as any)
+}
+
+describe('storage usage', () => {
+  beforeEach(() => {
+    localStorage.clear()
+    vi.mocked(list).mockReset()
+    vi.mocked(getMetadata).mockReset()
+  })
+
+  it('should never run more tasks than the concurrency limit', async () => {
+    const limit = createLimiter(3)
+    let active = 0
+    let peak = 0
+    const task = async () => {
+      active++
+      peak = Math.max(peak, active)
+      await new Promise(resolve => setTimeout(resolve, 1))
+      active--
+    }
+
+    await Promise.all(Array.from({ length: 20 }, () => limit(task)))
+    expect(peak).toBe(3)
+  })
+
+  it('should scan paginated folders and persist the per-folder index', async () => {
+    mockTree()
+    const onProgress = vi.fn()
+
+    const usage = await scanStorageUsage('u1', folder('users/u1', 'u1') as any, onProgress)
+
+    expect(usage).toEqual({
+      totalSize: 350,
+      fileCount: 3,
+      folderSizes: { root: 300, 'root/patients': 0, 'root/patients/p1': 50 }
+    })
+    expect(list).toHaveBeenCalledWith(expect.anything(), { maxResults: 1000, pageToken: 'page2' })
+    expect(onProgress).toHaveBeenLastCalledWith(usage)
+    expect(getIndexedStorageUsage('u1')).toEqual(usage)
+  })
+
+  it('should update the index incrementally on upload and delete', async () => {
+    mockTree()
+    await scanStorageUsage('u1', folder('users/u1', 'u1') as any)
+
+    recordStorageChange('users/u1/patients/p1/d.pdf', 25, 1)
+    recordStorageChange('users/u1/a.pdf', -100, -1)
+
+    expect(getIndexedStorageUsage('u1')).toMatchObject({
+      totalSize: 275,
+      fileCount: 3,
+      folderSizes: { root: 200, 'root/patients/p1': 75 }
+    })
+
+    invalidateStorageUsageForPath('users/u1/patients/p1/profile/profile.jpg')
+    expect(getIndexedStorageUsage('u1')).toBeNull()
+  })
+
+  it('should map storage paths to index folders', () => {
+    expect(locateStoragePath('users/u1/consultations/c1/documents/x.pdf')).toEqual({
+      userId: 'u1',
+      folderKey: 'root/consultations/c1/documents'
+    })
+    expect(locateStoragePath('users/u1/x.pdf')).toEqual({ userId: 'u1', folderKey: 'root' })
+    expect(locateStoragePath('public/logo.png')).toBeNull()
+  })
+})
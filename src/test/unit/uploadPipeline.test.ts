@@ -0,0 +1,110 @@
+import { describe, it, expect, vi, beforeEach } from 'vitest'
+import { webcrypto } from 'node:crypto'
+import { createByteBudget, createUploadPipeline, hashFileContent } from '../../utils/uploadPipeline'
+
+const fileOf = (name: string, size: number, fill = 1) =>
+  new File([new Uint8Array(size).fill(fill)], name, { type: 'image/jpeg' })
+
+const deferred = () => {
+  let resolve!: () => void
+  const promise = new Promise<void>(r => { resolve = r })
+  return { promise, resolve }
+}
+
+const tick = () => new Promise(resolve => setTimeout(resolve, 0))
+
+describe('upload pipeline', () => {
+  beforeEach(() => {
+    // Le setup remplace crypto par un mock sans Web Crypto
+    Object.assign(globalThis.crypto, { subtle: webcrypto.subtle })
+  })
+
+  it('should grant bytes in request order within the budget', async () => {
+    const budget = createByteBudget(100)
+    const granted: string[] = []
+
+    await budget.acquire(60)
+    const second = budget.acquire(50).then(() => granted.push('second'))
+    const third = budget.acquire(10).then(() => granted.push('third'))
+    await tick()
+    expect(granted).toEqual([])
+
+    budget.release(60)
+    await Promise.all([second, third])
+    expect(granted).toEqual(['second', 'third'])
+    expect(await budget.acquire(500)).toBe(100)
+  })
+
+  it('should compress the next file while the previous one uploads', async () => {
+    const run = createUploadPipeline({ compressionConcurrency: 1, uploadConcurrency: 1, maxInFlightBytes: 1000 })
+    const events: string[] = []
+    const firstUpload = deferred()
+
+    const job = (name: string, release?: Promise<void>) => run({
+      file: fileOf(name, 10, name.length),
+      prepare: async (file: File) => {
+        events.push(`compress ${name}`)
+        return file
+      },
+      upload: async (prepared: File) => {
+        events.push(`upload ${name}`)
+        await release
+        return prepared.name
+      }
+    })
+
+    const first = job('a', firstUpload.promise)
+    const second = job('bb')
+    await vi.waitFor(() => expect(events).toContain('compress bb'))
+    expect(events).toEqual(['compress a', 'upload a', 'compress bb'])
+
+    firstUpload.resolve()
+    expect(await first).toEqual({ result: 'a', skipped: false })
+    expect(await second).toEqual({ result: 'bb', skipped: false })
+    expect(events[events.length - 1]).toBe('upload bb')
+  })
+
+  it('should cap the bytes held by files in flight', async () => {
+    const run = createUploadPipeline({ compressionConcurrency: 4, uploadConcurrency: 4, maxInFlightBytes: 25 })
+    const uploads = [deferred(), deferred(), deferred()]
+    let started = 0
+
+    const jobs = uploads.map(({ promise }, i) => run({
+      file: fileOf(`f${i}`, 10),
+      prepare: async (file: File) => file,
+      upload: async () => {
+        started++
+        await promise
+        return i
+      }
+    }))
+
+    await vi.waitFor(() => expect(started).toBe(2))
+    await tick()
+    expect(started).toBe(2)
+
+    uploads.forEach(upload => upload.resolve())
+    await Promise.all(jobs)
+    expect(started).toBe(3)
+  })
+
+  it('should skip compression and upload when the content was already uploaded', async () => {
+    const run = createUploadPipeline()
+    const file = fileOf('scan.jpg', 32, 7)
+    const knownHash = await hashFileContent(file)
+    const prepare = vi.fn(async (f: File) => f)
+    const upload = vi.fn(async () => 'new')
+
+    const outcome = await run({
+      file,
+      prepare,
+      upload,
+      findUploaded: async (contentHash: string) => (contentHash === knownHash ? 'existing' : null)
+    })
+
+    expect(knownHash).toMatch(/^[0-9a-f]{64}$/)
+    expect(outcome).toEqual({ result: 'existing', skipped: true })
+    expect(prepare).not.toHaveBeenCalled()
+    expect(upload).not.toHaveBeenCalled()
+  })
+})
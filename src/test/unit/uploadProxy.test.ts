@@ -0,0 +1,76 @@
+import { describe, it, expect, vi, beforeEach } from 'vitest'
+import { uploadThroughProxy } from '../../utils/uploadProxy'
+
+vi.mock('../../firebase/config', () => ({
+  app: { options: { projectId: 'demo-project' } },
+  auth: { currentUser: { uid: 'test-user-id', getIdToken: async () => 'id-token' } }
+}))
+
+const proxyUrl = 'https://europe-west1-demo-project.cloudfunctions.net/uploadDocumentProxy'
+const jsonResponse = (data: any) => ({ ok: true, json: async () => data, text: async () => JSON.stringify(data) })
+
+const fetchMock = vi.fn()
+vi.stubGlobal('fetch', fetchMock)
+
+const options = {
+  path: 'users/test-user-id/documents/scan.pdf',
+  contentType: 'application/pdf',
+  customMetadata: { originalName: 'scan.pdf' }
+}
+
+describe('uploadThroughProxy', () => {
+  beforeEach(() => {
+    fetchMock.mockReset()
+  })
+
+  it('should send the file as binary slices and report progress after each chunk', async () => {
+    const file = new Blob([new Uint8Array(10)])
+    fetchMock
+      .mockResolvedValueOnce(jsonResponse({ sessionId: 's1', chunkSize: 4 }))
+      .mockResolvedValueOnce(jsonResponse({ complete: false, nextOffset: 4 }))
+      .mockResolvedValueOnce(jsonResponse({ complete: false, nextOffset: 8 }))
+      .mockResolvedValueOnce(jsonResponse({
+        complete: true, path: options.path, downloadUrl: 'https://files.example/scan.pdf', size: 10, contentType: 'application/pdf'
+      }))
+    const onChunk = vi.fn()
+
+    const result = await uploadThroughProxy(file, { ...options, onChunk })
+
+    expect(result).toEqual({ path: options.path, downloadUrl: 'https://files.example/scan.pdf', size: 10, contentType: 'application/pdf' })
+    const [startUrl, startInit] = fetchMock.mock.calls[0]
+    expect(startUrl).toBe(proxyUrl)
+    expect(JSON.parse(startInit.body)).toMatchObject({ path: options.path, size: 10 })
+    expect(JSON.parse(startInit.body)).not.toHaveProperty('base64')
+
+    const chunkCalls = fetchMock.mock.calls.slice(1)
+    expect(chunkCalls.map(([url]) => url)).toEqual([
+      `${proxyUrl}?session=s1&offset=0`,
+      `${proxyUrl}?session=s1&offset=4`,
+      `${proxyUrl}?session=s1&offset=8`
+    ])
+    expect(chunkCalls.map(([, init]) => (init.body as Blob).size)).toEqual([4, 4, 2])
+    expect(chunkCalls[0][1].headers['Content-Type']).toBe('application/octet-stream')
+    expect(onChunk.mock.calls).toEqual([[4, 10], [8, 10], [10, 10]])
+  })
+
+  it('should resume from the offset acknowledged by the server', async () => {
+    const file = new Blob([new Uint8Array(8)])
+    fetchMock
+      .mockResolvedValueOnce(jsonResponse({ sessionId: 's2', chunkSize: 4 }))
+      .mockResolvedValueOnce(jsonResponse({ complete: false, nextOffset: 2 }))
+      .mockResolvedValueOnce(jsonResponse({ complete: false, nextOffset: 6 }))
+      .mockResolvedValueOnce(jsonResponse({ complete: true, path: options.path, downloadUrl: '', size: 8, contentType: 'application/pdf' }))
+
+    await uploadThroughProxy(file, options)
+
+    expect(fetchMock.mock.calls.slice(1).map(([url]) => url.split('offset=')[1])).toEqual(['0', '2', '6'])
+  })
+
+  it('should fail when the proxy rejects a chunk', async () => {
+    fetchMock
+      .mockResolvedValueOnce(jsonResponse({ sessionId: 's3', chunkSize: 4 }))
+      .mockResolvedValueOnce({ ok: false, status: 502, text: async () => 'Storage rejected chunk' })
+
+    await expect(uploadThroughProxy(new Blob([new Uint8Array(8)]), options)).rejects.toThrow('Proxy upload failed: 502')
+  })
+})
@@ -0,0 +1,19 @@
+import { describe, it, expect } from 'vitest'
+import { getVisibleRange } from '../../components/ui/VirtualList'
+
+describe('getVisibleRange', () => {
+  it('should mount only the visible rows plus overscan', () => {
+    // 448 px de hauteur, lignes de 64 px : 7 lignes visibles
+    expect(getVisibleRange(0, 448, 64, 1000, 5)).toEqual({ start: 0, end: 12 })
+    expect(getVisibleRange(640, 448, 64, 1000, 5)).toEqual({ start: 5, end: 22 })
+  })
+
+  it('should clamp the range to the item count', () => {
+    expect(getVisibleRange(6000, 448, 64, 100, 5)).toEqual({ start: 88, end: 100 })
+    expect(getVisibleRange(0, 448, 64, 3, 5)).toEqual({ start: 0, end: 3 })
+  })
+
+  it('should return an empty range for an empty list', () => {
+    expect(getVisibleRange(0, 448, 64, 0, 5)).toEqual({ start: 0, end: 0 })
+  })
+})
@@ -1,4 +1,4 @@
-import { collection, addDoc, Timestamp } from 'firebase/firestore';
+import { doc, writeBatch, Timestamp } from 'firebase/firestore';
 import { db, auth } from '../firebase/config';
 
 // Types d'événements d'audit
@@ -38,17 +38,76 @@ export interface AuditEvent {
   sessionId?: string;
 }
 
+// Un lot est écrit dès qu'il atteint cette taille, sinon après le délai
+const FLUSH_BATCH_SIZE = 100;
+const FLUSH_INTERVAL_MS = 5000;
+// Au-delà, les plus anciens événements ne restent que dans IndexedDB
+const MAX_QUEUE_SIZE = 1000;
+// Limite d'écritures d'un writeBatch Firestore
+const MAX_BATCH_WRITES = 500;
+const AUDIT_DB_NAME = 'osteoapp-audit';
+const AUDIT_DB_VERSION = 2;
+const AUDIT_STORE = 'events';
+const AUDIT_USER_INDEX = 'userId';
+// Au-delà, les événements sont écrits sans adresse IP
+const IP_LOOKUP_TIMEOUT_MS = 2000;
+// Ancienne file de secours (localStorage), reprise une fois
+const LEGACY_STORAGE_KEY = 'hds_audit_logs';
+
+// Événement en attente d'écriture ; l'ID du document est attribué à la
+// journalisation, ce qui rend la reprise après interruption idempotente
+interface QueuedAuditEvent extends Omit<AuditEvent, 'timestamp' | 'ipAddress'> {
+  id: string;
+  timestamp: number;
+  syncedFromLocal?: boolean;
+}
+
+function promisify<T>(request: IDBRequest<T>): Promise<T> {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+function transactionDone(tx: IDBTransaction): Promise<void> {
+  return new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve();
+    tx.onerror = () => reject(tx.error);
+    tx.onabort = () => reject(tx.error);
+  });
+}
+
+function isPermissionError(error: unknown): boolean {
+  const message = (error as any)?.message || String(error);
+  return (error as any)?.code === 'permission-denied' || /Missing or insufficient permissions/i.test(message);
+}
+
 /**
  * Service de journalisation d'audit conforme HDS
+ *
+ * Les événements sont mis en file et écrits par lots (writeBatch) : la
+ * journalisation ne fait aucun accès réseau. Chaque événement est aussi
+ * conservé dans IndexedDB jusqu'à son écriture, puis renvoyé à la session
+ * suivante du même compte si l'onglet est fermé avant.
  */
 export class AuditLogger {
   // Utilise la collection autorisée par les règles Firestore
   // Règles: allow create if isAuthenticated(); admin-only read/update/delete
   private static readonly COLLECTION_NAME = 'activity_logs';
   private static sessionId: string = crypto.randomUUID();
+  private static queue: QueuedAuditEvent[] = [];
+  // IDs en file ou en cours d'écriture, à ne pas renvoyer depuis IndexedDB
+  private static pendingIds: Set<string> = new Set();
+  private static flushTimer: ReturnType<typeof setTimeout> | null = null;
+  private static flushing: Promise<number> | null = null;
+  private static spilled = false;
+  private static triggersInstalled = false;
+  private static clientIP: Promise<string> | null = null;
+  private static dbPromise: Promise<IDBDatabase | null> | null = null;
   
   /**
-   * Journalise un événement d'audit
+   * Journalise un événement d'audit. L'événement est mis en file et l'appel
+   * rend la main immédiatement avec l'ID du futur document.
    */
   static async log(
     eventType: AuditEventType,
@@ -58,34 +117,181 @@ export class AuditLogger {
     status: 'success' | 'failure',
     details?: any
   ): Promise<string | null> {
-    try {
-      if (!auth.currentUser) {
-        console.warn('⚠️ Audit logging attempted without authenticated user');
-        return null;
+    if (!auth.currentUser) {
+      console.warn('⚠️ Audit logging attempted without authenticated user');
+      return null;
+    }
+
+    const auditEvent: QueuedAuditEvent = {
+      id: crypto.randomUUID(),
+      timestamp: Date.now(),
+      userId: auth.currentUser.uid,
+      eventType,
+      resource,
+      action,
+      sensitivityLevel,
+      status,
+      details: details || {},
+      userAgent: navigator.userAgent,
+      sessionId: this.sessionId
+    };
+    if (auth.currentUser.email) {
+      auditEvent.userEmail = auth.currentUser.email;
+    }
+
+    this.enqueue([auditEvent]);
+    return auditEvent.id;
+  }
+
+  /**
+   * Écrit immédiatement les événements en file (changement d'onglet,
+   * déconnexion). Retourne le nombre d'événements écrits ; avec `timeoutMs`,
+   * rend 0 passé ce délai sans interrompre l'écriture (les événements restent
+   * dans IndexedDB jusqu'à leur écriture).
+   */
+  static flush(timeoutMs?: number): Promise<number> {
+    if (timeoutMs !== undefined) {
+      return Promise.race([
+        this.flush(),
+        new Promise<number>(resolve => setTimeout(() => resolve(0), timeoutMs))
+      ]);
+    }
+    if (this.flushing) return this.flushing;
+    if (this.flushTimer) {
+      clearTimeout(this.flushTimer);
+      this.flushTimer = null;
+    }
+    this.flushing = this.flushQueue().finally(() => {
+      this.flushing = null;
+      if (this.queue.length > 0) this.scheduleFlush();
+    });
+    return this.flushing;
+  }
+
+  /**
+   * Nombre d'événements en attente d'écriture
+   */
+  static getQueueSize(): number {
+    return this.queue.length;
+  }
+
+  private static enqueue(events: QueuedAuditEvent[]): void {
+    this.installFlushTriggers();
+    events.forEach(event => {
+      this.queue.push(event);
+      this.pendingIds.add(event.id);
+    });
+    this.storeEvents(events);
+
+    if (this.queue.length > MAX_QUEUE_SIZE) {
+      const dropped = this.queue.splice(0, this.queue.length - MAX_QUEUE_SIZE);
+      dropped.forEach(event => this.pendingIds.delete(event.id));
+      this.spilled = true;
+    }
+
+    if (this.queue.length >= FLUSH_BATCH_SIZE) {
+      void this.flush();
+    } else {
+      this.scheduleFlush();
+    }
+  }
+
+  private static scheduleFlush(): void {
+    if (this.flushTimer || this.flushing) return;
+    this.flushTimer = setTimeout(() => {
+      this.flushTimer = null;
+      void this.flush();
+    }, FLUSH_INTERVAL_MS);
+  }
+
+  private static installFlushTriggers(): void {
+    if (this.triggersInstalled || typeof document === 'undefined') return;
+    this.triggersInstalled = true;
+    document.addEventListener('visibilitychange', () => {
+      if (document.visibilityState === 'hidden') void this.flush();
+    });
+    window.addEventListener('pagehide', () => void this.flush());
+  }
+
+  private static async flushQueue(): Promise<number> {
+    // Événements d'un autre compte (déconnexion sans écriture) : ils restent
+    // dans IndexedDB et seront écrits à sa prochaine session
+    const userId = auth.currentUser?.uid;
+    const foreign = this.queue.filter(event => event.userId !== userId);
+    if (foreign.length > 0) {
+      this.queue = this.queue.filter(event => event.userId === userId);
+      foreign.forEach(event => this.pendingIds.delete(event.id));
+    }
+
+    let written = 0;
+    while (this.queue.length > 0) {
+      const events = this.queue.splice(0, MAX_BATCH_WRITES);
+      try {
+        await this.writeEvents(events);
+        written += events.length;
+        events.forEach(event => this.pendingIds.delete(event.id));
+        await this.removeStoredEvents(events.map(event => event.id));
+      } catch (error) {
+        if (isPermissionError(error)) {
+          written += await this.writeIndividually(events);
+        } else {
+          console.error('❌ Failed to write audit logs:', error);
+          this.queue.unshift(...events);
+          break;
+        }
       }
-      
-      // Création de l'événement d'audit
-      const auditEvent: Omit<AuditEvent, 'timestamp'> = {
-        userId: auth.currentUser.uid,
-        userEmail: auth.currentUser.email || undefined,
-        eventType,
-        resource,
-        action,
-        sensitivityLevel,
-        status,
-        details: details || {},
-        ipAddress: await this.getClientIP(),
-        userAgent: navigator.userAgent,
-        sessionId: this.sessionId
-      };
-      
-      // Ajout de l'horodatage cryptographique
-      const timestamp = Timestamp.now();
-      
-      // Stockage dans Firestore
-      const docRef = await addDoc(collection(db, this.COLLECTION_NAME), {
-        ...auditEvent,
-        timestamp,
+    }
+
+    if (written > 0) {
+      console.log(`✅ ${written} audit log(s) written`);
+    }
+    // Les événements sortis de la file pleine sont repris depuis IndexedDB
+    if (this.spilled && this.queue.length === 0) {
+      this.spilled = false;
+      void this.syncLocalLogs();
+    }
+    return written;
+  }
+
+  /**
+   * Un refus fait échouer tout le lot : les événements sont réécrits un par
+   * un pour isoler ceux qui sont refusés. Un événement repris d'une session
+   * précédente peut déjà avoir été écrit (la réécriture est alors une mise à
+   * jour, interdite) : refusé, il est abandonné. Les autres restent dans
+   * IndexedDB pour la prochaine session.
+   */
+  private static async writeIndividually(events: QueuedAuditEvent[]): Promise<number> {
+    const results = await Promise.allSettled(events.map(event => this.writeEvents([event])));
+    const done: string[] = [];
+    let written = 0;
+    let refused = 0;
+    results.forEach((result, index) => {
+      const event = events[index];
+      this.pendingIds.delete(event.id);
+      if (result.status === 'fulfilled') {
+        written++;
+        done.push(event.id);
+      } else {
+        refused++;
+        if (event.syncedFromLocal) done.push(event.id);
+      }
+    });
+    if (refused > 0) {
+      console.warn('⚠️ Audit log non persisté (permissions insuffisantes, contexte dev ou non-admin).');
+    }
+    await this.removeStoredEvents(done);
+    return written;
+  }
+
+  private static async writeEvents(events: QueuedAuditEvent[]): Promise<void> {
+    const ipAddress = await this.getClientIP();
+    const batch = writeBatch(db);
+    events.forEach(({ id, timestamp, ...event }) => {
+      batch.set(doc(db, this.COLLECTION_NAME, id), {
+        ...event,
+        ipAddress,
+        // Horodatage de l'événement, pas de l'écriture du lot
+        timestamp: Timestamp.fromMillis(timestamp),
         // Ajout de métadonnées pour conformité HDS
         hdsCompliance: {
           version: '2022-01',
@@ -94,86 +300,95 @@ export class AuditLogger {
           immutable: true
         }
       });
-      
-      console.log(`✅ Audit log created: ${docRef.id}`);
-      return docRef.id;
-      
-    } catch (error) {
-      const message = (error as any)?.message || String(error);
-      if (/Missing or insufficient permissions/i.test(message)) {
-        console.warn('⚠️ Audit log non persisté (permissions insuffisantes, contexte dev ou non-admin).');
-      } else {
-        console.error('❌ Failed to create audit log:', error);
-      }
-      
-      // En cas d'erreur, tentative de journalisation locale
-      this.logLocally({
-        timestamp: new Date(),
-        userId: auth.currentUser?.uid || 'unknown',
-        userEmail: auth.currentUser?.email || undefined,
-        eventType,
-        resource,
-        action,
-        sensitivityLevel,
-        status,
-        details: details || {},
-        ipAddress: 'unknown',
-        userAgent: navigator.userAgent,
-        sessionId: this.sessionId
-      });
-      
-      return null;
-    }
+    });
+    await batch.commit();
   }
-  
-  /**
-   * Journalisation de secours locale
-   */
-  private static logLocally(event: AuditEvent): void {
-    try {
-      const localLogs = JSON.parse(localStorage.getItem('hds_audit_logs') || '[]');
-      localLogs.push(event);
-      
-      // Limiter à 100 entrées maximum
-      if (localLogs.length > 100) {
-        localLogs.shift();
-      }
-      
-      localStorage.setItem('hds_audit_logs', JSON.stringify(localLogs));
-    } catch (error) {
-      console.error('❌ Failed to create local audit log:', error);
+
+  private static openDatabase(): Promise<IDBDatabase | null> {
+    if (this.dbPromise) return this.dbPromise;
+    if (typeof indexedDB === 'undefined') {
+      return Promise.resolve(null);
     }
+    this.dbPromise = new Promise<IDBDatabase | null>(resolve => {
+      const request = indexedDB.open(AUDIT_DB_NAME, AUDIT_DB_VERSION);
+      request.onupgradeneeded = () => {
+        const store = request.result.objectStoreNames.contains(AUDIT_STORE)
+          ? request.transaction!.objectStore(AUDIT_STORE)
+          : request.result.createObjectStore(AUDIT_STORE, { keyPath: 'id' });
+        if (!store.indexNames.contains(AUDIT_USER_INDEX)) {
+          store.createIndex(AUDIT_USER_INDEX, 'userId');
+        }
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => {
+        console.warn('⚠️ Audit log store unavailable:', request.error);
+        resolve(null);
+      };
+    });
+    return this.dbPromise;
   }
-  
+
+  private static storeEvents(events: QueuedAuditEvent[]): void {
+    this.openDatabase()
+      .then(database => {
+        if (!database) return;
+        const tx = database.transaction(AUDIT_STORE, 'readwrite');
+        events.forEach(event => tx.objectStore(AUDIT_STORE).put(event));
+        return transactionDone(tx);
+      })
+      .catch(error => console.error('❌ Failed to create local audit log:', error));
+  }
+
+  private static removeStoredEvents(ids: string[]): Promise<void> {
+    return this.openDatabase()
+      .then(database => {
+        if (!database || ids.length === 0) return;
+        const tx = database.transaction(AUDIT_STORE, 'readwrite');
+        ids.forEach(id => tx.objectStore(AUDIT_STORE).delete(id));
+        return transactionDone(tx);
+      })
+      .catch(error => console.warn('⚠️ Could not remove written audit logs:', error));
+  }
+
   /**
-   * Synchronise les logs locaux avec Firestore
+   * Reprend les événements de l'utilisateur connecté conservés localement et
+   * non encore écrits (session précédente, file saturée, ancienne file
+   * localStorage) et les remet dans la file d'écriture. Ceux des autres
+   * comptes attendent leur prochaine session.
    */
   static async syncLocalLogs(): Promise<number> {
+    const userId = auth.currentUser?.uid;
+    if (!userId) return 0;
+
     try {
-      const localLogs = JSON.parse(localStorage.getItem('hds_audit_logs') || '[]');
-      if (localLogs.length === 0) return 0;
-      
-      let syncCount = 0;
-      
-      for (const log of localLogs) {
-        try {
-          await addDoc(collection(db, this.COLLECTION_NAME), {
-            ...log,
-            timestamp: Timestamp.fromDate(new Date(log.timestamp)),
-            syncedFromLocal: true
-          });
-          syncCount++;
-        } catch (error) {
-          console.error('❌ Failed to sync local log:', error);
-        }
-      }
-      
-      if (syncCount > 0) {
-        localStorage.setItem('hds_audit_logs', JSON.stringify([]));
-        console.log(`✅ Synced ${syncCount} local audit logs`);
+      const events: QueuedAuditEvent[] = [];
+
+      const legacyLogs = JSON.parse(localStorage.getItem(LEGACY_STORAGE_KEY) || '[]');
+      legacyLogs.forEach((log: any) => {
+        const { timestamp, ipAddress: _ipAddress, ...event } = log;
+        events.push({
+          ...event,
+          id: crypto.randomUUID(),
+          timestamp: new Date(timestamp).getTime() || Date.now(),
+          syncedFromLocal: true
+        });
+      });
+      localStorage.removeItem(LEGACY_STORAGE_KEY);
+
+      const database = await this.openDatabase();
+      if (database) {
+        const stored = await promisify<QueuedAuditEvent[]>(
+          database.transaction(AUDIT_STORE, 'readonly').objectStore(AUDIT_STORE).index(AUDIT_USER_INDEX).getAll(userId)
+        );
+        stored
+          .filter(event => !this.pendingIds.has(event.id))
+          .forEach(event => events.push({ ...event, syncedFromLocal: true }));
       }
-      
-      return syncCount;
+
+      if (events.length === 0) return 0;
+      this.enqueue(events);
+      console.log(`✅ ${events.length} local audit log(s) queued for sync`);
+      return events.length;
     } catch (error) {
       console.error('❌ Failed to sync local audit logs:', error);
       return 0;
@@ -181,16 +396,24 @@ export class AuditLogger {
   }
   
   /**
-   * Obtient l'adresse IP du client
+   * Obtient l'adresse IP du client, une fois par session. La requête est
+   * abandonnée après IP_LOOKUP_TIMEOUT_MS pour ne pas bloquer l'écriture (ni
+   * la déconnexion) ; elle est retentée au lot suivant.
    */
-  private static async getClientIP(): Promise<string> {
-    try {
-      const response = await fetch('https://api.ipify.org?format=json');
-      const data = await response.json();
-      return data.ip;
-    } catch {
-      return 'unknown';
+  private static getClientIP(): Promise<string> {
+    if (!this.clientIP) {
+      const controller = new AbortController();
+      const timer = setTimeout(() => controller.abort(), IP_LOOKUP_TIMEOUT_MS);
+      this.clientIP = fetch('https://api.ipify.org?format=json', { signal: controller.signal })
+        .then(response => response.json())
+        .then(data => data.ip || 'unknown')
+        .catch(() => {
+          this.clientIP = null;
+          return 'unknown';
+        })
+        .finally(() => clearTimeout(timer));
     }
+    return this.clientIP;
   }
   
   /**
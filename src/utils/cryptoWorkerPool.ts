@@ -0,0 +1,163 @@
+import { encryptDataBatch, decryptBatchWithKey, decryptWithCache, getUserKey } from './encryption';
+import {
+  CryptoOperation,
+  CryptoWorkerRequest,
+  CryptoWorkerResponse,
+  encodeValues,
+  decodeValues
+} from '../workers/cryptoMessages';
+
+// En dessous, l'aller-retour vers un worker coûte plus que le chiffrement lui-même
+const MIN_VALUES_PER_WORKER = 8;
+const MAX_WORKERS = 8;
+
+interface PendingRequest {
+  resolve: (values: any[]) => void;
+  reject: (error: Error) => void;
+}
+
+interface PooledWorker {
+  worker: Worker;
+  pending: Map<number, PendingRequest>;
+}
+
+let pool: PooledWorker[] | null = null;
+let poolDisabled = false;
+let nextRequestId = 0;
+let nextWorker = 0;
+
+function getPoolSize(): number {
+  const cores = typeof navigator !== 'undefined' && navigator.hardwareConcurrency
+    ? navigator.hardwareConcurrency
+    : 2;
+  return Math.max(1, Math.min(cores, MAX_WORKERS));
+}
+
+function spawnWorker(): PooledWorker {
+  const worker = new Worker(new URL('../workers/crypto.worker.ts', import.meta.url), { type: 'module' });
+  const entry: PooledWorker = { worker, pending: new Map() };
+
+  worker.onmessage = (event: MessageEvent<CryptoWorkerResponse>) => {
+    const { id, payload, error } = event.data;
+    const request = entry.pending.get(id);
+    if (!request) return;
+    entry.pending.delete(id);
+    if (error || !payload) {
+      request.reject(new Error(error || 'Réponse vide du worker de chiffrement'));
+    } else {
+      request.resolve(decodeValues(payload));
+    }
+  };
+
+  worker.onerror = (event: ErrorEvent) => {
+    // Script introuvable, CSP... : le pool est abandonné au profit du thread principal
+    event.preventDefault();
+    console.warn('⚠️ Crypto worker failed, falling back to main thread:', event.message);
+    const error = new Error(event.message || 'Worker de chiffrement indisponible');
+    entry.pending.forEach(request => request.reject(error));
+    entry.pending.clear();
+    terminateCryptoWorkers();
+    poolDisabled = true;
+  };
+
+  return entry;
+}
+
+function getPool(): PooledWorker[] | null {
+  if (pool) return pool;
+  if (poolDisabled || typeof Worker === 'undefined') return null;
+  try {
+    pool = Array.from({ length: getPoolSize() }, spawnWorker);
+  } catch (error) {
+    console.warn('⚠️ Crypto workers unavailable, falling back to main thread:', error);
+    poolDisabled = true;
+    return null;
+  }
+  return pool;
+}
+
+function postToWorker(
+  entry: PooledWorker,
+  op: CryptoOperation,
+  userId: string,
+  userKey: string,
+  values: any[]
+): Promise<any[]> {
+  const id = nextRequestId++;
+  const payload = encodeValues(values);
+  return new Promise((resolve, reject) => {
+    entry.pending.set(id, { resolve, reject });
+    const request: CryptoWorkerRequest = { id, op, userId, userKey, payload };
+    entry.worker.postMessage(request, [payload]);
+  });
+}
+
+/**
+ * Répartit les valeurs en tranches contiguës sur les workers du pool et
+ * réassemble les résultats dans l'ordre d'entrée. Une tranche dont le worker
+ * échoue est traitée sur le thread principal.
+ */
+async function runOnPool(
+  op: CryptoOperation,
+  values: any[],
+  userId: string,
+  onMainThread: (values: any[]) => Promise<any[]>
+): Promise<any[] | null> {
+  const workers = values.length >= MIN_VALUES_PER_WORKER ? getPool() : null;
+  if (!workers) return null;
+
+  const userKey = getUserKey(userId);
+  const chunkCount = Math.min(workers.length, Math.ceil(values.length / MIN_VALUES_PER_WORKER));
+  const chunkSize = Math.ceil(values.length / chunkCount);
+  const chunks = await Promise.all(
+    Array.from({ length: chunkCount }, (_, i) => {
+      const chunk = values.slice(i * chunkSize, (i + 1) * chunkSize);
+      const entry = workers[nextWorker++ % workers.length];
+      return postToWorker(entry, op, userId, userKey, chunk).catch(error => {
+        console.warn(`⚠️ Crypto worker ${op} failed, processing chunk on main thread:`, error);
+        return onMainThread(chunk);
+      });
+    })
+  );
+  return chunks.flat();
+}
+
+/**
+ * Chiffre un lot de valeurs hors du thread principal (pool de Web Workers
+ * dimensionné sur navigator.hardwareConcurrency). Résultats au format de
+ * encryptData, alignés sur les valeurs d'entrée. Sans Worker (tests, SSR)
+ * ou pour un petit lot, le lot est traité sur le thread principal
+ * (encryptDataBatch, synchrone sans Web Crypto).
+ */
+export async function encryptMany(values: any[], userId: string): Promise<string[]> {
+  const onMainThread = (chunk: any[]) => encryptDataBatch(chunk, userId);
+  const results = await runOnPool('encrypt', values, userId, onMainThread);
+  return results ?? onMainThread(values);
+}
+
+/**
+ * Déchiffre un lot de valeurs hors du thread principal. Les valeurs déjà
+ * présentes dans decryptionCache ne quittent pas le thread principal ; chaque
+ * worker applique decryptDataBatch au reste de sa tranche, même repli que
+ * encryptMany.
+ */
+export async function decryptMany(values: string[], userId: string): Promise<any[]> {
+  const onMainThread = (chunk: string[]) => decryptBatchWithKey(chunk, userId, () => getUserKey(userId));
+  return decryptWithCache(values, userId, async misses => {
+    const results = await runOnPool('decrypt', misses, userId, onMainThread);
+    return results ?? onMainThread(misses);
+  });
+}
+
+/**
+ * Arrête les workers du pool (ils seront recréés au prochain lot)
+ */
+export function terminateCryptoWorkers(): void {
+  pool?.forEach(({ worker, pending }) => {
+    worker.terminate();
+    pending.forEach(request => request.reject(new Error('Worker de chiffrement arrêté')));
+  });
+  pool = null;
+  poolDisabled = false;
+  nextWorker = 0;
+}
@@ -0,0 +1,111 @@
+// Budget mémoire du cache (estimation UTF-16 des chaînes conservées)
+const DEFAULT_MAX_BYTES = 4 * 1024 * 1024;
+
+interface CacheEntry {
+  ciphertext: string;
+  // Les objets (address...) sont conservés en JSON pour que chaque lecture
+  // rende une copie que l'appelant peut modifier
+  value: string;
+  isJson: boolean;
+  bytes: number;
+}
+
+export interface DecryptionCacheStats {
+  hits: number;
+  misses: number;
+  entries: number;
+  bytes: number;
+  maxBytes: number;
+}
+
+/**
+ * Hachage 53 bits (cyrb53) d'un texte chiffré, pour des clés de cache courtes
+ */
+function hashCiphertext(value: string): number {
+  let h1 = 0xdeadbeef;
+  let h2 = 0x41c6ce57;
+  for (let i = 0; i < value.length; i++) {
+    const ch = value.charCodeAt(i);
+    h1 = Math.imul(h1 ^ ch, 2654435761);
+    h2 = Math.imul(h2 ^ ch, 1597334677);
+  }
+  h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+  h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+  return 4294967296 * (2097151 & h2) + (h1 >>> 0);
+}
+
+/**
+ * Cache LRU des valeurs déchiffrées, indexé par utilisateur et hachage du
+ * texte chiffré. Un texte chiffré ne change pas tant que le champ n'est pas
+ * modifié : revoir une fiche ou un historique ne coûte alors aucune
+ * opération de déchiffrement. L'éviction se fait au-delà d'un budget en
+ * octets, en commençant par les entrées les moins récemment lues.
+ */
+export class DecryptionCache {
+  private cache: Map<string, CacheEntry> = new Map();
+  private bytes = 0;
+  private hits = 0;
+  private misses = 0;
+
+  constructor(private maxBytes: number = DEFAULT_MAX_BYTES) {}
+
+  get(userId: string, ciphertext: string): any | undefined {
+    const key = `${userId}:${hashCiphertext(ciphertext)}`;
+    const entry = this.cache.get(key);
+    // Le texte chiffré complet est comparé : une collision de hachage est un échec
+    if (!entry || entry.ciphertext !== ciphertext) {
+      this.misses++;
+      return undefined;
+    }
+    this.hits++;
+    // Réinsertion : l'entrée devient la plus récente
+    this.cache.delete(key);
+    this.cache.set(key, entry);
+    return entry.isJson ? JSON.parse(entry.value) : entry.value;
+  }
+
+  set(userId: string, ciphertext: string, value: any): void {
+    if (value === undefined) return;
+    const isJson = typeof value !== 'string';
+    const stored = isJson ? JSON.stringify(value) : value;
+    const bytes = (userId.length + ciphertext.length + stored.length) * 2;
+    if (bytes > this.maxBytes) return;
+
+    const key = `${userId}:${hashCiphertext(ciphertext)}`;
+    this.remove(key);
+    this.cache.set(key, { ciphertext, value: stored, isJson, bytes });
+    this.bytes += bytes;
+
+    for (const oldest of this.cache.keys()) {
+      if (this.bytes <= this.maxBytes) break;
+      this.remove(oldest);
+    }
+  }
+
+  clear(): void {
+    this.cache.clear();
+    this.bytes = 0;
+    this.hits = 0;
+    this.misses = 0;
+  }
+
+  getStats(): DecryptionCacheStats {
+    return {
+      hits: this.hits,
+      misses: this.misses,
+      entries: this.cache.size,
+      bytes: this.bytes,
+      maxBytes: this.maxBytes
+    };
+  }
+
+  private remove(key: string): void {
+    const entry = this.cache.get(key);
+    if (entry) {
+      this.bytes -= entry.bytes;
+      this.cache.delete(key);
+    }
+  }
+}
+
+export const decryptionCache = new DecryptionCache();
@@ -1,4 +1,4 @@
-import { isEncrypted, decryptData } from './encryption'
+import { isEncrypted, decryptData, CIPHERTEXT_PREFIX_PATTERN } from './encryption'
 
 /**
  * Diagnostic des problèmes de déchiffrement
@@ -37,8 +37,7 @@ export class DecryptionDiagnostic {
     }
 
     // Vérifier si c'est un UUID chiffré
-    const uuidPattern = /^[0-9a-f]{32}:/i;
-    result.isUUIDEncrypted = uuidPattern.test(fieldValue);
+    result.isUUIDEncrypted = CIPHERTEXT_PREFIX_PATTERN.test(fieldValue);
 
     if (result.isUUIDEncrypted) {
       console.log(`🔍 Diagnostic UUID chiffré pour ${fieldName}:`, fieldValue.substring(0, 50) + '...');
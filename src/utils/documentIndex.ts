@@ -0,0 +1,152 @@
+import { collection, doc, getDocs, query, where, writeBatch, deleteDoc, setDoc } from 'firebase/firestore';
+import { db, auth } from '../firebase/config';
+import type { DocumentMetadata } from './documentStorage';
+
+// Index Firestore des fichiers Storage : une entrée par fichier et un
+// marqueur par dossier indiquant que l'index du dossier est complet
+const COLLECTION_NAME = 'storageDocuments';
+const FOLDER_MARKER_PREFIX = 'folder:';
+const MAX_BATCH_WRITES = 500;
+
+// Champs conservés dans l'index (pas l'URL, résolue à la demande)
+type IndexedDocument = Omit<DocumentMetadata, 'url'>;
+
+function ownerOf(path: string): string | null {
+  const parts = path.split('/').filter(Boolean);
+  return parts[0] === 'users' && parts[1] ? parts[1] : null;
+}
+
+function entryId(path: string): string {
+  return encodeURIComponent(path);
+}
+
+function markerId(folderPath: string): string {
+  return FOLDER_MARKER_PREFIX + encodeURIComponent(folderPath);
+}
+
+function toEntry(document: IndexedDocument, osteopathId: string) {
+  const entry: Record<string, any> = {
+    osteopathId,
+    folder: document.folder,
+    path: document.path || `${document.folder}/${document.name}`,
+    name: document.name,
+    originalName: document.originalName,
+    type: document.type,
+    size: document.size,
+    uploadedAt: document.uploadedAt,
+    uploadedBy: document.uploadedBy
+  };
+  if (document.category) entry.category = document.category;
+  if (document.displayName) entry.displayName = document.displayName;
+  if (document.contentHash) entry.contentHash = document.contentHash;
+  return entry;
+}
+
+/**
+ * Documents d'un dossier d'après l'index, en une requête. null si le dossier
+ * n'a pas encore été indexé (ou si l'index est illisible) : l'appelant liste
+ * alors le dossier dans Storage.
+ */
+export async function readFolderIndex(folderPath: string): Promise<DocumentMetadata[] | null> {
+  const osteopathId = ownerOf(folderPath);
+  if (!osteopathId || !auth.currentUser) return null;
+
+  try {
+    const snapshot = await getDocs(query(
+      collection(db, COLLECTION_NAME),
+      where('osteopathId', '==', osteopathId),
+      where('folder', '==', folderPath)
+    ));
+    if (!snapshot.docs.some(docSnap => docSnap.id === markerId(folderPath))) {
+      return null;
+    }
+    return snapshot.docs
+      .filter(docSnap => !docSnap.data().isFolderMarker)
+      .map(docSnap => {
+        const data = docSnap.data();
+        return {
+          id: data.name,
+          name: data.name,
+          originalName: data.originalName || data.name,
+          displayName: data.displayName,
+          url: '',
+          path: data.path,
+          type: data.type || 'application/octet-stream',
+          size: data.size || 0,
+          uploadedAt: data.uploadedAt,
+          uploadedBy: data.uploadedBy || 'unknown',
+          folder: data.folder,
+          category: data.category,
+          contentHash: data.contentHash
+        } as DocumentMetadata;
+      });
+  } catch (error) {
+    console.warn('⚠️ Document index unavailable:', (error as Error)?.message || String(error));
+    return null;
+  }
+}
+
+/**
+ * Enregistre le contenu complet d'un dossier (après un listage Storage) et
+ * le marque comme indexé
+ */
+export async function writeFolderIndex(folderPath: string, documents: IndexedDocument[]): Promise<void> {
+  const osteopathId = ownerOf(folderPath);
+  if (!osteopathId) return;
+
+  try {
+    for (let i = 0; i < documents.length; i += MAX_BATCH_WRITES) {
+      const batch = writeBatch(db);
+      documents.slice(i, i + MAX_BATCH_WRITES).forEach(document => {
+        const entry = toEntry(document, osteopathId);
+        batch.set(doc(db, COLLECTION_NAME, entryId(entry.path)), entry);
+      });
+      await batch.commit();
+    }
+    await setDoc(doc(db, COLLECTION_NAME, markerId(folderPath)), {
+      osteopathId,
+      folder: folderPath,
+      isFolderMarker: true,
+      indexedAt: new Date().toISOString()
+    });
+  } catch (error) {
+    console.warn('⚠️ Could not index folder:', folderPath, (error as Error)?.message || String(error));
+  }
+}
+
+/**
+ * Un index de dossier qui n'a pas pu être mis à jour n'est plus complet : le
+ * marqueur est retiré pour que le prochain listage le reconstruise
+ */
+async function dropFolderMarker(folderPath: string, error: unknown): Promise<void> {
+  console.warn('⚠️ Document index out of date for:', folderPath, (error as Error)?.message || String(error));
+  await deleteDoc(doc(db, COLLECTION_NAME, markerId(folderPath))).catch(() => {});
+}
+
+/**
+ * Ajoute ou remplace l'entrée d'un fichier
+ */
+export async function indexDocument(document: IndexedDocument): Promise<void> {
+  const path = document.path || `${document.folder}/${document.name}`;
+  const osteopathId = ownerOf(path);
+  if (!osteopathId) return;
+
+  try {
+    await setDoc(doc(db, COLLECTION_NAME, entryId(path)), toEntry({ ...document, path }, osteopathId));
+  } catch (error) {
+    await dropFolderMarker(document.folder, error);
+  }
+}
+
+/**
+ * Retire l'entrée d'un fichier supprimé
+ */
+export async function unindexDocument(path: string): Promise<void> {
+  if (!ownerOf(path)) return;
+
+  try {
+    await deleteDoc(doc(db, COLLECTION_NAME, entryId(path)));
+  } catch (error) {
+    await dropFolderMarker(path.slice(0, path.lastIndexOf('/')), error);
+  }
+}
@@ -1,6 +1,17 @@
 import { ref, uploadBytesResumable, uploadBytes, getDownloadURL, deleteObject, listAll, getMetadata } from 'firebase/storage';
 import { storage, auth, app } from '../firebase/config';
 import imageCompression from 'browser-image-compression';
+import {
+  StorageUsage,
+  getIndexedStorageUsage,
+  scanStorageUsage,
+  recordStorageChange,
+  hasStorageUsageIndex,
+  invalidateStorageUsageForPath
+} from './storageUsage';
+import { readFolderIndex, writeFolderIndex, indexDocument, unindexDocument } from './documentIndex';
+import { uploadThroughProxy } from './uploadProxy';
+import { compressImageInWorker } from './imageWorkerPool';
 
 // Types et interfaces
 export interface UploadProgress {
@@ -19,18 +30,27 @@ export interface UploadResult {
   uploadedAt: string;
 }
 
+export interface UploadOptions {
+  // Fichier déjà compressé par le pipeline d'upload (voir uploadPipeline)
+  preparedFile?: File;
+  // Empreinte SHA-256 du fichier d'origine, conservée dans l'index
+  contentHash?: string | null;
+}
+
 export interface DocumentMetadata {
   id: string;
   name: string;
   originalName: string;
   displayName?: string; // Nom du document personnalisé par l'utilisateur
-  url: string;
+  url: string; // Vide tant que l'URL n'a pas été résolue (voir resolveDocumentURL)
+  path?: string; // Chemin complet dans Storage
   type: string;
   size: number;
   uploadedAt: string;
   uploadedBy: string;
   folder: string;
   category?: string; // Ajout de la catégorie
+  contentHash?: string; // Empreinte du fichier d'origine (détection des doublons)
 }
 
 // Configuration des types de fichiers autorisés (conforme aux règles Storage)
@@ -183,7 +203,12 @@ export async function compressImageIfNeeded(
       fileType: file.type
     };
 
-    const compressedFile = await imageCompression(file, options);
+    const compressedFile = await compressImageInWorker(file, {
+      maxSizeBytes: options.maxSizeMB * 1024 * 1024,
+      maxWidthOrHeight: options.maxWidthOrHeight,
+      initialQuality: options.initialQuality,
+      keepResolution: options.alwaysKeepResolution
+    }) ?? await imageCompression(file, options);
     
     console.log('✅ Image compressée:', {
       originalSize: file.size,
@@ -267,7 +292,34 @@ export async function uploadDocument(
   file: File,
   folder: string,
   fileName?: string,
-  onProgress?: (progress: UploadProgress) => void
+  onProgress?: (progress: UploadProgress) => void,
+  options: UploadOptions = {}
+): Promise<UploadResult> {
+  const result = await uploadDocumentToStorage(file, folder, fileName, onProgress, options.preparedFile);
+  recordStorageChange(result.uploadPath, result.fileSize, 1);
+  rememberDocumentURL(result.uploadPath, result.url);
+  await indexDocument({
+    id: result.fileName,
+    name: result.fileName,
+    originalName: file.name,
+    path: result.uploadPath,
+    type: result.fileType || file.type || 'application/octet-stream',
+    size: result.fileSize,
+    uploadedAt: result.uploadedAt,
+    uploadedBy: auth.currentUser?.uid || 'unknown',
+    folder,
+    category: folder.split('/').filter(Boolean).pop() || 'other',
+    contentHash: options.contentHash || undefined
+  });
+  return result;
+}
+
+async function uploadDocumentToStorage(
+  file: File,
+  folder: string,
+  fileName?: string,
+  onProgress?: (progress: UploadProgress) => void,
+  preparedFile?: File
 ): Promise<UploadResult> {
   console.log('🚀 Début de l\'upload:', {
     fileName: file.name,
@@ -289,28 +341,6 @@ export async function uploadDocument(
   let uploadPath: string = '';
   let processedFile: File = file;
 
-  // Helper: convert file/blob to base64 string for proxy upload
-  async function fileToBase64(f: File): Promise<string> {
-    const buf = await f.arrayBuffer();
-    const bytes = new Uint8Array(buf);
-    let binary = '';
-    for (let i = 0; i < bytes.length; i++) {
-      binary += String.fromCharCode(bytes[i]);
-    }
-    return btoa(binary);
-  }
-
-  // Helper: build Cloud Functions upload proxy URL (emulator or production)
-  function getUploadProxyUrl(): string {
-    const projectId = String((app.options as any)?.projectId || 'ostheo-app');
-    const useEmulator = String((import.meta as any).env?.VITE_FIREBASE_USE_EMULATOR ?? 'false') === 'true';
-    if (useEmulator) {
-      // Functions emulator default: http://localhost:5001/{project}/europe-west1/{function}
-      return `http://localhost:5001/${projectId}/europe-west1/uploadDocumentProxy`;
-    }
-    return `https://europe-west1-${projectId}.cloudfunctions.net/uploadDocumentProxy`;
-  }
-
   try {
     // Étape 1: Validation
     console.log('📋 Étape 1: Validation du fichier');
@@ -330,7 +360,7 @@ export async function uploadDocument(
       fileName: file.name
     });
 
-    processedFile = await compressImageIfNeeded(file, onProgress);
+    processedFile = preparedFile ?? await compressImageIfNeeded(file, onProgress);
 
     // Étape 3: Génération du nom unique
     console.log('📝 Étape 3: Génération du nom de fichier');
@@ -604,37 +634,23 @@ export async function uploadDocument(
               : (ext === 'png') ? 'image/png'
               : 'application/octet-stream');
 
-        const base64 = await fileToBase64(processedFile);
-        const proxyUrl = getUploadProxyUrl();
-        const token = await auth.currentUser!.getIdToken();
-
-        const resp = await fetch(proxyUrl, {
-          method: 'POST',
-          headers: {
-            'Authorization': `Bearer ${token}`,
-            'Content-Type': 'application/json'
+        const data = await uploadThroughProxy(processedFile, {
+          path: uploadPath,
+          contentType: fallbackContentType,
+          customMetadata: {
+            originalName: file.name,
+            uploadedBy: auth.currentUser!.uid,
+            uploadedAt: new Date().toISOString(),
+            originalSize: String(file.size),
+            processedSize: String(processedFile.size),
+            via: 'proxy'
           },
-          body: JSON.stringify({
-            path: uploadPath,
-            base64,
-            contentType: fallbackContentType,
-            customMetadata: {
-              originalName: file.name,
-              uploadedBy: auth.currentUser!.uid,
-              uploadedAt: new Date().toISOString(),
-              originalSize: String(file.size),
-              processedSize: String(processedFile.size),
-              via: 'proxy'
-            }
-          })
+          onChunk: (uploadedBytes, totalBytes) => {
+            const progress = 40 + (totalBytes > 0 ? (uploadedBytes / totalBytes) * 50 : 50);
+            onProgress?.({ progress, status: 'uploading', fileName: file.name });
+          }
         });
 
-        if (!resp.ok) {
-          const text = await resp.text();
-          throw new Error(`Proxy upload failed: ${resp.status} ${text}`);
-        }
-        const data = await resp.json();
-
         onProgress?.({ progress: 100, status: 'complete', fileName: file.name });
 
         return {
@@ -687,7 +703,18 @@ export async function deleteDocument(filePath: string): Promise<void> {
   try {
     console.log('🗑️ Suppression du fichier:', filePath);
     const fileRef = ref(storage, filePath);
+    // La taille n'est lue que si l'index d'utilisation doit être corrigé
+    const size = hasStorageUsageIndex(filePath)
+      ? await getMetadata(fileRef).then(metadata => metadata.size, () => null)
+      : 0;
     await deleteObject(fileRef);
+    forgetDocumentURL(filePath);
+    await unindexDocument(filePath);
+    if (size === null) {
+      invalidateStorageUsageForPath(filePath);
+    } else {
+      recordStorageChange(filePath, -size, -1);
+    }
     console.log('✅ Fichier supprimé avec succès');
   } catch (error) {
     console.error('❌ Erreur lors de la suppression:', error);
@@ -726,6 +753,8 @@ export async function cleanupOldFiles(
           
           if (fileAge > maxAge) {
             await deleteObject(itemRef);
+            forgetDocumentURL(itemRef.fullPath);
+            await unindexDocument(itemRef.fullPath);
             deletedCount++;
             console.log('🗑️ Fichier ancien supprimé:', fileName);
           }
@@ -735,6 +764,10 @@ export async function cleanupOldFiles(
       }
     }
 
+    if (deletedCount > 0) {
+      invalidateStorageUsageForPath(folderPath);
+    }
+
     console.log(`✅ Nettoyage terminé: ${deletedCount} fichier(s) supprimé(s)`);
     return deletedCount;
   } catch (error) {
@@ -745,6 +778,10 @@ export async function cleanupOldFiles(
 
 /**
  * Liste tous les documents d'un dossier
+ *
+ * Les descripteurs sont lus dans l'index Firestore en une requête, sans
+ * URL : celle-ci est résolue à l'ouverture (resolveDocumentURL). Un dossier
+ * pas encore indexé est listé dans Storage puis indexé.
  */
 export async function listDocuments(folderPath: string): Promise<DocumentMetadata[]> {
   if (!auth.currentUser) {
@@ -753,35 +790,11 @@ export async function listDocuments(folderPath: string): Promise<DocumentMetadat
 
   try {
     console.log('📋 Listage des documents dans:', folderPath);
-    const folderRef = ref(storage, folderPath);
-    const listResult = await listAll(folderRef);
-    
-    const documents: DocumentMetadata[] = [];
+    let documents = await readFolderIndex(folderPath);
 
-    for (const itemRef of listResult.items) {
-      try {
-        const url = await getDownloadURL(itemRef);
-        const metadata = await getMetadata(itemRef);
-        
-        // Extraire la catégorie du chemin
-        const pathParts = itemRef.fullPath.split('/');
-        const category = pathParts[pathParts.length - 2] || 'other';
-        
-        documents.push({
-          id: itemRef.name,
-          name: itemRef.name,
-          originalName: metadata.customMetadata?.originalName || itemRef.name,
-          url,
-          type: metadata.contentType || 'application/octet-stream',
-          size: metadata.size,
-          uploadedAt: metadata.customMetadata?.uploadedAt || metadata.timeCreated,
-          uploadedBy: metadata.customMetadata?.uploadedBy || 'unknown',
-          folder: folderPath,
-          category
-        });
-      } catch (error) {
-        console.warn('⚠️ Erreur lors de la récupération des métadonnées:', itemRef.name, error);
-      }
+    if (!documents) {
+      documents = await listStorageFolder(folderPath);
+      await writeFolderIndex(folderPath, documents);
     }
 
     // Trier par date de création (plus récent en premier)
@@ -795,6 +808,74 @@ export async function listDocuments(folderPath: string): Promise<DocumentMetadat
   }
 }
 
+async function listStorageFolder(folderPath: string): Promise<DocumentMetadata[]> {
+  const listResult = await listAll(ref(storage, folderPath));
+
+  const documents = await Promise.all(listResult.items.map(async itemRef => {
+    try {
+      const metadata = await getMetadata(itemRef);
+
+      // Extraire la catégorie du chemin
+      const pathParts = itemRef.fullPath.split('/');
+      const category = pathParts[pathParts.length - 2] || 'other';
+
+      return {
+        id: itemRef.name,
+        name: itemRef.name,
+        originalName: metadata.customMetadata?.originalName || itemRef.name,
+        url: '',
+        path: itemRef.fullPath,
+        type: metadata.contentType || 'application/octet-stream',
+        size: metadata.size,
+        uploadedAt: metadata.customMetadata?.uploadedAt || metadata.timeCreated,
+        uploadedBy: metadata.customMetadata?.uploadedBy || 'unknown',
+        folder: folderPath,
+        category
+      } as DocumentMetadata;
+    } catch (error) {
+      console.warn('⚠️ Erreur lors de la récupération des métadonnées:', itemRef.name, error);
+      return null;
+    }
+  }));
+
+  return documents.filter((document): document is DocumentMetadata => document !== null);
+}
+
+// URLs de téléchargement déjà résolues, gardées peu de temps
+const DOWNLOAD_URL_TTL_MS = 10 * 60 * 1000;
+const downloadURLs = new Map<string, { url: Promise<string>; expiresAt: number }>();
+
+function rememberDocumentURL(path: string, url: string): void {
+  if (url) {
+    downloadURLs.set(path, { url: Promise.resolve(url), expiresAt: Date.now() + DOWNLOAD_URL_TTL_MS });
+  }
+}
+
+function forgetDocumentURL(path: string): void {
+  downloadURLs.delete(path);
+}
+
+/**
+ * URL de téléchargement d'un document, résolue à la demande et mise en
+ * cache quelques minutes
+ */
+export function resolveDocumentURL(document: Pick<DocumentMetadata, 'url' | 'path' | 'folder' | 'name'>): Promise<string> {
+  if (document.url) {
+    return Promise.resolve(document.url);
+  }
+
+  const path = document.path || `${document.folder}/${document.name}`;
+  const cached = downloadURLs.get(path);
+  if (cached && cached.expiresAt > Date.now()) {
+    return cached.url;
+  }
+
+  const url = getDownloadURL(ref(storage, path));
+  downloadURLs.set(path, { url, expiresAt: Date.now() + DOWNLOAD_URL_TTL_MS });
+  url.catch(() => forgetDocumentURL(path));
+  return url;
+}
+
 /**
  * Obtient une URL de téléchargement sécurisée avec expiration
  */
@@ -823,60 +904,29 @@ export async function getSecureDownloadURL(
 
 /**
  * Vérifie l'espace de stockage utilisé par un utilisateur
+ *
+ * Servi par l'index local tenu à jour par les uploads et suppressions ; sans
+ * index récent (ou avec `refresh`), l'arborescence est parcourue et
+ * `onProgress` reçoit les totaux partiels au fil du parcours.
  */
-export async function getStorageUsage(userId: string): Promise<{
-  totalSize: number;
-  fileCount: number;
-  folderSizes: Record<string, number>;
-}> {
+export async function getStorageUsage(
+  userId: string,
+  options: { refresh?: boolean; onProgress?: (partial: StorageUsage) => void } = {}
+): Promise<StorageUsage> {
   if (!auth.currentUser || auth.currentUser.uid !== userId) {
     throw new Error('Accès non autorisé');
   }
 
   try {
-    console.log('📊 Calcul de l\'utilisation du stockage pour:', userId);
-    const userFolderRef = ref(storage, `users/${userId}`);
-    // Note: on ne lit pas directement listAll ici; on utilise la fonction récursive ci-dessous
-
-    let totalSize = 0;
-    let fileCount = 0;
-    const folderSizes: Record<string, number> = {};
-
-    // Fonction récursive pour parcourir tous les dossiers
-    const processFolder = async (folderRef: any, folderPath: string) => {
-      const result = await listAll(folderRef);
-      
-      let folderSize = 0;
-      
-      // Traiter les fichiers
-      for (const itemRef of result.items) {
-        try {
-          const metadata = await getMetadata(itemRef);
-          const size = metadata.size;
-          
-          totalSize += size;
-          folderSize += size;
-          fileCount++;
-        } catch (error) {
-          console.warn('⚠️ Erreur lors de la récupération des métadonnées:', itemRef.name, error);
-        }
-      }
-      
-      folderSizes[folderPath] = folderSize;
-      
-      // Traiter les sous-dossiers
-      for (const prefixRef of result.prefixes) {
-        await processFolder(prefixRef, `${folderPath}/${prefixRef.name}`);
+    if (!options.refresh) {
+      const indexed = getIndexedStorageUsage(userId);
+      if (indexed) {
+        return indexed;
       }
-    };
-
-    await processFolder(userFolderRef, 'root');
+    }
 
-    const usage = {
-      totalSize,
-      fileCount,
-      folderSizes
-    };
+    console.log('📊 Calcul de l\'utilisation du stockage pour:', userId);
+    const usage = await scanStorageUsage(userId, ref(storage, `users/${userId}`), options.onProgress);
 
     console.log('✅ Utilisation du stockage calculée:', usage);
     return usage;
@@ -977,8 +1027,27 @@ export async function moveFile(oldPath: string, newPath: string): Promise<string
 
     // Supprimer l'ancien fichier seulement après avoir confirmé le succès du nouvel upload
     await deleteObject(oldRef);
+    recordStorageChange(newPath, oldMetadata.size, 1);
+    recordStorageChange(oldPath, -oldMetadata.size, -1);
+    forgetDocumentURL(oldPath);
+    await unindexDocument(oldPath);
 
     const newDownloadURL = await getDownloadURL(newRef);
+    rememberDocumentURL(newPath, newDownloadURL);
+    const newName = newPath.split('/').pop() || newPath;
+    const newFolder = newPath.slice(0, newPath.lastIndexOf('/'));
+    await indexDocument({
+      id: newName,
+      name: newName,
+      originalName: customMetadata.originalName || newName,
+      path: newPath,
+      type: oldMetadata.contentType || 'application/octet-stream',
+      size: oldMetadata.size,
+      uploadedAt: customMetadata.uploadedAt || oldMetadata.timeCreated,
+      uploadedBy: customMetadata.uploadedBy || 'unknown',
+      folder: newFolder,
+      category: newFolder.split('/').filter(Boolean).pop() || 'other'
+    });
     console.log(`✅ Fichier déplacé de ${oldPath} vers ${newPath}. Nouvelle URL: ${newDownloadURL}`);
     return newDownloadURL;
   } catch (error) {
@@ -1,5 +1,6 @@
 import { Firestore } from 'firebase/firestore';
-import { AES, enc, mode, pad, lib } from 'crypto-js';
+import { AES, HmacSHA256, enc, kdf, mode, pad, lib } from 'crypto-js';
+import { decryptionCache } from './decryptionCache';
 
 // Clé de chiffrement principale (en production, cette clé serait stockée dans un KMS)
 // IMPORTANT: Cette implémentation est simplifiée pour démonstration
@@ -59,6 +60,66 @@ export function getUserKey(userId: string): string {
   return userKeys.get(userId)!;
 }
 
+/**
+ * Version de clé des données chiffrées par encryptData. Elle est inscrite
+ * dans l'en-tête de chaque valeur ("VV" + IV hexadécimal), ce qui permet de
+ * changer de dérivation sans rendre illisibles les données existantes. Les
+ * valeurs sans version (IV seul, passphrase "Salted__") sont l'ancien format.
+ */
+export const CURRENT_KEY_VERSION = 2;
+
+// Dérivation de la clé AES-256 brute de chaque version
+const KEY_DERIVATIONS: Record<number, (userId: string) => lib.WordArray> = {
+  2: userId => HmacSHA256(`osteoapp-field-key:${userId}`, MASTER_KEY)
+};
+
+/**
+ * Clé d'un utilisateur pour une version donnée, dérivée une fois par
+ * session : plus aucune dérivation EVP par champ, chaque chiffrement se
+ * limite à l'AES. La copie Web Crypto est importée non extractible ; la
+ * clé brute ne sert qu'au chemin synchrone (CryptoJS).
+ */
+export interface KeyHandle {
+  userId: string;
+  version: number;
+  raw: lib.WordArray;
+  cryptoKey?: Promise<CryptoKey>;
+}
+
+const keyHandles: Map<string, KeyHandle> = new Map();
+
+/**
+ * Récupère la poignée de clé d'un utilisateur (null si la version est inconnue)
+ */
+export function getKeyHandle(userId: string, version: number = CURRENT_KEY_VERSION): KeyHandle | null {
+  const id = `${version}:${userId}`;
+  let handle = keyHandles.get(id);
+  if (!handle) {
+    const derive = KEY_DERIVATIONS[version];
+    if (!derive) return null;
+    handle = { userId, version, raw: derive(userId) };
+    keyHandles.set(id, handle);
+  }
+  return handle;
+}
+
+function getCryptoKey(subtle: SubtleCrypto, handle: KeyHandle): Promise<CryptoKey> {
+  if (!handle.cryptoKey) {
+    handle.cryptoKey = subtle.importKey('raw', wordArrayToBytes(handle.raw), { name: 'AES-CBC' }, false, ['encrypt', 'decrypt']);
+    // Un import échoué sera retenté au prochain appel
+    handle.cryptoKey.catch(() => { handle.cryptoKey = undefined; });
+  }
+  return handle.cryptoKey;
+}
+
+/**
+ * Oublie les clés de session (déconnexion)
+ */
+export function clearKeyHandles(): void {
+  keyHandles.clear();
+  userKeys.clear();
+}
+
 /**
  * Valide les données avant chiffrement
  */
@@ -91,21 +152,21 @@ export function encryptData(data: any, userId: string): string {
       return typeof data === 'string' ? data : JSON.stringify(data);
     }
     
-    const userKey = getUserKey(userId);
+    const handle = getKeyHandle(userId)!;
     const iv = generateIV();
     
     // Conversion des données en chaîne JSON
     const jsonString = typeof data === 'string' ? data : JSON.stringify(data);
     
-    // Chiffrement AES-256-CBC avec CryptoJS
-    const encrypted = AES.encrypt(jsonString, userKey, {
+    // Chiffrement AES-256-CBC avec la clé brute de l'utilisateur
+    const encrypted = AES.encrypt(jsonString, handle.raw, {
       iv: iv,
       mode: mode.CBC,
       padding: pad.Pkcs7
     });
     
-    // Format: IV:Données chiffrées
-    return iv.toString(enc.Hex) + ':' + encrypted.toString();
+    // Format: VersionIV:Données chiffrées
+    return formatVersionedCiphertext(handle.version, iv.toString(enc.Hex), encrypted.ciphertext.toString(enc.Base64));
   } catch (error) {
     console.error('❌ Encryption failed for data:', typeof data, error);
     // En cas d'erreur, retourner une version sécurisée des données originales
@@ -113,6 +174,40 @@ export function encryptData(data: any, userId: string): string {
   }
 }
 
+/**
+ * Chiffre un lot de valeurs via Web Crypto avec la clé non extractible de
+ * l'utilisateur. Même format que encryptData, qui sert de repli sans
+ * crypto.subtle et pour les valeurs qu'il ne chiffre pas.
+ */
+export async function encryptDataBatch(values: any[], userId: string): Promise<string[]> {
+  const subtle = getSubtle();
+  if (!subtle || !globalThis.crypto.getRandomValues) {
+    return values.map(value => encryptData(value, userId));
+  }
+  const handle = getKeyHandle(userId)!;
+  const key = await getCryptoKey(subtle, handle);
+  const encoder = new TextEncoder();
+  return Promise.all(values.map(async data => {
+    if (!validateDataForEncryption(data)) {
+      return encryptData(data, userId);
+    }
+    try {
+      const iv = globalThis.crypto.getRandomValues(new Uint8Array(16));
+      const jsonString = typeof data === 'string' ? data : JSON.stringify(data);
+      const ciphertext = await subtle.encrypt({ name: 'AES-CBC', iv }, key, encoder.encode(jsonString));
+      return formatVersionedCiphertext(handle.version, bytesToHex(iv), bytesToBase64(new Uint8Array(ciphertext)));
+    } catch {
+      return encryptData(data, userId);
+    }
+  }));
+}
+
+/**
+ * Début d'une valeur chiffrée : IV hexadécimal (32 caractères), éventuellement
+ * précédé de la version de clé (2 caractères), puis ':'
+ */
+export const CIPHERTEXT_PREFIX_PATTERN = /^([0-9a-f]{2})?[0-9a-f]{32}:/i;
+
 /**
  * Vérifie si une chaîne est au format de données chiffrées valide
  */
@@ -127,9 +222,10 @@ export function isValidEncryptedFormat(encryptedData: string): boolean {
     return false;
   }
   
-  // Vérifier que l'IV est un hexadécimal valide de la bonne longueur (32 caractères pour 16 bytes)
+  // Vérifier que l'IV est un hexadécimal valide de la bonne longueur (32 caractères pour 16 bytes),
+  // éventuellement précédé de la version de clé (2 caractères)
   const ivHex = parts[0];
-  if (!/^[0-9a-fA-F]{32}$/.test(ivHex)) {
+  if (!/^([0-9a-fA-F]{2})?[0-9a-fA-F]{32}$/.test(ivHex)) {
     return false;
   }
   
@@ -146,6 +242,38 @@ export function isValidEncryptedFormat(encryptedData: string): boolean {
  * Déchiffre des données sensibles avec gestion robuste des erreurs
  */
 export function decryptData(encryptedData: string, userId: string): any {
+  if (typeof encryptedData !== 'string') {
+    return decryptWithKey(encryptedData, getUserKey(userId));
+  }
+  const cached = decryptionCache.get(userId, encryptedData);
+  if (cached !== undefined) return cached;
+  const versioned = parseVersionedCiphertext(encryptedData);
+  const result = versioned
+    ? decryptVersioned(versioned, userId)
+    : decryptWithKey(encryptedData, getUserKey(userId));
+  cacheDecrypted(userId, encryptedData, result);
+  return result;
+}
+
+/**
+ * Met en cache un déchiffrement AES effectif réussi (valeur versionnée ou
+ * "Salted__"), jamais un marqueur d'erreur ni une valeur retournée telle quelle
+ */
+function cacheDecrypted(userId: string, encryptedData: string, value: any): void {
+  const failed = value === encryptedData || (typeof value === 'string' && value.startsWith('['));
+  const decryptedByAes = parseVersionedCiphertext(encryptedData) || parseSaltedCiphertext(encryptedData);
+  if (!failed && decryptedByAes) {
+    decryptionCache.set(userId, encryptedData, value);
+  }
+}
+
+/**
+ * Déchiffre une valeur de l'ancien format (sans version de clé) avec la
+ * passphrase de session déjà résolue d'un utilisateur (getUserKey). Utilisé
+ * tel quel par le worker de chiffrement, qui n'a pas accès aux clés de
+ * session du thread principal.
+ */
+export function decryptWithKey(encryptedData: string, userKey: string): any {
   try {
     // Vérification préliminaire
     if (!encryptedData || typeof encryptedData !== 'string') {
@@ -157,6 +285,12 @@ export function decryptData(encryptedData: string, userId: string): any {
       return '[EMPTY_DATA]';
     }
     
+    // Ancien format "IV:Salted__…" : avant la détection d'UUID, qui le
+    // renverrait tel quel au lieu de le déchiffrer
+    if (parseSaltedCiphertext(encryptedData)) {
+      return decryptSaltedWithKey(encryptedData, userKey);
+    }
+    
     // ✅ CORRECTION : Gestion des UUIDs chiffrés (format: 32 caractères hexadécimaux:encryptedData)
     if (encryptedData.includes(':') && encryptedData.length > 50) {
       const parts = encryptedData.split(':');
@@ -169,7 +303,7 @@ export function decryptData(encryptedData: string, userId: string): any {
           console.log('🔓 Détection UUID chiffré, déchiffrement de la partie:', encryptedPart.substring(0, 50) + '...');
           
           try {
-            const result = decryptData(encryptedPart, userId);
+            const result = decryptWithKey(encryptedPart, userKey);
             // Vérifier si le déchiffrement a réussi
             if (typeof result === 'string' && 
                 !result.startsWith('[') && 
@@ -218,7 +352,7 @@ export function decryptData(encryptedData: string, userId: string): any {
           console.log('🔓 Détection UUID chiffré, déchiffrement de la partie:', encryptedPart.substring(0, 50) + '...');
           
           try {
-            const result = decryptData(encryptedPart, userId);
+            const result = decryptWithKey(encryptedPart, userKey);
             // Vérifier si le déchiffrement a réussi
             if (typeof result === 'string' && 
                 !result.startsWith('[') && 
@@ -248,8 +382,6 @@ export function decryptData(encryptedData: string, userId: string): any {
       return '[MALFORMED_ENCRYPTED_DATA]';
     }
     
-    const userKey = getUserKey(userId);
-    
     // Séparation de l'IV et des données chiffrées
     const [ivHex, ciphertext] = encryptedData.split(':');
     
@@ -318,6 +450,290 @@ export function decryptData(encryptedData: string, userId: string): any {
   }
 }
 
+// En-tête "Salted__" du format OpenSSL produit par AES.encrypt avec une passphrase
+const OPENSSL_SALTED_MAGIC = [0x53, 0x61, 0x6c, 0x74, 0x65, 0x64, 0x5f, 0x5f];
+
+function getSubtle(): SubtleCrypto | null {
+  return typeof globalThis !== 'undefined' && globalThis.crypto && globalThis.crypto.subtle
+    ? globalThis.crypto.subtle
+    : null;
+}
+
+function wordArrayToBytes(words: lib.WordArray): Uint8Array {
+  const bytes = new Uint8Array(words.sigBytes);
+  for (let i = 0; i < words.sigBytes; i++) {
+    bytes[i] = (words.words[i >>> 2] >>> (24 - (i % 4) * 8)) & 0xff;
+  }
+  return bytes;
+}
+
+function bytesToWordArray(bytes: Uint8Array): lib.WordArray {
+  const words: number[] = [];
+  for (let i = 0; i < bytes.length; i++) {
+    words[i >>> 2] |= bytes[i] << (24 - (i % 4) * 8);
+  }
+  return lib.WordArray.create(words, bytes.length);
+}
+
+function base64ToBytes(value: string): Uint8Array | null {
+  try {
+    const binary = atob(value);
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) {
+      bytes[i] = binary.charCodeAt(i);
+    }
+    return bytes;
+  } catch {
+    return null;
+  }
+}
+
+function bytesToBase64(bytes: Uint8Array): string {
+  let binary = '';
+  for (let i = 0; i < bytes.length; i++) {
+    binary += String.fromCharCode(bytes[i]);
+  }
+  return btoa(binary);
+}
+
+function bytesToHex(bytes: Uint8Array): string {
+  let hex = '';
+  for (let i = 0; i < bytes.length; i++) {
+    hex += bytes[i].toString(16).padStart(2, '0');
+  }
+  return hex;
+}
+
+function hexToBytes(hex: string): Uint8Array {
+  const bytes = new Uint8Array(hex.length / 2);
+  for (let i = 0; i < bytes.length; i++) {
+    bytes[i] = parseInt(hex.substr(i * 2, 2), 16);
+  }
+  return bytes;
+}
+
+interface VersionedCiphertext {
+  version: number;
+  ivHex: string;
+  ciphertext: string;
+}
+
+function formatVersionedCiphertext(version: number, ivHex: string, ciphertext: string): string {
+  return version.toString(16).padStart(2, '0') + ivHex + ':' + ciphertext;
+}
+
+/**
+ * Lit l'en-tête d'une valeur "VV" + IV (34 caractères hexadécimaux) : les
+ * valeurs de l'ancien format ont un IV seul (32 caractères) suivi de
+ * "Salted__" en base64, et ne sont jamais prises pour une valeur versionnée.
+ */
+function parseVersionedCiphertext(value: string): VersionedCiphertext | null {
+  const separator = value.indexOf(':');
+  if (separator !== 34 || !/^[0-9a-fA-F]{34}$/.test(value.substring(0, 34))) {
+    return null;
+  }
+  const ciphertext = value.substring(35);
+  if (!/^[A-Za-z0-9+/=]{16,}$/.test(ciphertext)) {
+    return null;
+  }
+  return {
+    version: parseInt(value.substring(0, 2), 16),
+    ivHex: value.substring(2, 34),
+    ciphertext
+  };
+}
+
+/**
+ * Déchiffrement synchrone (CryptoJS) d'une valeur versionnée : une seule
+ * opération AES avec la clé brute de la poignée, sans dérivation.
+ */
+function decryptVersioned(value: VersionedCiphertext, userId: string): any {
+  const handle = getKeyHandle(userId, value.version);
+  if (!handle) return '[UNKNOWN_KEY_VERSION]';
+  let decrypted: lib.WordArray;
+  try {
+    decrypted = AES.decrypt(
+      lib.CipherParams.create({ ciphertext: enc.Base64.parse(value.ciphertext) }),
+      handle.raw,
+      { iv: enc.Hex.parse(value.ivHex), mode: mode.CBC, padding: pad.Pkcs7 }
+    );
+  } catch {
+    return '[AES_DECRYPTION_FAILED]';
+  }
+  if (decrypted.sigBytes < 0) return '[AES_DECRYPTION_FAILED]';
+  return decodePlaintext(wordArrayToBytes(decrypted).buffer as ArrayBuffer);
+}
+
+/**
+ * Extrait sel et texte chiffré d'une valeur "IV:Données chiffrées".
+ * Avec une passphrase, CryptoJS dérive clé et IV du sel (EVP_BytesToKey) :
+ * le préfixe hexadécimal n'intervient pas dans le déchiffrement.
+ */
+function parseSaltedCiphertext(value: string): { salt: Uint8Array; ciphertext: Uint8Array } | null {
+  const separator = value.indexOf(':');
+  if (separator < 0 || !/^[0-9a-fA-F]{12,64}$/.test(value.substring(0, separator))) {
+    return null;
+  }
+  const bytes = base64ToBytes(value.substring(separator + 1));
+  if (!bytes || bytes.length < 32 || (bytes.length - 16) % 16 !== 0) {
+    return null;
+  }
+  for (let i = 0; i < OPENSSL_SALTED_MAGIC.length; i++) {
+    if (bytes[i] !== OPENSSL_SALTED_MAGIC[i]) return null;
+  }
+  return { salt: bytes.subarray(8, 16), ciphertext: bytes.subarray(16) };
+}
+
+/**
+ * Équivalent synchrone de decryptWithSubtle : CryptoJS lit l'en-tête
+ * "Salted__" et dérive clé et IV de la passphrase, le préfixe est ignoré.
+ */
+function decryptSaltedWithKey(value: string, userKey: string): any {
+  try {
+    const decrypted = AES.decrypt(value.substring(value.indexOf(':') + 1), userKey);
+    if (decrypted.sigBytes < 0) {
+      // Remplissage invalide : mauvaise passphrase
+      return '[AES_DECRYPTION_FAILED]';
+    }
+    return decodePlaintext(wordArrayToBytes(decrypted).buffer as ArrayBuffer);
+  } catch {
+    return '[AES_DECRYPTION_FAILED]';
+  }
+}
+
+async function decryptWithSubtle(
+  subtle: SubtleCrypto,
+  passphrase: lib.WordArray,
+  salt: Uint8Array,
+  ciphertext: Uint8Array
+): Promise<any> {
+  // Même dérivation que CryptoJS : 256 bits de clé + 128 bits d'IV, MD5, 1 itération
+  const derived = kdf.OpenSSL.execute(
+    passphrase as unknown as string,
+    8,
+    4,
+    bytesToWordArray(salt)
+  );
+  let plain: ArrayBuffer;
+  try {
+    const key = await subtle.importKey('raw', wordArrayToBytes(derived.key), { name: 'AES-CBC' }, false, ['decrypt']);
+    plain = await subtle.decrypt({ name: 'AES-CBC', iv: wordArrayToBytes(derived.iv) }, key, ciphertext);
+  } catch {
+    return '[AES_DECRYPTION_FAILED]';
+  }
+  return decodePlaintext(plain);
+}
+
+async function decryptVersionedWithSubtle(
+  subtle: SubtleCrypto,
+  value: VersionedCiphertext,
+  userId: string
+): Promise<any> {
+  const handle = getKeyHandle(userId, value.version);
+  const ciphertext = base64ToBytes(value.ciphertext);
+  if (!handle) return '[UNKNOWN_KEY_VERSION]';
+  if (!ciphertext) return '[MALFORMED_ENCRYPTED_DATA]';
+  let plain: ArrayBuffer;
+  try {
+    const key = await getCryptoKey(subtle, handle);
+    plain = await subtle.decrypt({ name: 'AES-CBC', iv: hexToBytes(value.ivHex) }, key, ciphertext);
+  } catch {
+    return '[AES_DECRYPTION_FAILED]';
+  }
+  return decodePlaintext(plain);
+}
+
+function decodePlaintext(plain: ArrayBuffer): any {
+  if (plain.byteLength === 0) {
+    // prepareDataForStorage chiffre aussi les champs cliniques vides
+    return '';
+  }
+  let text: string;
+  try {
+    text = new TextDecoder('utf-8', { fatal: true }).decode(plain);
+  } catch {
+    return '[DECODING_FAILED]';
+  }
+  try {
+    return JSON.parse(text);
+  } catch {
+    return text;
+  }
+}
+
+/**
+ * Déchiffre un lot de valeurs en une fois via Web Crypto (crypto.subtle).
+ * La passphrase de l'utilisateur n'est encodée qu'une fois pour tout le lot et
+ * l'AES est exécuté nativement. Les valeurs qui ne sont pas au format
+ * "IV:Données chiffrées" de encryptData, ou un environnement sans
+ * crypto.subtle, passent par decryptData : les résultats (y compris les
+ * marqueurs d'erreur) sont alignés sur les valeurs d'entrée.
+ */
+export async function decryptDataBatch(values: string[], userId: string): Promise<any[]> {
+  return decryptWithCache(values, userId, misses => decryptBatchWithKey(misses, userId, () => getUserKey(userId)));
+}
+
+/**
+ * Sert depuis decryptionCache les valeurs déjà déchiffrées et ne passe que
+ * les autres à decryptMisses. Seuls les déchiffrements AES effectifs réussis
+ * (valeurs versionnées ou "Salted__") sont mis en cache, jamais les marqueurs
+ * d'erreur ni les valeurs retournées telles quelles.
+ */
+export async function decryptWithCache(
+  values: string[],
+  userId: string,
+  decryptMisses: (misses: string[]) => Promise<any[]>
+): Promise<any[]> {
+  const results: any[] = new Array(values.length);
+  const missIndexes: number[] = [];
+  values.forEach((value, index) => {
+    const cached = typeof value === 'string' ? decryptionCache.get(userId, value) : undefined;
+    if (cached === undefined) {
+      missIndexes.push(index);
+    } else {
+      results[index] = cached;
+    }
+  });
+  if (missIndexes.length === 0) {
+    return results;
+  }
+
+  const decrypted = await decryptMisses(missIndexes.map(index => values[index]));
+  missIndexes.forEach((index, i) => {
+    results[index] = decrypted[i];
+    if (typeof values[index] === 'string') {
+      cacheDecrypted(userId, values[index], decrypted[i]);
+    }
+  });
+  return results;
+}
+
+/**
+ * decryptDataBatch sans cache. La passphrase de session de l'ancien format
+ * n'est résolue (legacyKey) que si le lot contient de telles valeurs.
+ */
+export async function decryptBatchWithKey(
+  values: string[],
+  userId: string,
+  legacyKey: () => string
+): Promise<any[]> {
+  const subtle = getSubtle();
+  let passphrase: lib.WordArray | undefined;
+  return Promise.all(values.map(value => {
+    const versioned = typeof value === 'string' ? parseVersionedCiphertext(value) : null;
+    if (versioned) {
+      return subtle ? decryptVersionedWithSubtle(subtle, versioned, userId) : decryptVersioned(versioned, userId);
+    }
+    const parsed = subtle && typeof value === 'string' ? parseSaltedCiphertext(value) : null;
+    if (!subtle || !parsed) {
+      return decryptWithKey(value, legacyKey());
+    }
+    // Passphrase encodée une seule fois pour tout le lot
+    passphrase = passphrase ?? enc.Utf8.parse(legacyKey());
+    return decryptWithSubtle(subtle, passphrase, parsed.salt, parsed.ciphertext);
+  }));
+}
+
 /**
  * Vérifie si une donnée est chiffrée
  */
@@ -410,11 +826,23 @@ export function attemptDataRepair(encryptedData: string, _userId: string): strin
   }
 }
 
+/**
+ * Indique si une valeur est déjà chiffrée avec la version de clé courante
+ */
+export function isCurrentKeyVersion(encryptedData: string): boolean {
+  const versioned = typeof encryptedData === 'string' ? parseVersionedCiphertext(encryptedData) : null;
+  return versioned?.version === CURRENT_KEY_VERSION;
+}
+
 /**
  * Migre les données chiffrées vers un nouveau format
  */
 export function migrateEncryptedData(oldEncryptedData: string, userId: string): string {
   try {
+    if (isCurrentKeyVersion(oldEncryptedData)) {
+      return oldEncryptedData;
+    }
+
     // Tenter de déchiffrer avec l'ancienne méthode
     const decryptedData = decryptData(oldEncryptedData, userId);
     
@@ -429,4 +857,63 @@ export function migrateEncryptedData(oldEncryptedData: string, userId: string):
     console.error('❌ Data migration failed:', error);
     return oldEncryptedData;
   }
-}
\ No newline at end of file
+}
+
+/**
+ * Rechiffre un flux de valeurs avec la version de clé courante, par lots de
+ * batchSize : chaque lot est déchiffré puis rechiffré en une passe
+ * (decryptDataBatch/encryptDataBatch) avec les mêmes poignées de clé pour
+ * tout le flux. Les résultats sont produits dans l'ordre d'entrée ; une
+ * valeur déjà à jour, non chiffrée ou indéchiffrable est rendue telle quelle.
+ */
+export async function* migrateEncryptedDataStream(
+  values: Iterable<string> | AsyncIterable<string>,
+  userId: string,
+  batchSize: number = 64
+): AsyncGenerator<string> {
+  let batch: string[] = [];
+  for await (const value of values) {
+    batch.push(value);
+    if (batch.length >= batchSize) {
+      yield* await migrateBatch(batch, userId);
+      batch = [];
+    }
+  }
+  if (batch.length > 0) {
+    yield* await migrateBatch(batch, userId);
+  }
+}
+
+/**
+ * Seules les valeurs qu'un AES déchiffre effectivement sont rechiffrées :
+ * versions de clé antérieures, ou ancien format "Salted__" via Web Crypto.
+ */
+function canMigrate(value: string): boolean {
+  if (typeof value !== 'string') return false;
+  const versioned = parseVersionedCiphertext(value);
+  if (versioned) return versioned.version !== CURRENT_KEY_VERSION;
+  return getSubtle() !== null && parseSaltedCiphertext(value) !== null;
+}
+
+async function migrateBatch(values: string[], userId: string): Promise<string[]> {
+  const results = [...values];
+  const indexes = values
+    .map((_, index) => index)
+    .filter(index => canMigrate(values[index]));
+  if (indexes.length === 0) {
+    return results;
+  }
+
+  const decrypted = await decryptDataBatch(indexes.map(index => values[index]), userId);
+  const readable: Array<{ index: number; value: any }> = [];
+  decrypted.forEach((value, i) => {
+    if (value !== undefined && !(typeof value === 'string' && value.startsWith('['))) {
+      readable.push({ index: indexes[i], value });
+    }
+  });
+  const encrypted = await encryptDataBatch(readable.map(({ value }) => value), userId);
+  readable.forEach(({ index }, i) => {
+    results[index] = encrypted[i];
+  });
+  return results;
+}
@@ -1,6 +1,10 @@
 import { ref, uploadBytes, getDownloadURL, deleteObject } from 'firebase/storage';
 import { storage, auth } from '../firebase/config';
 import imageCompression from 'browser-image-compression';
+import { recordStorageChange, invalidateStorageUsageForPath } from './storageUsage';
+import { indexDocument, unindexDocument } from './documentIndex';
+import { compressImageInWorker } from './imageWorkerPool';
+import type { UploadOptions } from './documentStorage';
 
 const MAX_FILE_SIZE = 10 * 1024 * 1024; // 10MB
 // Types autorisés (alignés avec Storage.rules): PDF, JPG, PNG
@@ -109,10 +113,16 @@ export async function compressImageIfNeeded(file: File): Promise<File> {
     useWebWorker: true,
     fileType: file.type,
     alwaysKeepResolution: true,
+    initialQuality: 1,
   };
 
   try {
-    return await imageCompression(file, options);
+    return await compressImageInWorker(file, {
+      maxSizeBytes: options.maxSizeMB * 1024 * 1024,
+      maxWidthOrHeight: options.maxWidthOrHeight,
+      initialQuality: options.initialQuality,
+      keepResolution: options.alwaysKeepResolution
+    }) ?? await imageCompression(file, options);
   } catch (error) {
     console.error('Error compressing image:', error);
     return file;
@@ -151,6 +161,8 @@ export async function uploadProfileImage(
     onProgress?.({ progress: 50, status: 'uploading' });
     const snapshot = await uploadBytes(fileRef, processedFile, metadata);
     
+    // Remplace éventuellement une image existante de taille inconnue
+    invalidateStorageUsageForPath(filePath);
     onProgress?.({ progress: 80, status: 'uploading' });
     const url = await getDownloadURL(snapshot.ref);
 
@@ -176,7 +188,8 @@ export async function uploadProfileImage(
 export async function uploadPatientFile(
   file: File, 
   patientId: string,
-  onProgress?: (progress: UploadProgress) => void
+  onProgress?: (progress: UploadProgress) => void,
+  options: UploadOptions = {}
 ): Promise<UploadResult> {
   if (!auth.currentUser) {
     throw new Error('Utilisateur non authentifié');
@@ -186,7 +199,7 @@ export async function uploadPatientFile(
     onProgress?.({ progress: 0, status: 'compressing' });
     
     await validateFile(file);
-    const processedFile = await compressImageIfNeeded(file);
+    const processedFile = options.preparedFile ?? await compressImageIfNeeded(file);
     
     onProgress?.({ progress: 30, status: 'uploading' });
 
@@ -204,6 +217,20 @@ export async function uploadPatientFile(
     onProgress?.({ progress: 50, status: 'uploading' });
     const snapshot = await uploadBytes(fileRef, processedFile, metadata);
     
+    recordStorageChange(filePath, processedFile.size, 1);
+    await indexDocument({
+      id: fileName,
+      name: fileName,
+      originalName: file.name,
+      path: filePath,
+      type: contentType,
+      size: processedFile.size,
+      uploadedAt: new Date().toISOString(),
+      uploadedBy: auth.currentUser.uid,
+      folder: filePath.slice(0, filePath.lastIndexOf('/')),
+      category: 'documents',
+      contentHash: options.contentHash || undefined
+    });
     onProgress?.({ progress: 80, status: 'uploading' });
     const url = await getDownloadURL(snapshot.ref);
 
@@ -234,6 +261,8 @@ export async function deletePatientFile(fileUrl: string): Promise<void> {
   try {
     const fileRef = ref(storage, fileUrl);
     await deleteObject(fileRef);
+    invalidateStorageUsageForPath(fileRef.fullPath);
+    await unindexDocument(fileRef.fullPath);
   } catch (error) {
     console.error('Error deleting file:', error);
     throw new Error('Erreur lors de la suppression du fichier');
@@ -1,4 +1,4 @@
-import { getDocs, onSnapshot, Query } from 'firebase/firestore';
+import { getDocs, onSnapshot, Query, DocumentData, QuerySnapshot } from 'firebase/firestore';
 
 /**
  * Configure a Firestore onSnapshot listener safely:
@@ -8,19 +8,363 @@ import { getDocs, onSnapshot, Query } from 'firebase/firestore';
  *
  * This reduces noisy aborted network logs by avoiding listeners for queries
  * that would be rejected by rules or fail due to environment constraints.
+ *
+ * With `validate: false` the initial getDocs is skipped, for callers whose
+ * first snapshot already carries the data they need (the reads would
+ * otherwise be billed twice). `includeMetadataChanges` also delivers
+ * snapshots that only change metadata (e.g. back online, fromCache false).
  */
 export async function setupSafeSnapshot(
   q: Query,
   next: (snapshot: any) => void,
-  error: (err: Error) => void
+  error: (err: Error) => void,
+  options: { validate?: boolean; includeMetadataChanges?: boolean } = {}
 ): Promise<() => void> {
-  try {
-    await getDocs(q);
-  } catch (err) {
-    error(err as Error);
-    return () => {};
+  if (options.validate !== false) {
+    try {
+      await getDocs(q);
+    } catch (err) {
+      error(err as Error);
+      return () => {};
+    }
   }
 
-  const unsubscribe = onSnapshot(q, next, (err) => error(err as Error));
+  const unsubscribe = options.includeMetadataChanges
+    ? onSnapshot(q, { includeMetadataChanges: true }, next, (err) => error(err as Error))
+    : onSnapshot(q, next, (err) => error(err as Error));
   return () => unsubscribe();
-}
\ No newline at end of file
+}
+
+// Durée pendant laquelle une requête sans abonné reste écoutée : un retour
+// sur l'onglet dans ce délai est servi sans nouvelle lecture
+const LIVE_QUERY_IDLE_MS = 5 * 60 * 1000;
+
+export interface LiveDoc {
+  id: string;
+  data: DocumentData;
+}
+
+/**
+ * Requête partagée : toutes les sources de même clé doivent décrire la même
+ * requête et le même décodage (déchiffrement...). `decode` ne reçoit que les
+ * documents ajoutés ou modifiés depuis le dernier snapshot et rend un élément
+ * par document, dans le même ordre.
+ *
+ * `bootstrap` peut fournir les documents déjà connus (copie locale) et des
+ * requêtes restreintes aux changements, écoutées à la place de `query` ;
+ * `onChanges` reçoit alors les changements de ces requêtes pour les
+ * conserver. Ces requêtes ne voient pas les suppressions faites ailleurs :
+ * `reconcile` est appelée à chaque reconnexion avec le nombre de documents
+ * connus et rend les identifiants encore présents sur le serveur, ou null si
+ * rien n'a disparu.
+ */
+export interface LiveQuerySource<T> {
+  key: string;
+  query: () => Query;
+  decode: (docs: LiveDoc[]) => Promise<T[]>;
+  bootstrap?: () => Promise<{ docs: LiveDoc[]; queries: Query[] } | null>;
+  onChanges?: (upserted: LiveDoc[], removedIds: string[]) => void;
+  reconcile?: (knownCount: number) => Promise<Set<string> | null>;
+}
+
+interface LiveQueryEntry {
+  items: Map<string, any>;
+  // loaded : une valeur existe (éventuellement périmée) ; synced : l'écoute
+  // en cours a livré son premier snapshot
+  loaded: boolean;
+  synced: boolean;
+  live: boolean;
+  error: Error | null;
+  refCount: number;
+  stop: (() => void) | null;
+  idleTimer: ReturnType<typeof setTimeout> | null;
+  // Les snapshots sont appliqués l'un après l'autre (décodage asynchrone)
+  applying: Promise<void>;
+  listeners: Set<(items: any[]) => void>;
+  errorListeners: Set<(err: Error) => void>;
+  waiters: { resolve: () => void; reject: (err: Error) => void }[];
+}
+
+const liveQueries = new Map<string, LiveQueryEntry>();
+
+function getEntry(key: string): LiveQueryEntry {
+  let entry = liveQueries.get(key);
+  if (!entry) {
+    entry = {
+      items: new Map(),
+      loaded: false,
+      synced: false,
+      live: false,
+      error: null,
+      refCount: 0,
+      stop: null,
+      idleTimer: null,
+      applying: Promise.resolve(),
+      listeners: new Set(),
+      errorListeners: new Set(),
+      waiters: []
+    };
+    liveQueries.set(key, entry);
+  }
+  return entry;
+}
+
+/**
+ * Applique des changements à l'index. `present` (premier résultat complet
+ * d'une écoute) retire les documents disparus pendant l'interruption.
+ */
+async function applyChanges<T>(
+  entry: LiveQueryEntry,
+  source: LiveQuerySource<T>,
+  upserted: LiveDoc[],
+  removedIds: string[],
+  present: Set<string> | null
+): Promise<void> {
+  if (present && !entry.synced) {
+    Array.from(entry.items.keys()).forEach(id => {
+      if (!present.has(id)) entry.items.delete(id);
+    });
+  }
+  removedIds.forEach(id => entry.items.delete(id));
+
+  if (upserted.length > 0) {
+    const decoded = await source.decode(upserted);
+    upserted.forEach((doc, index) => entry.items.set(doc.id, decoded[index]));
+  }
+
+  const firstSnapshot = !entry.synced;
+  entry.loaded = true;
+  entry.synced = true;
+  entry.waiters.splice(0).forEach(waiter => waiter.resolve());
+  if (firstSnapshot || upserted.length > 0 || removedIds.length > 0) {
+    const items = Array.from(entry.items.values());
+    entry.listeners.forEach(listener => listener(items));
+  }
+}
+
+function enqueue(key: string, entry: LiveQueryEntry, task: () => Promise<void>): void {
+  entry.applying = entry.applying
+    .then(task)
+    .catch(err => failEntry(key, entry, err as Error));
+}
+
+function failEntry(key: string, entry: LiveQueryEntry, err: Error): void {
+  entry.stop?.();
+  entry.stop = null;
+  entry.live = false;
+  entry.synced = false;
+  entry.error = err;
+  entry.waiters.splice(0).forEach(waiter => waiter.reject(err));
+  entry.errorListeners.forEach(listener => listener(err));
+  if (!entry.loaded && entry.refCount === 0) {
+    liveQueries.delete(key);
+  }
+}
+
+function startListening<T>(entry: LiveQueryEntry, source: LiveQuerySource<T>): void {
+  if (entry.live) return;
+  entry.live = true;
+  entry.synced = false;
+  entry.error = null;
+  let cancelled = false;
+  const unsubscribers: (() => void)[] = [];
+  entry.stop = () => {
+    cancelled = true;
+    unsubscribers.splice(0).forEach(unsubscribe => unsubscribe());
+  };
+
+  // Une vérification à la fois, même si plusieurs requêtes se reconnectent
+  let reconciling = false;
+  const reconcile = () => {
+    if (!source.reconcile || reconciling) return;
+    reconciling = true;
+    enqueue(source.key, entry, async () => {
+      try {
+        const present = await source.reconcile!(entry.items.size);
+        if (cancelled || !present) return;
+        const removedIds = Array.from(entry.items.keys()).filter(id => !present.has(id));
+        await applyChanges(entry, source, [], removedIds, null);
+      } catch (err) {
+        console.warn(`⚠️ Reconcile failed for ${source.key}:`, (err as Error)?.message || String(err));
+      } finally {
+        reconciling = false;
+      }
+    });
+  };
+
+  // full : la requête rend toute la collection (sinon, seulement les changements)
+  const listen = (q: Query, full: boolean) => {
+    let offline = false;
+    setupSafeSnapshot(
+      q,
+      (snapshot: QuerySnapshot) => {
+        if (cancelled) return;
+        // Retour du serveur après une coupure : les suppressions faites
+        // entre-temps ailleurs n'apparaîtront pas dans les changements
+        let reconnected = false;
+        if (!full && snapshot.metadata) {
+          reconnected = offline && !snapshot.metadata.fromCache;
+          offline = snapshot.metadata.fromCache;
+        }
+        const upserted: LiveDoc[] = [];
+        const removedIds: string[] = [];
+        snapshot.docChanges().forEach(change => {
+          if (change.type === 'removed') {
+            removedIds.push(change.doc.id);
+          } else {
+            upserted.push({ id: change.doc.id, data: change.doc.data() });
+          }
+        });
+        const present = full ? new Set(snapshot.docs.map(docSnap => docSnap.id)) : null;
+        enqueue(source.key, entry, async () => {
+          await applyChanges(entry, source, upserted, removedIds, present);
+          if (!full && (upserted.length > 0 || removedIds.length > 0)) {
+            source.onChanges?.(upserted, removedIds);
+          }
+        });
+        // Après les changements de ce snapshot, pour comparer des comptes à jour
+        if (reconnected) reconcile();
+      },
+      (err) => {
+        if (!cancelled) failEntry(source.key, entry, err);
+      },
+      { validate: false, includeMetadataChanges: !full && !!source.reconcile }
+    ).then(unsubscribe => {
+      if (cancelled) {
+        unsubscribe();
+      } else {
+        unsubscribers.push(unsubscribe);
+      }
+    });
+  };
+
+  if (!source.bootstrap) {
+    listen(source.query(), true);
+    return;
+  }
+
+  enqueue(source.key, entry, async () => {
+    const boot = await source.bootstrap!().catch(err => {
+      console.warn(`⚠️ Bootstrap failed for ${source.key}:`, (err as Error)?.message || String(err));
+      return null;
+    });
+    if (cancelled) return;
+    if (!boot) {
+      listen(source.query(), true);
+      return;
+    }
+    await applyChanges(entry, source, boot.docs, [], new Set(boot.docs.map(doc => doc.id)));
+    boot.queries.forEach(q => listen(q, false));
+  });
+}
+
+function retain(entry: LiveQueryEntry): void {
+  entry.refCount++;
+  if (entry.idleTimer) {
+    clearTimeout(entry.idleTimer);
+    entry.idleTimer = null;
+  }
+}
+
+function release(entry: LiveQueryEntry): void {
+  entry.refCount--;
+  if (entry.refCount > 0 || entry.idleTimer) return;
+  entry.idleTimer = setTimeout(() => {
+    entry.idleTimer = null;
+    if (entry.refCount > 0) return;
+    // Les éléments restent en mémoire : ils serviront de valeur périmée
+    // pendant la revalidation de la prochaine lecture
+    entry.stop?.();
+    entry.stop = null;
+    entry.live = false;
+    entry.synced = false;
+  }, LIVE_QUERY_IDLE_MS);
+}
+
+function whenLoaded(entry: LiveQueryEntry): Promise<void> {
+  if (entry.synced) {
+    return entry.applying;
+  }
+  if (!entry.live) {
+    return Promise.reject(entry.error || new Error('Requête interrompue'));
+  }
+  // Les snapshots arrivés entre-temps sont appliqués avant de rendre la main
+  return new Promise<void>((resolve, reject) => entry.waiters.push({ resolve, reject }))
+    .then(() => entry.applying);
+}
+
+/**
+ * Lit le résultat d'une requête partagée. Une seule écoute onSnapshot existe
+ * par clé ; elle est démarrée à la première lecture et maintenue quelques
+ * minutes après la dernière, de sorte que les lectures suivantes ne coûtent
+ * aucun accès réseau. Avec `allowStale`, une valeur déjà connue est rendue
+ * immédiatement pendant que l'écoute est relancée.
+ */
+export async function readLiveQuery<T>(
+  source: LiveQuerySource<T>,
+  options: { allowStale?: boolean } = {}
+): Promise<T[]> {
+  const entry = getEntry(source.key);
+  retain(entry);
+  try {
+    const stale = entry.loaded && !entry.live;
+    startListening(entry, source);
+    if (!(stale && options.allowStale)) {
+      await whenLoaded(entry);
+    }
+    return Array.from(entry.items.values());
+  } finally {
+    release(entry);
+  }
+}
+
+/**
+ * S'abonne au résultat d'une requête partagée : `listener` reçoit la valeur
+ * connue (même périmée) tout de suite, puis chaque mise à jour.
+ */
+export function subscribeLiveQuery<T>(
+  source: LiveQuerySource<T>,
+  listener: (items: T[]) => void,
+  onError?: (err: Error) => void
+): () => void {
+  const entry = getEntry(source.key);
+  retain(entry);
+  entry.listeners.add(listener);
+  if (onError) entry.errorListeners.add(onError);
+  if (entry.loaded) {
+    listener(Array.from(entry.items.values()));
+  }
+  startListening(entry, source);
+
+  return () => {
+    entry.listeners.delete(listener);
+    if (onError) entry.errorListeners.delete(onError);
+    release(entry);
+  };
+}
+
+/**
+ * Retire un document supprimé par l'application. Les écoutes restreintes aux
+ * changements (bootstrap) ne voient pas la suppression d'un document ancien.
+ */
+export function removeLiveDocument(key: string, id: string): void {
+  const entry = liveQueries.get(key);
+  if (!entry || !entry.items.has(id)) return;
+  enqueue(key, entry, async () => {
+    entry.items.delete(id);
+    const items = Array.from(entry.items.values());
+    entry.listeners.forEach(listener => listener(items));
+  });
+}
+
+/**
+ * Arrête toutes les écoutes et oublie leurs résultats (déconnexion)
+ */
+export function clearLiveQueries(): void {
+  liveQueries.forEach(entry => {
+    if (entry.idleTimer) clearTimeout(entry.idleTimer);
+    entry.stop?.();
+    entry.waiters.splice(0).forEach(waiter => waiter.reject(new Error('Requête annulée')));
+  });
+  liveQueries.clear();
+}
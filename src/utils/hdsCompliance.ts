@@ -1,6 +1,7 @@
 import { doc, updateDoc, getDoc, setDoc } from 'firebase/firestore';
 import { db, auth, hdsConfig } from '../firebase/config';
 import { encryptData, decryptData, pseudonymizeData, isEncrypted, isValidEncryptedFormat, attemptDataRepair } from './encryption';
+import { encryptMany, decryptMany } from './cryptoWorkerPool';
 import { AuditLogger, AuditEventType, SensitivityLevel } from './auditLogger';
 
 /**
@@ -100,6 +101,18 @@ const SENSITIVE_FIELDS: Record<string, string[]> = {
   ]
 };
 
+// ✅ AJOUT: Liste des champs cliniques qui doivent TOUJOURS être sauvegardés même s'ils sont vides
+const CLINICAL_FIELDS = [
+  'currentTreatment',
+  'consultationReason',
+  'medicalAntecedents',
+  'medicalHistory',
+  'osteopathicTreatment',
+  'notes',
+  'reason',
+  'treatment'
+];
+
 // Champs à pseudonymiser
 const PSEUDONYMIZED_FIELDS: Record<string, string[]> = {
   patients: ['socialSecurityNumber', 'email', 'phone'],
@@ -128,25 +141,87 @@ export class HDSCompliance {
   ): any {
     if (!data) return data;
     
+    const { processedData, fieldsToEncrypt } = this.initStorageData(data, collectionName);
+
+    // Chiffrement des champs sensibles (uniquement si HDS activé)
+    if (this.isEnabled()) {
+      fieldsToEncrypt.forEach(field => {
+        try {
+          // Chiffrer toutes les valeurs (y compris les chaînes vides initialisées)
+          const value = processedData[field];
+          const valueToEncrypt = this.storageValue(field, value);
+          processedData[field] = encryptData(valueToEncrypt, userId);
+
+          // Log pour le champ notes spécifiquement
+          if (field === 'notes') {
+            console.log(`🔍 HDS - Chiffrement du champ notes:`, {
+              originalValue: value,
+              valueToEncrypt: valueToEncrypt,
+              encrypted: processedData[field]
+            });
+          }
+
+          // Log pour les champs cliniques vides
+          if (CLINICAL_FIELDS.includes(field) && valueToEncrypt === '') {
+            console.log(`✅ Champ clinique vide chiffré: ${field}`);
+          }
+        } catch (error) {
+          console.error(`❌ Failed to encrypt field ${field}:`, error);
+          // Marquer le champ comme ayant une erreur de chiffrement
+          processedData[field] = `[ENCRYPTION_ERROR]:${processedData[field]}`;
+        }
+      });
+    }
+    
+    return this.finalizeStorageData(processedData, collectionName, userId, fieldsToEncrypt);
+  }
+
+  /**
+   * Prépare un lot de documents pour stockage : même résultat que
+   * prepareDataForStorage, mais tous les champs de tous les documents sont
+   * chiffrés en un seul appel au pool de workers (encryptMany).
+   */
+  static async prepareDocumentsForStorage(
+    documents: any[],
+    collectionName: string,
+    userId: string
+  ): Promise<any[]> {
+    const prepared = documents.map(data => (data ? this.initStorageData(data, collectionName) : null));
+
+    if (this.isEnabled()) {
+      const targets: Array<{ processedData: any; field: string }> = [];
+      const values: any[] = [];
+      prepared.forEach(entry => {
+        entry?.fieldsToEncrypt.forEach(field => {
+          targets.push({ processedData: entry.processedData, field });
+          values.push(this.storageValue(field, entry.processedData[field]));
+        });
+      });
+      const encrypted = await encryptMany(values, userId);
+      encrypted.forEach((value, i) => {
+        targets[i].processedData[targets[i].field] = value;
+      });
+    }
+
+    return prepared.map((entry, index) => entry
+      ? this.finalizeStorageData(entry.processedData, collectionName, userId, entry.fieldsToEncrypt)
+      : documents[index]);
+  }
+
+  /**
+   * Clone les données et liste les champs sensibles restant à chiffrer
+   */
+  private static initStorageData(
+    data: any,
+    collectionName: string
+  ): { processedData: any; fieldsToEncrypt: string[] } {
     // Clone des données
     const processedData = { ...data };
 
-    // ✅ AJOUT: Liste des champs cliniques qui doivent TOUJOURS être sauvegardés même s'ils sont vides
-    const clinicalFields = [
-      'currentTreatment',
-      'consultationReason',
-      'medicalAntecedents',
-      'medicalHistory',
-      'osteopathicTreatment',
-      'notes',
-      'reason',
-      'treatment'
-    ];
-
     // ✅ CORRECTION: Initialiser les champs cliniques vides AVANT le filtrage
     // Ceci garantit qu'ils seront inclus dans fieldsToEncrypt
     if (collectionName === 'consultations') {
-      clinicalFields.forEach(field => {
+      CLINICAL_FIELDS.forEach(field => {
         if (processedData[field] === undefined || processedData[field] === null || processedData[field] === '') {
           processedData[field] = ''; // Initialiser avec chaîne vide
         }
@@ -161,43 +236,30 @@ export class HDSCompliance {
       !isEncrypted(processedData[field])
     );
 
-    // Chiffrement des champs sensibles (uniquement si HDS activé)
-    if (this.isEnabled()) {
-      fieldsToEncrypt.forEach(field => {
-        try {
-          // Chiffrer toutes les valeurs (y compris les chaînes vides initialisées)
-          const value = processedData[field];
-
-          // Gestion spéciale pour les objets complexes comme address
-          if (field === 'address' && typeof value === 'object') {
-            processedData[field] = encryptData(value, userId);
-          } else {
-            // Chiffrer la valeur (convertir en string, même vide)
-            const valueToEncrypt = String(value || '');
-            processedData[field] = encryptData(valueToEncrypt, userId);
-
-            // Log pour le champ notes spécifiquement
-            if (field === 'notes') {
-              console.log(`🔍 HDS - Chiffrement du champ notes:`, {
-                originalValue: value,
-                valueToEncrypt: valueToEncrypt,
-                encrypted: processedData[field]
-              });
-            }
+    return { processedData, fieldsToEncrypt };
+  }
 
-            // Log pour les champs cliniques vides
-            if (clinicalFields.includes(field) && valueToEncrypt === '') {
-              console.log(`✅ Champ clinique vide chiffré: ${field}`);
-            }
-          }
-        } catch (error) {
-          console.error(`❌ Failed to encrypt field ${field}:`, error);
-          // Marquer le champ comme ayant une erreur de chiffrement
-          processedData[field] = `[ENCRYPTION_ERROR]:${processedData[field]}`;
-        }
-      });
+  /**
+   * Valeur effectivement chiffrée pour un champ
+   */
+  private static storageValue(field: string, value: any): any {
+    // Gestion spéciale pour les objets complexes comme address
+    if (field === 'address' && typeof value === 'object') {
+      return value;
     }
-    
+    // Chiffrer la valeur (convertir en string, même vide)
+    return String(value || '');
+  }
+
+  /**
+   * Ajoute l'index pseudonymisé et les métadonnées HDS
+   */
+  private static finalizeStorageData(
+    processedData: any,
+    collectionName: string,
+    userId: string,
+    fieldsToEncrypt: string[]
+  ): any {
     // Pseudonymisation si nécessaire
     const pseudoFields = PSEUDONYMIZED_FIELDS[collectionName] || [];
     if (pseudoFields.length > 0) {
@@ -403,6 +465,53 @@ export class HDSCompliance {
     return convertTimestampsToISOStrings(processedData);
   }
   
+  /**
+   * Déchiffre un lot de documents (typiquement un snapshot de requête) pour affichage.
+   * Tous les champs chiffrés de tous les documents sont déchiffrés en un seul
+   * appel au pool de workers (decryptMany, Web Crypto dans chaque worker),
+   * hors du thread principal, puis chaque document suit le
+   * traitement habituel de decryptDataForDisplay. Un champ que le lot n'a pas
+   * pu déchiffrer y est retraité par le chemin CryptoJS existant.
+   */
+  static async decryptDocumentsForDisplay(
+    documents: any[],
+    collectionName: string,
+    userId: string
+  ): Promise<any[]> {
+    const fields = [...(SENSITIVE_FIELDS[collectionName] || [])];
+    if (!fields.includes('address')) {
+      fields.push('address');
+    }
+
+    const targets: Array<{ index: number; field: string }> = [];
+    const values: string[] = [];
+    documents.forEach((data, index) => {
+      if (!data) return;
+      for (const field of fields) {
+        const value = data[field];
+        if (typeof value === 'string' && isEncrypted(value)) {
+          targets.push({ index, field });
+          values.push(value);
+        }
+      }
+    });
+
+    const prepared = documents.map(data => (data ? { ...data } : data));
+    if (values.length > 0) {
+      const decrypted = await decryptMany(values, userId);
+      decrypted.forEach((value, i) => {
+        const failed = value === undefined || value === null ||
+          (typeof value === 'string' && value.startsWith('['));
+        if (!failed) {
+          const { index, field } = targets[i];
+          prepared[index][field] = field === 'address' && typeof value === 'string' ? { street: value } : value;
+        }
+      });
+    }
+
+    return prepared.map(data => this.decryptDataForDisplay(data, collectionName, userId));
+  }
+
   /**
    * Sauvegarde des données conformes HDS
    */
@@ -418,7 +527,7 @@ export class HDSCompliance {
     try {
       // Préparation des données
       const userId = auth.currentUser.uid;
-      const compliantData = this.prepareDataForStorage(data, collectionName, userId);
+      const [compliantData] = await this.prepareDocumentsForStorage([data], collectionName, userId);
       
       // Sauvegarde dans Firestore
       const docRef = doc(db, collectionName, docId);
@@ -650,7 +759,7 @@ export class HDSCompliance {
       
       // Préparation des données conformes
       const userId = auth.currentUser.uid;
-      const compliantData = this.prepareDataForStorage(data, collectionName, userId);
+      const [compliantData] = await this.prepareDocumentsForStorage([data], collectionName, userId);
       
       // Mise à jour dans Firestore
       await updateDoc(docRef, compliantData);
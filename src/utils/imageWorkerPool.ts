@@ -0,0 +1,116 @@
+import { ImageCompressionSettings, ImageWorkerRequest, ImageWorkerResponse } from '../workers/imageMessages';
+
+// Décoder et réencoder une photo mobilise un cœur et plusieurs dizaines de Mo
+const MAX_WORKERS = 4;
+
+interface PendingRequest {
+  resolve: (image: Blob | null) => void;
+  reject: (error: Error) => void;
+}
+
+interface PooledWorker {
+  worker: Worker;
+  pending: Map<number, PendingRequest>;
+}
+
+let pool: PooledWorker[] | null = null;
+let poolDisabled = false;
+let nextRequestId = 0;
+
+/**
+ * Nombre de workers du pool : c'est aussi le nombre de compressions utiles
+ * en parallèle
+ */
+export function getImageWorkerCount(): number {
+  const cores = typeof navigator !== 'undefined' && navigator.hardwareConcurrency
+    ? navigator.hardwareConcurrency
+    : 2;
+  return Math.max(1, Math.min(cores - 1, MAX_WORKERS));
+}
+
+function spawnWorker(): PooledWorker {
+  const worker = new Worker(new URL('../workers/image.worker.ts', import.meta.url), { type: 'module' });
+  const entry: PooledWorker = { worker, pending: new Map() };
+
+  worker.onmessage = (event: MessageEvent<ImageWorkerResponse>) => {
+    const { id, image, error } = event.data;
+    const request = entry.pending.get(id);
+    if (!request) return;
+    entry.pending.delete(id);
+    if (error) {
+      request.reject(new Error(error));
+    } else {
+      request.resolve(image ?? null);
+    }
+  };
+
+  worker.onerror = (event: ErrorEvent) => {
+    // Script introuvable, CSP... : la compression repasse sur le thread principal
+    event.preventDefault();
+    console.warn('⚠️ Image worker failed, falling back to main thread:', event.message);
+    const error = new Error(event.message || 'Worker de compression indisponible');
+    entry.pending.forEach(request => request.reject(error));
+    entry.pending.clear();
+    terminateImageWorkers();
+    poolDisabled = true;
+  };
+
+  return entry;
+}
+
+function getPool(): PooledWorker[] | null {
+  if (pool) return pool;
+  if (poolDisabled || typeof Worker === 'undefined' || typeof OffscreenCanvas === 'undefined') return null;
+  try {
+    pool = Array.from({ length: getImageWorkerCount() }, spawnWorker);
+  } catch (error) {
+    console.warn('⚠️ Image workers unavailable, falling back to main thread:', error);
+    poolDisabled = true;
+    return null;
+  }
+  return pool;
+}
+
+/**
+ * Compresse une image dans le pool de workers (OffscreenCanvas). Résout avec
+ * le fichier compressé, ou l'original si la compression n'apporte rien ; null
+ * si aucun worker n'est disponible ou si le worker n'a pas pu traiter l'image
+ * (format non décodable...) : l'appelant compresse alors sur le thread
+ * principal.
+ */
+export async function compressImageInWorker(file: File, settings: ImageCompressionSettings): Promise<File | null> {
+  const workers = getPool();
+  if (!workers) return null;
+
+  // Le worker le moins chargé reçoit l'image
+  const entry = workers.reduce((best, candidate) =>
+    candidate.pending.size < best.pending.size ? candidate : best
+  );
+  const id = nextRequestId++;
+
+  try {
+    const image = await new Promise<Blob | null>((resolve, reject) => {
+      entry.pending.set(id, { resolve, reject });
+      const request: ImageWorkerRequest = { id, image: file, settings };
+      entry.worker.postMessage(request);
+    });
+    return image
+      ? new File([image], file.name, { type: image.type || file.type, lastModified: file.lastModified })
+      : file;
+  } catch (error) {
+    console.warn('⚠️ Image worker compression failed:', file.name, (error as Error)?.message || String(error));
+    return null;
+  }
+}
+
+/**
+ * Arrête les workers du pool (ils seront recréés à la prochaine image)
+ */
+export function terminateImageWorkers(): void {
+  pool?.forEach(({ worker, pending }) => {
+    worker.terminate();
+    pending.forEach(request => request.reject(new Error('Worker de compression arrêté')));
+  });
+  pool = null;
+  poolDisabled = false;
+}
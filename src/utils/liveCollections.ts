@@ -0,0 +1,56 @@
+import { collection, query, where, DocumentData } from 'firebase/firestore';
+import { db } from '../firebase/config';
+import { LiveQuerySource, removeLiveDocument } from './firestoreListener';
+import { syncCollection, changedSinceQueries, persistChanges, reconcileCollection } from './offlineStore';
+import HDSCompliance from './hdsCompliance';
+
+export type LiveRecord = DocumentData & { id: string };
+
+function liveKey(collectionName: string, osteopathId: string): string {
+  return `${collectionName}:${osteopathId}`;
+}
+
+/**
+ * Source partagée des documents d'une collection appartenant à un ostéopathe,
+ * déchiffrés pour l'affichage (seuls les documents modifiés repassent par le
+ * déchiffrement). Les champs non chiffrés (dates...) sont rendus tels que
+ * stockés.
+ *
+ * Au démarrage, la copie locale IndexedDB (documents chiffrés) est complétée
+ * des seuls documents modifiés depuis la dernière synchronisation, puis seuls
+ * les changements suivants sont écoutés. À chaque reconnexion, un comptage
+ * serveur détecte les suppressions faites depuis un autre appareil.
+ */
+export function osteopathCollection(collectionName: string, osteopathId: string): LiveQuerySource<LiveRecord> {
+  return {
+    key: liveKey(collectionName, osteopathId),
+    query: () => query(collection(db, collectionName), where('osteopathId', '==', osteopathId)),
+    decode: async docs => {
+      const decrypted = await HDSCompliance.decryptDocumentsForDisplay(
+        docs.map(docChange => docChange.data),
+        collectionName,
+        osteopathId
+      );
+      return decrypted.map((data, index) => ({ ...data, id: docs[index].id }));
+    },
+    bootstrap: async () => {
+      const synced = await syncCollection(collectionName, osteopathId);
+      return synced && {
+        docs: synced.docs,
+        queries: changedSinceQueries(collectionName, osteopathId, synced.watermark)
+      };
+    },
+    onChanges: (upserted, removedIds) => {
+      persistChanges(collectionName, osteopathId, upserted, removedIds);
+    },
+    reconcile: knownCount => reconcileCollection(collectionName, osteopathId, knownCount)
+  };
+}
+
+/**
+ * À appeler après la suppression d'un document par l'application
+ */
+export function forgetDocument(collectionName: string, osteopathId: string, id: string): void {
+  removeLiveDocument(liveKey(collectionName, osteopathId), id);
+  persistChanges(collectionName, osteopathId, [], [id]);
+}
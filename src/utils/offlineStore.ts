@@ -0,0 +1,308 @@
+import {
+  collection,
+  query,
+  where,
+  getDocs,
+  getCountFromServer,
+  Timestamp,
+  Query,
+  DocumentData
+} from 'firebase/firestore';
+import { db } from '../firebase/config';
+import type { LiveDoc } from './firestoreListener';
+
+const DB_NAME = 'osteoapp-offline';
+const DB_VERSION = 1;
+const DOCS_STORE = 'documents';
+const META_STORE = 'meta';
+// updatedAt est fixé par l'horloge de chaque poste : les changements sont
+// relus avec cette marge sous le filigrane
+const WATERMARK_MARGIN_MS = 10 * 60 * 1000;
+// Resynchronisation complète périodique, pour les écritures qui ne mettent
+// pas updatedAt à jour
+const FULL_SYNC_INTERVAL_MS = 24 * 60 * 60 * 1000;
+
+interface StoredDoc {
+  scope: string;
+  id: string;
+  data: DocumentData;
+}
+
+interface ScopeMeta {
+  scope: string;
+  watermark: number;
+  fullSyncAt: number;
+}
+
+export interface OfflineSyncResult {
+  docs: LiveDoc[];
+  // Plus grand updatedAt connu (ms)
+  watermark: number;
+  // Documents lus sur le serveur pendant la synchronisation
+  fetched: number;
+}
+
+let dbPromise: Promise<IDBDatabase | null> | null = null;
+
+function promisify<T>(request: IDBRequest<T>): Promise<T> {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+function transactionDone(tx: IDBTransaction): Promise<void> {
+  return new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve();
+    tx.onerror = () => reject(tx.error);
+    tx.onabort = () => reject(tx.error);
+  });
+}
+
+function openDatabase(): Promise<IDBDatabase | null> {
+  if (dbPromise) return dbPromise;
+  if (typeof indexedDB === 'undefined') {
+    return Promise.resolve(null);
+  }
+  dbPromise = new Promise<IDBDatabase | null>(resolve => {
+    const request = indexedDB.open(DB_NAME, DB_VERSION);
+    request.onupgradeneeded = () => {
+      const database = request.result;
+      const docs = database.createObjectStore(DOCS_STORE, { keyPath: ['scope', 'id'] });
+      docs.createIndex('scope', 'scope');
+      database.createObjectStore(META_STORE, { keyPath: 'scope' });
+    };
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => {
+      console.warn('⚠️ Offline store unavailable:', request.error);
+      resolve(null);
+    };
+  });
+  return dbPromise;
+}
+
+function scopeOf(collectionName: string, osteopathId: string): string {
+  return `${collectionName}:${osteopathId}`;
+}
+
+/**
+ * updatedAt en millisecondes, quel que soit son type de stockage
+ * (Timestamp, chaîne ISO, Date) ; 0 si absent ou illisible
+ */
+export function updatedAtMillis(value: any): number {
+  if (!value) return 0;
+  if (typeof value.toMillis === 'function') return value.toMillis();
+  if (typeof value.seconds === 'number') return value.seconds * 1000;
+  const time = new Date(value).getTime();
+  return isNaN(time) ? 0 : time;
+}
+
+/**
+ * Les Timestamp perdent leur prototype dans IndexedDB : ils sont stockés
+ * en millisecondes et recréés à la lecture
+ */
+export function serializeData(value: any): any {
+  if (value && typeof value.toMillis === 'function' && typeof value.seconds === 'number') {
+    return { __timestamp: value.toMillis() };
+  }
+  if (Array.isArray(value)) return value.map(serializeData);
+  if (value && typeof value === 'object' && !(value instanceof Date)) {
+    const result: Record<string, any> = {};
+    Object.keys(value).forEach(key => {
+      result[key] = serializeData(value[key]);
+    });
+    return result;
+  }
+  return value;
+}
+
+export function deserializeData(value: any): any {
+  if (value && typeof value === 'object' && typeof value.__timestamp === 'number') {
+    return Timestamp.fromMillis(value.__timestamp);
+  }
+  if (Array.isArray(value)) return value.map(deserializeData);
+  if (value && typeof value === 'object' && !(value instanceof Date)) {
+    const result: Record<string, any> = {};
+    Object.keys(value).forEach(key => {
+      result[key] = deserializeData(value[key]);
+    });
+    return result;
+  }
+  return value;
+}
+
+function maxUpdatedAt(docs: LiveDoc[], initial: number): number {
+  return docs.reduce((max, { data }) => Math.max(max, updatedAtMillis(data.updatedAt)), initial);
+}
+
+function baseQuery(collectionName: string, osteopathId: string): Query {
+  return query(collection(db, collectionName), where('osteopathId', '==', osteopathId));
+}
+
+/**
+ * Requêtes des documents modifiés après `since`. updatedAt est tantôt une
+ * chaîne ISO, tantôt un Timestamp ; Firestore ne compare que des valeurs de
+ * même type, d'où une requête par type.
+ */
+export function changedSinceQueries(collectionName: string, osteopathId: string, since: number): Query[] {
+  const from = Math.max(0, since - WATERMARK_MARGIN_MS);
+  const byOsteopath = where('osteopathId', '==', osteopathId);
+  const ref = collection(db, collectionName);
+  return [
+    query(ref, byOsteopath, where('updatedAt', '>', new Date(from).toISOString())),
+    query(ref, byOsteopath, where('updatedAt', '>', Timestamp.fromMillis(from)))
+  ];
+}
+
+async function readScope(database: IDBDatabase, scope: string): Promise<{ meta: ScopeMeta | undefined; docs: LiveDoc[] }> {
+  const tx = database.transaction([DOCS_STORE, META_STORE], 'readonly');
+  const [meta, stored] = await Promise.all([
+    promisify<ScopeMeta | undefined>(tx.objectStore(META_STORE).get(scope)),
+    promisify<StoredDoc[]>(tx.objectStore(DOCS_STORE).index('scope').getAll(scope))
+  ]);
+  return {
+    meta,
+    docs: stored.map(({ id, data }) => ({ id, data: deserializeData(data) }))
+  };
+}
+
+async function writeScope(
+  database: IDBDatabase,
+  scope: string,
+  upserted: LiveDoc[],
+  removedIds: string[],
+  meta: ScopeMeta | null,
+  replace: boolean
+): Promise<void> {
+  const tx = database.transaction([DOCS_STORE, META_STORE], 'readwrite');
+  const docs = tx.objectStore(DOCS_STORE);
+  if (replace) {
+    // Les tableaux se classent après les chaînes : [scope, []] borne tous les id
+    docs.delete(IDBKeyRange.bound([scope], [scope, []]));
+  }
+  removedIds.forEach(id => docs.delete([scope, id]));
+  upserted.forEach(({ id, data }) => docs.put({ scope, id, data: serializeData(data) } as StoredDoc));
+  if (meta) {
+    tx.objectStore(META_STORE).put(meta);
+  }
+  await transactionDone(tx);
+}
+
+async function fullSync(database: IDBDatabase, collectionName: string, osteopathId: string): Promise<OfflineSyncResult> {
+  const snapshot = await getDocs(baseQuery(collectionName, osteopathId));
+  const docs = snapshot.docs.map(docSnap => ({ id: docSnap.id, data: docSnap.data() }));
+  const watermark = maxUpdatedAt(docs, 0);
+  await writeScope(
+    database,
+    scopeOf(collectionName, osteopathId),
+    docs,
+    [],
+    { scope: scopeOf(collectionName, osteopathId), watermark, fullSyncAt: Date.now() },
+    true
+  );
+  return { docs, watermark, fetched: docs.length };
+}
+
+/**
+ * Synchronise la copie locale (documents toujours chiffrés) d'une collection
+ * de l'ostéopathe : seuls les documents modifiés depuis le filigrane sont lus
+ * sur le serveur. Un comptage serveur détecte les suppressions ; en cas
+ * d'écart, ou si la dernière synchronisation complète est ancienne, la
+ * collection est relue entièrement. Retourne null sans IndexedDB ou en cas
+ * d'échec (l'appelant lit alors la collection normalement).
+ */
+export async function syncCollection(collectionName: string, osteopathId: string): Promise<OfflineSyncResult | null> {
+  const database = await openDatabase();
+  if (!database) return null;
+
+  try {
+    const scope = scopeOf(collectionName, osteopathId);
+    const { meta, docs } = await readScope(database, scope);
+    if (!meta || Date.now() - meta.fullSyncAt > FULL_SYNC_INTERVAL_MS) {
+      return await fullSync(database, collectionName, osteopathId);
+    }
+
+    const snapshots = await Promise.all(
+      changedSinceQueries(collectionName, osteopathId, meta.watermark).map(q => getDocs(q))
+    );
+    const changed = snapshots.flatMap(snapshot =>
+      snapshot.docs.map(docSnap => ({ id: docSnap.id, data: docSnap.data() }))
+    );
+    const byId = new Map(docs.map(doc => [doc.id, doc]));
+    changed.forEach(doc => byId.set(doc.id, doc));
+
+    const count = await getCountFromServer(baseQuery(collectionName, osteopathId));
+    if (count.data().count !== byId.size) {
+      return await fullSync(database, collectionName, osteopathId);
+    }
+
+    const watermark = maxUpdatedAt(changed, meta.watermark);
+    await writeScope(database, scope, changed, [], { ...meta, watermark }, false);
+    return { docs: Array.from(byId.values()), watermark, fetched: changed.length };
+  } catch (error) {
+    console.warn(`⚠️ Offline sync failed for ${collectionName}:`, (error as Error)?.message || String(error));
+    return null;
+  }
+}
+
+/**
+ * Vérifie par un comptage serveur qu'aucun document n'a disparu (suppression
+ * depuis un autre appareil) : en cas d'écart avec `knownCount`, la collection
+ * est relue entièrement et les identifiants présents sont rendus. null si
+ * rien n'a changé, sans IndexedDB ou en cas d'échec.
+ */
+export async function reconcileCollection(
+  collectionName: string,
+  osteopathId: string,
+  knownCount: number
+): Promise<Set<string> | null> {
+  const database = await openDatabase();
+  if (!database) return null;
+
+  try {
+    const count = await getCountFromServer(baseQuery(collectionName, osteopathId));
+    if (count.data().count === knownCount) return null;
+    const { docs } = await fullSync(database, collectionName, osteopathId);
+    return new Set(docs.map(doc => doc.id));
+  } catch (error) {
+    console.warn(`⚠️ Offline reconcile failed for ${collectionName}:`, (error as Error)?.message || String(error));
+    return null;
+  }
+}
+
+/**
+ * Reporte dans la copie locale des changements reçus en temps réel
+ */
+export async function persistChanges(
+  collectionName: string,
+  osteopathId: string,
+  upserted: LiveDoc[],
+  removedIds: string[]
+): Promise<void> {
+  const database = await openDatabase();
+  if (!database) return;
+
+  try {
+    const scope = scopeOf(collectionName, osteopathId);
+    const meta = await promisify<ScopeMeta | undefined>(
+      database.transaction(META_STORE, 'readonly').objectStore(META_STORE).get(scope)
+    );
+    const nextMeta = meta && { ...meta, watermark: maxUpdatedAt(upserted, meta.watermark) };
+    await writeScope(database, scope, upserted, removedIds, nextMeta || null, false);
+  } catch (error) {
+    console.warn(`⚠️ Could not persist ${collectionName} changes offline:`, (error as Error)?.message || String(error));
+  }
+}
+
+/**
+ * Efface la copie locale (déconnexion)
+ */
+export async function clearOfflineStore(): Promise<void> {
+  const database = await openDatabase();
+  if (!database) return;
+
+  const tx = database.transaction([DOCS_STORE, META_STORE], 'readwrite');
+  tx.objectStore(DOCS_STORE).clear();
+  tx.objectStore(META_STORE).clear();
+  await transactionDone(tx);
+}
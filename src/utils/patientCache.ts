@@ -1,43 +1,205 @@
+import { collection, query, where, getDocs, documentId } from 'firebase/firestore';
+import { db, auth } from '../firebase/config';
 import { Patient } from '../types';
+import HDSCompliance from './hdsCompliance';
+import { getEffectiveOsteopathId } from './substituteAuth';
 
 const CACHE_DURATION = 5 * 60 * 1000; // 5 minutes
+const MAX_ENTRIES = 500;
+// Limite de valeurs d'un filtre "in" Firestore
+const IN_QUERY_LIMIT = 30;
 
 interface CacheEntry {
   data: Patient;
   timestamp: number;
 }
 
-class PatientCache {
+export interface PatientCacheStats {
+  hits: number;
+  misses: number;
+  coalesced: number;
+  fetched: number;
+  queries: number;
+  evictions: number;
+  entries: number;
+  inFlight: number;
+}
+
+/**
+ * Cache des patients déchiffrés : LRU borné en nombre d'entrées, avec
+ * expiration, regroupement des lectures concurrentes d'un même patient et
+ * lecture groupée (getMany) par requêtes "in".
+ */
+export class PatientCache {
   private cache: Map<string, CacheEntry> = new Map();
+  private inFlight: Map<string, Promise<Patient | null>> = new Map();
+  // Incrémenté à chaque invalidation : une lecture lancée avant ne remplit pas le cache
+  private generations: Map<string, number> = new Map();
+  // Ostéopathe effectif (titulaire ou remplaçant) résolu une fois par utilisateur connecté
+  private osteopathIds: Map<string, Promise<string | null>> = new Map();
+  private stats = { hits: 0, misses: 0, coalesced: 0, fetched: 0, queries: 0, evictions: 0 };
+
+  constructor(
+    private maxEntries: number = MAX_ENTRIES,
+    private ttl: number = CACHE_DURATION
+  ) {}
 
   set(patientId: string, data: Patient): void {
+    this.cache.delete(patientId);
     this.cache.set(patientId, {
-      data,
+      data: { ...data },
       timestamp: Date.now(),
     });
+
+    for (const oldest of this.cache.keys()) {
+      if (this.cache.size <= this.maxEntries) break;
+      this.cache.delete(oldest);
+      this.stats.evictions++;
+    }
   }
 
   get(patientId: string): Patient | null {
     const entry = this.cache.get(patientId);
-    
-    if (!entry) return null;
-    
+
+    if (!entry) {
+      this.stats.misses++;
+      return null;
+    }
+
     // Check if cache is still valid
-    if (Date.now() - entry.timestamp > CACHE_DURATION) {
+    if (Date.now() - entry.timestamp > this.ttl) {
       this.cache.delete(patientId);
+      this.stats.misses++;
       return null;
     }
-    
-    return entry.data;
+
+    // Réinsertion : l'entrée devient la plus récente
+    this.cache.delete(patientId);
+    this.cache.set(patientId, entry);
+    this.stats.hits++;
+    // Copie : un appelant qui modifie le patient n'altère pas l'entrée partagée
+    return { ...entry.data };
+  }
+
+  /**
+   * Patient depuis le cache ou Firestore ; les appels concurrents pour un
+   * même patient partagent une seule lecture. null si le patient n'existe
+   * pas ou n'appartient pas à l'utilisateur.
+   */
+  async load(patientId: string): Promise<Patient | null> {
+    const patients = await this.getMany([patientId]);
+    return patients.get(patientId) || null;
+  }
+
+  /**
+   * Patients demandés, indexés par ID (les introuvables sont absents). Les
+   * patients manquants sont lus par lots de requêtes "in".
+   */
+  async getMany(patientIds: string[]): Promise<Map<string, Patient>> {
+    const result = new Map<string, Patient>();
+    const pending: Array<Promise<void>> = [];
+    const missing: string[] = [];
+
+    for (const patientId of new Set(patientIds.filter(Boolean))) {
+      const cached = this.get(patientId);
+      if (cached) {
+        result.set(patientId, cached);
+        continue;
+      }
+      const inFlight = this.inFlight.get(patientId);
+      if (inFlight) {
+        this.stats.coalesced++;
+        pending.push(inFlight.then(patient => { if (patient) result.set(patientId, { ...patient }); }));
+        continue;
+      }
+      missing.push(patientId);
+    }
+
+    for (let i = 0; i < missing.length; i += IN_QUERY_LIMIT) {
+      const chunk = missing.slice(i, i + IN_QUERY_LIMIT);
+      const batch = this.fetchChunk(chunk);
+      chunk.forEach(patientId => {
+        const promise = batch.then(patients => patients.get(patientId) || null);
+        this.inFlight.set(patientId, promise);
+        // Nettoyage seulement si la promesse n'a pas été remplacée entre-temps
+        const release = () => {
+          if (this.inFlight.get(patientId) === promise) this.inFlight.delete(patientId);
+        };
+        promise.then(release, release);
+        pending.push(promise.then(patient => { if (patient) result.set(patientId, { ...patient }); }));
+      });
+    }
+
+    await Promise.all(pending);
+    return result;
   }
 
   invalidate(patientId: string): void {
     this.cache.delete(patientId);
+    this.inFlight.delete(patientId);
+    this.generations.set(patientId, (this.generations.get(patientId) || 0) + 1);
   }
 
   clear(): void {
     this.cache.clear();
+    this.inFlight.clear();
+    this.generations.clear();
+    this.osteopathIds.clear();
+    this.stats = { hits: 0, misses: 0, coalesced: 0, fetched: 0, queries: 0, evictions: 0 };
+  }
+
+  getStats(): PatientCacheStats {
+    return {
+      ...this.stats,
+      entries: this.cache.size,
+      inFlight: this.inFlight.size
+    };
+  }
+
+  private async fetchChunk(patientIds: string[]): Promise<Map<string, Patient>> {
+    const patients = new Map<string, Patient>();
+    const osteopathId = await this.resolveOsteopathId();
+    if (!osteopathId) return patients;
+    const generations = patientIds.map(patientId => this.generations.get(patientId) || 0);
+
+    // Le filtre osteopathId est exigé par les règles Firestore pour une requête
+    const snapshot = await getDocs(query(
+      collection(db, 'patients'),
+      where(documentId(), 'in', patientIds),
+      where('osteopathId', '==', osteopathId)
+    ));
+    this.stats.queries++;
+    this.stats.fetched += snapshot.size;
+
+    const decrypted = await HDSCompliance.decryptDocumentsForDisplay(
+      snapshot.docs.map(docSnap => docSnap.data()),
+      'patients',
+      osteopathId
+    );
+    snapshot.docs.forEach((docSnap, index) => {
+      const patient = { ...decrypted[index], id: docSnap.id } as Patient;
+      patients.set(docSnap.id, patient);
+      if ((this.generations.get(docSnap.id) || 0) === generations[patientIds.indexOf(docSnap.id)]) {
+        this.set(docSnap.id, patient);
+      }
+    });
+    return patients;
+  }
+
+  private resolveOsteopathId(): Promise<string | null> {
+    const user = auth.currentUser;
+    if (!user) return Promise.resolve(null);
+    let resolved = this.osteopathIds.get(user.uid);
+    if (!resolved) {
+      resolved = getEffectiveOsteopathId(user);
+      this.osteopathIds.set(user.uid, resolved);
+      // Un échec de résolution n'est pas mémorisé : la lecture suivante réessaie
+      resolved.then(osteopathId => {
+        if (!osteopathId && this.osteopathIds.get(user.uid) === resolved) this.osteopathIds.delete(user.uid);
+      });
+    }
+    return resolved;
   }
 }
 
-export const patientCache = new PatientCache();
\ No newline at end of file
+export const patientCache = new PatientCache();
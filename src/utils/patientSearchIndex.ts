@@ -0,0 +1,175 @@
+// Longueur maximale des préfixes indexés : les termes plus longs sont
+// vérifiés sur les mots des seuls candidats
+const MAX_PREFIX_LENGTH = 4;
+
+export interface SearchablePatient {
+  id: string;
+  firstName?: string;
+  lastName?: string;
+  email?: string;
+  phone?: string;
+}
+
+/**
+ * Minuscules sans accents ni ponctuation, mots séparés par un espace
+ */
+export function normalizeSearchText(value: string): string {
+  return value
+    .normalize('NFD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .toLowerCase()
+    .replace(/œ/g, 'oe')
+    .replace(/æ/g, 'ae')
+    .replace(/ß/g, 'ss')
+    .replace(/[^a-z0-9]+/g, ' ')
+    .trim();
+}
+
+/**
+ * Formes indexées d'un numéro : chiffres bruts et, pour un numéro
+ * international français, forme nationale (+33 6... -> 06...)
+ */
+function phoneTokens(phone: string): string[] {
+  const digits = phone.replace(/\D/g, '');
+  if (!digits) return [];
+  const national = digits.replace(/^(?:0033|33)(?=\d{9}$)/, '0');
+  return national === digits ? [digits] : [national, digits];
+}
+
+function isPhoneQuery(value: string): boolean {
+  return /\d/.test(value) && /^[\d\s.+\-()]+$/.test(value.trim());
+}
+
+function patientTokens(patient: SearchablePatient): string[] {
+  const words = normalizeSearchText(
+    [patient.firstName, patient.lastName, patient.email].filter(Boolean).join(' ')
+  );
+  const tokens = new Set(words ? words.split(' ') : []);
+  if (patient.phone) {
+    phoneTokens(patient.phone).forEach(token => tokens.add(token));
+  }
+  return Array.from(tokens);
+}
+
+/**
+ * Termes d'une recherche ; un numéro saisi avec espaces ou points forme un
+ * seul terme
+ */
+export function searchTerms(value: string): string[] {
+  if (isPhoneQuery(value)) {
+    return phoneTokens(value).slice(0, 1);
+  }
+  const normalized = normalizeSearchText(value);
+  return normalized ? Array.from(new Set(normalized.split(' '))) : [];
+}
+
+/**
+ * Index de recherche des patients déchiffrés (nom, prénom, email,
+ * téléphone), en mémoire uniquement. Chaque mot est indexé par ses préfixes ;
+ * un patient correspond si chaque terme recherché est le début d'un de ses
+ * mots. L'index est mis à jour par différence : seuls les patients dont les
+ * champs ont changé sont réindexés.
+ */
+export class PatientSearchIndex {
+  private tokensById: Map<string, string[]> = new Map();
+  private postings: Map<string, Set<string>> = new Map();
+
+  get size(): number {
+    return this.tokensById.size;
+  }
+
+  /**
+   * Indexe ou réindexe un patient ; false si ses champs n'ont pas changé
+   */
+  upsert(patient: SearchablePatient): boolean {
+    const tokens = patientTokens(patient);
+    const previous = this.tokensById.get(patient.id);
+    if (previous && previous.join(' ') === tokens.join(' ')) {
+      return false;
+    }
+    if (previous) {
+      this.remove(patient.id);
+    }
+
+    this.tokensById.set(patient.id, tokens);
+    tokens.forEach(token => {
+      const length = Math.min(token.length, MAX_PREFIX_LENGTH);
+      for (let i = 1; i <= length; i++) {
+        const prefix = token.slice(0, i);
+        let ids = this.postings.get(prefix);
+        if (!ids) {
+          ids = new Set();
+          this.postings.set(prefix, ids);
+        }
+        ids.add(patient.id);
+      }
+    });
+    return true;
+  }
+
+  remove(patientId: string): void {
+    const tokens = this.tokensById.get(patientId);
+    if (!tokens) return;
+    this.tokensById.delete(patientId);
+    tokens.forEach(token => {
+      const length = Math.min(token.length, MAX_PREFIX_LENGTH);
+      for (let i = 1; i <= length; i++) {
+        const prefix = token.slice(0, i);
+        const ids = this.postings.get(prefix);
+        if (!ids) continue;
+        ids.delete(patientId);
+        if (ids.size === 0) this.postings.delete(prefix);
+      }
+    });
+  }
+
+  /**
+   * Aligne l'index sur la liste complète des patients
+   */
+  sync(patients: SearchablePatient[]): void {
+    const present = new Set<string>();
+    patients.forEach(patient => {
+      present.add(patient.id);
+      this.upsert(patient);
+    });
+    Array.from(this.tokensById.keys()).forEach(id => {
+      if (!present.has(id)) this.remove(id);
+    });
+  }
+
+  /**
+   * IDs des patients correspondant à la recherche, ou null pour une
+   * recherche vide (tous les patients)
+   */
+  search(value: string): Set<string> | null {
+    const terms = searchTerms(value);
+    if (terms.length === 0) return null;
+
+    // Termes les plus longs d'abord : leurs candidats sont les moins nombreux
+    terms.sort((a, b) => b.length - a.length);
+    let result: Set<string> | null = null;
+    for (const term of terms) {
+      const candidates = this.postings.get(term.slice(0, MAX_PREFIX_LENGTH));
+      if (!candidates) return new Set();
+
+      const current: Set<string> | null = result;
+      const matches = new Set<string>();
+      const smallest = current && current.size < candidates.size ? current : candidates;
+      smallest.forEach(id => {
+        if (current && !current.has(id)) return;
+        if (!candidates.has(id)) return;
+        if (term.length <= MAX_PREFIX_LENGTH || this.tokensById.get(id)!.some(token => token.startsWith(term))) {
+          matches.add(id);
+        }
+      });
+      result = matches;
+      if (result.size === 0) break;
+    }
+    return result;
+  }
+
+  clear(): void {
+    this.tokensById.clear();
+    this.postings.clear();
+  }
+}
@@ -0,0 +1,212 @@
+import { list, getMetadata, StorageReference } from 'firebase/storage';
+
+export interface StorageUsage {
+  totalSize: number;
+  fileCount: number;
+  // Taille des fichiers directement contenus dans chaque dossier
+  // ('root', 'root/patients/<id>/documents'...)
+  folderSizes: Record<string, number>;
+}
+
+interface FolderUsage {
+  size: number;
+  count: number;
+}
+
+interface UsageIndex {
+  version: 1;
+  scannedAt: number;
+  folders: Record<string, FolderUsage>;
+}
+
+// Requêtes Storage simultanées pendant un parcours
+const SCAN_CONCURRENCY = 8;
+// Maximum accepté par list()
+const LIST_PAGE_SIZE = 1000;
+const PROGRESS_INTERVAL_MS = 250;
+// L'index ne voit que les changements faits depuis ce navigateur : il est
+// recalculé chaque jour
+const INDEX_MAX_AGE_MS = 24 * 60 * 60 * 1000;
+const INDEX_KEY_PREFIX = 'storage_usage_';
+
+/**
+ * Limite le nombre de tâches asynchrones exécutées en même temps
+ */
+export function createLimiter(concurrency: number) {
+  let active = 0;
+  const waiting: (() => void)[] = [];
+
+  // Une place libérée passe directement à la tâche suivante en attente
+  const next = () => {
+    const resume = waiting.shift();
+    if (resume) {
+      resume();
+    } else {
+      active--;
+    }
+  };
+
+  return async function run<T>(task: () => Promise<T>): Promise<T> {
+    if (active >= concurrency) {
+      await new Promise<void>(resolve => waiting.push(resolve));
+    } else {
+      active++;
+    }
+    try {
+      return await task();
+    } finally {
+      next();
+    }
+  };
+}
+
+function usageFromFolders(folders: Record<string, FolderUsage>): StorageUsage {
+  const usage: StorageUsage = { totalSize: 0, fileCount: 0, folderSizes: {} };
+  Object.entries(folders).forEach(([key, folder]) => {
+    usage.totalSize += folder.size;
+    usage.fileCount += folder.count;
+    usage.folderSizes[key] = folder.size;
+  });
+  return usage;
+}
+
+/**
+ * Utilisateur et dossier (clé d'index) d'un chemin de fichier
+ * users/{uid}/...; null pour un chemin hors de cette arborescence
+ */
+export function locateStoragePath(filePath: string): { userId: string; folderKey: string } | null {
+  const parts = filePath.split('/').filter(Boolean);
+  if (parts.length < 3 || parts[0] !== 'users') return null;
+  return {
+    userId: parts[1],
+    folderKey: ['root', ...parts.slice(2, -1)].join('/')
+  };
+}
+
+function readIndex(userId: string): UsageIndex | null {
+  try {
+    const index = JSON.parse(localStorage.getItem(INDEX_KEY_PREFIX + userId) || 'null');
+    return index && index.version === 1 ? index : null;
+  } catch {
+    return null;
+  }
+}
+
+function writeIndex(userId: string, index: UsageIndex): void {
+  try {
+    localStorage.setItem(INDEX_KEY_PREFIX + userId, JSON.stringify(index));
+  } catch (error) {
+    console.warn('⚠️ Could not persist storage usage index:', error);
+  }
+}
+
+/**
+ * Utilisation connue sans parcours, si l'index est récent
+ */
+export function getIndexedStorageUsage(userId: string): StorageUsage | null {
+  const index = readIndex(userId);
+  if (!index || Date.now() - index.scannedAt > INDEX_MAX_AGE_MS) return null;
+  return usageFromFolders(index.folders);
+}
+
+export function hasStorageUsageIndex(filePath: string): boolean {
+  const location = locateStoragePath(filePath);
+  return !!location && !!readIndex(location.userId);
+}
+
+/**
+ * Reporte un ajout (delta positif) ou une suppression dans l'index, s'il
+ * existe
+ */
+export function recordStorageChange(filePath: string, sizeDelta: number, countDelta: number): void {
+  const location = locateStoragePath(filePath);
+  if (!location) return;
+  const index = readIndex(location.userId);
+  if (!index) return;
+
+  const folder = index.folders[location.folderKey] || { size: 0, count: 0 };
+  folder.size = Math.max(0, folder.size + sizeDelta);
+  folder.count = Math.max(0, folder.count + countDelta);
+  index.folders[location.folderKey] = folder;
+  writeIndex(location.userId, index);
+}
+
+/**
+ * Oublie l'index (changement dont la taille est inconnue) : le prochain
+ * calcul refait un parcours
+ */
+export function invalidateStorageUsage(userId: string): void {
+  try {
+    localStorage.removeItem(INDEX_KEY_PREFIX + userId);
+  } catch {
+    // Stockage local indisponible : rien à oublier
+  }
+}
+
+/**
+ * Oublie l'index de l'utilisateur propriétaire d'un chemin users/{uid}/...
+ */
+export function invalidateStorageUsageForPath(path: string): void {
+  const parts = path.split('/').filter(Boolean);
+  if (parts[0] === 'users' && parts[1]) {
+    invalidateStorageUsage(parts[1]);
+  }
+}
+
+/**
+ * Parcourt l'arborescence d'un utilisateur : les dossiers sont listés par
+ * pages et les métadonnées lues en parallèle, dans la limite de
+ * SCAN_CONCURRENCY requêtes. `onProgress` reçoit régulièrement les totaux
+ * partiels. Le résultat est conservé comme index.
+ */
+export async function scanStorageUsage(
+  userId: string,
+  rootRef: StorageReference,
+  onProgress?: (partial: StorageUsage) => void
+): Promise<StorageUsage> {
+  const limit = createLimiter(SCAN_CONCURRENCY);
+  const folders: Record<string, FolderUsage> = {};
+  let lastReport = 0;
+
+  const report = () => {
+    if (!onProgress) return;
+    const now = Date.now();
+    if (now - lastReport < PROGRESS_INTERVAL_MS) return;
+    lastReport = now;
+    onProgress(usageFromFolders(folders));
+  };
+
+  const walk = async (folderRef: StorageReference, key: string): Promise<void> => {
+    const folder: FolderUsage = { size: 0, count: 0 };
+    folders[key] = folder;
+    const pending: Promise<void>[] = [];
+    let pageToken: string | undefined;
+
+    do {
+      const page = await limit(() => list(folderRef, { maxResults: LIST_PAGE_SIZE, pageToken }));
+      page.items.forEach(itemRef => {
+        pending.push(
+          limit(() => getMetadata(itemRef)).then(
+            metadata => {
+              folder.size += metadata.size;
+              folder.count++;
+              report();
+            },
+            error => console.warn('⚠️ Erreur lors de la récupération des métadonnées:', itemRef.name, error)
+          )
+        );
+      });
+      page.prefixes.forEach(prefixRef => pending.push(walk(prefixRef, `${key}/${prefixRef.name}`)));
+      pageToken = page.nextPageToken;
+    } while (pageToken);
+
+    await Promise.all(pending);
+  };
+
+  await walk(rootRef, 'root');
+  writeIndex(userId, { version: 1, scannedAt: Date.now(), folders });
+
+  const usage = usageFromFolders(folders);
+  onProgress?.(usage);
+  return usage;
+}
@@ -0,0 +1,115 @@
+import { createLimiter } from './storageUsage';
+import { getImageWorkerCount } from './imageWorkerPool';
+
+// Téléversements simultanés : assez pour occuper la bande montante sans
+// multiplier les connexions
+const UPLOAD_CONCURRENCY = 3;
+// Octets lus ou en cours d'envoi à un instant donné (originaux en cours de
+// compression + fichiers en cours d'envoi)
+const MAX_IN_FLIGHT_BYTES = 48 * 1024 * 1024;
+
+export interface UploadPipelineOptions {
+  compressionConcurrency?: number;
+  uploadConcurrency?: number;
+  maxInFlightBytes?: number;
+}
+
+export interface UploadJob<T> {
+  file: File;
+  // Compression (ou toute préparation) avant l'envoi
+  prepare: (file: File) => Promise<File>;
+  upload: (prepared: File, contentHash: string | null) => Promise<T>;
+  // Résultat d'un envoi précédent du même contenu : ni compression ni envoi
+  findUploaded?: (contentHash: string) => Promise<T | null>;
+}
+
+export interface UploadJobResult<T> {
+  result: T;
+  skipped: boolean;
+}
+
+/**
+ * Budget d'octets partagé : acquire attend que la place se libère, dans
+ * l'ordre des demandes. Une demande plus grande que le budget entier passe
+ * seule.
+ */
+export function createByteBudget(maxBytes: number) {
+  let available = maxBytes;
+  const waiting: { bytes: number; resume: () => void }[] = [];
+
+  const drain = () => {
+    while (waiting.length && waiting[0].bytes <= available) {
+      const next = waiting.shift()!;
+      available -= next.bytes;
+      next.resume();
+    }
+  };
+
+  return {
+    async acquire(bytes: number): Promise<number> {
+      const granted = Math.min(bytes, maxBytes);
+      if (!waiting.length && granted <= available) {
+        available -= granted;
+      } else {
+        await new Promise<void>(resume => waiting.push({ bytes: granted, resume }));
+      }
+      return granted;
+    },
+    release(bytes: number): void {
+      available += bytes;
+      drain();
+    }
+  };
+}
+
+/**
+ * Empreinte SHA-256 (hex) du contenu d'un fichier ; null sans Web Crypto
+ */
+export async function hashFileContent(file: Blob): Promise<string | null> {
+  if (!globalThis.crypto?.subtle) return null;
+  try {
+    const digest = await crypto.subtle.digest('SHA-256', new Uint8Array(await file.arrayBuffer()));
+    return Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+  } catch (error) {
+    console.warn('⚠️ Could not hash file:', (error as Error)?.message || String(error));
+    return null;
+  }
+}
+
+/**
+ * Pipeline de téléversement en deux étages : empreinte et compression d'un
+ * côté (limitées au nombre de workers d'images), envoi de l'autre (limité à
+ * UPLOAD_CONCURRENCY). Le fichier N+1 est compressé pendant l'envoi du
+ * fichier N, et le total des octets en mémoire reste sous maxInFlightBytes :
+ * un fichier réserve sa taille d'origine, ramenée à sa taille compressée
+ * jusqu'à la fin de l'envoi.
+ */
+export function createUploadPipeline(options: UploadPipelineOptions = {}) {
+  const compressionLimit = createLimiter(options.compressionConcurrency ?? getImageWorkerCount());
+  const uploadLimit = createLimiter(options.uploadConcurrency ?? UPLOAD_CONCURRENCY);
+  const budget = createByteBudget(options.maxInFlightBytes ?? MAX_IN_FLIGHT_BYTES);
+
+  return async function run<T>(job: UploadJob<T>): Promise<UploadJobResult<T>> {
+    let reserved = await budget.acquire(job.file.size);
+    try {
+      const stage = await compressionLimit(async () => {
+        const contentHash = await hashFileContent(job.file);
+        const uploaded = contentHash && job.findUploaded ? await job.findUploaded(contentHash) : null;
+        return { contentHash, uploaded, file: uploaded ? null : await job.prepare(job.file) };
+      });
+      if (stage.uploaded) {
+        return { result: stage.uploaded, skipped: true };
+      }
+
+      const file = stage.file!;
+      if (file.size < reserved) {
+        budget.release(reserved - file.size);
+        reserved = file.size;
+      }
+      const result = await uploadLimit(() => job.upload(file, stage.contentHash));
+      return { result, skipped: false };
+    } finally {
+      budget.release(reserved);
+    }
+  };
+}
@@ -0,0 +1,98 @@
+import { app, auth } from '../firebase/config';
+
+export interface ProxyUploadOptions {
+  path: string;
+  contentType: string;
+  customMetadata: Record<string, string>;
+  // Octets confirmés par le serveur après chaque morceau
+  onChunk?: (uploadedBytes: number, totalBytes: number) => void;
+}
+
+export interface ProxyUploadResult {
+  path: string;
+  downloadUrl: string;
+  size: number;
+  contentType: string;
+}
+
+// Un serveur qui n'avance plus (offset inchangé) n'est pas relancé indéfiniment
+const MAX_STALLED_CHUNKS = 3;
+
+/**
+ * URL de la Cloud Function d'upload (émulateur ou production)
+ */
+export function getUploadProxyUrl(): string {
+  const projectId = String((app.options as any)?.projectId || 'ostheo-app');
+  const useEmulator = String((import.meta as any).env?.VITE_FIREBASE_USE_EMULATOR ?? 'false') === 'true';
+  if (useEmulator) {
+    // Functions emulator default: http://localhost:5001/{project}/europe-west1/{function}
+    return `http://localhost:5001/${projectId}/europe-west1/uploadDocumentProxy`;
+  }
+  return `https://europe-west1-${projectId}.cloudfunctions.net/uploadDocumentProxy`;
+}
+
+async function postToProxy(url: string, token: string, body: BodyInit, contentType: string): Promise<any> {
+  const resp = await fetch(url, {
+    method: 'POST',
+    headers: {
+      'Authorization': `Bearer ${token}`,
+      'Content-Type': contentType
+    },
+    body
+  });
+  if (!resp.ok) {
+    const text = await resp.text();
+    throw new Error(`Proxy upload failed: ${resp.status} ${text}`);
+  }
+  return resp.json();
+}
+
+/**
+ * Upload via la Cloud Function, en morceaux binaires : une session est
+ * ouverte, puis le fichier est envoyé tranche par tranche (Blob.slice), sans
+ * jamais être chargé entièrement en mémoire. Chaque morceau attend l'accusé
+ * de réception du précédent et repart de l'offset confirmé par le serveur.
+ */
+export async function uploadThroughProxy(file: Blob, options: ProxyUploadOptions): Promise<ProxyUploadResult> {
+  if (!auth.currentUser) {
+    throw new Error('Utilisateur non authentifié');
+  }
+
+  const baseUrl = getUploadProxyUrl();
+  const token = await auth.currentUser.getIdToken();
+
+  const session = await postToProxy(baseUrl, token, JSON.stringify({
+    path: options.path,
+    contentType: options.contentType,
+    size: file.size,
+    customMetadata: options.customMetadata
+  }), 'application/json');
+
+  const chunkSize = Number(session.chunkSize);
+  let offset = 0;
+  let stalled = 0;
+
+  for (;;) {
+    const chunk = file.slice(offset, Math.min(offset + chunkSize, file.size));
+    const url = `${baseUrl}?session=${encodeURIComponent(session.sessionId)}&offset=${offset}`;
+    const data = await postToProxy(url, token, chunk, 'application/octet-stream');
+
+    if (data.complete) {
+      options.onChunk?.(file.size, file.size);
+      return {
+        path: String(data.path),
+        downloadUrl: String(data.downloadUrl || ''),
+        size: Number(data.size),
+        contentType: String(data.contentType)
+      };
+    }
+
+    const nextOffset = Number(data.nextOffset);
+    stalled = nextOffset > offset ? 0 : stalled + 1;
+    if (stalled >= MAX_STALLED_CHUNKS) {
+      throw new Error(`Proxy upload stalled at offset ${offset}`);
+    }
+    offset = nextOffset;
+    options.onChunk?.(offset, file.size);
+  }
+}
@@ -0,0 +1,7 @@
+import { handleCryptoRequest, CryptoWorkerRequest } from './cryptoMessages';
+
+// Worker de chiffrement instancié par utils/cryptoWorkerPool
+self.onmessage = async (event: MessageEvent<CryptoWorkerRequest>) => {
+  const response = await handleCryptoRequest(event.data);
+  self.postMessage(response, { transfer: response.payload ? [response.payload] : [] });
+};
@@ -0,0 +1,50 @@
+import { encryptDataBatch, decryptBatchWithKey } from '../utils/encryption';
+
+export type CryptoOperation = 'encrypt' | 'decrypt';
+
+/**
+ * Message envoyé à un worker de chiffrement. Les valeurs voyagent en JSON
+ * UTF-8 dans un ArrayBuffer transféré (et non copié) entre les threads.
+ */
+export interface CryptoWorkerRequest {
+  id: number;
+  op: CryptoOperation;
+  userId: string;
+  // Passphrase de session des valeurs de l'ancien format (sans version de clé)
+  userKey: string;
+  payload: ArrayBuffer;
+}
+
+export interface CryptoWorkerResponse {
+  id: number;
+  payload?: ArrayBuffer;
+  error?: string;
+}
+
+const encoder = new TextEncoder();
+const decoder = new TextDecoder();
+
+export function encodeValues(values: any[]): ArrayBuffer {
+  return encoder.encode(JSON.stringify(values)).buffer as ArrayBuffer;
+}
+
+export function decodeValues(payload: ArrayBuffer): any[] {
+  return JSON.parse(decoder.decode(payload));
+}
+
+/**
+ * Traite une requête côté worker : mêmes fonctions que le thread principal.
+ * Le worker dérive lui-même les poignées de clé versionnées ; seule la
+ * passphrase de session de l'ancien format lui est transmise.
+ */
+export async function handleCryptoRequest(request: CryptoWorkerRequest): Promise<CryptoWorkerResponse> {
+  try {
+    const values = decodeValues(request.payload);
+    const results = request.op === 'encrypt'
+      ? await encryptDataBatch(values, request.userId)
+      : await decryptBatchWithKey(values, request.userId, () => request.userKey);
+    return { id: request.id, payload: encodeValues(results) };
+  } catch (error) {
+    return { id: request.id, error: (error as Error).message };
+  }
+}
@@ -0,0 +1,6 @@
+import { handleImageRequest, ImageWorkerRequest } from './imageMessages';
+
+// Worker de compression d'images instancié par utils/imageWorkerPool
+self.onmessage = async (event: MessageEvent<ImageWorkerRequest>) => {
+  self.postMessage(await handleImageRequest(event.data));
+};
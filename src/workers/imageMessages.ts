@@ -0,0 +1,91 @@
+/**
+ * Paramètres de compression, équivalents à ceux de browser-image-compression
+ */
+export interface ImageCompressionSettings {
+  maxSizeBytes: number;
+  maxWidthOrHeight: number;
+  initialQuality: number;
+  // Ne réduit que la qualité, jamais les dimensions en dessous de maxWidthOrHeight
+  keepResolution: boolean;
+}
+
+/**
+ * Message envoyé à un worker d'images. Le Blob est transmis par référence
+ * (clonage structuré) : les octets de l'image ne sont pas recopiés.
+ */
+export interface ImageWorkerRequest {
+  id: number;
+  image: Blob;
+  settings: ImageCompressionSettings;
+}
+
+export interface ImageWorkerResponse {
+  id: number;
+  // Absent si la compression n'apporte rien : l'original est conservé
+  image?: Blob;
+  error?: string;
+}
+
+// Au-delà, l'image est laissée à la dernière taille obtenue
+const MAX_ATTEMPTS = 6;
+const QUALITY_STEP = 0.8;
+const SCALE_STEP = 0.8;
+const MIN_QUALITY = 0.3;
+
+// La qualité n'a d'effet que sur les formats avec perte
+function isLossy(type: string): boolean {
+  return type === 'image/jpeg' || type === 'image/webp';
+}
+
+/**
+ * Compresse une image avec OffscreenCanvas : redimensionnement à
+ * maxWidthOrHeight, puis baisse de qualité (JPEG, WebP) ou de dimensions
+ * (PNG) jusqu'à passer sous maxSizeBytes
+ */
+export async function compressImageBlob(image: Blob, settings: ImageCompressionSettings): Promise<Blob | null> {
+  const bitmap = await createImageBitmap(image);
+  try {
+    const lossy = isLossy(image.type);
+    let scale = Math.min(1, settings.maxWidthOrHeight / Math.max(bitmap.width, bitmap.height));
+    let quality = settings.initialQuality;
+
+    const render = async () => {
+      const canvas = new OffscreenCanvas(
+        Math.max(1, Math.round(bitmap.width * scale)),
+        Math.max(1, Math.round(bitmap.height * scale))
+      );
+      const context = canvas.getContext('2d');
+      if (!context) throw new Error('Contexte 2D indisponible');
+      context.drawImage(bitmap, 0, 0, canvas.width, canvas.height);
+      return canvas.convertToBlob({ type: image.type, quality: lossy ? quality : undefined });
+    };
+
+    let output = await render();
+    for (let attempt = 1; attempt < MAX_ATTEMPTS && output.size > settings.maxSizeBytes; attempt++) {
+      if (lossy && quality * QUALITY_STEP >= MIN_QUALITY) {
+        quality *= QUALITY_STEP;
+      } else if (!settings.keepResolution) {
+        scale *= SCALE_STEP;
+      } else {
+        break;
+      }
+      output = await render();
+    }
+
+    return output.size < image.size ? output : null;
+  } finally {
+    bitmap.close();
+  }
+}
+
+/**
+ * Traite une requête côté worker
+ */
+export async function handleImageRequest(request: ImageWorkerRequest): Promise<ImageWorkerResponse> {
+  try {
+    const image = await compressImageBlob(request.image, request.settings);
+    return image ? { id: request.id, image } : { id: request.id };
+  } catch (error) {
+    return { id: request.id, error: (error as Error).message };
+  }
+}
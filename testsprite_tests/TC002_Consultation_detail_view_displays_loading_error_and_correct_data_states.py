@@ -1,140 +1,41 @@
 import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
+from harness import PatientDetailPage, app_url, login, perf, scenario_context, waits
 
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
 
+async def run_test(browser=None):
+    async with scenario_context(browser) as context:
         # Open a new page in the browser context
         page = await context.new_page()
 
         # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5175", wait_until="commit", timeout=10000)
-
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
+        await page.goto(app_url(), wait_until="commit", timeout=10000)
 
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Wait until the first screen is rendered and its Firestore reads are done
+        await waits.settle(page)
 
         # Interact with the page elements to simulate user flow
-        # -> Input email and password, then click login button to access the app
-        frame = context.pages[-1]
-        # Input email address 
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('10signcom@gmail.com')
-        frame = context.pages[-1]
-        # Input password 
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Nidnorg1962@')
-        frame = context.pages[-1]
-        # Click the login button to submit credentials 
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000) 
-        # -> Input email and password, then click login button to access the app
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('10signcom@gmail.com')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Nidnorg1962@')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Retry login by inputting email and password again and clicking login button
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('10signcom@gmail.com')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Nidnorg1962@')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Check if there is an alternative login method or admin login button to try
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input admin email and password, then click 'Se connecter' button to login as admin
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/div/div/div[2]/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('admin@osteoapp.com')
-        
-
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/div/div/div[2]/div[2]/form/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Nidnorg1962@')
-        
+        # -> Reuse the cached session; the login form is only filled if it has expired
+        async with perf.step(page, "session"):
+            await login(page)
 
-        # -> Click 'Se connecter' button in admin login modal to attempt login
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/div/div/div[2]/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+        # -> Open the record of the first patient, where consultations are listed
+        patient = PatientDetailPage.of(page)
+        await patient.open_first_patient()
 
-        # -> Since login attempts failed, check if there is a way to bypass login or access consultation list directly, or report issue.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/div/div/div[2]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+        # -> Open its first consultation; timed until the detail has loaded
+        async with perf.step(page, "consultation_detail"):
+            detail = await patient.view_consultation(0)
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
         try:
-            await expect(frame.locator('text=Consultation Successfully Loaded').first).to_be_visible(timeout=1000)
+            await expect(detail.title).to_contain_text("Consultation du")
+            await expect(detail.error).to_have_count(0)
+            await expect(detail.loading).to_have_count(0)
         except AssertionError:
             raise AssertionError("Test case failed: The detailed consultation view did not handle loading and error states properly or did not display accurate consultation information including ID, patient, date/time, reasons, notes, treatment, practitioner, duration, and price as required by the test plan.")
-        await asyncio.sleep(5)
 
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
 
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
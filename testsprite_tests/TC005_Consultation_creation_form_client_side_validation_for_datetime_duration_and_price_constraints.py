@@ -1,95 +1,47 @@
 import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
+from harness import ConsultationsPage, app_url, login, perf, scenario_context, waits
 
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
 
+async def run_test(browser=None):
+    async with scenario_context(browser) as context:
         # Open a new page in the browser context
         page = await context.new_page()
 
         # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5175", wait_until="commit", timeout=10000)
+        await page.goto(app_url(), wait_until="commit", timeout=10000)
 
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Wait until the first screen is rendered and its Firestore reads are done
+        await waits.settle(page)
 
         # Interact with the page elements to simulate user flow
-        # -> Input email and password, then click login button to access the application
-        frame = context.pages[-1]
-        # Input email in login form 
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('10signcom@gmail.com')
-        frame = context.pages[-1]
-        # Input password in login form 
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Nidnorg1962@')
-        frame = context.pages[-1]
-        # Click login button to submit login form 
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000) 
-        # -> Input email and password, then click login button to access the application
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('10signcom@gmail.com')
-        
+        # -> Reuse the cached session; the login form is only filled if it has expired
+        async with perf.step(page, "session"):
+            await login(page)
+
+        # -> Open the consultation creation form from the consultations page
+        consultations = ConsultationsPage.of(page)
+        await consultations.open()
+        form = await consultations.open_new_consultation()
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Nidnorg1962@')
-        
+        # -> Input an invalid date with an otherwise valid form
+        await form.select_patient()
+        await form.fill_valid(date="")
+        await expect(form.error("Ce champ est requis")).to_be_visible()
 
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+        # -> Input a zero duration, then a negative price
+        await form.fill(date=form.VALID["date"], duration="0")
+        await expect(form.error("Durée minimum 15 minutes")).to_be_visible()
+        await form.fill(duration="60", price="-10")
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
         try:
-            await expect(frame.locator('text=Invalid date or time format detected').first).to_be_visible(timeout=1000)
+            await expect(form.error("Le tarif doit être positif")).to_be_visible()
+            await expect(form.submit).to_be_disabled()
         except AssertionError:
             raise AssertionError('Test case failed: The form did not show validation error messages for invalid date/time, duration, or price as required by the test plan.')
-        await asyncio.sleep(5)
 
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
 
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -1,131 +1,39 @@
 import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
+from harness import ConsultationsPage, LoginPage, app_url, login, perf, scenario_context, waits
 
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
 
+async def run_test(browser=None):
+    # The login form itself is under test: start from a signed-out context
+    async with scenario_context(browser, authenticated=False) as context:
         # Open a new page in the browser context
         page = await context.new_page()
 
         # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:5175", wait_until="commit", timeout=10000)
+        await page.goto(app_url(), wait_until="commit", timeout=10000)
 
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Wait until the first screen is rendered and its Firestore reads are done
+        async with perf.step(page, "login_screen"):
+            await waits.settle(page)
 
         # Interact with the page elements to simulate user flow
-        # -> Trigger validation errors in consultation form by submitting empty login form.
-        frame = context.pages[-1]
-        # Click 'Se connecter' button to trigger validation errors on login form 
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        # -> Trigger loading and error messages in consultation detail and list views to verify ARIA-live regions or equivalent usage.
-        await page.goto('http://localhost:5175/consultations', timeout=10000)
-        await asyncio.sleep(3)
-        # -> Click 'Se connecter' button to trigger validation errors on login form.
-        frame = context.pages[-1]
-        # Click 'Se connecter' button to trigger validation errors on login form 
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        # -> Navigate to consultation detail and list views to trigger loading and error messages and verify ARIA-live regions or equivalent usage.
-        await page.goto('http://localhost:5175/consultations', timeout=10000)
-        await asyncio.sleep(3)
-        # -> Navigate to consultation detail and list views to trigger loading and error messages and verify ARIA-live regions or equivalent usage.
-        await page.goto('http://localhost:5175/consultations', timeout=10000)
-        await asyncio.sleep(3)
-        # -> Navigate to consultation detail and list views to trigger loading and error messages and verify ARIA-live regions or equivalent usage.
-        await page.goto('http://localhost:5175/consultations', timeout=10000)
-        await asyncio.sleep(3)
-        # -> Navigate to consultation list view to trigger loading and error messages and verify ARIA-live regions or equivalent usage.
-        await page.goto('http://localhost:5175/consultations', timeout=10000)
-        await asyncio.sleep(3)
-        # -> Navigate to consultation list view to trigger loading and error messages and verify ARIA-live regions or equivalent usage.
-        await page.goto('http://localhost:5175/consultations', timeout=10000)
-        await asyncio.sleep(3)
-        # -> Navigate to consultation list view to trigger loading and error messages and verify ARIA-live regions or equivalent usage.
-        await page.goto('http://localhost:5175/consultations', timeout=10000)
-        await asyncio.sleep(3)
-        # -> Navigate to consultation list view to trigger loading and error messages and verify ARIA-live regions or equivalent usage.
-        await page.goto('http://localhost:5175/consultations', timeout=10000)
-        await asyncio.sleep(3)
-        # -> Log in using provided credentials to access consultation detail and list views to trigger loading and error messages and verify ARIA-live regions or equivalent usage.
-        frame = context.pages[-1]
-        # Input email for login 
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('10signcom@gmail.com')
-        frame = context.pages[-1]
-        # Input password for login 
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Nidnorg1962@')
-        frame = context.pages[-1]
-        # Click 'Se connecter' button to log in 
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000) 
-        # -> Click the 'Se connecter' button to trigger validation errors in the login form.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Navigate to consultation detail view to trigger loading and error messages and verify ARIA-live regions or equivalent usage.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+        # -> Trigger validation errors by submitting the empty login form
+        login_page = LoginPage.of(page)
+        await login_page.submit.click()
 
-        # -> Trigger validation errors in the admin login form by submitting empty form and verify ARIA attributes and screen reader accessibility of error messages.
-        frame = context.pages[-1]
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/div/div/div/div[2]/div[2]/form/div[2]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+        # -> Log in, then open the consultations page to trigger its loading messages
+        async with perf.step(page, "session"):
+            await login(page)
+        consultations = ConsultationsPage.of(page)
+        await consultations.open()
 
         # --> Assertions to verify final state
-        frame = context.pages[-1]
         try:
-            await expect(frame.locator('text=Validation Passed Successfully').first).to_be_visible(timeout=1000)
+            await expect(page.get_by_text('Validation Passed Successfully').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: Validation errors, loading, error messages, and localization checks did not pass as per the test plan. The expected ARIA-compliant and localized messages were not found on the page.")
-        await asyncio.sleep(5)
 
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
 
-asyncio.run(run_test())
-    
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -0,0 +1,36 @@
+"""Shared Playwright harness for the TestSprite E2E scenarios."""
+
+from . import perf, waits
+from .auth import ensure_storage_state, login
+from .browser import launch_browser, scenario_context
+from .config import SuiteConfig, app_url, load_config
+from .pages import (
+    ConsultationsPage,
+    LoginPage,
+    NewConsultationModal,
+    PatientDetailPage,
+    ViewConsultationModal,
+)
+from .runner import Scenario, ScenarioResult, discover, run_scenario, run_suite
+
+__all__ = [
+    "ConsultationsPage",
+    "LoginPage",
+    "NewConsultationModal",
+    "PatientDetailPage",
+    "Scenario",
+    "ScenarioResult",
+    "SuiteConfig",
+    "ViewConsultationModal",
+    "app_url",
+    "discover",
+    "ensure_storage_state",
+    "launch_browser",
+    "load_config",
+    "login",
+    "perf",
+    "run_scenario",
+    "run_suite",
+    "scenario_context",
+    "waits",
+]
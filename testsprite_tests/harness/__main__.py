@@ -0,0 +1,157 @@
+"""Command-line entry point: ``python -m harness`` from ``testsprite_tests/``.
+
+Examples::
+
+    python -m harness                # every test plan scenario, 4 at a time
+    python -m harness -n 8 -k TC00   # TC001-TC009 with 8 workers
+    python -m harness --source scripts   # the generated TC scripts instead
+    python -m harness --headed -n 1  # watch a sequential run
+    python -m harness --repeat 5 --check-baseline
+    python -m harness --emulators --preset medium   # hermetic run, see harness.emulators
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+from . import auth, baseline, datagen, emulators, perf
+from .runner import SKIPPED, SOURCES, SUITE_DIR, discover, run_suite
+
+# TC scripts import ``harness`` themselves, so the suite directory must be
+# importable whatever the current working directory is.
+if str(SUITE_DIR) not in sys.path:
+    sys.path.insert(0, str(SUITE_DIR))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m harness",
+        description="Run the TestSprite Playwright scenarios against one shared browser.",
+    )
+    parser.add_argument(
+        "-n", "--workers",
+        type=int,
+        default=int(os.environ.get("TESTSPRITE_WORKERS", "4")),
+        help="number of scenarios running concurrently (default: 4)",
+    )
+    parser.add_argument("-k", dest="keyword", help="only run scenarios whose name contains KEYWORD")
+    parser.add_argument(
+        "--source", choices=SOURCES, default="table",
+        help="scenario table generated from the test plan, or the TC scripts (default: table)",
+    )
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    parser.add_argument("--timeout", type=float, default=None, help="per-scenario timeout in seconds")
+    parser.add_argument("--no-auth", action="store_true", help="do not inject the cached login session")
+    parser.add_argument("--refresh-auth", action="store_true", help="log in again even if the cached session is valid")
+    parser.add_argument("--no-perf", action="store_true", help="do not record performance metrics")
+    parser.add_argument("--repeat", type=int, default=1, help="run the suite N times, one performance run each")
+    parser.add_argument(
+        "--check-baseline", action="store_true",
+        help="fail when p50/p95 of these runs regress against baselines/ (see harness.baseline)",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=baseline.DEFAULT_THRESHOLD,
+        help="allowed relative regression for --check-baseline (default: 0.20)",
+    )
+    parser.add_argument(
+        "--emulators", action="store_true",
+        help="run against local Firebase emulators and a dev server seeded with synthetic data",
+    )
+    parser.add_argument("--preset", choices=sorted(datagen.PRESETS), default="small", help="data size for --emulators")
+    parser.add_argument("--seed", type=int, default=1, help="data seed for --emulators")
+    parser.add_argument("--collect-only", action="store_true", help="list the scenarios and exit")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print tracebacks of failures, or the table steps with --collect-only")
+    return parser
+
+
+def print_result(result) -> None:
+    line = f"{result.scenario.name} {result.status.upper()} ({result.duration:.1f}s)"
+    if result.ok and result.message:
+        line += f" - {result.message}"
+    print(line, flush=True)
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    scenarios = discover(keyword=args.keyword, source=args.source)
+
+    if args.collect_only or not scenarios:
+        for scenario in scenarios:
+            reason = f"  [skipped: {scenario.skip_reason}]" if scenario.skip_reason else ""
+            print(f"{scenario.name}{reason}")
+            if args.verbose and hasattr(scenario, "describe"):
+                print("\n".join("    " + line for line in scenario.describe()))
+        print(f"{len(scenarios)} scenario(s) collected")
+        return 0 if scenarios or args.collect_only else 5
+
+    if args.no_auth:
+        auth.set_enabled(False)
+    if args.no_perf:
+        perf.set_enabled(False)
+
+    print(f"collected {len(scenarios)} scenario(s), {args.workers} worker(s)")
+    environment = (
+        emulators.HermeticEnvironment(preset=args.preset, seed=args.seed) if args.emulators else nullcontext()
+    )
+    run_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+    runs = []
+    exit_code = 0
+    try:
+        with environment:
+            for iteration in range(max(1, args.repeat)):
+                if args.repeat > 1:
+                    perf.set_run_dir(perf.PERF_ROOT / f"{run_id}-{iteration + 1:02d}")
+                    print(f"\n=== run {iteration + 1}/{args.repeat} ===")
+                runs.append(perf.run_dir())
+                if run_once(scenarios, args):
+                    exit_code = 1
+    except emulators.EmulatorError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+
+    if args.check_baseline and perf.is_enabled():
+        regressions = baseline.compare(baseline.aggregate(runs), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        print(f"{len(regressions)} performance regression(s) over {len(runs)} run(s)")
+        if regressions:
+            exit_code = 1
+    return exit_code
+
+
+def run_once(scenarios, args) -> int:
+    started = time.perf_counter()
+    results = asyncio.run(run_suite(
+        scenarios,
+        workers=args.workers,
+        headless=not args.headed,
+        timeout=args.timeout,
+        refresh_auth=args.refresh_auth,
+        on_result=print_result,
+    ))
+    elapsed = time.perf_counter() - started
+
+    failures = [r for r in results if not r.ok]
+    for result in failures:
+        print(f"\n___ {result.scenario.name} ___\n{result.message}")
+        if args.verbose and result.details:
+            print(result.details)
+
+    report = perf.write_report() if perf.is_enabled() else None
+    if report:
+        print(f"\n{perf.format_report(report)}\nperformance report: {report}")
+
+    skipped = sum(1 for r in results if r.status == SKIPPED)
+    passed = len(results) - len(failures) - skipped
+    print(f"\n{passed} passed, {len(failures)} failed, {skipped} skipped in {elapsed:.1f}s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
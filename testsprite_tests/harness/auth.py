@@ -0,0 +1,139 @@
+"""Authenticated storage-state cache.
+
+The practitioner account is logged in once through the real login form; the
+resulting Playwright ``storage_state`` (localStorage and IndexedDB, where the
+Firebase Auth session and the app tokens live) is written to
+``tmp/.auth/storage_state.json`` and injected into every new context until it
+expires. Scenarios therefore start on an authenticated session instead of
+typing credentials.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from playwright import async_api
+
+from .config import SUITE_DIR, app_url, load_config
+from .pages import LoginPage
+
+AUTH_DIR = SUITE_DIR / "tmp" / ".auth"
+STATE_PATH = AUTH_DIR / "storage_state.json"
+META_PATH = AUTH_DIR / "storage_state.meta.json"
+
+# Firebase ID tokens are valid for one hour; stay below that by default.
+DEFAULT_TTL_SECONDS = int(os.environ.get("TESTSPRITE_AUTH_TTL", "3000"))
+
+LOGIN_TIMEOUT_MS = 20000
+
+_enabled = os.environ.get("TESTSPRITE_AUTH", "1") != "0"
+_lock: Optional[asyncio.Lock] = None
+_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def set_enabled(enabled: bool) -> None:
+    """Turn storage-state injection on or off for the current process."""
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def cached_storage_state(ttl: float = DEFAULT_TTL_SECONDS) -> Optional[Path]:
+    """Return the saved state if it belongs to the configured account and is fresh."""
+    if not STATE_PATH.exists() or not META_PATH.exists():
+        return None
+    try:
+        meta = json.loads(META_PATH.read_text(encoding="utf-8"))
+    except ValueError:
+        return None
+    config = load_config()
+    if meta.get("endpoint") != config.local_endpoint or meta.get("user") != config.login_user:
+        return None
+    if time.time() - meta.get("savedAt", 0) > ttl:
+        return None
+    return STATE_PATH
+
+
+def invalidate() -> None:
+    for path in (STATE_PATH, META_PATH):
+        if path.exists():
+            path.unlink()
+
+
+async def login(page: async_api.Page, user: Optional[str] = None, password: Optional[str] = None) -> None:
+    """Submit the login form once unless ``page`` already shows the app shell.
+
+    With an injected storage state ``ProtectedRoute`` renders the dashboard
+    layout directly; without one it redirects to ``/login``. Waiting on
+    whichever of the two appears first avoids any fixed delay. ``user`` and
+    ``password`` default to the configured account.
+    """
+    config = load_config()
+    if page.url in ("", "about:blank"):
+        await page.goto(app_url(LoginPage.path), wait_until="domcontentloaded")
+    screen = LoginPage.of(page)
+    await screen.email.or_(screen.app_shell).first.wait_for(state="visible", timeout=LOGIN_TIMEOUT_MS)
+    if not await screen.email.is_visible():
+        return
+    await screen.sign_in(user or config.login_user, password or config.login_password)
+    await page.wait_for_url(lambda url: "/login" not in url, timeout=LOGIN_TIMEOUT_MS)
+
+
+async def _save_state(context: async_api.BrowserContext) -> None:
+    AUTH_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        await context.storage_state(path=str(STATE_PATH), indexed_db=True)
+    except TypeError:
+        # Playwright < 1.51 cannot snapshot IndexedDB; localStorage still
+        # carries the session because the app uses browserLocalPersistence.
+        await context.storage_state(path=str(STATE_PATH))
+    config = load_config()
+    META_PATH.write_text(json.dumps({
+        "endpoint": config.local_endpoint,
+        "user": config.login_user,
+        "savedAt": time.time(),
+    }), encoding="utf-8")
+
+
+async def ensure_storage_state(
+    browser: async_api.Browser,
+    *,
+    ttl: float = DEFAULT_TTL_SECONDS,
+    refresh: bool = False,
+) -> Optional[Path]:
+    """Return a valid storage-state file, logging in at most once per process.
+
+    Concurrent scenarios share one login: the first caller authenticates while
+    the others wait on the lock and then reuse the file it wrote.
+    """
+    global _lock, _lock_loop
+    if not _enabled:
+        return None
+    # ``--repeat`` runs the suite in successive event loops.
+    loop = asyncio.get_running_loop()
+    if _lock is None or _lock_loop is not loop:
+        _lock, _lock_loop = asyncio.Lock(), loop
+
+    async with _lock:
+        if refresh:
+            invalidate()
+        cached = cached_storage_state(ttl)
+        if cached:
+            return cached
+
+        context = await browser.new_context()
+        try:
+            page = await context.new_page()
+            await login(page)
+            await _save_state(context)
+        finally:
+            await context.close()
+        return STATE_PATH
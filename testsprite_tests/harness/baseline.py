@@ -0,0 +1,204 @@
+"""Performance regression gate over the records written by ``harness.perf``.
+
+Baselines live in ``testsprite_tests/baselines/<test id>.json``, one file per
+scenario, holding the p50/p95 of every metric over several runs. ``check``
+computes the same percentiles over the latest runs and fails when one of them
+regresses by more than the threshold (and by more than the metric's noise
+floor, so a 3 ms list render turning into 4 ms is not a regression)::
+
+    python -m harness --repeat 5                 # produce 5 runs
+    python -m harness.baseline update --runs 5   # accept them as the baseline
+    python -m harness.baseline check --runs 5 --threshold 0.15
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .config import SUITE_DIR
+from .perf import PERF_ROOT, load_records
+
+BASELINE_DIR = SUITE_DIR / "baselines"
+DEFAULT_THRESHOLD = 0.20
+STATS = ("p50", "p95")
+
+# Minimum absolute increase, by metric prefix, before a relative regression
+# counts. Durations are in ms, heap in bytes.
+NOISE_FLOORS = {
+    "step.": 50.0,
+    "nav.": 50.0,
+    "vitals.cls": 0.02,
+    "vitals.longTasks": 2.0,
+    "vitals.": 50.0,
+    "heap.": 2 * 1024 * 1024,
+}
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile, ``q`` in [0, 100]."""
+    ordered = sorted(values)
+    if not ordered:
+        raise ValueError("percentile of an empty sequence")
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def noise_floor(metric: str) -> float:
+    for prefix, floor in NOISE_FLOORS.items():
+        if metric.startswith(prefix):
+            return floor
+    return 0.0
+
+
+def latest_runs(count: int, root: Path = PERF_ROOT) -> List[Path]:
+    """The ``count`` most recent run directories."""
+    if not root.exists():
+        return []
+    runs = sorted((p for p in root.iterdir() if p.is_dir()), key=lambda p: p.name)
+    return runs[-count:]
+
+
+def aggregate(runs: Iterable[Path]) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """``test id -> metric -> {p50, p95, n}`` over the records of ``runs``."""
+    samples: Dict[str, Dict[str, List[float]]] = {}
+    for run in runs:
+        for record in load_records(run):
+            per_metric = samples.setdefault(record["testId"], {})
+            for metric, value in record.get("metrics", {}).items():
+                per_metric.setdefault(metric, []).append(float(value))
+    return {
+        test_id: {
+            metric: {"p50": percentile(values, 50), "p95": percentile(values, 95), "n": len(values)}
+            for metric, values in sorted(metrics.items())
+        }
+        for test_id, metrics in sorted(samples.items())
+    }
+
+
+def baseline_path(test_id: str) -> Path:
+    return BASELINE_DIR / f"{test_id}.json"
+
+
+def load_baseline(test_id: str) -> Optional[dict]:
+    path = baseline_path(test_id)
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+
+
+def write_baselines(stats: Dict[str, Dict[str, Dict[str, float]]], runs: Sequence[Path]) -> List[Path]:
+    BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+    written = []
+    for test_id, metrics in stats.items():
+        previous = load_baseline(test_id) or {}
+        path = baseline_path(test_id)
+        path.write_text(json.dumps({
+            "testId": test_id,
+            "updatedAt": datetime.now().isoformat(timespec="seconds"),
+            "runs": [run.name for run in runs],
+            # Hand-tuned per-metric thresholds survive a baseline refresh.
+            "thresholds": previous.get("thresholds", {}),
+            "metrics": metrics,
+        }, indent=2) + "\n", encoding="utf-8")
+        written.append(path)
+    return written
+
+
+@dataclass
+class Regression:
+    test_id: str
+    metric: str
+    stat: str
+    baseline: float
+    current: float
+    threshold: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline - 1 if self.baseline else math.inf
+
+    def __str__(self) -> str:
+        return (
+            f"{self.test_id} {self.metric} {self.stat}: {self.baseline:.1f} -> {self.current:.1f} "
+            f"(+{self.ratio:.0%}, limit +{self.threshold:.0%})"
+        )
+
+
+def compare(
+    stats: Dict[str, Dict[str, Dict[str, float]]],
+    threshold: float = DEFAULT_THRESHOLD,
+    overrides: Optional[Dict[str, float]] = None,
+) -> List[Regression]:
+    """Regressions of ``stats`` against the stored baselines."""
+    regressions = []
+    for test_id, metrics in stats.items():
+        baseline = load_baseline(test_id)
+        if not baseline:
+            continue
+        limits = {**baseline.get("thresholds", {}), **(overrides or {})}
+        for metric, reference in baseline["metrics"].items():
+            current = metrics.get(metric)
+            if current is None:
+                continue
+            limit = limits.get(metric, threshold)
+            for stat in STATS:
+                before, after = reference[stat], current[stat]
+                if after - before <= noise_floor(metric):
+                    continue
+                if before == 0 or after > before * (1 + limit):
+                    regressions.append(Regression(test_id, metric, stat, before, after, limit))
+    return regressions
+
+
+def _parse_overrides(values: Iterable[str]) -> Dict[str, float]:
+    overrides = {}
+    for value in values:
+        metric, _, limit = value.partition("=")
+        overrides[metric] = float(limit)
+    return overrides
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.baseline", description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=("update", "check", "show"))
+    parser.add_argument("--runs", type=int, default=5, help="number of most recent runs to aggregate (default: 5)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed relative increase (default: 0.20)")
+    parser.add_argument(
+        "--metric-threshold", action="append", default=[], metavar="METRIC=RATIO",
+        help="per-metric threshold, e.g. step.consultation_list=0.1",
+    )
+    args = parser.parse_args(argv)
+
+    runs = latest_runs(args.runs)
+    if not runs:
+        print(f"no performance runs under {PERF_ROOT}")
+        return 2
+    stats = aggregate(runs)
+
+    if args.command == "show":
+        print(json.dumps(stats, indent=2))
+        return 0
+
+    if args.command == "update":
+        for path in write_baselines(stats, runs):
+            print(f"baseline written: {path.relative_to(SUITE_DIR)}")
+        return 0
+
+    missing = [test_id for test_id in stats if load_baseline(test_id) is None]
+    if missing:
+        print("no baseline for: " + ", ".join(missing))
+    regressions = compare(stats, args.threshold, _parse_overrides(args.metric_threshold))
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"{len(regressions)} regression(s) over {len(runs)} run(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Browser and context bootstrap shared by every TC scenario."""
+
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from playwright import async_api
+
+from . import perf, waits
+from .auth import ensure_storage_state
+
+# Chromium flags used by the generated scripts. ``--single-process`` is only
+# kept for standalone runs: a shared browser serving several contexts at once
+# needs its renderer processes.
+BROWSER_ARGS = [
+    "--window-size=1280,720",         # Set the browser window size
+    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+    "--ipc=host",                     # Use host-level IPC for better stability
+]
+STANDALONE_ARGS = BROWSER_ARGS + ["--single-process"]
+
+DEFAULT_TIMEOUT_MS = 5000
+
+
+async def launch_browser(
+    pw: async_api.Playwright,
+    *,
+    headless: bool = True,
+    standalone: bool = False,
+) -> async_api.Browser:
+    """Launch the Chromium instance scenarios run against."""
+    return await pw.chromium.launch(
+        headless=headless,
+        args=STANDALONE_ARGS if standalone else BROWSER_ARGS,
+    )
+
+
+@asynccontextmanager
+async def scenario_context(
+    browser: Optional[async_api.Browser] = None,
+    *,
+    authenticated: bool = True,
+) -> AsyncIterator[async_api.BrowserContext]:
+    """Yield an isolated ``BrowserContext`` for one scenario.
+
+    When the runner passes its shared ``browser`` only a fresh context is
+    created and closed. When a TC script is executed on its own, a complete
+    Playwright session and browser are started for it and torn down on exit,
+    exactly as the generated scripts used to do inline. Either way the context
+    starts from the cached authenticated storage state (see ``harness.auth``)
+    unless ``authenticated`` is false, for scenarios that exercise the login
+    page itself.
+    """
+    pw = None
+    owned_browser = None
+    context = None
+    status = "passed"
+
+    try:
+        if browser is None:
+            pw = await async_api.async_playwright().start()
+            owned_browser = await launch_browser(pw, standalone=True)
+            browser = owned_browser
+
+        storage_state = await ensure_storage_state(browser) if authenticated else None
+        context = await browser.new_context(
+            storage_state=str(storage_state) if storage_state else None,
+        )
+        context.set_default_timeout(DEFAULT_TIMEOUT_MS)
+        waits.instrument(context)
+        await perf.attach(context)
+        yield context
+
+    except AssertionError:
+        status = "failed"
+        raise
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        if context:
+            await perf.detach(context, status)
+            await context.close()
+        if owned_browser:
+            await owned_browser.close()
+        if pw:
+            await pw.stop()
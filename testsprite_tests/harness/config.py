@@ -0,0 +1,38 @@
+"""Access to ``tmp/config.json``, the TestSprite run configuration."""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+SUITE_DIR = Path(__file__).resolve().parent.parent
+CONFIG_PATH = SUITE_DIR / "tmp" / "config.json"
+
+
+@dataclass(frozen=True)
+class SuiteConfig:
+    local_endpoint: str
+    login_user: str
+    login_password: str
+    proxy: Optional[str] = None
+
+
+@lru_cache(maxsize=1)
+def load_config(path: Path = CONFIG_PATH) -> SuiteConfig:
+    """Read the suite configuration; ``TESTSPRITE_*`` variables take precedence."""
+    raw = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    return SuiteConfig(
+        local_endpoint=os.environ.get("TESTSPRITE_ENDPOINT", raw.get("localEndpoint", "http://localhost:5175")).rstrip("/"),
+        login_user=os.environ.get("TESTSPRITE_LOGIN_USER", raw.get("loginUser", "")),
+        login_password=os.environ.get("TESTSPRITE_LOGIN_PASSWORD", raw.get("loginPassword", "")),
+        proxy=raw.get("proxy"),
+    )
+
+
+def app_url(path: str = "/") -> str:
+    """Absolute URL of ``path`` on the application under test."""
+    return load_config().local_endpoint + "/" + path.lstrip("/")
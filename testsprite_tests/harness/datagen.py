@@ -0,0 +1,685 @@
+"""Seeded synthetic practice data for scale testing.
+
+Generates patients, consultations, appointments and invoices shaped like the
+documents the app writes (``src/types/index.ts`` and the create paths of the
+patient, consultation, appointment and invoice services), passes every
+document through a port of ``HDSCompliance.prepareDataForStorage`` and loads
+them into a local Firestore emulator with ``documents:batchWrite``::
+
+    firebase emulators:start --only firestore --project demo-emulator
+    python -m harness.datagen --preset medium --seed 7 --osteopath-id <uid>
+
+The same seed, preset and ``--anchor`` date always produce the same
+documents, ids included. ``--out data.jsonl`` writes them to a file instead
+of (or in addition to) the emulator.
+
+Sensitive fields are left in clear text, like the app does while
+``hdsConfig.enabled`` is false, unless ``--encrypt`` is given; they are then
+encrypted in the ``IV:CryptoJS ciphertext`` format of ``encryptData``. That
+mode needs the ``cryptography`` package.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_OSTEOPATH_ID = "testsprite-osteopath"
+DEFAULT_PROJECT = os.environ.get("GCLOUD_PROJECT", "demo-emulator")
+DEFAULT_EMULATOR = os.environ.get("FIRESTORE_EMULATOR_HOST", "localhost:8080")
+BATCH_SIZE = 500  # Firestore limit for one batched write
+
+# src/firebase/config.ts and src/utils/encryption.ts
+COMPLIANCE_VERSION = "HDS-2022-01"
+MASTER_KEY = os.environ.get("VITE_ENCRYPTION_KEY") or "hds-compliant-encryption-key-must-be-stored-securely"
+
+# src/utils/hdsCompliance.ts
+SENSITIVE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "patients": (
+        "firstName", "lastName", "dateOfBirth", "socialSecurityNumber", "email", "phone",
+        "address", "medicalHistory", "allergies",
+    ),
+    "consultations": (
+        "reason", "treatment", "notes", "consultationReason", "currentTreatment",
+        "medicalAntecedents", "medicalHistory", "osteopathicTreatment", "symptoms",
+        "patientFirstName", "patientLastName", "patientDateOfBirth", "patientGender",
+        "patientPhone", "patientEmail", "patientProfession", "patientAddress",
+        "patientInsurance", "patientInsuranceNumber",
+    ),
+    "invoices": ("patientName", "notes"),
+}
+PSEUDONYMIZED_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "patients": ("socialSecurityNumber", "email", "phone"),
+    "consultations": (),
+    "invoices": (),
+}
+CLINICAL_FIELDS = (
+    "currentTreatment", "consultationReason", "medicalAntecedents", "medicalHistory",
+    "osteopathicTreatment", "notes", "reason", "treatment",
+)
+
+
+@dataclass(frozen=True)
+class Preset:
+    patients: int
+    consultations: int
+    upcoming_appointments: int
+    invoice_ratio: float
+
+
+PRESETS: Dict[str, Preset] = {
+    "small": Preset(patients=50, consultations=500, upcoming_appointments=20, invoice_ratio=0.8),
+    "medium": Preset(patients=500, consultations=5_000, upcoming_appointments=150, invoice_ratio=0.8),
+    "huge": Preset(patients=5_000, consultations=50_000, upcoming_appointments=1_000, invoice_ratio=0.8),
+}
+
+FIRST_NAMES = {
+    "male": (
+        "Louis", "Gabriel", "Léo", "Raphaël", "Arthur", "Jules", "Hugo", "Lucas", "Adam", "Nathan",
+        "Paul", "Théo", "Antoine", "Mathis", "Étienne", "François", "Nicolas", "Julien", "Thomas", "Rémi",
+    ),
+    "female": (
+        "Jade", "Louise", "Emma", "Alice", "Chloé", "Léa", "Manon", "Camille", "Inès", "Zoé",
+        "Hélène", "Céline", "Sophie", "Margaux", "Anaïs", "Élodie", "Juliette", "Clémence", "Noémie", "Aurélie",
+    ),
+}
+LAST_NAMES = (
+    "Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy", "Moreau",
+    "Simon", "Laurent", "Lefèvre", "Michel", "Garcia", "David", "Bertrand", "Roux", "Vincent", "Fournier",
+    "Morel", "Girard", "André", "Lefebvre", "Mercier", "Dupont", "Lambert", "Bonnet", "François", "Martinez",
+    "Legrand", "Garnier", "Faure", "Rousseau", "Blanc", "Guérin", "Muller", "Henry", "Roussel", "Nicolas",
+)
+CITIES = (
+    ("Paris", "75011"), ("Lyon", "69003"), ("Marseille", "13006"), ("Toulouse", "31000"),
+    ("Nantes", "44000"), ("Bordeaux", "33000"), ("Lille", "59000"), ("Rennes", "35000"),
+    ("Montpellier", "34000"), ("Strasbourg", "67000"), ("Grenoble", "38000"), ("Dijon", "21000"),
+)
+STREETS = (
+    "rue de la République", "avenue Jean Jaurès", "rue Victor Hugo", "boulevard Pasteur",
+    "rue des Lilas", "place de la Mairie", "rue du Moulin", "allée des Tilleuls", "rue Nationale",
+)
+PROFESSIONS = (
+    "Enseignant", "Infirmière", "Développeur", "Comptable", "Artisan", "Commercial", "Étudiant",
+    "Retraité", "Agriculteur", "Architecte", "Chauffeur", "Cadre", "Kinésithérapeute", "Musicien",
+)
+INSURANCES = ("MGEN", "Harmonie Mutuelle", "MAAF", "AG2R La Mondiale", "Malakoff Humanis", "Swiss Life")
+REASONS = (
+    "Lombalgie aiguë", "Cervicalgie", "Dorsalgie", "Sciatalgie", "Entorse de cheville",
+    "Céphalées de tension", "Douleur d'épaule", "Suivi post-partum", "Troubles digestifs",
+    "Tendinite du coude", "Bilan postural", "Douleur de genou", "Torticolis", "Vertiges positionnels",
+)
+TREATMENTS = (
+    "Techniques myotensives lombaires", "Mobilisation cervicale douce", "Traitement viscéral abdominal",
+    "Techniques crâniennes", "Manipulation thoracique", "Travail fascial du membre inférieur",
+    "Décoaptation sacro-iliaque", "Étirements de la chaîne postérieure", "Drainage lymphatique",
+)
+ANTECEDENTS = (
+    "Aucun antécédent notable", "Appendicectomie (2015)", "Fracture du poignet droit (2019)",
+    "Asthme traité", "Hypertension sous traitement", "Hernie discale L5-S1", "Migraines chroniques",
+    "Accouchement par césarienne", "Entorse récidivante de cheville", "Scoliose légère",
+)
+SYMPTOMS = (
+    "douleur", "raideur", "fourmillements", "fatigue", "maux de tête", "vertiges",
+    "insomnie", "douleur irradiante", "contracture", "limitation de mobilité",
+)
+NOTES = (
+    "Amélioration nette depuis la dernière séance.", "Revoir dans trois semaines.",
+    "Conseils posturaux donnés.", "Exercices d'étirement à faire quotidiennement.",
+    "Patient stressé, travail respiratoire proposé.", "Pas de contre-indication relevée.",
+    "Orienter vers le médecin traitant si persistance.", "",
+)
+ALLERGIES = ("", "", "", "Pénicilline", "Pollen", "Arachide", "Latex", "Aspirine")
+# authService.getDefaultPermissions('osteopath')
+OSTEOPATH_PERMISSIONS = (
+    "profile:read", "profile:write", "data:read", "data:write", "patients:read", "patients:write",
+    "consultations:read", "consultations:write", "invoices:read", "invoices:write",
+)
+APPOINTMENT_TYPES = ("consultation", "follow-up", "emergency")
+AUTO_ID_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+
+Document = Tuple[str, str, Dict[str, Any]]  # (collection, id, fields)
+
+
+# --- encryption (src/utils/encryption.ts) -----------------------------------
+
+def _evp_bytes_to_key(passphrase: bytes, salt: bytes, key_len: int = 32, iv_len: int = 16) -> Tuple[bytes, bytes]:
+    """OpenSSL ``EVP_BytesToKey`` with MD5 and one iteration, as CryptoJS does."""
+    derived, block = b"", b""
+    while len(derived) < key_len + iv_len:
+        block = hashlib.md5(block + passphrase + salt).digest()
+        derived += block
+    return derived[:key_len], derived[key_len:key_len + iv_len]
+
+
+class CryptoJSCipher:
+    """``AES.encrypt(text, passphrase).toString()`` of CryptoJS.
+
+    With a passphrase CryptoJS derives key and IV from a random 8-byte salt
+    and ignores the ``iv`` option, so the IV prefix written by
+    ``encryptData`` is informational only. Salts and IVs come from the seeded
+    generator so that a given seed always yields the same ciphertexts.
+    """
+
+    def __init__(self, rng: random.Random) -> None:
+        try:
+            from cryptography.hazmat.primitives import padding
+            from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+        except ImportError as exc:  # pragma: no cover - depends on the environment
+            raise SystemExit("--encrypt needs the 'cryptography' package (pip install cryptography)") from exc
+        self._padding, self._cipher, self._algorithms, self._modes = padding, Cipher, algorithms, modes
+        self.rng = rng
+
+    def encrypt(self, plaintext: str, passphrase: str) -> str:
+        salt = self.rng.randbytes(8)
+        key, iv = _evp_bytes_to_key(passphrase.encode("utf-8"), salt)
+        padder = self._padding.PKCS7(128).padder()
+        padded = padder.update(plaintext.encode("utf-8")) + padder.finalize()
+        encryptor = self._cipher(self._algorithms.AES(key), self._modes.CBC(iv)).encryptor()
+        ciphertext = encryptor.update(padded) + encryptor.finalize()
+        return base64.b64encode(b"Salted__" + salt + ciphertext).decode("ascii")
+
+    def user_key(self, user_id: str) -> str:
+        """``generateUserKey``: the user id encrypted with the master key."""
+        return self.encrypt(user_id, MASTER_KEY)
+
+    def encrypt_data(self, value: Any, user_key: str) -> str:
+        """``encryptData``: ``<IV hex>:<CryptoJS ciphertext>``."""
+        text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        return self.rng.randbytes(16).hex() + ":" + self.encrypt(text, user_key)
+
+
+_ENCRYPTED = re.compile(r"^[0-9a-fA-F]{12,64}:[A-Za-z0-9+/=]{16,}$")
+
+
+def is_encrypted(value: Any) -> bool:
+    """``isEncrypted``: the ``IV:ciphertext`` shape of ``encryptData`` output."""
+    return isinstance(value, str) and bool(_ENCRYPTED.match(value))
+
+
+def _js_string(value: Any) -> str:
+    """``String(value || '')`` for the values the generator produces."""
+    if not value:
+        return ""
+    if isinstance(value, list):
+        return ",".join(_js_string(item) for item in value)
+    return str(value)
+
+
+def prepare_for_storage(
+    data: Dict[str, Any],
+    collection: str,
+    user_id: str,
+    cipher: Optional[CryptoJSCipher] = None,
+    user_key: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Port of ``HDSCompliance.prepareDataForStorage``.
+
+    ``cipher`` plays the part of ``hdsConfig.enabled``: without it the fields
+    stay in clear text and ``_hds.encryptedFields`` is empty.
+    """
+    processed = dict(data)
+    if collection == "consultations":
+        for field in CLINICAL_FIELDS:
+            if processed.get(field) in (None, ""):
+                processed[field] = ""
+
+    to_encrypt = [
+        f for f in SENSITIVE_FIELDS.get(collection, ())
+        if processed.get(f) is not None and not is_encrypted(processed[f])
+    ]
+    if cipher:
+        for field in to_encrypt:
+            value = processed[field]
+            if field == "address" and isinstance(value, dict):
+                processed[field] = cipher.encrypt_data(value, user_key)
+            else:
+                processed[field] = cipher.encrypt_data(_js_string(value), user_key)
+
+    pseudo_fields = PSEUDONYMIZED_FIELDS.get(collection, ())
+    present = [f for f in pseudo_fields if processed.get(f) is not None]
+    if present:
+        # The app spreads the string value into an object of characters
+        # (``pseudonymizeData({...value})``); mirror the stored shape.
+        processed["_pseudoIndex"] = {f: {str(i): c for i, c in enumerate(str(processed[f]))} for f in present}
+
+    processed["_hds"] = {
+        "version": COMPLIANCE_VERSION,
+        "encryptedFields": to_encrypt if cipher else [],
+        "pseudonymizedFields": list(pseudo_fields),
+        "lastUpdated": (now or datetime.now(timezone.utc)).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+        "updatedBy": user_id,
+    }
+    return processed
+
+
+# --- generation -------------------------------------------------------------
+
+class PracticeGenerator:
+    """Deterministic documents of one practice for a preset and a seed."""
+
+    def __init__(
+        self,
+        preset: Preset,
+        seed: int,
+        osteopath_id: str = DEFAULT_OSTEOPATH_ID,
+        anchor: Optional[date] = None,
+        encrypt: bool = False,
+    ) -> None:
+        self.preset = preset
+        self.osteopath_id = osteopath_id
+        self.rng = random.Random(seed)
+        anchor = anchor or date.today()
+        self.now = datetime(anchor.year, anchor.month, anchor.day, 8, 0, tzinfo=timezone.utc)
+        self.cipher = CryptoJSCipher(random.Random(seed ^ 0x5EED)) if encrypt else None
+        self.user_key = self.cipher.user_key(osteopath_id) if self.cipher else None
+        self._invoice_seq: Dict[str, int] = {}
+
+    # helpers
+
+    def _auto_id(self) -> str:
+        return "".join(self.rng.choice(AUTO_ID_ALPHABET) for _ in range(20))
+
+    def _uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _iso(self, moment: datetime) -> str:
+        return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+    def _slot(self, day: date) -> datetime:
+        """A 45-minute slot between 8:00 and 18:15 on ``day``."""
+        minutes = 8 * 60 + 15 * self.rng.randrange(0, 42)
+        return datetime(day.year, day.month, day.day, minutes // 60, minutes % 60, tzinfo=timezone.utc)
+
+    def _store(self, collection: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        return prepare_for_storage(data, collection, self.osteopath_id, self.cipher, self.user_key, self.now)
+
+    def _consultation_counts(self) -> List[int]:
+        """Consultations per patient: one each, the rest skewed towards regulars."""
+        patients, total = self.preset.patients, max(self.preset.consultations, self.preset.patients)
+        weights = [self.rng.paretovariate(1.5) for _ in range(patients)]
+        counts = [1] * patients
+        for index in self.rng.choices(range(patients), weights=weights, k=total - patients):
+            counts[index] += 1
+        return counts
+
+    # documents
+
+    def patient(self) -> Dict[str, Any]:
+        rng = self.rng
+        gender = rng.choices(("female", "male", "other"), weights=(52, 46, 2))[0]
+        first = rng.choice(FIRST_NAMES["male" if gender == "male" else "female"])
+        last = rng.choice(LAST_NAMES)
+        birth = date(rng.randint(1940, 2020), rng.randint(1, 12), rng.randint(1, 28))
+        city, zip_code = rng.choice(CITIES)
+        created = self.now - timedelta(days=rng.randint(30, 5 * 365), minutes=rng.randint(0, 600))
+        email_local = f"{first}.{last}".lower().encode("ascii", "ignore").decode().replace(" ", "")
+        return {
+            "id": self._uuid(),
+            "firstName": first,
+            "lastName": last,
+            "gender": gender,
+            "dateOfBirth": birth.isoformat(),
+            "profession": rng.choice(PROFESSIONS),
+            "email": f"{email_local}{rng.randint(1, 999)}@example.com",
+            "phone": "0" + str(rng.choice((6, 7))) + "".join(str(rng.randint(0, 9)) for _ in range(8)),
+            "address": {
+                "street": f"{rng.randint(1, 120)} {rng.choice(STREETS)}",
+                "city": city,
+                "zipCode": zip_code,
+                "country": "France",
+            },
+            "insurance": {"provider": rng.choice(INSURANCES), "policyNumber": str(rng.randint(10**9, 10**10 - 1))},
+            "medicalHistory": rng.choice(ANTECEDENTS),
+            "allergies": rng.choice(ALLERGIES),
+            "notes": rng.choice(NOTES),
+            "tags": [],
+            "currentTreatment": rng.choice(TREATMENTS),
+            "consultationReason": rng.choice(REASONS),
+            "medicalAntecedents": rng.choice(ANTECEDENTS),
+            "osteopathicTreatment": rng.choice(TREATMENTS),
+            "createdAt": self._iso(created),
+            "updatedAt": self._iso(created),
+            "createdBy": self.osteopath_id,
+            "osteopathId": self.osteopath_id,
+        }
+
+    def _snapshot(self, patient: Dict[str, Any]) -> Dict[str, Any]:
+        address = patient["address"]
+        return {
+            "patientFirstName": patient["firstName"],
+            "patientLastName": patient["lastName"],
+            "patientDateOfBirth": patient["dateOfBirth"],
+            "patientGender": patient["gender"],
+            "patientPhone": patient["phone"],
+            "patientEmail": patient["email"],
+            "patientProfession": patient["profession"],
+            "patientAddress": f"{address['street']}, {address['zipCode']} {address['city']}",
+            "patientInsurance": patient["insurance"]["provider"],
+            "patientInsuranceNumber": patient["insurance"]["policyNumber"],
+        }
+
+    def consultation(self, patient: Dict[str, Any], when: datetime, initial: bool) -> Dict[str, Any]:
+        rng = self.rng
+        reason = patient["consultationReason"] if initial else rng.choice(REASONS)
+        treatment = rng.choice(TREATMENTS)
+        return {
+            "patientId": patient["id"],
+            "patientName": f"{patient['firstName']} {patient['lastName']}",
+            "osteopathId": self.osteopath_id,
+            "date": when,
+            "reason": reason,
+            "treatment": treatment,
+            "notes": rng.choice(NOTES),
+            "duration": 45,
+            "price": rng.choice((55, 60, 65, 70)),
+            "status": "completed",
+            "examinations": [],
+            "prescriptions": [],
+            **self._snapshot(patient),
+            "currentTreatment": treatment,
+            "consultationReason": reason,
+            "medicalAntecedents": patient["medicalAntecedents"],
+            "medicalHistory": patient["medicalHistory"],
+            "osteopathicTreatment": treatment,
+            "symptoms": rng.sample(SYMPTOMS, rng.randint(1, 3)),
+            "isInitialConsultation": initial,
+            "documents": [],
+            "createdAt": when + timedelta(minutes=50),
+            "updatedAt": when + timedelta(minutes=50),
+        }
+
+    def appointment(self, patient: Dict[str, Any], when: datetime, consultation_id: Optional[str]) -> Dict[str, Any]:
+        data = {
+            "patientId": patient["id"],
+            "patientName": f"{patient['firstName']} {patient['lastName']}",
+            "practitionerId": self.osteopath_id,
+            "practitionerName": "Ostéopathe",
+            "osteopathId": self.osteopath_id,
+            "date": when,
+            "endTime": when + timedelta(minutes=45),
+            "duration": 45,
+            "type": "consultation" if consultation_id else self.rng.choice(APPOINTMENT_TYPES),
+            "status": "completed" if consultation_id else "confirmed",
+            "location": {"type": "office", "name": "Cabinet principal"},
+            "notes": "",
+            "createdAt": when - timedelta(days=self.rng.randint(1, 21)),
+            "updatedAt": when,
+            "createdBy": self.osteopath_id,
+        }
+        if consultation_id:
+            data["consultationId"] = consultation_id
+        return data
+
+    def invoice(self, patient: Dict[str, Any], consultation_id: str, consultation: Dict[str, Any]) -> Dict[str, Any]:
+        when: datetime = consultation["date"]
+        stamp = when.strftime("%Y%m%d-%H%M")
+        # Same-minute consultations would collide on F-YYYYMMDD-HHMM.
+        self._invoice_seq[stamp] = seq = self._invoice_seq.get(stamp, 0) + 1
+        price = float(consultation["price"])
+        return {
+            "number": f"F-{stamp}" + (f"-{seq}" if seq > 1 else ""),
+            "patientId": patient["id"],
+            "patientName": consultation["patientName"],
+            "consultationId": consultation_id,
+            "osteopathId": self.osteopath_id,
+            "issueDate": when.date().isoformat(),
+            "dueDate": (when.date() + timedelta(days=30)).isoformat(),
+            "items": [{
+                "id": "1",
+                "description": "Consultation ostéopathique",
+                "quantity": 1,
+                "unitPrice": price,
+                "taxRate": 0,
+                "amount": price,
+            }],
+            "subtotal": price,
+            "tax": 0,
+            "total": price,
+            "status": "paid" if self.rng.random() < 0.9 else "unpaid",
+            "notes": "",
+            "createdAt": when + timedelta(minutes=55),
+            "updatedAt": when + timedelta(minutes=55),
+            "createdBy": self.osteopath_id,
+        }
+
+    def documents(self, raw: bool = False) -> Iterator[Document]:
+        """Yield ``(collection, id, fields)``, one patient and its history at a time.
+
+        ``raw`` skips ``prepare_for_storage`` and yields the clear-text
+        documents, e.g. to rebuild the patients of an already seeded practice.
+        """
+        rng = self.rng
+        counts = self._consultation_counts()
+        upcoming = rng.choices(range(self.preset.patients), k=self.preset.upcoming_appointments)
+        upcoming_by_patient: Dict[int, int] = {}
+        for index in upcoming:
+            upcoming_by_patient[index] = upcoming_by_patient.get(index, 0) + 1
+
+        for index, count in enumerate(counts):
+            patient = self.patient()
+            created = datetime.fromisoformat(patient["createdAt"].replace("Z", "+00:00"))
+            span = max((self.now - created).days, 1)
+            days = sorted(rng.randrange(span) for _ in range(count))
+            next_appointment: Optional[datetime] = None
+
+            history: List[Document] = []
+            for position, offset in enumerate(days):
+                when = self._slot((created + timedelta(days=offset)).date())
+                consultation_id, appointment_id = self._auto_id(), self._auto_id()
+                consultation = self.consultation(patient, when, initial=position == 0)
+                consultation["appointmentId"] = appointment_id
+                history.append(("appointments", appointment_id, self.appointment(patient, when, consultation_id)))
+                if rng.random() < self.preset.invoice_ratio:
+                    history.append(("invoices", self._auto_id(), self.invoice(patient, consultation_id, consultation)))
+                history.append(("consultations", consultation_id, consultation))
+
+            for _ in range(upcoming_by_patient.get(index, 0)):
+                when = self._slot((self.now + timedelta(days=rng.randint(1, 60))).date())
+                next_appointment = min(next_appointment or when, when)
+                history.append(("appointments", self._auto_id(), self.appointment(patient, when, None)))
+
+            if next_appointment:
+                patient["nextAppointment"] = next_appointment.strftime("%Y-%m-%dT%H:%M:00")
+            yield "patients", patient["id"], patient if raw else self._store("patients", patient)
+            for collection, doc_id, data in history:
+                yield collection, doc_id, data if raw else self._store(collection, data)
+
+    def user_profile(self, email: Optional[str] = None) -> Document:
+        """``users/{uid}`` as ``authService`` creates it for an osteopath."""
+        return "users", self.osteopath_id, {
+            "uid": self.osteopath_id,
+            "email": email or f"{self.osteopath_id}@example.com",
+            "displayName": "Ostéopathe",
+            "role": "osteopath",
+            "permissions": list(OSTEOPATH_PERMISSIONS),
+            "lastLogin": self._iso(self.now),
+            "isActive": True,
+        }
+
+
+# --- Firestore emulator -----------------------------------------------------
+
+def to_value(value: Any) -> Dict[str, Any]:
+    """Encode a Python value as a Firestore REST ``Value``."""
+    if value is None:
+        return {"nullValue": None}
+    if isinstance(value, bool):
+        return {"booleanValue": value}
+    if isinstance(value, int):
+        return {"integerValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, datetime):
+        return {"timestampValue": value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")}
+    if isinstance(value, str):
+        return {"stringValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [to_value(v) for v in value]}}
+    if isinstance(value, dict):
+        return {"mapValue": {"fields": {k: to_value(v) for k, v in value.items()}}}
+    raise TypeError(f"cannot store {type(value).__name__} in Firestore")
+
+
+def from_value(value: Dict[str, Any]) -> Any:
+    """Decode a Firestore REST ``Value``; timestamps become aware datetimes."""
+    kind, raw = next(iter(value.items()))
+    if kind == "integerValue":
+        return int(raw)
+    if kind == "timestampValue":
+        return datetime.fromisoformat(re.sub(r"(\.\d{6})\d*", r"\1", raw).replace("Z", "+00:00"))
+    if kind == "arrayValue":
+        return [from_value(v) for v in raw.get("values", [])]
+    if kind == "mapValue":
+        return {k: from_value(v) for k, v in raw.get("fields", {}).items()}
+    return raw
+
+
+def to_json(value: Any) -> Any:
+    """JSON-friendly copy, timestamps as ``{"__timestamp__": iso}``."""
+    if isinstance(value, datetime):
+        return {"__timestamp__": value.isoformat()}
+    if isinstance(value, dict):
+        return {k: to_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_json(v) for v in value]
+    return value
+
+
+def _chunks(documents: Iterable[Document], size: int) -> Iterator[List[Document]]:
+    chunk: List[Document] = []
+    for document in documents:
+        chunk.append(document)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class EmulatorLoader:
+    """Writes documents to the Firestore emulator in batches of ``BATCH_SIZE``.
+
+    ``Authorization: Bearer owner`` makes the emulator skip the security
+    rules, like the Admin SDK would.
+    """
+
+    def __init__(self, host: str = DEFAULT_EMULATOR, project: str = DEFAULT_PROJECT, concurrency: int = 8) -> None:
+        self.host = host
+        self.root = f"projects/{project}/databases/(default)/documents"
+        self.concurrency = concurrency
+
+    def _request(self, method: str, url: str, body: Optional[dict] = None) -> dict:
+        request = urllib.request.Request(
+            url,
+            data=json.dumps(body).encode("utf-8") if body is not None else None,
+            method=method,
+            headers={"Content-Type": "application/json", "Authorization": "Bearer owner"},
+        )
+        with urllib.request.urlopen(request, timeout=60) as response:
+            payload = response.read()
+        return json.loads(payload) if payload else {}
+
+    def clear(self) -> None:
+        """Delete every document of the project (emulator-only endpoint)."""
+        self._request("DELETE", f"http://{self.host}/emulator/v1/{self.root}")
+
+    def write_batch(self, batch: List[Document]) -> int:
+        writes = [
+            {"update": {"name": f"{self.root}/{collection}/{doc_id}", "fields": {k: to_value(v) for k, v in data.items()}}}
+            for collection, doc_id, data in batch
+        ]
+        result = self._request("POST", f"http://{self.host}/v1/{self.root}:batchWrite", {"writes": writes})
+        failed = [s for s in result.get("status", []) if s.get("code", 0) != 0]
+        if failed:
+            raise RuntimeError(f"{len(failed)} write(s) rejected: {failed[0].get('message')}")
+        return len(batch)
+
+    def load(self, documents: Iterable[Document], on_progress=None) -> int:
+        """Write ``documents`` with at most ``concurrency`` batches in flight."""
+        written = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            pending = []
+            for batch in _chunks(documents, BATCH_SIZE):
+                pending.append(pool.submit(self.write_batch, batch))
+                if len(pending) >= self.concurrency * 2:
+                    written += pending.pop(0).result()
+                    if on_progress:
+                        on_progress(written)
+            for future in pending:
+                written += future.result()
+                if on_progress:
+                    on_progress(written)
+        return written
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.datagen", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--osteopath-id", default=DEFAULT_OSTEOPATH_ID, help="uid owning the generated practice")
+    parser.add_argument("--anchor", type=date.fromisoformat, help="'today' of the generated history (default: today)")
+    parser.add_argument("--encrypt", action="store_true", help="encrypt sensitive fields like HDS mode does")
+    parser.add_argument("--emulator", default=DEFAULT_EMULATOR, help="Firestore emulator host:port")
+    parser.add_argument("--project", default=DEFAULT_PROJECT)
+    parser.add_argument("--clear", action="store_true", help="wipe the emulator database first")
+    parser.add_argument("--concurrency", type=int, default=8, help="batches in flight (default: 8)")
+    parser.add_argument("--out", help="write the documents as JSON lines to this file")
+    parser.add_argument("--no-load", action="store_true", help="do not write to the emulator")
+    args = parser.parse_args(argv)
+
+    generator = PracticeGenerator(PRESETS[args.preset], args.seed, args.osteopath_id, args.anchor, args.encrypt)
+    counts: Dict[str, int] = {}
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+
+    def stream() -> Iterator[Document]:
+        # Documents are counted and written out as they are loaded, so even
+        # the huge preset never sits in memory as a whole.
+        for document in itertools.chain([generator.user_profile()], generator.documents()):
+            collection, doc_id, data = document
+            counts[collection] = counts.get(collection, 0) + 1
+            if out:
+                out.write(json.dumps({"collection": collection, "id": doc_id, "data": to_json(data)}, ensure_ascii=False) + "\n")
+            yield document
+
+    started = time.perf_counter()
+    try:
+        if args.no_load:
+            written = sum(1 for _ in stream())
+        else:
+            loader = EmulatorLoader(args.emulator, args.project, args.concurrency)
+            if args.clear:
+                loader.clear()
+            written = loader.load(stream())
+    except (urllib.error.URLError, ConnectionError) as exc:
+        print(f"Firestore emulator unreachable at {args.emulator}: {exc}", file=sys.stderr)
+        return 2
+    finally:
+        if out:
+            out.close()
+    elapsed = time.perf_counter() - started
+    print("generated " + ", ".join(f"{n} {c}" for c, n in counts.items()))
+    if args.out:
+        print(f"written to {args.out}")
+    if not args.no_load:
+        print(f"loaded {written} documents into {args.project} in {elapsed:.1f}s ({written / max(elapsed, 1e-9):.0f} docs/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
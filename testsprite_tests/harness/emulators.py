@@ -0,0 +1,316 @@
+"""Hermetic test environment on the local Firebase emulators.
+
+``HermeticEnvironment`` starts the Auth, Firestore, Storage and Functions
+emulators from the repository's ``firebase.json`` (with ``firestore.rules``
+and ``storage.rules``), creates the practitioner account in the Auth
+emulator, seeds its practice with ``harness.datagen`` and serves the app with
+a Vite dev server built with ``VITE_FIREBASE_USE_EMULATOR=true``. While it is
+up, ``load_config()`` points the suite at that server and that account, so
+neither the dev server of ``tmp/config.json`` nor the real project is
+contacted. Everything is stopped again on exit::
+
+    python -m harness --emulators --preset medium   # run the suite hermetically
+    python -m harness.emulators                     # keep it up for standalone TC runs
+
+The emulator project id starts with ``demo-``, which keeps the emulators from
+reaching any real Firebase resource. The emulator binaries are downloaded by
+``firebase-tools`` on first use; later runs work offline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from . import auth, datagen
+from .config import SUITE_DIR, load_config
+
+REPO_ROOT = SUITE_DIR.parent
+LOG_DIR = SUITE_DIR / "tmp" / "emulators"
+
+PROJECT_ID = "demo-testsprite"
+# Ports hard-coded in src/firebase/config.ts and declared in firebase.json.
+EMULATOR_PORTS = {"auth": 9099, "firestore": 8080, "storage": 9199, "functions": 5001}
+APP_PORT = int(os.environ.get("TESTSPRITE_APP_PORT", "5199"))
+START_TIMEOUT_S = float(os.environ.get("TESTSPRITE_EMULATOR_TIMEOUT", "180"))
+
+LOGIN_USER = "praticien@testsprite.local"
+LOGIN_PASSWORD = "testsprite-password"
+
+# The app reads these at build time; they override whatever .env holds so a
+# hermetic run can never talk to the real project.
+APP_ENV = {
+    "VITE_FIREBASE_USE_EMULATOR": "true",
+    "VITE_FIREBASE_USE_PRODUCTION": "false",
+    "VITE_FIREBASE_API_KEY": "demo-api-key",
+    "VITE_FIREBASE_AUTH_DOMAIN": f"{PROJECT_ID}.firebaseapp.com",
+    "VITE_FIREBASE_PROJECT_ID": PROJECT_ID,
+    "VITE_FIREBASE_STORAGE_BUCKET": f"{PROJECT_ID}.appspot.com",
+    "VITE_FIREBASE_APP_ID": "1:000000000000:web:testsprite",
+    "VITE_ENABLE_PWA": "false",
+}
+
+
+class EmulatorError(RuntimeError):
+    """A service of the hermetic environment could not be started."""
+
+
+def port_open(port: int, host: str = "localhost") -> bool:
+    try:
+        with socket.create_connection((host, port), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+@dataclass(frozen=True)
+class Account:
+    email: str
+    password: str
+    uid: str
+    id_token: str
+    created: bool
+
+
+def _identity(method: str, body: dict) -> dict:
+    url = (
+        f"http://localhost:{EMULATOR_PORTS['auth']}/identitytoolkit.googleapis.com/v1/accounts:{method}"
+        f"?key={APP_ENV['VITE_FIREBASE_API_KEY']}"
+    )
+    request = urllib.request.Request(url, data=json.dumps(body).encode("utf-8"), headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def sign_up(email: str, password: str) -> Account:
+    """Create ``email`` in the Auth emulator, or sign it in if it already exists."""
+    body = {"email": email, "password": password, "returnSecureToken": True}
+    try:
+        data, created = _identity("signUp", body), True
+    except urllib.error.HTTPError as exc:
+        if b"EMAIL_EXISTS" not in exc.read():
+            raise
+        data, created = _identity("signInWithPassword", body), False
+    return Account(email, password, data["localId"], data["idToken"], created)
+
+
+def seed_practice(uid: str, email: str, preset: str = "small", seed: int = 1, encrypt: bool = False) -> int:
+    """Load the synthetic practice of ``uid`` (and its ``users`` profile) into the Firestore emulator."""
+    generator = datagen.PracticeGenerator(datagen.PRESETS[preset], seed, uid, encrypt=encrypt)
+    loader = datagen.EmulatorLoader(f"localhost:{EMULATOR_PORTS['firestore']}", PROJECT_ID)
+    return loader.load(itertools.chain([generator.user_profile(email)], generator.documents()))
+
+
+class Service:
+    """A child process in its own process group, logging to ``LOG_DIR``."""
+
+    def __init__(self, name: str, command: Sequence[str], ports: Sequence[int], env: Optional[Dict[str, str]] = None) -> None:
+        self.name = name
+        self.command = list(command)
+        self.ports = list(ports)
+        self.env = env
+        self.process: Optional[subprocess.Popen] = None
+        self.log_path = LOG_DIR / f"{name}.log"
+
+    def start(self) -> None:
+        busy = [port for port in self.ports if port_open(port)]
+        if busy:
+            raise EmulatorError(f"{self.name}: port(s) {busy} already in use")
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        log = open(self.log_path, "wb")
+        self.process = subprocess.Popen(
+            self.command,
+            cwd=REPO_ROOT,
+            env={**os.environ, **(self.env or {})},
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        log.close()
+
+    def wait_ready(self, timeout: float = START_TIMEOUT_S) -> None:
+        deadline = time.monotonic() + timeout
+        pending = list(self.ports)
+        while pending:
+            if self.process and self.process.poll() is not None:
+                raise EmulatorError(f"{self.name} exited with code {self.process.returncode}, see {self.log_path}")
+            if time.monotonic() > deadline:
+                raise EmulatorError(f"{self.name} not listening on {pending} after {timeout:.0f}s, see {self.log_path}")
+            pending = [port for port in pending if not port_open(port)]
+            if pending:
+                time.sleep(0.25)
+
+    def stop(self, grace: float = 20.0) -> None:
+        """SIGINT the process group (the Firebase CLI then stops its JVMs), SIGKILL after ``grace``."""
+        process, self.process = self.process, None
+        if process is None or process.poll() is not None:
+            return
+        try:
+            os.killpg(process.pid, signal.SIGINT)
+            process.wait(timeout=grace)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+        except ProcessLookupError:
+            pass
+
+
+class HermeticEnvironment:
+    """Emulators, seeded data and dev server for one suite run.
+
+    Usable as a context manager; ``start`` leaves nothing running if one of
+    the services fails.
+    """
+
+    def __init__(
+        self,
+        *,
+        preset: str = "small",
+        seed: int = 1,
+        encrypt: bool = False,
+        app_port: int = APP_PORT,
+        emulators: Sequence[str] = tuple(EMULATOR_PORTS),
+        serve_app: bool = True,
+    ) -> None:
+        self.preset = preset
+        self.seed = seed
+        self.encrypt = encrypt
+        self.app_port = app_port
+        self.serve_app = serve_app
+        self.endpoint = f"http://localhost:{app_port}"
+        self.user_id: Optional[str] = None
+        self.firebase = Service(
+            "firebase",
+            ["npx", "firebase-tools", "emulators:start", "--only", ",".join(emulators), "--project", PROJECT_ID],
+            [EMULATOR_PORTS[name] for name in emulators],
+        )
+        self.vite = Service(
+            "vite",
+            ["npx", "vite", "--port", str(app_port), "--strictPort"],
+            [app_port],
+            env=APP_ENV,
+        )
+        self._saved_env: Dict[str, Optional[str]] = {}
+
+    def create_user(self) -> str:
+        return sign_up(LOGIN_USER, LOGIN_PASSWORD).uid
+
+    def seed_data(self) -> int:
+        return seed_practice(self.user_id, LOGIN_USER, self.preset, self.seed, self.encrypt)
+
+    def wait_app(self, timeout: float = START_TIMEOUT_S) -> None:
+        """Wait until the dev server answers, not only accepts connections."""
+        self.vite.wait_ready(timeout)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                with urllib.request.urlopen(self.endpoint + "/", timeout=5):
+                    return
+            except (urllib.error.URLError, ConnectionError):
+                if time.monotonic() > deadline:
+                    raise EmulatorError(f"dev server not answering on {self.endpoint}, see {self.vite.log_path}")
+                time.sleep(0.25)
+
+    def _point_suite_here(self) -> None:
+        overrides = {
+            "TESTSPRITE_ENDPOINT": self.endpoint,
+            "TESTSPRITE_LOGIN_USER": LOGIN_USER,
+            "TESTSPRITE_LOGIN_PASSWORD": LOGIN_PASSWORD,
+        }
+        for key, value in overrides.items():
+            self._saved_env[key] = os.environ.get(key)
+            os.environ[key] = value
+        load_config.cache_clear()
+        # A session cached for a previous emulator run names a user that no
+        # longer exists.
+        auth.invalidate()
+
+    def _restore_suite(self) -> None:
+        for key, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        self._saved_env.clear()
+        load_config.cache_clear()
+        auth.invalidate()
+
+    def start(self) -> "HermeticEnvironment":
+        try:
+            self.firebase.start()
+            self.firebase.wait_ready()
+            self.user_id = self.create_user()
+            seeded = self.seed_data()
+            print(f"emulators up, {seeded} documents seeded for {LOGIN_USER} ({self.preset}, seed {self.seed})", flush=True)
+            if self.serve_app:
+                self.vite.start()
+                self.wait_app()
+        except BaseException:
+            self.stop()
+            raise
+        self._point_suite_here()
+        if self.serve_app:
+            print(f"app served on {self.endpoint}", flush=True)
+        return self
+
+    def stop(self) -> None:
+        self.vite.stop()
+        self.firebase.stop()
+        if self._saved_env:
+            self._restore_suite()
+
+    def __enter__(self) -> "HermeticEnvironment":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def exports(environment: HermeticEnvironment) -> List[str]:
+    """Shell lines pointing standalone TC scripts at ``environment``."""
+    return [
+        f"export TESTSPRITE_ENDPOINT={environment.endpoint}",
+        f"export TESTSPRITE_LOGIN_USER={LOGIN_USER}",
+        f"export TESTSPRITE_LOGIN_PASSWORD={LOGIN_PASSWORD}",
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.emulators", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--preset", choices=sorted(datagen.PRESETS), default="small")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--encrypt", action="store_true", help="seed HDS-encrypted documents")
+    parser.add_argument("--app-port", type=int, default=APP_PORT)
+    args = parser.parse_args(argv)
+
+    environment = HermeticEnvironment(preset=args.preset, seed=args.seed, encrypt=args.encrypt, app_port=args.app_port)
+    try:
+        environment.start()
+    except EmulatorError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    print("\n".join(exports(environment)) + "\nCtrl-C to stop", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        environment.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
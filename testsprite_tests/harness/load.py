@@ -0,0 +1,491 @@
+"""Multi-practitioner load generator for the consultation workflow.
+
+Every simulated practitioner owns an account and a seeded practice on the
+emulators and loops over the journey of TC003/TC007/TC008: create a
+consultation, list the consultations, open one, edit it. Two drivers replay
+that journey:
+
+``firestore``
+    Lightweight clients on the Firestore emulator REST API, authenticated
+    with the practitioner's ID token so ``firestore.rules`` apply. Each
+    operation issues the reads and writes of the service it stands for:
+    ``ConsultationService.createConsultation`` with its automatic invoice and
+    audit entries, ``getAllConsultations``, ``getConsultationById`` and
+    ``updateConsultation`` with ``syncPatientNextAppointment`` and, for
+    initial consultations, the bidirectional patient sync.
+``browser``
+    One Playwright context per practitioner on the shared browser, logged in
+    through the login form, calling the app's own ``ConsultationService``
+    inside the page (modules served by the Vite dev server), so encryption,
+    validation and the patient sync run exactly as in the app.
+
+Throughput, latency percentiles and error rates are reported per operation
+and written to ``tmp/perf/load-<timestamp>.json``::
+
+    python -m harness.load --emulators --users 25 --duration 120
+    python -m harness.load --mode browser --emulators --users 8 --iterations 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from playwright import async_api
+
+from . import datagen, emulators
+from .auth import login
+from .baseline import percentile
+from .browser import DEFAULT_TIMEOUT_MS, launch_browser
+from .config import app_url
+from .perf import PERF_ROOT
+
+OPERATIONS = ("create", "list", "detail", "edit")
+USER_EMAIL = "praticien{:03d}@testsprite.local"
+USER_PASSWORD = "testsprite-password"
+# Patients of each practice a journey picks from.
+PATIENT_POOL = 25
+
+
+class Stats:
+    """Latencies and errors per operation, shared by every simulated user."""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = {op: [] for op in OPERATIONS}
+        self.errors: Dict[str, Counter] = {op: Counter() for op in OPERATIONS}
+        self.journeys = 0
+        self.started = time.perf_counter()
+
+    @asynccontextmanager
+    async def measure(self, operation: str) -> AsyncIterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as exc:
+            message = str(exc).splitlines()[0][:120] if str(exc) else ""
+            self.errors[operation][f"{type(exc).__name__}: {message}"] += 1
+            raise
+        else:
+            self.latencies[operation].append((time.perf_counter() - started) * 1000)
+
+    def report(self, users: int, mode: str) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        operations = {}
+        for op in OPERATIONS:
+            samples, errors = self.latencies[op], sum(self.errors[op].values())
+            total = len(samples) + errors
+            operations[op] = {
+                "count": total,
+                "errors": errors,
+                "errorRate": errors / total if total else 0.0,
+                "throughput": len(samples) / elapsed if elapsed else 0.0,
+                **{f"p{q}": round(percentile(samples, q), 1) if samples else None for q in (50, 95, 99)},
+                "max": round(max(samples), 1) if samples else None,
+                "topErrors": self.errors[op].most_common(3),
+            }
+        return {
+            "mode": mode,
+            "users": users,
+            "generatedAt": datetime.now().isoformat(timespec="seconds"),
+            "durationS": round(elapsed, 1),
+            "journeys": self.journeys,
+            "journeysPerS": round(self.journeys / elapsed, 2) if elapsed else 0.0,
+            "operations": operations,
+        }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{report['users']} user(s), {report['mode']} driver, {report['journeys']} journeys "
+        f"in {report['durationS']}s ({report['journeysPerS']}/s)",
+        f"{'operation':<10} {'count':>7} {'err %':>6} {'ops/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}",
+    ]
+    for op, s in report["operations"].items():
+        cells = [f"{'-' if s[k] is None else s[k]:>8}" for k in ("p50", "p95", "p99", "max")]
+        lines.append(f"{op:<10} {s['count']:>7} {s['errorRate'] * 100:>6.1f} {s['throughput']:>7.2f} " + " ".join(cells))
+        for message, count in s["topErrors"]:
+            lines.append(f"{'':<10} {count:>7}x {message}")
+    return "\n".join(lines)
+
+
+@dataclass
+class Practitioner:
+    index: int
+    account: emulators.Account
+    generator: datagen.PracticeGenerator
+    patients: List[Dict[str, Any]] = field(default_factory=list)
+    created: List[str] = field(default_factory=list)
+
+
+def provision(users: int, preset: str, seed: int, encrypt: bool = False) -> List[Practitioner]:
+    """Sign the practitioners up and seed their practices (once per account)."""
+    practitioners = []
+    for index in range(users):
+        email = USER_EMAIL.format(index + 1)
+        account = emulators.sign_up(email, USER_PASSWORD)
+        if account.created:
+            emulators.seed_practice(account.uid, email, preset, seed + index, encrypt)
+        # A generator rebuilt with the practice's seed yields the same patients,
+        # ids included, in clear text; a second one produces the new documents.
+        generator = datagen.PracticeGenerator(datagen.PRESETS[preset], seed + index, account.uid, encrypt=encrypt)
+        patients = [
+            data for collection, _, data in itertools.islice(
+                datagen.PracticeGenerator(datagen.PRESETS[preset], seed + index, account.uid).documents(raw=True),
+                PATIENT_POOL * 40,
+            )
+            if collection == "patients"
+        ][:PATIENT_POOL]
+        practitioners.append(Practitioner(index, account, generator, patients))
+    return practitioners
+
+
+# --- firestore driver -------------------------------------------------------
+
+class FirestoreClient:
+    """Minimal Firestore REST client acting as one signed-in user."""
+
+    def __init__(self, id_token: str, host: str = datagen.DEFAULT_EMULATOR, project: str = emulators.PROJECT_ID) -> None:
+        self.root = f"projects/{project}/databases/(default)/documents"
+        self.base = f"http://{host}/v1/{self.root}"
+        self.headers = {"Content-Type": "application/json", "Authorization": f"Bearer {id_token}"}
+
+    def _call(self, method: str, url: str, body: Optional[dict] = None) -> Any:
+        request = urllib.request.Request(
+            url, data=json.dumps(body).encode("utf-8") if body is not None else None, method=method, headers=self.headers,
+        )
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return json.loads(response.read() or b"{}")
+
+    @staticmethod
+    def _decode(document: dict) -> Dict[str, Any]:
+        data = {k: datagen.from_value(v) for k, v in document.get("fields", {}).items()}
+        data["id"] = document["name"].rsplit("/", 1)[-1]
+        return data
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self._decode(self._call("GET", f"{self.base}/{path}"))
+        except urllib.error.HTTPError as exc:
+            if exc.code == 404:
+                return None
+            raise
+
+    def query(self, collection: str, equals: Dict[str, Any], order_by: Optional[str] = None) -> List[Dict[str, Any]]:
+        filters = [
+            {"fieldFilter": {"field": {"fieldPath": name}, "op": "EQUAL", "value": datagen.to_value(value)}}
+            for name, value in equals.items()
+        ]
+        structured: Dict[str, Any] = {
+            "from": [{"collectionId": collection}],
+            "where": {"compositeFilter": {"op": "AND", "filters": filters}} if len(filters) > 1 else filters[0],
+        }
+        if order_by:
+            structured["orderBy"] = [{"field": {"fieldPath": order_by}, "direction": "DESCENDING"}]
+        rows = self._call("POST", f"{self.base}:runQuery", {"structuredQuery": structured})
+        return [self._decode(row["document"]) for row in rows if "document" in row]
+
+    def create(self, collection: str, data: Dict[str, Any]) -> str:
+        fields = {k: datagen.to_value(v) for k, v in data.items()}
+        return self._call("POST", f"{self.base}/{collection}", {"fields": fields})["name"].rsplit("/", 1)[-1]
+
+    def update(self, path: str, data: Dict[str, Any]) -> None:
+        mask = urllib.parse.urlencode([("updateMask.fieldPaths", name) for name in data] + [("currentDocument.exists", "true")])
+        fields = {k: datagen.to_value(v) for k, v in data.items()}
+        self._call("PATCH", f"{self.base}/{path}?{mask}", {"fields": fields})
+
+
+def _audit(uid: str, email: str, event: str, resource: str, action: str, details: dict) -> Dict[str, Any]:
+    """An ``activity_logs`` entry as ``AuditLogger.log`` writes it."""
+    return {
+        "userId": uid,
+        "userEmail": email,
+        "eventType": event,
+        "resource": resource,
+        "action": action,
+        "sensitivityLevel": "SENSITIVE",
+        "status": "success",
+        "details": details,
+        "ipAddress": "127.0.0.1",
+        "userAgent": "harness.load",
+        "sessionId": f"load-{uid}",
+        "timestamp": datetime.now(timezone.utc),
+        "hdsCompliance": {"version": "2022-01", "retentionPeriod": 1095, "cryptographicTimestamp": True, "immutable": True},
+    }
+
+
+class FirestoreJourney:
+    """The Firestore traffic of the consultation services for one practitioner."""
+
+    def __init__(self, practitioner: Practitioner) -> None:
+        self.p = practitioner
+        self.uid = practitioner.account.uid
+        self.client = FirestoreClient(practitioner.account.id_token)
+        self.rng = random.Random(practitioner.index)
+
+    def _store(self, collection: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        g = self.p.generator
+        return datagen.prepare_for_storage(data, collection, self.uid, g.cipher, g.user_key)
+
+    def _log(self, event: str, resource: str, action: str, details: dict) -> None:
+        self.client.create("activity_logs", _audit(self.uid, self.p.account.email, event, resource, action, details))
+
+    def create(self) -> str:
+        patient = self.rng.choice(self.p.patients)
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        consultation = self.p.generator.consultation(patient, now, initial=False)
+        consultation["createdAt"] = consultation["updatedAt"] = now
+        consultation_id = self.client.create("consultations", self._store("consultations", consultation))
+        # InvoiceService.createInvoice
+        self.client.query("invoices", {"consultationId": consultation_id, "osteopathId": self.uid})
+        if self.client.get(f"patients/{patient['id']}") is None:
+            raise LookupError(f"patient {patient['id']} not found")
+        invoice = self.p.generator.invoice(patient, consultation_id, consultation)
+        invoice_id = self.client.create("invoices", self._store("invoices", invoice))
+        self._log("DATA_MODIFICATION", f"invoices/{invoice_id}", "create", {"patientId": patient["id"]})
+        self._log("DATA_CREATION", f"consultations/{consultation_id}", "create", {"patientId": patient["id"]})
+        return consultation_id
+
+    def list(self) -> List[Dict[str, Any]]:
+        return self.client.query("consultations", {"osteopathId": self.uid}, order_by="date")
+
+    def detail(self, consultation_id: str) -> Dict[str, Any]:
+        consultation = self.client.get(f"consultations/{consultation_id}")
+        if consultation is None:
+            raise LookupError(f"consultation {consultation_id} not found")
+        return consultation
+
+    def edit(self, consultation_id: str) -> None:
+        existing = self.detail(consultation_id)
+        existing.pop("id")
+        merged = {**existing, "notes": self.rng.choice(datagen.NOTES) or "Séance de suivi.", "updatedAt": datetime.now(timezone.utc)}
+        self.client.update(f"consultations/{consultation_id}", self._store("consultations", merged))
+        patient_id = existing["patientId"]
+        # AppointmentService.syncPatientNextAppointment
+        if self.client.get(f"patients/{patient_id}") is not None:
+            now = datetime.now(timezone.utc)
+            upcoming = sorted(
+                a["date"] for a in self.client.query("appointments", {"patientId": patient_id, "osteopathId": self.uid})
+                if a["date"] > now and a.get("status") not in ("cancelled", "completed")
+            )
+            self.client.update(f"patients/{patient_id}", {
+                "nextAppointment": upcoming[0].strftime("%Y-%m-%dT%H:%M:00") if upcoming else None,
+                "updatedAt": now.isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            })
+        # BidirectionalSyncService.syncPatientFromInitialConsultation
+        if existing.get("isInitialConsultation"):
+            if self.client.get(f"patients/{patient_id}") is not None:
+                self.client.update(f"patients/{patient_id}", {
+                    "medicalHistory": merged.get("medicalHistory", ""),
+                    "updatedAt": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+                })
+        self._log("DATA_MODIFICATION", f"consultations/{consultation_id}", "update", {"fields": ["notes"]})
+
+
+# --- browser driver ---------------------------------------------------------
+
+# Served as ES modules by the Vite dev server: importing them returns the
+# instances the app itself uses (same Firebase app, same signed-in user).
+SERVICE_JS = """
+async ({ op, id, form, notes }) => {
+  const { ConsultationService } = await import('/src/services/consultationService.ts');
+  switch (op) {
+    case 'create': return await ConsultationService.createConsultation(form);
+    case 'list': return (await ConsultationService.getAllConsultations()).map(c => c.id);
+    case 'detail': return (await ConsultationService.getConsultationById(id))?.id ?? null;
+    case 'edit': await ConsultationService.updateConsultation(id, { notes }); return id;
+  }
+}
+"""
+
+
+class BrowserJourney:
+    """The consultation services of the app, called inside a logged-in page."""
+
+    def __init__(self, practitioner: Practitioner, page: async_api.Page) -> None:
+        self.p = practitioner
+        self.page = page
+        self.rng = random.Random(practitioner.index)
+
+    async def _call(self, op: str, **args: Any) -> Any:
+        return await self.page.evaluate(SERVICE_JS, {"op": op, "id": None, "form": None, "notes": None, **args})
+
+    async def create(self) -> str:
+        patient = self.rng.choice(self.p.patients)
+        form = self.p.generator.consultation(patient, datetime.now(timezone.utc).replace(microsecond=0), initial=False)
+        for name in ("osteopathId", "createdAt", "updatedAt", "documents"):
+            form.pop(name)
+        form["date"] = form["date"].isoformat()
+        return await self._call("create", form=form)
+
+    async def list(self) -> List[str]:
+        return await self._call("list")
+
+    async def detail(self, consultation_id: str) -> str:
+        found = await self._call("detail", id=consultation_id)
+        if found is None:
+            raise LookupError(f"consultation {consultation_id} not found")
+        return found
+
+    async def edit(self, consultation_id: str) -> None:
+        await self._call("edit", id=consultation_id, notes=self.rng.choice(datagen.NOTES) or "Séance de suivi.")
+
+
+# --- scheduling -------------------------------------------------------------
+
+async def run_journeys(
+    journey: Any,
+    practitioner: Practitioner,
+    stats: Stats,
+    deadline: float,
+    iterations: Optional[int],
+    think_time: float,
+    offload: bool,
+) -> None:
+    """Loop create → list → detail → edit until the deadline or the iteration count."""
+    loop = asyncio.get_running_loop()
+
+    async def call(method, *args):
+        # Firestore journeys block on HTTP and run in the executor; browser
+        # journeys are coroutines.
+        if offload:
+            return await loop.run_in_executor(None, method, *args)
+        return await method(*args)
+
+    for iteration in itertools.count():
+        if (iterations is not None and iteration >= iterations) or time.perf_counter() >= deadline:
+            return
+        try:
+            async with stats.measure("create"):
+                consultation_id = await call(journey.create)
+            practitioner.created.append(consultation_id)
+            async with stats.measure("list"):
+                await call(journey.list)
+            async with stats.measure("detail"):
+                await call(journey.detail, consultation_id)
+            async with stats.measure("edit"):
+                await call(journey.edit, consultation_id)
+            stats.journeys += 1
+        except Exception:
+            # Counted by ``measure``; the simulated user starts over.
+            pass
+        if think_time:
+            await asyncio.sleep(think_time * (0.5 + journey.rng.random()))
+
+
+async def run_load(
+    practitioners: List[Practitioner],
+    *,
+    mode: str = "firestore",
+    duration: float = 60.0,
+    iterations: Optional[int] = None,
+    ramp_up: float = 0.0,
+    think_time: float = 0.0,
+    headless: bool = True,
+) -> Stats:
+    stats = Stats()
+    deadline = time.perf_counter() + duration
+
+    async def delayed(index: int, coro) -> None:
+        if ramp_up and len(practitioners) > 1:
+            await asyncio.sleep(ramp_up * index / (len(practitioners) - 1))
+        await coro
+
+    if mode == "firestore":
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=max(4, len(practitioners))))
+        await asyncio.gather(*(
+            delayed(p.index, run_journeys(FirestoreJourney(p), p, stats, deadline, iterations, think_time, offload=True))
+            for p in practitioners
+        ))
+        return stats
+
+    async with async_api.async_playwright() as pw:
+        browser = await launch_browser(pw, headless=headless)
+
+        async def user(p: Practitioner) -> None:
+            context = await browser.new_context()
+            context.set_default_timeout(DEFAULT_TIMEOUT_MS * 4)
+            try:
+                page = await context.new_page()
+                await page.goto(app_url("/login"), wait_until="domcontentloaded")
+                await login(page, p.account.email, p.account.password)
+                await run_journeys(BrowserJourney(p, page), p, stats, deadline, iterations, think_time, offload=False)
+            finally:
+                await context.close()
+
+        try:
+            await asyncio.gather(*(delayed(p.index, user(p)) for p in practitioners))
+        finally:
+            await browser.close()
+    return stats
+
+
+def write_report(report: Dict[str, Any]) -> Path:
+    PERF_ROOT.mkdir(parents=True, exist_ok=True)
+    path = PERF_ROOT / f"load-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.load", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mode", choices=("firestore", "browser"), default="firestore")
+    parser.add_argument("-u", "--users", type=int, default=10, help="concurrent simulated practitioners (default: 10)")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of load (default: 60)")
+    parser.add_argument("--iterations", type=int, help="journeys per user, overrides --duration")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds over which users start")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between journeys, in seconds")
+    parser.add_argument("--preset", choices=sorted(datagen.PRESETS), default="small", help="practice size of each user")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--encrypt", action="store_true", help="seed and write HDS-encrypted documents")
+    parser.add_argument("--emulators", action="store_true", help="start (and stop) the emulators, and the app in browser mode")
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args(argv)
+
+    environment = (
+        emulators.HermeticEnvironment(preset=args.preset, seed=args.seed, serve_app=args.mode == "browser")
+        if args.emulators else nullcontext()
+    )
+    try:
+        with environment:
+            print(f"provisioning {args.users} practitioner(s)...", flush=True)
+            practitioners = provision(args.users, args.preset, args.seed, args.encrypt)
+            stats = asyncio.run(run_load(
+                practitioners,
+                mode=args.mode,
+                duration=float("inf") if args.iterations else args.duration,
+                iterations=args.iterations,
+                ramp_up=args.ramp_up,
+                think_time=args.think_time,
+                headless=not args.headed,
+            ))
+    except emulators.EmulatorError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    except urllib.error.URLError as exc:
+        print(f"emulators unreachable: {exc}", file=sys.stderr)
+        return 2
+
+    report = stats.report(args.users, args.mode)
+    print(format_report(report))
+    print(f"load report: {write_report(report)}")
+    return 1 if any(op["errors"] for op in report["operations"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
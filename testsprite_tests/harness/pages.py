@@ -0,0 +1,247 @@
+"""Page objects of the screens the scenarios drive.
+
+Each screen is a ``PageObject`` obtained with ``Screen.of(page)``, which
+returns the same instance for the lifetime of the page, and its locators are
+``cached_property``s built once per instance from roles, labels and the
+``data-testid`` hooks of the app (never from absolute xpaths, which evaluate
+against the whole DOM and break on any layout change). Scenario scripts and
+``harness.steps`` go through these classes only, so a UI change is fixed in
+one place.
+"""
+
+from __future__ import annotations
+
+import weakref
+from functools import cached_property
+from datetime import datetime
+from typing import Dict, List, Optional, Type, TypeVar
+
+from playwright import async_api
+from playwright.async_api import expect
+
+from . import waits
+from .config import app_url
+
+T = TypeVar("T", bound="PageObject")
+
+LOAD_TIMEOUT_MS = 10000
+
+_objects: "weakref.WeakKeyDictionary[async_api.Page, Dict[type, PageObject]]" = weakref.WeakKeyDictionary()
+
+
+class PageObject:
+    """Base of the screens: one instance and one set of locators per page."""
+
+    path: Optional[str] = None
+
+    def __init__(self, page: async_api.Page) -> None:
+        self.page = page
+
+    @classmethod
+    def of(cls: Type[T], page: async_api.Page) -> T:
+        objects = _objects.setdefault(page, {})
+        if cls not in objects:
+            objects[cls] = cls(page)
+        return objects[cls]
+
+    async def goto(self) -> None:
+        await self.page.goto(app_url(self.path or "/"), wait_until="commit")
+        await waits.settle(self.page)
+
+
+class LoginPage(PageObject):
+    path = "/login"
+
+    @cached_property
+    def email(self) -> async_api.Locator:
+        return self.page.get_by_label("Email", exact=True)
+
+    @cached_property
+    def password(self) -> async_api.Locator:
+        return self.page.get_by_label("Mot de passe", exact=True)
+
+    @cached_property
+    def submit(self) -> async_api.Locator:
+        return self.page.get_by_role("button", name="Se connecter", exact=True)
+
+    @cached_property
+    def app_shell(self) -> async_api.Locator:
+        # Only rendered by DashboardLayout, i.e. once the user is authenticated.
+        return self.page.locator("header").get_by_role("button", name="Notifications")
+
+    async def sign_in(self, user: str, password: str) -> None:
+        await self.email.fill(user)
+        await self.password.fill(password)
+        await self.submit.click()
+
+
+class ConsultationsPage(PageObject):
+    path = "/consultations"
+
+    @cached_property
+    def heading(self) -> async_api.Locator:
+        return self.page.get_by_role("heading", name="Consultations & Agenda")
+
+    @cached_property
+    def loading(self) -> async_api.Locator:
+        return self.page.get_by_test_id("consultations-loading")
+
+    @cached_property
+    def new_consultation(self) -> async_api.Locator:
+        # Labelled "Nouvelle" only on small screens.
+        return self.page.get_by_role("button", name="Nouvelle", exact=False).first
+
+    @cached_property
+    def stats(self) -> async_api.Locator:
+        return self.page.get_by_text("Rendez-vous", exact=True)
+
+    @cached_property
+    def retry(self) -> async_api.Locator:
+        return self.page.get_by_role("button", name="Réessayer")
+
+    @cached_property
+    def list_rows(self) -> async_api.Locator:
+        return self.page.get_by_test_id("consultation-list-row")
+
+    async def row_dates(self) -> List[datetime]:
+        """Dates of the rendered history rows, in display order."""
+        values = await self.list_rows.locator("time").evaluate_all(
+            "nodes => nodes.map(node => node.getAttribute('datetime'))"
+        )
+        return [datetime.fromisoformat(value.replace("Z", "+00:00")) for value in values]
+
+    async def open(self) -> None:
+        await self.page.goto(app_url(self.path), wait_until="commit")
+        await self.wait_loaded()
+
+    async def wait_loaded(self) -> None:
+        await expect(self.heading).to_be_visible(timeout=LOAD_TIMEOUT_MS)
+        await expect(self.loading).to_have_count(0, timeout=LOAD_TIMEOUT_MS)
+        await waits.settle(self.page)
+
+    async def open_new_consultation(self) -> "NewConsultationModal":
+        modal = NewConsultationModal.of(self.page)
+        if not await modal.dialog.is_visible():
+            await self.new_consultation.click()
+            await expect(modal.dialog).to_be_visible()
+        return modal
+
+
+class PatientDetailPage(PageObject):
+    """Patient record; its consultations tab is where the detail modal opens."""
+
+    @cached_property
+    def consultations_tab(self) -> async_api.Locator:
+        return self.page.get_by_role("button", name="Consultations (")
+
+    @cached_property
+    def consultation_rows(self) -> async_api.Locator:
+        return self.page.get_by_test_id("consultation-row")
+
+    async def open_first_patient(self) -> None:
+        await self.page.goto(app_url("/patients"), wait_until="commit")
+        await waits.settle(self.page)
+        await self.page.locator('a[href^="/patients/"]').first.click()
+        await expect(self.consultations_tab).to_be_visible(timeout=LOAD_TIMEOUT_MS)
+
+    async def view_consultation(self, index: int = 0) -> "ViewConsultationModal":
+        await self.consultations_tab.click()
+        row = self.consultation_rows.nth(index)
+        await row.get_by_role("button", name="Voir", exact=True).click()
+        modal = ViewConsultationModal.of(self.page)
+        await modal.wait_loaded()
+        return modal
+
+
+class ViewConsultationModal(PageObject):
+
+    @cached_property
+    def dialog(self) -> async_api.Locator:
+        return self.page.get_by_test_id("view-consultation-modal")
+
+    @cached_property
+    def title(self) -> async_api.Locator:
+        return self.dialog.get_by_role("heading", level=2)
+
+    @cached_property
+    def loading(self) -> async_api.Locator:
+        return self.dialog.get_by_test_id("consultation-loading")
+
+    @cached_property
+    def error(self) -> async_api.Locator:
+        return self.dialog.get_by_role("alert")
+
+    @cached_property
+    def close_button(self) -> async_api.Locator:
+        return self.dialog.get_by_role("button", name="Fermer", exact=True)
+
+    async def wait_loaded(self) -> None:
+        await expect(self.dialog).to_be_visible(timeout=LOAD_TIMEOUT_MS)
+        await expect(self.loading).to_have_count(0, timeout=LOAD_TIMEOUT_MS)
+
+    async def close(self) -> None:
+        await self.close_button.click()
+        await expect(self.dialog).to_be_hidden()
+
+
+class NewConsultationModal(PageObject):
+
+    # Values the form accepts; callers override single fields.
+    VALID = {
+        "date": "2025-03-14",
+        "time": "10:30",
+        "duration": "60",
+        "price": "60",
+        "consultationReason": "Lombalgie aiguë",
+    }
+
+    @cached_property
+    def dialog(self) -> async_api.Locator:
+        return self.page.get_by_test_id("new-consultation-modal")
+
+    @cached_property
+    def patient(self) -> async_api.Locator:
+        return self.dialog.get_by_label("Patient *")
+
+    @cached_property
+    def patient_options(self) -> async_api.Locator:
+        # The first option is the "Sélectionner un patient" placeholder.
+        return self.patient.locator("option")
+
+    @cached_property
+    def selected_patient(self) -> async_api.Locator:
+        return self.dialog.get_by_test_id("selected-patient")
+
+    @cached_property
+    def errors(self) -> async_api.Locator:
+        return self.dialog.locator("p.text-error")
+
+    @cached_property
+    def submit(self) -> async_api.Locator:
+        return self.page.get_by_role("button", name="Créer la consultation")
+
+    @cached_property
+    def created(self) -> async_api.Locator:
+        return self.dialog.get_by_text("Consultation créée avec succès")
+
+    def field(self, field_id: str) -> async_api.Locator:
+        return self.dialog.locator(f"#{field_id}")
+
+    async def select_patient(self, index: int = 1) -> str:
+        """Select the ``index``-th option and return the patient's name."""
+        option = self.patient_options.nth(index)
+        await expect(option).to_be_attached(timeout=LOAD_TIMEOUT_MS)
+        name = (await option.inner_text()).strip()
+        await self.patient.select_option(index=index)
+        return name
+
+    async def fill(self, **values: str) -> None:
+        for field_id, value in values.items():
+            await self.field(field_id).fill(value)
+            await self.field(field_id).blur()
+
+    async def fill_valid(self, **overrides: str) -> None:
+        await self.fill(**{**self.VALID, **overrides})
+
+    def error(self, message: str) -> async_api.Locator:
+        return self.errors.filter(has_text=message)
@@ -0,0 +1,282 @@
+"""Page-load and interaction performance capture.
+
+Every scenario context gets a ``PerfRecorder``. An init script registers
+``PerformanceObserver``s for LCP, layout shifts (CLS), event timing (an
+INP-style worst interaction latency) and long tasks before any app code runs.
+When the scenario ends, Navigation Timing, paint entries, the observer
+totals, the JS heap (``performance.memory`` and CDP ``Performance.getMetrics``)
+and the durations of the steps marked with ``perf.step()`` are written as
+one JSON record under ``tmp/perf/<run id>/``. ``write_report`` rolls the
+records of a run up into ``report.json``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from playwright import async_api
+
+from .config import SUITE_DIR
+
+PERF_ROOT = SUITE_DIR / "tmp" / "perf"
+
+_enabled = os.environ.get("TESTSPRITE_PERF", "1") != "0"
+_run_dir: Optional[Path] = None
+
+# Set by the runner for each scenario task; standalone scripts fall back to
+# the name of the executed file.
+current_scenario: ContextVar[Optional[str]] = ContextVar("current_scenario", default=None)
+
+OBSERVERS_JS = """
+(() => {
+  if (window.__testspritePerf) return;
+  const perf = window.__testspritePerf = {
+    lcp: null, cls: 0, inp: null, interactions: 0, longTasks: 0, longTaskMs: 0
+  };
+  const observe = (type, onEntry, options = {}) => {
+    try {
+      new PerformanceObserver(list => list.getEntries().forEach(onEntry))
+        .observe({ type, buffered: true, ...options });
+    } catch (e) { /* entry type not supported by this browser */ }
+  };
+  observe('largest-contentful-paint', e => { perf.lcp = e.startTime; });
+  observe('layout-shift', e => { if (!e.hadRecentInput) perf.cls += e.value; });
+  observe('longtask', e => { perf.longTasks += 1; perf.longTaskMs += e.duration; });
+  observe('event', e => {
+    if (!e.interactionId) return;
+    perf.interactions += 1;
+    perf.inp = Math.max(perf.inp || 0, e.duration);
+  }, { durationThreshold: 16 });
+})();
+"""
+
+COLLECT_JS = """
+() => {
+  const nav = performance.getEntriesByType('navigation')[0];
+  const fcp = performance.getEntriesByName('first-contentful-paint')[0];
+  const memory = performance.memory;
+  return {
+    url: location.href,
+    navigation: nav ? {
+      ttfb: nav.responseStart - nav.startTime,
+      domInteractive: nav.domInteractive - nav.startTime,
+      domContentLoaded: nav.domContentLoadedEventEnd - nav.startTime,
+      load: nav.loadEventEnd > 0 ? nav.loadEventEnd - nav.startTime : null,
+      transferSize: nav.transferSize
+    } : null,
+    fcp: fcp ? fcp.startTime : null,
+    vitals: window.__testspritePerf || null,
+    heap: memory ? { used: memory.usedJSHeapSize, total: memory.totalJSHeapSize } : null,
+    resources: performance.getEntriesByType('resource').length
+  };
+}
+"""
+
+CDP_METRICS = ("JSHeapUsedSize", "JSHeapTotalSize", "Nodes", "LayoutCount", "RecalcStyleCount", "ScriptDuration", "TaskDuration")
+
+
+def set_enabled(enabled: bool) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def run_dir() -> Path:
+    """Directory receiving the records of the current run."""
+    global _run_dir
+    if _run_dir is None:
+        run_id = os.environ.get("TESTSPRITE_RUN_ID") or datetime.now().strftime("%Y%m%d-%H%M%S")
+        _run_dir = PERF_ROOT / run_id
+    return _run_dir
+
+
+def set_run_dir(path: Path) -> None:
+    global _run_dir
+    _run_dir = path
+
+
+def _scenario_name() -> str:
+    name = current_scenario.get()
+    if name:
+        return name
+    import __main__
+    return Path(getattr(__main__, "__file__", "scenario")).stem
+
+
+class PerfRecorder:
+    """Collects the measurements of one scenario context."""
+
+    def __init__(self, context: async_api.BrowserContext, scenario: str) -> None:
+        self.context = context
+        self.scenario = scenario
+        self.started = time.perf_counter()
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.steps: List[Dict[str, Any]] = []
+
+    async def install(self) -> None:
+        await self.context.add_init_script(OBSERVERS_JS)
+
+    def add_step(self, name: str, duration_ms: float, ok: bool = True) -> None:
+        self.steps.append({"name": name, "durationMs": round(duration_ms, 1), "ok": ok})
+
+    async def _page_metrics(self, page: async_api.Page) -> Dict[str, Any]:
+        try:
+            metrics = await page.evaluate(COLLECT_JS)
+        except async_api.Error:
+            return {"url": page.url}
+        try:
+            cdp = await self.context.new_cdp_session(page)
+            await cdp.send("Performance.enable")
+            raw = await cdp.send("Performance.getMetrics")
+            metrics["cdp"] = {m["name"]: m["value"] for m in raw["metrics"] if m["name"] in CDP_METRICS}
+            await cdp.detach()
+        except async_api.Error:
+            pass
+        return metrics
+
+    async def collect(self, status: str) -> Dict[str, Any]:
+        pages = [await self._page_metrics(page) for page in self.context.pages if not page.is_closed()]
+        return {
+            "scenario": self.scenario,
+            "testId": self.scenario.split("_", 1)[0],
+            "status": status,
+            "startedAt": self.started_at,
+            "durationMs": round((time.perf_counter() - self.started) * 1000, 1),
+            "steps": self.steps,
+            "pages": pages,
+            "metrics": summarize(pages, self.steps),
+        }
+
+    async def finish(self, status: str) -> Optional[Path]:
+        record = await self.collect(status)
+        directory = run_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / (re.sub(r"\W+", "_", self.scenario) + ".json")
+        path.write_text(json.dumps(record, indent=2), encoding="utf-8")
+        return path
+
+
+def summarize(pages: List[Dict[str, Any]], steps: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Flatten the main page and the steps into ``name -> value`` metrics."""
+    metrics: Dict[str, float] = {}
+    main = pages[0] if pages else {}
+    for key, value in (main.get("navigation") or {}).items():
+        if value is not None:
+            metrics[f"nav.{key}"] = value
+    if main.get("fcp") is not None:
+        metrics["vitals.fcp"] = main["fcp"]
+    vitals = main.get("vitals") or {}
+    for key in ("lcp", "cls", "inp", "longTasks", "longTaskMs"):
+        if vitals.get(key) is not None:
+            metrics[f"vitals.{key}"] = vitals[key]
+    heap = (main.get("cdp") or {}).get("JSHeapUsedSize") or (main.get("heap") or {}).get("used")
+    if heap is not None:
+        metrics["heap.used"] = heap
+    for step in steps:
+        if step["ok"]:
+            # Repeated step names keep their worst duration.
+            key = f"step.{step['name']}"
+            metrics[key] = max(metrics.get(key, 0), step["durationMs"])
+    return metrics
+
+
+_recorders: Dict[int, PerfRecorder] = {}
+
+
+async def attach(context: async_api.BrowserContext) -> Optional[PerfRecorder]:
+    """Create the recorder of a new scenario context (before any page opens)."""
+    if not _enabled:
+        return None
+    recorder = PerfRecorder(context, _scenario_name())
+    await recorder.install()
+    _recorders[id(context)] = recorder
+    return recorder
+
+
+async def detach(context: async_api.BrowserContext, status: str) -> Optional[Path]:
+    """Write the record of ``context``; called right before it is closed."""
+    recorder = _recorders.pop(id(context), None)
+    if recorder is None:
+        return None
+    try:
+        return await recorder.finish(status)
+    except async_api.Error:
+        return None
+
+
+@asynccontextmanager
+async def step(page: async_api.Page, name: str) -> AsyncIterator[None]:
+    """Time the enclosed block as step ``name`` of the current scenario."""
+    started = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        recorder = _recorders.get(id(page.context))
+        if recorder:
+            recorder.add_step(name, (time.perf_counter() - started) * 1000, ok)
+
+
+def load_records(directory: Path) -> List[Dict[str, Any]]:
+    return [
+        json.loads(path.read_text(encoding="utf-8"))
+        for path in sorted(directory.glob("*.json"))
+        if path.name != "report.json"
+    ]
+
+
+def write_report(directory: Optional[Path] = None) -> Optional[Path]:
+    """Roll the per-scenario records of a run up into ``report.json``."""
+    directory = directory or run_dir()
+    records = load_records(directory) if directory.exists() else []
+    if not records:
+        return None
+    report = {
+        "run": directory.name,
+        "generatedAt": datetime.now().isoformat(timespec="seconds"),
+        "scenarios": [
+            {
+                "scenario": r["scenario"],
+                "testId": r["testId"],
+                "status": r["status"],
+                "durationMs": r["durationMs"],
+                "metrics": r["metrics"],
+            }
+            for r in records
+        ],
+        "totals": {
+            "scenarios": len(records),
+            "durationMs": round(sum(r["durationMs"] for r in records), 1),
+            "slowest": max(records, key=lambda r: r["durationMs"])["scenario"],
+        },
+    }
+    path = directory / "report.json"
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return path
+
+
+def format_report(path: Path) -> str:
+    """Human-readable table of a ``report.json``."""
+    report = json.loads(path.read_text(encoding="utf-8"))
+    columns = ("nav.domContentLoaded", "vitals.lcp", "vitals.cls", "vitals.inp", "vitals.longTasks", "heap.used")
+    lines = [f"{'scenario':<8} {'total ms':>9} " + " ".join(f"{c.split('.')[-1]:>16}" for c in columns)]
+    for entry in report["scenarios"]:
+        metrics = entry["metrics"]
+        cells = []
+        for column in columns:
+            value = metrics.get(column)
+            cells.append(f"{'-' if value is None else round(value, 3):>16}")
+        lines.append(f"{entry['testId']:<8} {entry['durationMs']:>9.0f} " + " ".join(cells))
+    return "\n".join(lines)
@@ -0,0 +1,193 @@
+"""Discovery and concurrent execution of the TC scenarios.
+
+Scenarios come from two sources: the rows of the table generated from the
+test plan (see ``harness.scenarios``) and the ``TC0xx_*.py`` scripts, each of
+which exposes ``async def run_test(browser=None)``. Scripts whose content is
+byte-identical to another one (the ``... 2.py`` copies an export leaves
+behind) are collected once. The runner launches a single Chromium and awaits
+up to ``workers`` scenarios at a time, each one inside its own
+``BrowserContext`` so cookies, storage and pages never leak between them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import importlib.util
+import re
+import time
+import traceback
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+from typing import Iterable, List, Optional, Union
+
+from playwright import async_api
+
+from . import perf
+from .scenarios import PLAN_PATH, TableScenario, load_table
+from .auth import ensure_storage_state
+from .browser import launch_browser
+from .config import SUITE_DIR
+
+SCENARIO_PATTERN = re.compile(r"^(TC\d{3})_.*\.py$")
+
+PASSED = "passed"
+FAILED = "failed"
+ERROR = "error"
+TIMEOUT = "timeout"
+SKIPPED = "skipped"
+
+SOURCES = ("table", "scripts")
+
+
+@dataclass
+class Scenario:
+    """A discovered TC script."""
+
+    test_id: str
+    path: Path
+    skip_reason: Optional[str] = None
+    manual_steps: List[str] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return self.path.stem
+
+    def load(self) -> ModuleType:
+        """Import the script without triggering its ``__main__`` block."""
+        module_name = "testsprite_" + re.sub(r"\W", "_", self.path.stem)
+        spec = importlib.util.spec_from_file_location(module_name, self.path)
+        if spec is None or spec.loader is None:
+            raise ImportError(f"Cannot load scenario {self.path}")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        if not hasattr(module, "run_test"):
+            raise ImportError(f"{self.path.name} does not define run_test()")
+        return module
+
+    async def run(self, browser: async_api.Browser) -> None:
+        await self.load().run_test(browser)
+
+
+AnyScenario = Union[Scenario, TableScenario]
+
+
+@dataclass
+class ScenarioResult:
+    scenario: AnyScenario
+    status: str
+    duration: float
+    message: str = ""
+    details: str = field(default="", repr=False)
+
+    @property
+    def ok(self) -> bool:
+        return self.status in (PASSED, SKIPPED)
+
+
+def _copy_suffix(path: Path) -> bool:
+    """``TC001_x 2.py`` is a copy of ``TC001_x.py``, which is preferred."""
+    return bool(re.search(r" \d+$", path.stem))
+
+
+def discover_scripts(directory: Path = SUITE_DIR) -> List[Scenario]:
+    """Return the TC scripts of ``directory``, byte-identical copies removed."""
+    seen = set()
+    scenarios = []
+    paths = [p for p in directory.iterdir() if SCENARIO_PATTERN.match(p.name) and p.is_file()]
+    for path in sorted(paths, key=lambda p: (_copy_suffix(p), p.name)):
+        digest = hashlib.sha256(path.read_bytes()).digest()
+        if digest in seen:
+            continue
+        seen.add(digest)
+        scenarios.append(Scenario(test_id=SCENARIO_PATTERN.match(path.name).group(1), path=path))
+    return scenarios
+
+
+def discover(
+    directory: Path = SUITE_DIR,
+    keyword: Optional[str] = None,
+    source: str = "table",
+) -> List[AnyScenario]:
+    """Return the scenarios of ``source`` sorted by test id.
+
+    ``source`` is ``table`` (the test plan rows) or ``scripts`` (the TC
+    scripts). Both name a scenario after its script, so only one of them runs
+    at a time and their performance records stay comparable.
+    """
+    if source not in SOURCES:
+        raise ValueError(f"unknown scenario source {source!r}")
+    scenarios: List[AnyScenario]
+    if source == "table":
+        plan = directory / PLAN_PATH.name
+        scenarios = list(load_table(plan)) if plan.exists() else []
+    else:
+        scenarios = list(discover_scripts(directory))
+    if keyword:
+        scenarios = [s for s in scenarios if keyword.lower() in s.name.lower()]
+    return sorted(scenarios, key=lambda s: (s.test_id, s.name))
+
+
+async def run_scenario(
+    scenario: AnyScenario,
+    browser: async_api.Browser,
+    timeout: Optional[float] = None,
+) -> ScenarioResult:
+    """Run one scenario against the shared browser and capture its outcome."""
+    started = time.perf_counter()
+    if scenario.skip_reason:
+        return ScenarioResult(scenario=scenario, status=SKIPPED, duration=0.0, message=scenario.skip_reason)
+    perf.current_scenario.set(scenario.name)
+    try:
+        await asyncio.wait_for(scenario.run(browser), timeout=timeout)
+    except AssertionError as exc:
+        status, message, details = FAILED, str(exc), traceback.format_exc()
+    except asyncio.TimeoutError:
+        status, message, details = TIMEOUT, f"exceeded {timeout:.0f}s", ""
+    except Exception as exc:  # noqa: BLE001 - any crash is reported, not raised
+        status, message, details = ERROR, f"{type(exc).__name__}: {exc}", traceback.format_exc()
+    else:
+        status, details = PASSED, ""
+        message = f"{len(scenario.manual_steps)} step(s) not automated" if scenario.manual_steps else ""
+    return ScenarioResult(
+        scenario=scenario,
+        status=status,
+        duration=time.perf_counter() - started,
+        message=message,
+        details=details,
+    )
+
+
+async def run_suite(
+    scenarios: Iterable[AnyScenario],
+    *,
+    workers: int = 4,
+    headless: bool = True,
+    timeout: Optional[float] = None,
+    refresh_auth: bool = False,
+    on_result=None,
+) -> List[ScenarioResult]:
+    """Run ``scenarios`` with at most ``workers`` of them in flight at once.
+
+    The login happens once, before any scenario starts, so a broken account
+    or endpoint is reported a single time instead of by every worker.
+    """
+    scenarios = list(scenarios)
+    semaphore = asyncio.Semaphore(max(1, workers))
+
+    async with async_api.async_playwright() as pw:
+        browser = await launch_browser(pw, headless=headless)
+        try:
+            await ensure_storage_state(browser, refresh=refresh_auth)
+
+            async def worker(scenario: AnyScenario) -> ScenarioResult:
+                async with semaphore:
+                    result = await run_scenario(scenario, browser, timeout)
+                if on_result:
+                    on_result(result)
+                return result
+
+            return list(await asyncio.gather(*(worker(s) for s in scenarios)))
+        finally:
+            await browser.close()
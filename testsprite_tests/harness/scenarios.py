@@ -0,0 +1,145 @@
+"""Scenario table generated from ``testsprite_frontend_test_plan.json``.
+
+Every step description of the test plan is matched against ``RULES`` and
+turned into a call of a ``harness.steps`` primitive; the resulting rows form
+one table that the runner executes like the TC scripts, inside the same
+isolated, authenticated and instrumented contexts. A step no rule matches
+(server fault injection, locale switching, unit tests...) is kept in the row
+as not automated: it is reported with the result, and a row whose first
+step or every step is not automated is skipped rather than passed.
+
+``python -m harness --collect-only -v`` prints the table.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+from . import steps
+from .browser import scenario_context
+from .config import SUITE_DIR
+
+PLAN_PATH = SUITE_DIR / "testsprite_frontend_test_plan.json"
+
+# First match wins; a rule may expand into several primitive calls.
+RULES: List[Tuple[Pattern[str], List[Tuple[str, Dict[str, Any]]]]] = [
+    (re.compile(p, re.IGNORECASE), calls)
+    for p, calls in [
+        (r"(navigate to|visit) the consultations list", [("open_list", {})]),
+        (r"list is fully loaded", [("expect_list_loaded", {})]),
+        (r"(select|click on) (a|the first) consultation item", [("open_detail", {})]),
+        (r"navigation to the detail page", [("expect_detail_open", {})]),
+        (r"for valid data, verify all consultation fields", [("expect_detail_open", {})]),
+        (r"start end-to-end test environment", [("login", {})]),
+        (r"(navigate to|open) (the )?consultation creation form", [("open_new_form", {})]),
+        (r"^in the consultation creation form", [("open_new_form", {}), ("fill_form", {}), ("fill_field", {"date": ""})]),
+        (r"typing a patient's name", [("expect_patient_options", {})]),
+        (r"patient suggestions are displayed", [("expect_patient_options", {})]),
+        (r"select a patient from", [("select_patient", {})]),
+        (r"selected patient is correctly set", [("expect_patient_selected", {})]),
+        # date, time, duration and price have defaults: clear one of them.
+        (r"fill some but not all mandatory fields", [("select_patient", {}), ("fill_field", {"time": ""})]),
+        (r"fill (in valid data|the consultation creation form with valid data)( and submit)?$",
+         [("open_new_form", {}), ("fill_form", {})]),
+        (r"^input zero or negative duration", [("fill_field", {"duration": "0"})]),
+        (r"^input negative price", [("fill_field", {"duration": "60", "price": "-10"})]),
+        (r"^(attempt to )?submit the form", [("submit_form", {})]),
+        (r"error messages? (are|is) shown for mandatory fields", [("expect_submit_blocked", {})]),
+        (r"still prevents submission", [("expect_submit_blocked", {})]),
+        (r"validation error messages for invalid date", [("expect_field_error", {"message": "Ce champ est requis"})]),
+        (r"duration requiring positive", [("expect_field_error", {"message": "Durée minimum 15 minutes"})]),
+        (r"non-negative price", [("expect_field_error", {"message": "Le tarif doit être positif"})]),
+        # The app confirms in place with a success banner instead of redirecting.
+        (r"(toast notification|consultation is created and user redirected)", [("expect_created", {})]),
+        (r"redirected to the detailed consultation page", [("expect_created", {})]),
+    ]
+]
+
+
+@dataclass
+class PlannedStep:
+    description: str
+    calls: List[Tuple[str, Dict[str, Any]]]
+
+    @property
+    def automated(self) -> bool:
+        return bool(self.calls)
+
+
+@dataclass
+class TableScenario:
+    """One row of the table: a test plan entry and its primitive calls."""
+
+    test_id: str
+    title: str
+    priority: str
+    steps: List[PlannedStep] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        # Same stem as the generated TC script, so perf records and
+        # baselines line up whichever source ran.
+        return f"{self.test_id}_" + re.sub(r"[\s-]", "_", re.sub(r"[^\w\s-]", "", self.title))
+
+    def describe(self) -> List[str]:
+        """One line per plan step: the primitive calls, then the description."""
+        lines = []
+        for step in self.steps:
+            calls = ", ".join(
+                name + (f"({', '.join(f'{k}={v!r}' for k, v in kwargs.items())})" if kwargs else "")
+                for name, kwargs in step.calls
+            )
+            lines.append(f"{calls or '-':<48} {step.description}")
+        return lines
+
+    @property
+    def manual_steps(self) -> List[str]:
+        return [step.description for step in self.steps if not step.automated]
+
+    @property
+    def skip_reason(self) -> Optional[str]:
+        if not any(step.automated for step in self.steps):
+            return "no automated step"
+        if not self.steps[0].automated:
+            # The later steps depend on a setup the table cannot reproduce.
+            return f"setup not automated: {self.steps[0].description}"
+        return None
+
+    async def run(self, browser=None) -> None:
+        async with scenario_context(browser) as context:
+            ctx = steps.StepContext(context, await context.new_page())
+            await steps.STEPS["login"](ctx)
+            for step in self.steps:
+                for name, kwargs in step.calls:
+                    try:
+                        await steps.STEPS[name](ctx, **kwargs)
+                    except AssertionError as exc:
+                        raise AssertionError(f"{step.description}: {exc}") from exc
+
+
+def compile_step(description: str) -> PlannedStep:
+    for pattern, calls in RULES:
+        if pattern.search(description):
+            for name, _ in calls:
+                if name not in steps.STEPS:
+                    raise KeyError(f"rule {pattern.pattern!r} uses unknown primitive {name!r}")
+            return PlannedStep(description, calls)
+    return PlannedStep(description, [])
+
+
+def load_table(path: Path = PLAN_PATH) -> List[TableScenario]:
+    plan = json.loads(path.read_text(encoding="utf-8"))
+    return [
+        TableScenario(
+            test_id=entry["id"],
+            title=entry["title"],
+            priority=entry.get("priority", ""),
+            steps=[compile_step(step["description"]) for step in entry.get("steps", [])],
+        )
+        for entry in plan
+    ]
+
@@ -0,0 +1,148 @@
+"""Reusable step primitives of the data-driven scenarios.
+
+A primitive is an ``async def`` taking the ``StepContext`` of the running
+scenario plus keyword arguments from the scenario table, registered under a
+short name with ``@primitive``. Primitives drive the UI through the page
+objects of ``harness.pages``, and the ones that load a screen are timed with ``perf.step`` under the same names the TC scripts use, so
+their records stay comparable with the baselines.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict
+
+from playwright import async_api
+from playwright.async_api import expect
+
+from . import perf, waits
+from .auth import login
+from .config import app_url
+from .pages import ConsultationsPage, NewConsultationModal, PatientDetailPage, ViewConsultationModal
+
+Primitive = Callable[..., Awaitable[None]]
+
+STEPS: Dict[str, Primitive] = {}
+
+
+@dataclass
+class StepContext:
+    """State shared by the steps of one scenario run."""
+
+    context: async_api.BrowserContext
+    page: async_api.Page
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+def primitive(name: str) -> Callable[[Primitive], Primitive]:
+    def register(fn: Primitive) -> Primitive:
+        if name in STEPS:
+            raise ValueError(f"step primitive {name!r} registered twice")
+        STEPS[name] = fn
+        return fn
+    return register
+
+
+@primitive("login")
+async def login_step(ctx: StepContext) -> None:
+    await ctx.page.goto(app_url(), wait_until="commit", timeout=10000)
+    await waits.settle(ctx.page)
+    async with perf.step(ctx.page, "session"):
+        await login(ctx.page)
+
+
+@primitive("open_list")
+async def open_list(ctx: StepContext) -> None:
+    async with perf.step(ctx.page, "consultation_list"):
+        await ConsultationsPage.of(ctx.page).open()
+
+
+@primitive("expect_list_loaded")
+async def expect_list_loaded(ctx: StepContext) -> None:
+    consultations = ConsultationsPage.of(ctx.page)
+    await expect(consultations.loading).to_have_count(0)
+    await expect(consultations.retry).to_have_count(0)
+    await expect(consultations.stats.first).to_be_visible()
+
+
+@primitive("open_detail")
+async def open_detail(ctx: StepContext, index: int = 0) -> None:
+    """Open the ``index``-th consultation of the first patient."""
+    patient = PatientDetailPage.of(ctx.page)
+    await patient.open_first_patient()
+    async with perf.step(ctx.page, "consultation_detail"):
+        await patient.view_consultation(index)
+
+
+@primitive("expect_detail_open")
+async def expect_detail_open(ctx: StepContext) -> None:
+    detail = ViewConsultationModal.of(ctx.page)
+    await expect(detail.title).to_contain_text("Consultation du")
+    await expect(detail.error).to_have_count(0)
+    await expect(detail.close_button).to_be_visible()
+
+
+@primitive("open_new_form")
+async def open_new_form(ctx: StepContext) -> None:
+    consultations = ConsultationsPage.of(ctx.page)
+    if not await NewConsultationModal.of(ctx.page).dialog.is_visible() and "/consultations" not in ctx.page.url:
+        await consultations.open()
+    await consultations.open_new_consultation()
+
+
+@primitive("expect_patient_options")
+async def expect_patient_options(ctx: StepContext) -> None:
+    form = NewConsultationModal.of(ctx.page)
+    await expect(form.patient_options.nth(1)).to_be_attached(timeout=10000)
+
+
+@primitive("select_patient")
+async def select_patient(ctx: StepContext, index: int = 1) -> None:
+    ctx.data["patient"] = await NewConsultationModal.of(ctx.page).select_patient(index)
+
+
+@primitive("expect_patient_selected")
+async def expect_patient_selected(ctx: StepContext) -> None:
+    name = ctx.data.get("patient")
+    assert name, "no patient was selected by a previous step"
+    await expect(NewConsultationModal.of(ctx.page).selected_patient).to_contain_text(name)
+
+
+@primitive("fill_form")
+async def fill_form(ctx: StepContext, **values: str) -> None:
+    """Fill the creation form with valid values overridden by ``values``."""
+    if "patient" not in ctx.data:
+        await select_patient(ctx)
+    await NewConsultationModal.of(ctx.page).fill_valid(**values)
+
+
+@primitive("fill_field")
+async def fill_field(ctx: StepContext, **values: str) -> None:
+    await NewConsultationModal.of(ctx.page).fill(**values)
+
+
+@primitive("submit_form")
+async def submit_form(ctx: StepContext) -> None:
+    """Click submit, or record that the form keeps it disabled while invalid."""
+    button = NewConsultationModal.of(ctx.page).submit
+    ctx.data["blocked"] = await button.is_disabled()
+    if not ctx.data["blocked"]:
+        async with perf.step(ctx.page, "consultation_create"):
+            await button.click()
+            await waits.settle(ctx.page)
+
+
+@primitive("expect_submit_blocked")
+async def expect_submit_blocked(ctx: StepContext) -> None:
+    assert ctx.data.get("blocked"), "the form accepted an incomplete consultation"
+    await expect(NewConsultationModal.of(ctx.page).dialog).to_be_visible()
+
+
+@primitive("expect_field_error")
+async def expect_field_error(ctx: StepContext, message: str) -> None:
+    await expect(NewConsultationModal.of(ctx.page).error(message)).to_be_visible()
+
+
+@primitive("expect_created")
+async def expect_created(ctx: StepContext) -> None:
+    await expect(NewConsultationModal.of(ctx.page).created).to_be_visible(timeout=15000)
@@ -0,0 +1,155 @@
+"""Event-driven waits replacing the fixed sleeps of the generated scripts.
+
+Every helper resolves as soon as its signal is observed (an element becomes
+visible, the loading spinners of the app disappear, Firestore has no request
+in flight, the route changes) and never waits longer than ``MAX_WAIT_MS``,
+the global upper bound shared by all scenarios.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import time
+from typing import Callable, Dict, Optional, Pattern, Union
+
+from playwright import async_api
+
+MAX_WAIT_MS = int(os.environ.get("TESTSPRITE_MAX_WAIT_MS", "15000"))
+QUIET_MS = 300
+
+# Loader2 in Consultations.tsx, the detail spinner of ViewConsultationModal.tsx
+# and LoadingScreen all rely on Tailwind's ``animate-spin``.
+SPINNER = ".animate-spin"
+
+FIRESTORE_HOSTS = ("firestore.googleapis.com", "localhost:8080", "127.0.0.1:8080")
+# Long-polling Listen/Write channels stay open for the whole session and must
+# not count as pending work.
+LONG_LIVED = re.compile(r"/(Listen|Write)/channel")
+
+
+def _bounded(timeout: Optional[float]) -> float:
+    return MAX_WAIT_MS if timeout is None else min(timeout, MAX_WAIT_MS)
+
+
+class FirestoreTracker:
+    """Counts the Firestore requests currently in flight for one context."""
+
+    def __init__(self) -> None:
+        self.pending = 0
+        self.last_activity = time.monotonic()
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @staticmethod
+    def is_firestore(request: async_api.Request) -> bool:
+        url = request.url
+        return any(host in url for host in FIRESTORE_HOSTS) and not LONG_LIVED.search(url)
+
+    def on_request(self, request: async_api.Request) -> None:
+        if self.is_firestore(request):
+            self.pending += 1
+            self.last_activity = time.monotonic()
+            self._idle.clear()
+
+    def on_done(self, request: async_api.Request) -> None:
+        if self.is_firestore(request) and self.pending > 0:
+            self.pending -= 1
+            self.last_activity = time.monotonic()
+            if self.pending == 0:
+                self._idle.set()
+
+    async def wait_idle(self, quiet_ms: int, timeout_ms: float) -> None:
+        deadline = time.monotonic() + timeout_ms / 1000
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise async_api.TimeoutError(f"Firestore still busy after {timeout_ms:.0f}ms ({self.pending} pending)")
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                continue
+            quiet_for = time.monotonic() - self.last_activity
+            if quiet_for * 1000 >= quiet_ms:
+                return
+            await asyncio.sleep(min(quiet_ms / 1000 - quiet_for, max(remaining, 0)))
+
+
+_trackers: Dict[int, FirestoreTracker] = {}
+
+
+def instrument(context: async_api.BrowserContext) -> FirestoreTracker:
+    """Start counting Firestore traffic of ``context``; idempotent."""
+    key = id(context)
+    if key not in _trackers:
+        tracker = FirestoreTracker()
+        context.on("request", tracker.on_request)
+        context.on("requestfinished", tracker.on_done)
+        context.on("requestfailed", tracker.on_done)
+        context.on("close", lambda _: _trackers.pop(key, None))
+        _trackers[key] = tracker
+    return _trackers[key]
+
+
+async def visible(locator: async_api.Locator, timeout: Optional[float] = None) -> async_api.Locator:
+    """Wait until ``locator`` is visible and return it."""
+    await locator.wait_for(state="visible", timeout=_bounded(timeout))
+    return locator
+
+
+async def spinners_gone(page: async_api.Page, timeout: Optional[float] = None) -> None:
+    """Wait until no loading spinner is rendered."""
+    await page.locator(SPINNER).first.wait_for(state="hidden", timeout=_bounded(timeout))
+
+
+async def firestore_idle(
+    page: async_api.Page,
+    quiet_ms: int = QUIET_MS,
+    timeout: Optional[float] = None,
+) -> None:
+    """Wait until the page's Firestore requests have drained for ``quiet_ms``."""
+    await instrument(page.context).wait_idle(quiet_ms, _bounded(timeout))
+
+
+async def route(
+    page: async_api.Page,
+    target: Union[str, Pattern[str], Callable[[str], bool]],
+    timeout: Optional[float] = None,
+) -> None:
+    """Wait for client-side navigation to ``target``.
+
+    A plain string is matched as a path prefix (``"/consultations"``); regexes
+    and predicates are handed to Playwright unchanged.
+    """
+    if isinstance(target, str):
+        path = target
+        target = lambda url: re.sub(r"^[a-z]+://[^/]+", "", url).startswith(path)  # noqa: E731
+    await page.wait_for_url(target, wait_until="commit", timeout=_bounded(timeout))
+
+
+async def settle(page: async_api.Page, timeout: Optional[float] = None) -> None:
+    """Wait for a loaded, idle screen: DOM ready, no spinner, Firestore drained."""
+    bound = _bounded(timeout)
+    started = time.monotonic()
+
+    def left() -> float:
+        return max(bound - (time.monotonic() - started) * 1000, 1)
+
+    try:
+        await page.wait_for_load_state("domcontentloaded", timeout=left())
+        await spinners_gone(page, left())
+        await firestore_idle(page, timeout=left())
+    except async_api.TimeoutError:
+        # The upper bound is reached: hand over to the next step, whose own
+        # locator wait or assertion reports what is actually missing.
+        pass
+
+
+async def ready(page: async_api.Page, locator: async_api.Locator, timeout: Optional[float] = None) -> async_api.Locator:
+    """Wait until no spinner is shown and ``locator`` can be interacted with."""
+    try:
+        await spinners_gone(page, timeout)
+    except async_api.TimeoutError:
+        pass
+    return await visible(locator, timeout)